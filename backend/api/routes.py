@@ -1,38 +1,89 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
+from flask_sock import Sock
 import os
+import shutil
 import uuid
 import tempfile
+import threading
+import queue
+import zipfile
+import select
+import socket
+import hmac
+import time
+from contextlib import nullcontext
+from dataclasses import replace
 from werkzeug.utils import secure_filename
 import json
-import sys
+import base64
+import binascii
+import logging
 from dotenv import load_dotenv
 
 from services.audio_service import AudioSegmenter, AudioSegmenterConfig
 from services.speech_analysis import SpeechAnalyzer
-from services.transcription import TranscriptionService
+from services.transcription import TranscriptionService, TranscriptionProfile
 from services.gemini_service import GeminiService
+from services.live_session import LiveAnalysisSession, LiveSessionConfig
+from services.pipeline import AnalysisPipeline
+from services.motion import MotionAnalyzer, MotionConfig
+from services.analysis_profiles import DEFAULT_PROFILES, ProfileSelector
+from services.inference_pool import InferencePool
+from services.batch_analysis import BatchAnalyzer
+from services.streaming_pipeline import StreamingAnalyzer
 from utils.data_processor import DataProcessor
 from utils.visualization import VisualizationHelper
+from utils.result_store import ResultStore
+from utils.window_cache import WindowCache
+from utils.scheduler import FairScheduler
+from utils.cancellation import JobCancelled
+from utils.checkpoint_store import CheckpointStore
+from utils.profiler import RequestProfiler
+from utils.response_encoding import ResponseEncoder
+from utils.analytics_export import AnalyticsExporter
+from utils.upload_sessions import UploadSessionStore, UploadError, CHECKSUM_ALGORITHMS
+from utils.tracing import trace
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
+# WebSocket support (initialized against the app in create_app)
+sock = Sock()
+
 # Get Gemini API key from environment
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
-    print("WARNING: GEMINI_API_KEY not found in environment variables", file=sys.stderr)
-    print("Environment variables:", {k: v for k, v in os.environ.items() if 'API' in k or 'KEY' in k}, file=sys.stderr)
+    # Only variable names are logged; their values may be secrets
+    logger.warning("GEMINI_API_KEY not found in environment variables (key variables set: %s)",
+                   sorted(k for k in os.environ if 'API' in k or 'KEY' in k))
     # Try to load from .env file directly as a fallback
     load_dotenv()
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
     if GEMINI_API_KEY:
-        print("Successfully loaded GEMINI_API_KEY from .env file", file=sys.stderr)
+        logger.info("Successfully loaded GEMINI_API_KEY from .env file")
     else:
-        print("Failed to load GEMINI_API_KEY from both environment and .env file", file=sys.stderr)
+        logger.warning("Failed to load GEMINI_API_KEY from both environment and .env file")
 
 # Initialize services
+WHISPER_MODEL_SIZE = os.environ.get('WHISPER_MODEL_SIZE', 'tiny')
+# Whisper decode profile: greedy or beam search, bounded temperature fallback,
+# optionally pinned language (otherwise detected once per recording)
+WHISPER_DECODING = os.environ.get('WHISPER_DECODING', 'greedy')
+transcription_profile = TranscriptionProfile(
+    beam_size=int(os.environ.get('WHISPER_BEAM_SIZE', 5)) if WHISPER_DECODING == 'beam' else None,
+    language=os.environ.get('WHISPER_LANGUAGE') or None,
+    temperatures=tuple(float(t) for t in os.environ.get('WHISPER_TEMPERATURES', '0.0,0.4').split(','))
+)
 speech_analyzer = SpeechAnalyzer()
-transcription_service = TranscriptionService()
+transcription_service = TranscriptionService(model_size=WHISPER_MODEL_SIZE, profile=transcription_profile)
+# Previews always use the tiny model with greedy decoding; share the instance when the main service matches
+preview_profile = replace(transcription_profile, beam_size=None)
+preview_transcription_service = (
+    transcription_service if WHISPER_MODEL_SIZE == 'tiny' and preview_profile == transcription_profile
+    else TranscriptionService(model_size='tiny', profile=preview_profile)
+)
 gemini_service = GeminiService(api_key=GEMINI_API_KEY)  # Pass API key explicitly
 visualization_helper = VisualizationHelper()
 
@@ -41,18 +92,463 @@ FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
 audio_config = AudioSegmenterConfig(ffmpeg_path=FFMPEG_PATH)
 audio_segmenter = AudioSegmenter(audio_config)
 data_processor = DataProcessor(FFMPEG_PATH)
+result_store = ResultStore(
+    max_history_sessions=int(os.environ.get('PROGRESS_HISTORY_SESSIONS', 50)),
+    max_finished_jobs=int(os.environ.get('RESULT_MAX_FINISHED_JOBS', 1024)),
+    finished_ttl=float(os.environ.get('RESULT_TTL_SECONDS', 3600))
+)
+
+# Per-window inference cache for re-uploads of edited recordings (opt-in; it also
+# switches to content-defined windows, so the timeline differs from plan_segments)
+WINDOW_CACHE_SIZE = int(os.environ.get('WINDOW_CACHE_SIZE', 0))
+window_cache = WindowCache(max_entries=WINDOW_CACHE_SIZE) if WINDOW_CACHE_SIZE > 0 else None
+
+# Run model inference in a pool of worker processes (0 = in the web process)
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 0))
+inference_pool = (
+    InferencePool(INFERENCE_WORKERS, whisper_model_size=WHISPER_MODEL_SIZE, transcription_profile=transcription_profile)
+    if INFERENCE_WORKERS > 0 else None
+)
+
+# Body-language motion metrics from a low-rate, low-resolution video decode (0 disables)
+MOTION_ANALYSIS = os.environ.get('MOTION_ANALYSIS', '1') == '1'
+motion_analyzer = MotionAnalyzer(MotionConfig(ffmpeg_path=FFMPEG_PATH)) if MOTION_ANALYSIS else None
+
+# Per-window rows of completed analyses, appended to a partitioned Parquet/Arrow dataset (unset disables)
+analytics_exporter = AnalyticsExporter.from_env()
+
+analysis_pipeline = AnalysisPipeline(
+    audio_segmenter,
+    speech_analyzer,
+    transcription_service,
+    gemini_service,
+    data_processor,
+    visualization_helper,
+    preview_transcription_service=preview_transcription_service,
+    result_store=result_store,
+    window_cache=window_cache,
+    inference_pool=inference_pool,
+    motion_analyzer=motion_analyzer,
+    analytics_exporter=analytics_exporter
+)
+
+# Build the multi-resolution timeline for every upload (or per request with ?timeline=1)
+TIMELINE_PYRAMID = os.environ.get('TIMELINE_PYRAMID', '0') == '1'
+
+batch_analyzer = BatchAnalyzer(analysis_pipeline)
+
+def _parse_client_weights(value):
+    """Parse SCHEDULER_CLIENT_WEIGHTS ("client=weight,...")"""
+    weights = {}
+    for entry in value.split(','):
+        client_id, _, weight = entry.strip().partition('=')
+        if client_id and weight:
+            weights[client_id] = float(weight)
+    return weights
+
+# Fair scheduling of uploads across clients (weighted fair queuing on audio length)
+scheduler = FairScheduler(
+    max_concurrent=int(os.environ.get('SCHEDULER_MAX_CONCURRENT', 2)),
+    per_client_limit=int(os.environ.get('SCHEDULER_CLIENT_LIMIT', 1)),
+    client_weights=_parse_client_weights(os.environ.get('SCHEDULER_CLIENT_WEIGHTS', ''))
+)
+
+# Analysis profiles (lite / standard / deep); standard follows the configured Whisper
+# model, decoding and window lengths and is the default. ANALYSIS_PROFILE=auto (opt-in)
+# picks the richest enabled profile predicted to finish within ANALYSIS_SLO_SECONDS.
+ANALYSIS_PROFILE = os.environ.get('ANALYSIS_PROFILE', 'standard')
+ANALYSIS_PROFILES = os.environ.get('ANALYSIS_PROFILES', 'deep,standard,lite').split(',')
+ANALYSIS_SLO_SECONDS = float(os.environ.get('ANALYSIS_SLO_SECONDS', 120))
+WHISPER_DEEP_MODEL_SIZE = os.environ.get('WHISPER_DEEP_MODEL_SIZE', 'base')
+_profile_overrides = {
+    'deep': {'whisper_model_size': WHISPER_DEEP_MODEL_SIZE},
+    'standard': {
+        'whisper_model_size': WHISPER_MODEL_SIZE,
+        'beam_size': transcription_profile.beam_size,
+        'min_window': audio_config.min_duration,
+        'max_window': audio_config.max_duration
+    }
+}
+profile_selector = ProfileSelector(
+    [replace(p, **_profile_overrides.get(p.name, {})) for p in DEFAULT_PROFILES if p.name in ANALYSIS_PROFILES],
+    slo_seconds=ANALYSIS_SLO_SECONDS,
+    max_concurrent=scheduler.max_concurrent,
+    default=ANALYSIS_PROFILE
+)
+_profile_pipelines = {}
+_profile_pipelines_lock = threading.Lock()
+
+# Stage checkpoints so interrupted jobs resume after a restart (quota 0 disables)
+CHECKPOINT_DIR = os.environ.get('CHECKPOINT_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'checkpoints'))
+CHECKPOINT_QUOTA_MB = int(os.environ.get('CHECKPOINT_QUOTA_MB', 0))
+checkpoint_store = (
+    CheckpointStore(CHECKPOINT_DIR, CHECKPOINT_QUOTA_MB * 1024 * 1024)
+    if CHECKPOINT_QUOTA_MB > 0 else None
+)
+
+# Per-request profiling (X-Profile: 1 or ?profile=1) requires this key in X-Admin-Key
+PROFILING_ADMIN_KEY = os.environ.get('PROFILING_ADMIN_KEY')
+
+# Seconds between client-disconnect checks while a synchronous upload is analyzed
+DISCONNECT_POLL_INTERVAL = float(os.environ.get('DISCONNECT_POLL_INTERVAL', 0.5))
+
+# Upper bound on the number of videos accepted by one batch upload
+MAX_BATCH_FILES = int(os.environ.get('MAX_BATCH_FILES', 50))
+
+# Resumable (tus) uploads: partial files live here until complete; idle uploads expire.
+# Streamable containers are decoded while the chunks arrive (UPLOAD_STREAM_DECODE=0 disables).
+MAX_UPLOAD_BYTES = 700 * 1024 * 1024
+UPLOAD_SESSION_DIR = os.environ.get('UPLOAD_SESSION_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'upload_sessions'))
+UPLOAD_STREAM_DECODE = os.environ.get('UPLOAD_STREAM_DECODE', '1') == '1'
+UPLOAD_SESSION_TTL_HOURS = float(os.environ.get('UPLOAD_SESSION_TTL_HOURS', 24))
+# Created on the first resumable upload request, so importing this module touches no files
+_upload_sessions = None
+_upload_sessions_lock = threading.Lock()
+TUS_VERSION = '1.0.0'
+
+# Recordings at least this long are analyzed while decoding, in bounded memory,
+# instead of through a WAV and segment files (0 disables)
+STREAMING_ANALYSIS_MIN_SECONDS = float(os.environ.get('STREAMING_ANALYSIS_MIN_SECONDS', 1200))
+
+# Analysis results are encoded with orjson and compressed (brotli/gzip) above this size
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+response_encoder = ResponseEncoder(min_compress_bytes=RESPONSE_COMPRESS_MIN_BYTES)
 
 def allowed_file(filename):
     """Check if file has an allowed extension"""
     ALLOWED_EXTENSIONS = {'mp4', 'mov', 'avi', 'webm'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def get_client_id():
+    """Identify the client for fair scheduling (X-Client-Id header, else remote address)"""
+    return request.headers.get('X-Client-Id') or request.remote_addr or 'anonymous'
+
+def _is_admin():
+    """Check the X-Admin-Key header against PROFILING_ADMIN_KEY"""
+    key = request.headers.get('X-Admin-Key', '')
+    return bool(PROFILING_ADMIN_KEY) and hmac.compare_digest(key.encode(), PROFILING_ADMIN_KEY.encode())
+
+def _encoded_response(payload, status=200):
+    """
+    Build a response for an analysis payload, honouring Accept-Encoding,
+    ?points=N (downsampled timeline series; full resolution without it) and
+    ?layout=columnar (per-segment lists as parallel arrays)
+    """
+    points = request.args.get('points', type=int)
+    if points and points > 0:
+        payload = visualization_helper.downsample_payload(payload, points)
+    body, headers = response_encoder.encode(
+        payload,
+        accept_encoding=request.headers.get('Accept-Encoding'),
+        columnar=request.args.get('layout') == 'columnar'
+    )
+    return Response(body, status=status, headers=headers)
+
+def _profiling(job_id, enabled):
+    """Context manager yielding a RequestProfiler for the job, or None when not profiling"""
+    return RequestProfiler(job_id) if enabled else nullcontext()
+
+def _store_profile(job_id, profiler, result):
+    """Keep a finished profile as a job artifact and link it from the result"""
+    result_store.set_artifact(job_id, 'profile', profiler)
+    result['profile_url'] = f"/api/jobs/{job_id}/profile"
+
+def _open_checkpoint(job_id, upload_path, client_id, build_pyramid, cost, analysis='standard'):
+    """Open the job's checkpoint (None when checkpointing is disabled)"""
+    if checkpoint_store is None:
+        return None
+    return checkpoint_store.open(job_id, upload_path, {
+        'client_id': client_id,
+        'build_pyramid': build_pyramid,
+        'cost': cost,
+        'analysis': analysis
+    })
+
+def _close_checkpoint(checkpoint, status):
+    """Record how a job ended; cancelled jobs drop their checkpoint"""
+    if checkpoint is None:
+        return
+    if status == 'cancelled':
+        checkpoint_store.discard(checkpoint.job_id)
+    else:
+        checkpoint.set_status(status)
+
+def _pipeline_for(analysis_profile):
+    """
+    Pipeline wired for an analysis profile. Profiles matching the configured
+    model and windows share analysis_pipeline; others are built on first use.
+    """
+    same_model = (analysis_profile.whisper_model_size == WHISPER_MODEL_SIZE
+                  and analysis_profile.beam_size == transcription_profile.beam_size)
+    same_windows = (analysis_profile.min_window, analysis_profile.max_window) == (audio_config.min_duration, audio_config.max_duration)
+    if not analysis_profile.use_models or (same_model and same_windows):
+        return analysis_pipeline
+
+    with _profile_pipelines_lock:
+        if analysis_profile.name not in _profile_pipelines:
+            service = transcription_service if same_model else TranscriptionService(
+                model_size=analysis_profile.whisper_model_size,
+                profile=replace(transcription_profile, beam_size=analysis_profile.beam_size)
+            )
+            _profile_pipelines[analysis_profile.name] = analysis_pipeline.with_services(
+                audio_segmenter=AudioSegmenter(replace(
+                    audio_config, min_duration=analysis_profile.min_window, max_duration=analysis_profile.max_window
+                )),
+                transcription_service=service,
+                # Pool workers and cached windows hold results of the configured model
+                inference_pool=inference_pool if same_model else None,
+                window_cache=window_cache if same_model else None
+            )
+        return _profile_pipelines[analysis_profile.name]
+
+def _select_profile(upload_path, requested=None):
+    """
+    Probe an upload and choose its analysis profile.
+
+    Returns:
+        Tuple of (profile, selection record, scheduler cost)
+
+    Raises:
+        ValueError: If the requested profile is unknown
+    """
+    duration = audio_segmenter.probe_duration(upload_path)
+    analysis_profile, selection = profile_selector.select(duration, scheduler.load(), requested)
+    cost = scheduler.estimate_cost(duration) * profile_selector.cost_weight(analysis_profile)
+    return analysis_profile, selection, cost
+
+def resume_interrupted_jobs():
+    """
+    Resubmit jobs whose process stopped while they were running.
+    They continue from their last checkpointed stage as full (non-preview) runs;
+    each job is claimed by one process, however many workers start.
+    """
+    if checkpoint_store is None:
+        return []
+    resumed = []
+    for manifest in checkpoint_store.claim_interrupted_jobs():
+        job_id = manifest['job_id']
+        upload_path = manifest['source_path']
+        if 'decode' not in manifest['stages'] and not (upload_path and os.path.exists(upload_path)):
+            # Nothing to resume from: the upload is gone and the audio was never decoded
+            checkpoint_store.discard(job_id)
+            continue
+        metadata = manifest['metadata']
+        result_store.create_job(job_id)
+        threading.Thread(
+            target=_run_full_job,
+            args=(job_id, upload_path, metadata.get('build_pyramid', False),
+                  metadata.get('client_id', 'anonymous'), metadata.get('cost')),
+            kwargs={'analysis': metadata.get('analysis', 'standard')},
+            daemon=True
+        ).start()
+        resumed.append(job_id)
+    if resumed:
+        logger.info("Resuming %d interrupted job(s) from checkpoints", len(resumed))
+    return resumed
+
+def _record_session(client_id, job_id, result):
+    """
+    Add a completed analysis to the client's practice history. The result is
+    already stored, so a failure here is logged without failing the job.
+    """
+    try:
+        result_store.record_session(client_id, job_id, result)
+    except Exception:
+        logger.exception("Recording session %s for client %s failed", job_id, client_id)
+
+def _should_stream(duration, analysis_profile, pipeline, build_pyramid):
+    """
+    Whether a recording is long enough to be analyzed while decoding.
+    The timeline pyramid and the inference pool read the decoded WAV, so they
+    keep the file-based analysis.
+    """
+    return (STREAMING_ANALYSIS_MIN_SECONDS > 0 and duration >= STREAMING_ANALYSIS_MIN_SECONDS
+            and analysis_profile.use_models and pipeline.inference_pool is None
+            and not (build_pyramid or analysis_profile.build_pyramid))
+
+def _run_streaming(job_id, upload_path, decoded_audio, pipeline, analysis_profile, duration, cost,
+                   client_id, cancel_token, job_span, profile, selection):
+    """
+    Analyze a long recording in bounded memory, storing the final result
+    (no preview pass and no checkpoints).
+    """
+    with scheduler.slot(client_id, cost, job_id, cancel_token) as slot:
+        started = time.perf_counter()
+        job_span.set(queue_wait=slot.queue_wait, audio_seconds=round(duration, 2), streaming=True)
+        progress = lambda stage, fraction: result_store.update_progress(
+            job_id, 'full', stage, fraction)
+        with _profiling(job_id, profile) as profiler:
+            result = StreamingAnalyzer(pipeline).analyze(
+                decoded_audio or upload_path, job_id,
+                video_path=upload_path,
+                progress=profiler.wrap_progress(progress) if profiler else progress,
+                cancel_token=cancel_token,
+                use_llm=analysis_profile.use_llm,
+                analysis_profile=analysis_profile.name,
+                timings={'queue_wait': slot.queue_wait}
+            )
+        profile_selector.record(analysis_profile, result['duration'], time.perf_counter() - started)
+        result['analysis_profile'] = selection or {'name': analysis_profile.name}
+        if profiler is not None:
+            _store_profile(job_id, profiler, result)
+        result_store.set_result(job_id, result, final=True)
+        _record_session(client_id, job_id, result)
+
+def _run_job(job_id, upload_path, analyze, build_pyramid=False, client_id='anonymous', cost=None, profile=False,
+             analysis='standard', selection=None, decoded_audio=None):
+    """
+    Run an analysis job: trace it, schedule it, checkpoint it, store and record
+    its result, and clean up its files. Long recordings are streamed instead.
+    decoded_audio is the WAV of a resumable upload decoded while it was received.
+
+    Args:
+        analyze: Callable(pipeline, analysis_profile, audio, temp_dir, wrap_progress, cancel_token, checkpoint)
+            returning the final result; wrap_progress(callback) adds the profiler's stage timing
+    """
+    with trace(job_id, 'analysis', profile=analysis, client_id=client_id) as job_span:
+        cancel_token = result_store.get_token(job_id)
+        checkpoint = None
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                analysis_profile = profile_selector.get(analysis)
+                pipeline = _pipeline_for(analysis_profile)
+                duration = audio_segmenter.probe_duration(upload_path)
+                if cost is None:
+                    cost = scheduler.estimate_cost(duration) * profile_selector.cost_weight(analysis_profile)
+                if _should_stream(duration, analysis_profile, pipeline, build_pyramid):
+                    _run_streaming(job_id, upload_path, decoded_audio, pipeline, analysis_profile, duration, cost,
+                                   client_id, cancel_token, job_span, profile, selection)
+                    return
+                checkpoint = _open_checkpoint(job_id, upload_path, client_id, build_pyramid, cost, analysis)
+                with scheduler.slot(client_id, cost, job_id, cancel_token) as slot:
+                    started = time.perf_counter()
+                    with _profiling(job_id, profile) as profiler:
+                        audio = pipeline.prepare_audio(upload_path, temp_dir, cancel_token, checkpoint, decoded_audio)
+                        audio["timings"]["queue_wait"] = slot.queue_wait
+                        job_span.set(queue_wait=slot.queue_wait, audio_seconds=round(audio["duration"], 2))
+                        wrap_progress = profiler.wrap_progress if profiler else (lambda callback: callback)
+                        result = analyze(pipeline, analysis_profile, audio, temp_dir, wrap_progress, cancel_token, checkpoint)
+                    profile_selector.record(analysis_profile, audio["duration"], time.perf_counter() - started)
+                    result['analysis_profile'] = selection or {'name': analysis}
+                    if profiler is not None:
+                        _store_profile(job_id, profiler, result)
+                    result_store.set_result(job_id, result, final=True)
+                    _record_session(client_id, job_id, result)
+                    _close_checkpoint(checkpoint, 'completed')
+
+            except JobCancelled as e:
+                logger.info("Job %s cancelled: %s", job_id, e)
+                job_span.status = 'cancelled'
+                _close_checkpoint(checkpoint, 'cancelled')
+
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                job_span.status = 'error'
+                result_store.fail(job_id, str(e))
+                _close_checkpoint(checkpoint, 'failed')
+
+            finally:
+                for path in (upload_path, decoded_audio):
+                    if path and os.path.exists(path):
+                        os.remove(path)
+
+def _run_progressive_job(job_id, upload_path, build_pyramid=False, client_id='anonymous', cost=None, profile=False,
+                         analysis='standard', selection=None, decoded_audio=None):
+    """
+    Run the preview pass, then the refinement pass, storing each result.
+    decoded_audio is the WAV of a resumable upload decoded while it was received.
+    """
+    def analyze(pipeline, analysis_profile, audio, temp_dir, wrap_progress, cancel_token, checkpoint):
+        # Preview occupies the first 20% of the progress bar
+        preview_progress = lambda stage, fraction: result_store.update_progress(
+            job_id, 'preview', stage, 0.2 * fraction)
+        preview = pipeline.run_preview(
+            audio, temp_dir, job_id,
+            progress=wrap_progress(preview_progress),
+            cancel_token=cancel_token
+        )
+        preview['analysis_profile'] = selection or {'name': analysis}
+        result_store.set_result(job_id, preview)
+
+        stage_offsets = {'split': 0.2, 'emotion': 0.25, 'transcription': 0.55, 'insights': 0.9}
+        stage_spans = {'split': 0.05, 'emotion': 0.3, 'transcription': 0.35, 'insights': 0.1}
+        refine_progress = lambda stage, fraction: result_store.update_progress(
+            job_id, 'refine', stage, stage_offsets[stage] + stage_spans[stage] * fraction)
+        return pipeline.run(
+            audio, temp_dir, job_id,
+            progress=wrap_progress(refine_progress),
+            build_pyramid=build_pyramid or analysis_profile.build_pyramid,
+            cancel_token=cancel_token,
+            checkpoint=checkpoint,
+            use_llm=analysis_profile.use_llm,
+            analysis_profile=analysis_profile.name
+        )
+
+    _run_job(job_id, upload_path, analyze, build_pyramid, client_id, cost, profile, analysis, selection, decoded_audio)
+
+def _run_full_job(job_id, upload_path, build_pyramid=False, client_id='anonymous', cost=None, profile=False,
+                  analysis='standard', selection=None, decoded_audio=None):
+    """
+    Run the analysis of the given profile in one pass, storing the result.
+    decoded_audio is the WAV of a resumable upload decoded while it was received.
+    """
+    def analyze(pipeline, analysis_profile, audio, temp_dir, wrap_progress, cancel_token, checkpoint):
+        full_progress = lambda stage, fraction: result_store.update_progress(
+            job_id, 'full', stage, fraction)
+        if not analysis_profile.use_models:
+            return pipeline.run_lite(
+                audio, job_id,
+                progress=wrap_progress(full_progress),
+                cancel_token=cancel_token
+            )
+        return pipeline.run(
+            audio, temp_dir, job_id,
+            progress=wrap_progress(full_progress),
+            build_pyramid=build_pyramid or analysis_profile.build_pyramid,
+            cancel_token=cancel_token,
+            checkpoint=checkpoint,
+            use_llm=analysis_profile.use_llm,
+            analysis_profile=analysis_profile.name
+        )
+
+    _run_job(job_id, upload_path, analyze, build_pyramid, client_id, cost, profile, analysis, selection, decoded_audio)
+
+def _client_disconnected(environ):
+    """
+    Check whether the HTTP client has closed its connection.
+    Uses the raw socket exposed by the Werkzeug and Gunicorn servers; once the
+    request body has been read, a readable socket with no data means EOF.
+    """
+    conn = environ.get('werkzeug.socket') or environ.get('gunicorn.socket')
+    if conn is None:
+        return False
+    try:
+        readable, _, _ = select.select([conn], [], [], 0)
+        return bool(readable) and conn.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
 @api_bp.route('/upload', methods=['POST'])
 def upload_video():
     """
     Handle video upload and processing
-    Returns analysis results including emotion segments and transcription
+    Returns analysis results including emotion segments and transcription.
+    With ?mode=progressive, returns 202 with a job id immediately; a preview
+    result and then the refined result become available at /api/jobs/<job_id>.
+    Closing the connection (or DELETE /api/jobs/<job_id>) cancels the analysis.
+    ?points=N reduces wps_data and emotion_segments to about N display points;
+    ?layout=columnar returns the per-segment lists as parallel arrays.
+    ?analysis=lite|standard|deep picks the analysis profile (lite skips the
+    models and returns only prosody and motion metrics); without the parameter
+    ANALYSIS_PROFILE (default standard) applies. ?analysis=auto, or
+    ANALYSIS_PROFILE=auto, picks the richest profile predicted to meet the
+    latency SLO. The response records the profile under analysis_profile.
     """
+    # Profiling is only available to admins
+    profile = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+    if profile and not _is_admin():
+        return jsonify({'error': 'Profiling requires a valid admin key'}), 403
+    
     # Check if file part exists
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
@@ -76,92 +572,414 @@ def upload_video():
     upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
     file.save(upload_path)
     
-    # Create a temporary directory for processing
-    with tempfile.TemporaryDirectory() as temp_dir:
-        try:
-            # Create output directory for segments
-            output_dir = os.path.join(temp_dir, "output_segments")
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # Extract and split audio
-            full_audio_path, segment_paths = audio_segmenter.extract_and_split_audio(upload_path, output_dir)
-            
-            # Get total duration of the full audio
-            total_duration = data_processor.get_audio_duration(full_audio_path)
-            
-            # Analyze the segments for emotions
-            results = speech_analyzer.analyze_segments(output_dir)
-            
-            # Get segment durations
-            segment_durations = [data_processor.get_audio_duration(path) for path in segment_paths]
-            
-            # Process emotion data into time-based segments
-            emotion_segments = data_processor.process_emotion_data(
-                results, 
-                total_duration, 
-                segment_durations
-            )
-            
-            # Calculate average segment duration (for WPS)
-            average_segment_duration = total_duration / len(segment_paths) if segment_paths else 0
-            
-            # Transcribe segments
-            transcription_data = transcription_service.transcribe_segments(
-                segment_paths, 
-                average_segment_duration,
-                emotion_data=emotion_segments
-            )
-            
-            # Generate LLM insights
-            gemini_analysis = gemini_service.analyze_speech(emotion_segments, transcription_data)
-            
-            # Log the analysis result (for debugging)
-            print(f"Gemini analysis summary: {gemini_analysis.get('summary', 'Not available')[:100]}...", file=sys.stderr)
-            
-            # Save all analysis results to a file
-            results_path = data_processor.save_analysis_results(
-                output_dir, 
-                emotion_segments, 
-                transcription_data,
-                gemini_analysis
+    build_pyramid = TIMELINE_PYRAMID or request.args.get('timeline') == '1'
+    
+    # Pick the profile and estimate the job's cost from the container header before any decoding
+    client_id = get_client_id()
+    try:
+        analysis_profile, selection, cost = _select_profile(upload_path, request.args.get('analysis'))
+    except ValueError as e:
+        os.remove(upload_path)
+        return jsonify({'error': str(e)}), 400
+    job_args = (unique_id, upload_path, build_pyramid, client_id, cost, profile, analysis_profile.name, selection)
+    
+    result_store.create_job(unique_id)
+    
+    if request.args.get('mode') == 'progressive':
+        _start_background_job(job_args, analysis_profile)
+        return jsonify({
+            'success': True,
+            'job_id': unique_id,
+            'status_url': f"/api/jobs/{unique_id}"
+        }), 202
+    
+    return _wait_for_job(unique_id, _run_full_job, job_args)
+
+def _wait_for_job(job_id, target, job_args):
+    """
+    Run a job in a worker thread and respond with its result once it finishes.
+    A closed connection cancels the job.
+    """
+    job_thread = threading.Thread(target=target, args=job_args, daemon=True)
+    job_thread.start()
+    while job_thread.is_alive():
+        job_thread.join(DISCONNECT_POLL_INTERVAL)
+        if job_thread.is_alive() and _client_disconnected(request.environ):
+            result_store.cancel(job_id, 'client disconnected')
+            break
+
+    job = result_store.get(job_id)
+    if job['status'] == 'completed':
+        return _encoded_response(job['result'])
+    if job['status'] == 'cancelled':
+        return jsonify({'error': f"Job cancelled: {job['error']}"}), 409
+    return jsonify({'error': job['error']}), 500
+
+def _start_background_job(job_args, analysis_profile, **kwargs):
+    """Run a job in a background thread; profiles without a preview pass (lite) run in one pass"""
+    target = _run_progressive_job if analysis_profile.preview else _run_full_job
+    threading.Thread(target=target, args=job_args, kwargs=kwargs, daemon=True).start()
+
+def get_upload_sessions():
+    """The resumable upload store; creates its directory and reloads its sessions on first use"""
+    global _upload_sessions
+    with _upload_sessions_lock:
+        if _upload_sessions is None:
+            _upload_sessions = UploadSessionStore(
+                UPLOAD_SESSION_DIR,
+                MAX_UPLOAD_BYTES,
+                expire_seconds=UPLOAD_SESSION_TTL_HOURS * 3600,
+                media_probe=audio_segmenter.probe_streams,
+                decoder_factory=audio_segmenter.open_stream_decoder if UPLOAD_STREAM_DECODE else None
             )
-            
-            # Prepare visualization data
-            emotion_df = visualization_helper.prepare_emotion_timeline_data(emotion_segments)
-            emotion_metrics = visualization_helper.calculate_emotion_metrics(emotion_df)
-            wps_data = None
-            speech_clarity = None
-            
-            if transcription_data:
-                wps_data = visualization_helper.prepare_wps_data(transcription_data)
-                speech_clarity = visualization_helper.prepare_speech_clarity_data(transcription_data)
-            
-            # Create response data
-            response_data = {
-                'success': True,
-                'video_id': unique_id,
-                'emotion_segments': [{'time_range': tr, 'emotion': e} for tr, e in emotion_segments],
-                'transcription_data': transcription_data,
-                'gemini_analysis': gemini_analysis,
-                'emotion_metrics': emotion_metrics,
-                'speech_clarity': speech_clarity if transcription_data else None,
-                'wps_data': json.loads(wps_data.to_json(orient='records')) if wps_data is not None else None,
-                'duration': total_duration
-            }
-            
-            return jsonify(response_data), 200
-            
-        except Exception as e:
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return jsonify({'error': str(e)}), 500
-        
-        finally:
-            # Clean up the uploaded file if needed
-            # Uncomment to delete after processing:
-            if os.path.exists(upload_path):
-                os.remove(upload_path)
-            pass
+    return _upload_sessions
+
+def _tus_headers(session=None):
+    """Protocol headers of a resumable upload response"""
+    headers = {'Tus-Resumable': TUS_VERSION, 'Cache-Control': 'no-store'}
+    if session is not None:
+        headers['Upload-Offset'] = str(session.offset)
+        headers['Upload-Length'] = str(session.length)
+    return headers
+
+def _parse_upload_metadata(value):
+    """Parse an Upload-Metadata header ("key base64value,...")"""
+    metadata = {}
+    for entry in value.split(','):
+        key, _, encoded = entry.strip().partition(' ')
+        if not key:
+            continue
+        try:
+            metadata[key] = base64.b64decode(encoded).decode('utf-8') if encoded else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError(f"Invalid Upload-Metadata value for '{key}'")
+    return metadata
+
+@api_bp.route('/uploads', methods=['OPTIONS'])
+def upload_options():
+    """Advertise the supported resumable upload protocol"""
+    headers = _tus_headers()
+    headers.update({
+        'Tus-Version': TUS_VERSION,
+        'Tus-Extension': 'creation,checksum,termination',
+        'Tus-Max-Size': str(MAX_UPLOAD_BYTES),
+        'Tus-Checksum-Algorithm': ','.join(CHECKSUM_ALGORITHMS)
+    })
+    return '', 204, headers
+
+@api_bp.route('/uploads', methods=['POST'])
+def create_upload():
+    """
+    Start a resumable upload (tus creation). Requires Upload-Length and an
+    Upload-Metadata header with the base64 "filename"; optional "analysis"
+    and "timeline" entries (or the same query parameters) are applied when
+    the upload completes. Returns 201 with the upload URL in Location.
+    Chunks are then sent with PATCH; the job id is the upload id.
+    """
+    length = request.headers.get('Upload-Length', type=int)
+    if length is None:
+        return jsonify({'error': 'Upload-Length header is required'}), 400, _tus_headers()
+    try:
+        metadata = _parse_upload_metadata(request.headers.get('Upload-Metadata', ''))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400, _tus_headers()
+    filename = secure_filename(metadata.get('filename', ''))
+    if not filename or not allowed_file(filename):
+        return jsonify({'error': 'File type not allowed'}), 400, _tus_headers()
+
+    analysis = metadata.get('analysis') or request.args.get('analysis')
+    if analysis and analysis != 'auto':
+        try:
+            profile_selector.get(analysis)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400, _tus_headers()
+    options = {
+        'analysis': analysis or '',
+        'timeline': metadata.get('timeline') or request.args.get('timeline', ''),
+        'client_id': get_client_id()
+    }
+    try:
+        session = get_upload_sessions().create(filename, length, options)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status, _tus_headers()
+
+    headers = _tus_headers(session)
+    headers['Location'] = f"/api/uploads/{session.upload_id}"
+    return jsonify({'upload_id': session.upload_id, 'upload_url': headers['Location']}), 201, headers
+
+@api_bp.route('/uploads/<upload_id>', methods=['HEAD'])
+def upload_offset(upload_id):
+    """Current offset of a resumable upload, for resuming after a dropped connection"""
+    session = get_upload_sessions().get(upload_id)
+    if session is None:
+        return '', 404, _tus_headers()
+    return '', 200, _tus_headers(session)
+
+@api_bp.route('/uploads/<upload_id>', methods=['PATCH'])
+def upload_chunk(upload_id):
+    """
+    Append a chunk at Upload-Offset (body: application/offset+octet-stream).
+    An optional Upload-Checksum ("sha1 <base64>", also md5/sha256) is verified
+    before the offset advances; a mismatch returns 460 and the chunk must be
+    resent. Files that are not usable videos are rejected with 415 as soon
+    as their header arrives. The last chunk starts the analysis in the
+    background and returns 200 with the job id and status URL.
+    """
+    if request.mimetype != 'application/offset+octet-stream':
+        return jsonify({'error': 'Content-Type must be application/offset+octet-stream'}), 415, _tus_headers()
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'Upload-Offset header is required'}), 400, _tus_headers()
+    try:
+        session = get_upload_sessions().append(upload_id, offset, request.stream, request.headers.get('Upload-Checksum'))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status, _tus_headers(get_upload_sessions().get(upload_id))
+    if not session.complete:
+        return '', 204, _tus_headers(session)
+
+    headers = _tus_headers(session)
+    upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{upload_id}_{session.filename}")
+    files = get_upload_sessions().finish(upload_id, upload_path)
+    build_pyramid = TIMELINE_PYRAMID or session.metadata.get('timeline') == '1'
+    client_id = session.metadata.get('client_id') or get_client_id()
+    analysis_profile, selection, cost = _select_profile(upload_path, session.metadata.get('analysis') or None)
+    job_args = (upload_id, upload_path, build_pyramid, client_id, cost, False, analysis_profile.name, selection)
+    result_store.create_job(upload_id)
+    _start_background_job(job_args, analysis_profile, decoded_audio=files['decoded_audio'])
+    return jsonify({
+        'success': True,
+        'job_id': upload_id,
+        'status_url': f"/api/jobs/{upload_id}",
+        'media': session.media,
+        'decoded_during_upload': files['decoded_audio'] is not None
+    }), 200, headers
+
+@api_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+def delete_upload(upload_id):
+    """Abandon a resumable upload and delete its data (tus termination)"""
+    if not get_upload_sessions().delete(upload_id):
+        return '', 404, _tus_headers()
+    return '', 204, _tus_headers()
+
+def _extract_zip_videos(archive, destination, max_bytes):
+    """
+    Extract the allowed video files of an uploaded zip archive.
+    Directory structure is flattened and names are sanitized; extraction stops
+    with a ValueError when the uncompressed total exceeds max_bytes.
+    """
+    paths = []
+    total_bytes = 0
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            name = secure_filename(os.path.basename(info.filename))
+            if info.is_dir() or not allowed_file(name):
+                continue
+            total_bytes += info.file_size
+            if total_bytes > max_bytes:
+                raise ValueError('Archive contents are too large')
+            path = os.path.join(destination, f"{len(paths)}_{name}")
+            with zf.open(info) as src, open(path, 'wb') as dst:
+                while True:
+                    chunk = src.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            paths.append(path)
+    return paths
+
+@api_bp.route('/upload/batch', methods=['POST'])
+def upload_batch():
+    """
+    Handle a multi-video upload (several 'files' fields, or a zip in 'archive')
+    All files are decoded in parallel and their windows share wav2vec2 and
+    Whisper batches; per-file results are returned under one batch id.
+    The batch is one scheduled, cancellable job: like /api/upload it waits
+    for the result, or returns 202 with the job id with ?mode=progressive.
+    """
+    batch_id = str(uuid.uuid4())
+    upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], batch_id)
+    os.makedirs(upload_dir)
+    try:
+        filenames = []
+        video_paths = []
+
+        archive = request.files.get('archive')
+        if archive is not None and archive.filename:
+            if not archive.filename.lower().endswith('.zip'):
+                raise ValueError('Archive must be a .zip file')
+            video_paths = _extract_zip_videos(archive, upload_dir, current_app.config['MAX_CONTENT_LENGTH'])
+            filenames = [os.path.basename(path).split('_', 1)[1] for path in video_paths]
+
+        for file in request.files.getlist('files'):
+            if file.filename == '' or not allowed_file(file.filename):
+                raise ValueError(f"File type not allowed: {file.filename}")
+            filename = secure_filename(file.filename)
+            path = os.path.join(upload_dir, f"{len(video_paths)}_{filename}")
+            file.save(path)
+            filenames.append(filename)
+            video_paths.append(path)
+
+        if not video_paths:
+            raise ValueError('No video files in request')
+        if len(video_paths) > MAX_BATCH_FILES:
+            raise ValueError(f"Too many files (max {MAX_BATCH_FILES})")
+    except (ValueError, zipfile.BadZipFile) as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.exception("Batch upload %s failed", batch_id)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        return jsonify({'error': str(e)}), 500
+
+    # The batch occupies one scheduler slot, weighted by its total audio length
+    cost = sum(scheduler.estimate_cost(audio_segmenter.probe_duration(path)) for path in video_paths)
+    job_args = (batch_id, upload_dir, video_paths, filenames, get_client_id(), cost)
+    result_store.create_job(batch_id)
+
+    if request.args.get('mode') == 'progressive':
+        threading.Thread(target=_run_batch_job, args=job_args, daemon=True).start()
+        return jsonify({
+            'success': True,
+            'job_id': batch_id,
+            'status_url': f"/api/jobs/{batch_id}"
+        }), 202
+    return _wait_for_job(batch_id, _run_batch_job, job_args)
+
+def _run_batch_job(batch_id, upload_dir, video_paths, filenames, client_id, cost):
+    """Analyze the files of a batch upload as one job, storing the combined result."""
+    with trace(batch_id, 'batch_upload', files=len(video_paths), client_id=client_id) as job_span:
+        cancel_token = result_store.get_token(batch_id)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                with scheduler.slot(client_id, cost, batch_id, cancel_token) as slot:
+                    job_span.set(queue_wait=slot.queue_wait)
+                    results = batch_analyzer.analyze_files(
+                        video_paths,
+                        temp_dir,
+                        video_ids=[f"{batch_id}-{i}" for i in range(len(video_paths))],
+                        progress=lambda stage, fraction: result_store.update_progress(batch_id, 'full', stage, fraction),
+                        cancel_token=cancel_token
+                    )
+                for filename, result in zip(filenames, results):
+                    result['filename'] = filename
+                result_store.set_result(batch_id, {
+                    'success': True,
+                    'batch_id': batch_id,
+                    'file_count': len(results),
+                    'results': results
+                }, final=True)
+                for result in results:
+                    if result.get('success'):
+                        _record_session(client_id, result['video_id'], result)
+
+            except JobCancelled as e:
+                logger.info("Batch %s cancelled: %s", batch_id, e)
+                job_span.status = 'cancelled'
+
+            except Exception as e:
+                logger.exception("Batch upload %s failed", batch_id)
+                job_span.status = 'error'
+                result_store.fail(batch_id, str(e))
+
+            finally:
+                shutil.rmtree(upload_dir, ignore_errors=True)
+
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Return the status, progress and latest (preview or refined) result of a job"""
+    job = result_store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return _encoded_response(job)
+
+@api_bp.route('/jobs/<job_id>/profile', methods=['GET'])
+def get_job_profile(job_id):
+    """
+    Download the profile of a job run with profiling enabled (admin only).
+    ?format=json (default) returns stage timings, memory peaks, hot functions
+    and torch operators; ?format=folded returns folded stacks for flamegraph tools.
+    """
+    if not _is_admin():
+        return jsonify({'error': 'Admin key required'}), 403
+    profiler = result_store.get_artifact(job_id, 'profile')
+    if profiler is None:
+        return jsonify({'error': 'No profile for this job'}), 404
+    
+    if request.args.get('format') == 'folded':
+        return Response(
+            profiler.folded(),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename={job_id}.folded'}
+        )
+    response = jsonify(profiler.report())
+    response.headers['Content-Disposition'] = f'attachment; filename={job_id}.profile.json'
+    return response
+
+@api_bp.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job; its stages stop at the next window or batch"""
+    status = result_store.cancel(job_id, 'cancelled by client')
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if status != 'cancelled':
+        return jsonify({'error': f"Job already {status}"}), 409
+    return jsonify({'success': True, 'job_id': job_id, 'status': status}), 202
+
+@api_bp.route('/results/<video_id>/timeline', methods=['GET'])
+def get_timeline(video_id):
+    """
+    Return the emotion/pace timeline of an analyzed video at a given resolution.
+    ?level=<seconds> selects the bin width (default 15); any level at or above
+    the fine hop is served by reducing the stored per-window arrays.
+    """
+    pyramid = result_store.get_artifact(video_id, 'pyramid')
+    if pyramid is None:
+        return jsonify({'error': 'No timeline available for this video'}), 404
+    
+    try:
+        level = float(request.args.get('level', 15))
+        timeline = pyramid.level(level)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return _encoded_response({
+        'video_id': video_id,
+        'available_levels': pyramid.available_levels(),
+        'timeline': timeline
+    })
+
+@api_bp.route('/progress', methods=['GET'])
+def get_progress():
+    """
+    Return the practice history of the calling client (X-Client-Id): running
+    WPS, filler, versatility and emotion aggregates, per-session trends and
+    the recent sessions, all maintained incrementally as analyses complete
+    """
+    progress = result_store.get_progress(get_client_id())
+    if progress is None:
+        return jsonify({'error': 'No completed analyses for this client'}), 404
+    return _encoded_response(progress)
+
+@api_bp.route('/progress/compare', methods=['GET'])
+def compare_progress():
+    """
+    Compare two of the caller's sessions (?a=<job_id>&b=<job_id>), or one session
+    with the caller's averages (?a=<job_id> only). The emotion timelines are
+    diffed on a common grid: ?align=relative (default, ?bins=100 points over each
+    session) or ?align=absolute (second by second)
+    """
+    session_a = request.args.get('a')
+    if not session_a:
+        return jsonify({'error': 'Query parameter a is required'}), 400
+    align = request.args.get('align', 'relative')
+    if align not in ('relative', 'absolute'):
+        return jsonify({'error': 'align must be relative or absolute'}), 400
+    bins = min(max(request.args.get('bins', 100, type=int), 1), 1000)
+
+    comparison = result_store.compare_sessions(get_client_id(), session_a, request.args.get('b'), bins, align)
+    if comparison is None:
+        return jsonify({'error': 'Session not found in this client\'s recent history'}), 404
+    return _encoded_response(comparison)
 
 @api_bp.route('/chat', methods=['POST'])
 def chat_with_coach():
@@ -181,10 +999,21 @@ def chat_with_coach():
         return jsonify({'response': response}), 200
     
     except Exception as e:
-        import traceback
-        traceback.print_exc(file=sys.stderr)
+        logger.exception("Chat request failed")
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report hit-rate statistics of the per-window inference cache"""
+    if window_cache is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **window_cache.stats()}), 200
+
+@api_bp.route('/scheduler/stats', methods=['GET'])
+def scheduler_stats():
+    """Report queue depth per client, recent queue-wait percentiles and the analysis profiles' latency model"""
+    return jsonify({**scheduler.stats(), 'analysis_profiles': profile_selector.stats()}), 200
+
 @api_bp.route('/healthcheck', methods=['GET'])
 def healthcheck():
     """Simple health check endpoint"""
@@ -195,4 +1024,78 @@ def healthcheck():
         'services': {
             'gemini': gemini_status
         }
-    }), 200
\ No newline at end of file
+    }), 200
+
+@sock.route('/live', bp=api_bp)
+def live_session(ws):
+    """
+    Live practice mode over WebSocket.
+    The client streams binary 16 kHz mono pcm_s16le chunks and sends
+    {"type": "stop"} when done; emotion, transcript, wps and filler
+    events are sent back as JSON text messages.
+    """
+    session = LiveAnalysisSession(
+        speech_analyzer,
+        transcription_service,
+        visualization_helper,
+        LiveSessionConfig(
+            sample_rate=audio_config.audio_sample_rate,
+            window_duration=audio_config.min_duration
+        )
+    )
+    ws.send(json.dumps({
+        'type': 'ready',
+        'session_id': session.session_id,
+        'sample_rate': audio_config.audio_sample_rate,
+        'encoding': 'pcm_s16le'
+    }))
+
+    # Inference runs on its own thread so receiving never waits on a decode; chunks that
+    # arrive during a decode are fed together, so a slow decode never builds a backlog
+    chunks = queue.Queue()
+
+    def analyze():
+        try:
+            while True:
+                pending = [chunks.get()]
+                while True:
+                    try:
+                        pending.append(chunks.get_nowait())
+                    except queue.Empty:
+                        break
+                audio = b''.join(chunk for chunk in pending if isinstance(chunk, bytes))
+                if audio:
+                    for event in session.feed(audio):
+                        ws.send(json.dumps(event))
+                if 'stop' in pending:
+                    for event in session.finish():
+                        ws.send(json.dumps(event))
+                    return
+                if None in pending:
+                    return
+        except Exception as e:
+            logger.exception("Live session %s failed", session.session_id)
+            ws.send(json.dumps({'type': 'error', 'error': str(e)}))
+
+    worker = threading.Thread(target=analyze, name=f"live-{session.session_id[:8]}", daemon=True)
+    worker.start()
+    try:
+        while worker.is_alive():
+            message = ws.receive()
+            if message is None:
+                chunks.put(None)
+                break
+
+            if isinstance(message, str):
+                control = json.loads(message)
+                if control.get('type') == 'stop':
+                    chunks.put('stop')
+                    worker.join()
+                    break
+                continue
+
+            chunks.put(message)
+    except Exception as e:
+        logger.exception("Live session %s failed", session.session_id)
+        chunks.put(None)
+        ws.send(json.dumps({'type': 'error', 'error': str(e)}))
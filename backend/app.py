@@ -1,39 +1,38 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
 import os
-import sys
+import logging
 from dotenv import load_dotenv
-from api.routes import api_bp
+from utils.tracing import configure_logging
 
 # Load environment variables from the backend directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ENV_PATH = os.path.join(BASE_DIR, '.env')
 
-# More verbose environment variable loading
-try:
-    # First try to load from the specific path
-    if os.path.exists(ENV_PATH):
-        load_dotenv(ENV_PATH)
-        print(f"Loaded environment from: {ENV_PATH}", file=sys.stderr)
-    else:
-        print(f"Warning: .env file not found at {ENV_PATH}", file=sys.stderr)
-        # Try to load from current directory as fallback
-        load_dotenv()
-        print("Attempted to load .env from current directory", file=sys.stderr)
-    
-    # Check if GEMINI_API_KEY is loaded
-    if 'GEMINI_API_KEY' in os.environ:
-        # Don't print the actual key for security reasons
-        print("GEMINI_API_KEY is set in environment", file=sys.stderr)
-    else:
-        print("WARNING: GEMINI_API_KEY is not set in environment", file=sys.stderr)
-        print("Current environment variables:", file=sys.stderr)
-        for key, value in os.environ.items():
-            if 'API' in key or 'KEY' in key:
-                print(f"  {key}: {'*' * len(value) if value else 'not set'}", file=sys.stderr)
-    
-except Exception as e:
-    print(f"Error loading environment variables: {str(e)}", file=sys.stderr)
+env_loaded = os.path.exists(ENV_PATH)
+if env_loaded:
+    load_dotenv(ENV_PATH)
+else:
+    # Try to load from current directory as fallback
+    load_dotenv()
+
+# Structured logging (LOG_LEVEL, LOG_FORMAT, LOG_FILE, OTEL_EXPORTER_OTLP_ENDPOINT) before the services load
+configure_logging()
+logger = logging.getLogger(__name__)
+
+if env_loaded:
+    logger.info("Loaded environment from: %s", ENV_PATH)
+else:
+    logger.warning(".env file not found at %s; attempted to load .env from current directory", ENV_PATH)
+
+# Check if GEMINI_API_KEY is loaded (never log the key itself)
+if 'GEMINI_API_KEY' in os.environ:
+    logger.info("GEMINI_API_KEY is set in environment")
+else:
+    logger.warning("GEMINI_API_KEY is not set in environment (key variables set: %s)",
+                   sorted(key for key in os.environ if 'API' in key or 'KEY' in key))
+
+from api.routes import api_bp, sock, resume_interrupted_jobs
 
 def create_app():
     """Create and configure the Flask application"""
@@ -49,11 +48,18 @@ def create_app():
     os.makedirs(app.config['TEMP_FOLDER'], exist_ok=True)
     
     # Enable CORS with specific configuration
-    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}, supports_credentials=True)
+    # Resumable upload clients read the tus headers and the upload Location
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}}, supports_credentials=True,
+         expose_headers=['Location', 'Upload-Offset', 'Upload-Length', 'Tus-Resumable', 'Tus-Version',
+                         'Tus-Extension', 'Tus-Max-Size', 'Tus-Checksum-Algorithm'])
     
     # Register blueprints
+    sock.init_app(app)
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Pick up jobs interrupted by a crash or restart (when checkpointing is enabled)
+    resume_interrupted_jobs()
+    
     # Serve React app at root
     @app.route('/')
     def index():
@@ -0,0 +1,321 @@
+"""
+Offline batch analysis for directories of recorded sessions.
+
+Usage (from the repository root):
+    python -m backend.batch <directory-or-manifest> --output results.jsonl [--workers 4] [--group-size 8] [--no-llm] [--lite]
+
+A manifest is a text file with one video path per line, or a .jsonl file with a
+"path" field per line; relative paths are resolved against the manifest's
+directory. Results are appended to the output as JSON Lines; on a re-run, files
+that already have a successful record are skipped. --lite computes prosody
+metrics only (loudness, pitch, pauses, pace) without loading any model.
+Recordings longer than STREAMING_ANALYSIS_MIN_SECONDS (default 1200) are
+analyzed while decoding, in bounded memory.
+
+The backend's packages (api, services, utils, web) are imported by their
+top-level names, so only the CLI and the processes it spawns put the backend
+directory on sys.path. The library functions (analyze, analyze_many) run in
+a spawned worker process, so importing them leaves the caller's imports alone.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import List, Dict, Any, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger('batch')
+
+VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'webm'}
+
+# Worker process of the library functions, started on first use
+_library_process: Optional[ProcessPoolExecutor] = None
+_library_lock = threading.Lock()
+
+# Pipelines are expensive to build, so each process keeps one per option set
+_pipelines: Dict[tuple, Any] = {}
+# One analytics exporter per process, shared by its pipelines (None when disabled)
+_analytics_exporter = None
+
+def _use_backend_path():
+    """Make the backend packages importable in this process (CLI and worker processes only)."""
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+
+def get_pipeline(use_llm: bool = True, whisper_model_size: Optional[str] = None, lite: bool = False):
+    """
+    Build (once per process) an AnalysisPipeline wired with the default services.
+
+    Args:
+        use_llm: Whether to initialize the Gemini service
+        whisper_model_size: Whisper model size (default: WHISPER_MODEL_SIZE or "tiny")
+        lite: Build a model-free pipeline for run_lite (no emotion, Whisper or Gemini)
+
+    Returns:
+        AnalysisPipeline instance
+    """
+    global _analytics_exporter
+    from dotenv import load_dotenv
+    from services.audio_service import AudioSegmenter, AudioSegmenterConfig
+    from services.motion import MotionAnalyzer, MotionConfig
+    from services.pipeline import AnalysisPipeline
+    from utils.analytics_export import AnalyticsExporter
+    from utils.data_processor import DataProcessor
+    from utils.visualization import VisualizationHelper
+
+    load_dotenv(os.path.join(BASE_DIR, '.env'))
+    whisper_model_size = whisper_model_size or os.environ.get('WHISPER_MODEL_SIZE', 'tiny')
+    key = ('lite',) if lite else (use_llm, whisper_model_size)
+
+    if key not in _pipelines:
+        if _analytics_exporter is None:
+            _analytics_exporter = AnalyticsExporter.from_env()
+        ffmpeg_path = os.environ.get('FFMPEG_PATH', 'ffmpeg')
+        if lite:
+            speech_analyzer = transcription_service = gemini_service = None
+        else:
+            # Imported here so lite runs never load torch or whisper
+            from services.speech_analysis import SpeechAnalyzer
+            from services.transcription import TranscriptionService
+            from services.gemini_service import GeminiService
+            speech_analyzer = SpeechAnalyzer()
+            transcription_service = TranscriptionService(model_size=whisper_model_size)
+            gemini_service = GeminiService(api_key=os.environ.get('GEMINI_API_KEY')) if use_llm else None
+        _pipelines[key] = AnalysisPipeline(
+            AudioSegmenter(AudioSegmenterConfig(ffmpeg_path=ffmpeg_path)),
+            speech_analyzer,
+            transcription_service,
+            gemini_service,
+            DataProcessor(ffmpeg_path),
+            VisualizationHelper(),
+            motion_analyzer=MotionAnalyzer(MotionConfig(ffmpeg_path=ffmpeg_path)),
+            analytics_exporter=_analytics_exporter
+        )
+    return _pipelines[key]
+
+def analyze_many(
+    paths: List[str],
+    use_llm: bool = True,
+    whisper_model_size: Optional[str] = None,
+    batch_size: int = 16,
+    lite: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Analyze several videos, batching model calls across them.
+    Runs in the library's worker process, which keeps its models between calls.
+
+    Args:
+        paths: Video file paths
+        use_llm: Whether to include Gemini insights
+        whisper_model_size: Whisper model size (default: WHISPER_MODEL_SIZE or "tiny")
+        batch_size: Number of windows per model call
+        lite: Return prosody metrics only, without loading any model
+
+    Returns:
+        One result dictionary per path, in order
+    """
+    global _library_process
+    with _library_lock:
+        if _library_process is None:
+            _library_process = ProcessPoolExecutor(1, mp_context=get_context('spawn'), initializer=_use_backend_path)
+        executor = _library_process
+    try:
+        return executor.submit(_analyze_many, paths, use_llm, whisper_model_size, batch_size, lite).result()
+    except BrokenProcessPool:
+        # The worker died (e.g. out of memory); start a fresh one on the next call
+        with _library_lock:
+            if _library_process is executor:
+                _library_process = None
+        raise
+
+def _analyze_many(
+    paths: List[str],
+    use_llm: bool = True,
+    whisper_model_size: Optional[str] = None,
+    batch_size: int = 16,
+    lite: bool = False
+) -> List[Dict[str, Any]]:
+    """analyze_many in the calling process (the backend packages must be importable)."""
+    if lite:
+        return [_analyze_lite(path) for path in paths]
+
+    from services.batch_analysis import BatchAnalyzer
+    from services.streaming_pipeline import StreamingAnalyzer
+
+    pipeline = get_pipeline(use_llm, whisper_model_size)
+    # Long recordings are streamed one at a time in bounded memory; the rest share model batches
+    min_seconds = float(os.environ.get('STREAMING_ANALYSIS_MIN_SECONDS', 1200))
+    streamed = {
+        index for index, path in enumerate(paths)
+        if min_seconds > 0 and pipeline.audio_segmenter.probe_duration(path) >= min_seconds
+    }
+    results: List[Optional[Dict[str, Any]]] = [None] * len(paths)
+    batched = [index for index in range(len(paths)) if index not in streamed]
+    if batched:
+        analyzer = BatchAnalyzer(pipeline, batch_size=batch_size)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for index, result in zip(batched, analyzer.analyze_files([paths[i] for i in batched], temp_dir, use_llm=use_llm)):
+                results[index] = result
+    for index in sorted(streamed):
+        video_id = os.path.basename(paths[index])
+        try:
+            results[index] = StreamingAnalyzer(pipeline, batch_size=batch_size).analyze(paths[index], video_id, use_llm=use_llm)
+        except Exception as e:
+            results[index] = {'success': False, 'video_id': video_id, 'error': str(e)}
+    return results
+
+def _analyze_lite(path: str) -> Dict[str, Any]:
+    """Decode one file and run the model-free prosody analysis."""
+    pipeline = get_pipeline(lite=True)
+    video_id = os.path.basename(path)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        try:
+            return pipeline.run_lite(pipeline.prepare_audio(path, temp_dir), video_id)
+        except Exception as e:
+            return {'success': False, 'video_id': video_id, 'error': str(e)}
+
+def analyze(path: str, use_llm: bool = True, whisper_model_size: Optional[str] = None, lite: bool = False) -> Dict[str, Any]:
+    """
+    Analyze a single video with the same services as the web API.
+
+    Args:
+        path: Video file path
+        use_llm: Whether to include Gemini insights
+        whisper_model_size: Whisper model size (default: WHISPER_MODEL_SIZE or "tiny")
+        lite: Return prosody metrics only, without loading any model
+
+    Returns:
+        Result dictionary in the same shape as the /api/upload response
+    """
+    return analyze_many([path], use_llm=use_llm, whisper_model_size=whisper_model_size, lite=lite)[0]
+
+def collect_inputs(source: str) -> List[str]:
+    """
+    Resolve a directory or manifest into a sorted list of absolute video paths.
+
+    Args:
+        source: Directory to scan recursively, or manifest file
+
+    Returns:
+        List of absolute video paths
+    """
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.rsplit('.', 1)[-1].lower() in VIDEO_EXTENSIONS
+        ]
+        return sorted(os.path.abspath(path) for path in paths)
+
+    manifest_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            path = json.loads(line)['path'] if source.endswith('.jsonl') else line
+            paths.append(os.path.abspath(os.path.join(manifest_dir, path)))
+    return paths
+
+def completed_paths(output_path: str) -> set:
+    """
+    Read the paths that already have a successful record in the output.
+
+    Args:
+        output_path: JSON Lines results file
+
+    Returns:
+        Set of absolute paths to skip
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if record.get('success'):
+                done.add(record['path'])
+    return done
+
+def _init_worker(use_llm: bool, whisper_model_size: Optional[str], lite: bool = False):
+    """Preload the models once per worker process."""
+    _use_backend_path()
+    from utils.tracing import configure_logging
+    configure_logging()
+    get_pipeline(use_llm, whisper_model_size, lite)
+
+def _process_group(job) -> List[Dict[str, Any]]:
+    """Analyze one group of files in a worker and tag each record with its path."""
+    from utils.tracing import trace
+    paths, use_llm, whisper_model_size, batch_size, lite = job
+    try:
+        with trace(name='batch_group', files=len(paths), lite=lite):
+            results = _analyze_many(paths, use_llm, whisper_model_size, batch_size, lite)
+    except Exception as e:
+        logger.exception("Batch group of %d file(s) failed", len(paths))
+        results = [{'success': False, 'error': str(e)} for _ in paths]
+    if _analytics_exporter is not None:
+        # Pool workers exit without running atexit handlers, so write each group's rows now
+        _analytics_exporter.flush()
+    return [{'path': path, **result} for path, result in zip(paths, results)]
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        prog='python -m backend.batch',
+        description='Analyze a directory or manifest of videos into JSON Lines.'
+    )
+    parser.add_argument('source', help='Directory of videos or manifest file')
+    parser.add_argument('--output', '-o', default='results.jsonl', help='JSON Lines output (appended)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes, each with its own models')
+    parser.add_argument('--group-size', type=int, default=8, help='Files whose windows share model batches')
+    parser.add_argument('--batch-size', type=int, default=16, help='Windows per model call')
+    parser.add_argument('--whisper-model', default=None, help='Whisper model size')
+    parser.add_argument('--no-llm', action='store_true', help='Skip Gemini insights')
+    parser.add_argument('--lite', action='store_true', help='Prosody metrics only; no models are loaded')
+    args = parser.parse_args(argv)
+    _use_backend_path()
+    from utils.tracing import configure_logging
+    configure_logging()
+
+    paths = collect_inputs(args.source)
+    done = completed_paths(args.output)
+    pending = [path for path in paths if path not in done]
+    logger.info("%d file(s) found, %d already done, %d to analyze", len(paths), len(done & set(paths)), len(pending))
+
+    use_llm = not args.no_llm
+    jobs = [
+        (pending[i:i + args.group_size], use_llm, args.whisper_model, args.batch_size, args.lite)
+        for i in range(0, len(pending), args.group_size)
+    ]
+
+    with open(args.output, 'a') as output:
+        def write(records):
+            for record in records:
+                output.write(json.dumps(record) + '\n')
+            output.flush()
+
+        if args.workers <= 1:
+            for job in jobs:
+                write(_process_group(job))
+        else:
+            context = get_context('spawn')
+            with context.Pool(args.workers, initializer=_init_worker,
+                              initargs=(use_llm, args.whisper_model, args.lite)) as pool:
+                for records in pool.imap_unordered(_process_group, jobs):
+                    write(records)
+
+if __name__ == '__main__':
+    main()
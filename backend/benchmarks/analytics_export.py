@@ -0,0 +1,106 @@
+"""
+Compare per-analysis JSON files with the columnar analytics export.
+
+Writes N synthetic sessions (default: 200 sessions of 10 minutes in 4-7 s
+windows) the previous way, one analysis_results.json with indent=4 per
+session, and through the AnalyticsExporter as Parquet and Arrow IPC. Then
+scans every session for an analytics query (mean WPS and filler count per
+emotion), reading all JSON files versus only the needed columns of the
+dataset.
+
+Usage (from the backend directory):
+    python benchmarks/analytics_export.py --sessions 200 --minutes 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from response_encoding import EMOTIONS, build_payload, synthetic_analysis
+from utils.analytics_export import AnalyticsExporter, pa
+from utils.visualization import VisualizationHelper
+
+def directory_size(root: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(root) for name in names)
+
+def timed_once(fn):
+    """Wall time of fn in milliseconds, and its result."""
+    started = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - started) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--minutes', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if pa is None:
+        print("pyarrow is not installed; install it to run this benchmark")
+        return
+
+    helper = VisualizationHelper()
+    rng = np.random.default_rng(args.seed)
+    sessions = []
+    for index in range(args.sessions):
+        emotion_segments, transcription_data = synthetic_analysis(args.minutes, args.seed + index)
+        payload = build_payload(helper, emotion_segments, transcription_data, helper.prepare_wps_records(transcription_data))
+        payload['video_id'] = f"session-{index}"
+        probabilities = rng.dirichlet(np.ones(len(EMOTIONS)), len(emotion_segments)).astype(np.float32)
+        sessions.append((payload, probabilities))
+    windows = sum(len(payload['emotion_segments']) for payload, _ in sessions)
+    print(f"{args.sessions} sessions of {args.minutes:.0f} min, {windows} windows\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        rows = []
+
+        json_root = os.path.join(root, 'json')
+        def write_json():
+            for payload, _ in sessions:
+                directory = os.path.join(json_root, payload['video_id'])
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, 'analysis_results.json'), 'w') as f:
+                    json.dump({
+                        'emotion_segments': payload['emotion_segments'],
+                        'transcription_data': payload['transcription_data']
+                    }, f, indent=4)
+        def scan_json():
+            totals = {}
+            for name in os.listdir(json_root):
+                with open(os.path.join(json_root, name, 'analysis_results.json')) as f:
+                    results = json.load(f)
+                for segment in results['transcription_data']:
+                    count, wps = totals.get(segment['emotion'], (0, 0.0))
+                    totals[segment['emotion']] = (count + 1, wps + segment['wps'])
+            return totals
+        write_ms, _ = timed_once(write_json)
+        scan_ms, _ = timed_once(scan_json)
+        rows.append(("JSON, indent=4, one file per session", write_ms, scan_ms, directory_size(json_root)))
+
+        for format in ('parquet', 'arrow'):
+            dataset_root = os.path.join(root, format)
+            exporter = AnalyticsExporter(dataset_root, format=format, max_buffered_rows=50000)
+            def write_dataset():
+                for payload, probabilities in sessions:
+                    exporter.append(payload, probabilities, EMOTIONS, 'standard')
+                exporter.flush()
+            def scan_dataset():
+                table = AnalyticsExporter.open_dataset(dataset_root, format).to_table(columns=['emotion', 'wps', 'fillers'])
+                return table.group_by('emotion').aggregate([('wps', 'mean'), ('fillers', 'sum')])
+            write_ms, _ = timed_once(write_dataset)
+            scan_ms, _ = timed_once(scan_dataset)
+            rows.append((f"{format}, columnar export", write_ms, scan_ms, directory_size(dataset_root)))
+
+        print(f"{'storage':<40} {'write (ms)':>11} {'scan (ms)':>10} {'size (KB)':>10}")
+        for name, write_ms, scan_ms, size in rows:
+            print(f"{name:<40} {write_ms:>11.1f} {scan_ms:>10.1f} {size / 1024:>10.1f}")
+
+if __name__ == '__main__':
+    main()
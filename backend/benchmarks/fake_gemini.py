@@ -0,0 +1,131 @@
+"""
+Local stand-in for the Gemini REST API, for load tests.
+
+Answers generateContent calls with a fixed coaching analysis after a
+configurable latency, and fails a configurable fraction of them. Point the
+backend at it with:
+    GEMINI_API_KEY=fake GEMINI_API_ENDPOINT=http://127.0.0.1:8089
+
+Usage (from the backend directory):
+    python benchmarks/fake_gemini.py --port 8089 --latency 2.0 --jitter 0.5 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYSIS = {
+    "summary": "Synthetic analysis from the local Gemini stand-in.",
+    "improvement_areas": ["Pacing", "Pauses", "Emphasis"],
+    "strengths": ["Steady tone", "Clear structure"],
+    "coaching_tips": ["Slow down in dense passages", "Pause after key points", "Vary your pitch"]
+}
+
+class FakeGeminiServer:
+    """
+    Threaded HTTP server imitating models/<name>:generateContent.
+    Counts requests and injected errors for the load-test report.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 1.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        """
+        Initialize the server (port 0 picks a free port).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind
+            latency: Mean response delay in seconds
+            jitter: Uniform +/- jitter added to the delay in seconds
+            error_rate: Fraction of calls answered with HTTP 503
+            seed: Random seed for jitter and error injection
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not self.path.split('?')[0].endswith(':generateContent'):
+                    self._reply(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                    return
+
+                with server._lock:
+                    server.requests += 1
+                    delay = max(0.0, server.latency + server._random.uniform(-server.jitter, server.jitter))
+                    failed = server._random.random() < server.error_rate
+                    if failed:
+                        server.errors += 1
+                time.sleep(delay)
+
+                if failed:
+                    self._reply(503, {"error": {"code": 503, "message": "Injected error", "status": "UNAVAILABLE"}})
+                    return
+                self._reply(200, {
+                    "candidates": [{
+                        "content": {"parts": [{"text": json.dumps(ANALYSIS)}], "role": "model"},
+                        "finishReason": "STOP",
+                        "index": 0
+                    }]
+                })
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeGeminiServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._server.shutdown()
+        self._server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=1.0, help='Mean delay per call (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- jitter (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls failing with 503')
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Fake Gemini listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark InferencePool scaling from 1 to N worker processes.
+
+Runs several concurrent analysis pipelines over synthetic audio and reports
+throughput (audio seconds processed per wall-clock second) and speedup
+relative to a single worker.
+
+Usage (from the backend directory):
+    python benchmarks/inference_pool_scaling.py --max-workers 8 --pipelines 8 --duration 60
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audio_service import AudioSegmenter
+from services.inference_pool import InferencePool, SharedAudio
+from synthetic import SAMPLE_RATE, synthetic_speechlike_audio
+
+def run_pipeline(pool: InferencePool, samples: np.ndarray, windows):
+    with SharedAudio(samples) as shared:
+        pool.classify_windows(shared, windows, SAMPLE_RATE)
+        pool.transcribe_windows(shared, windows, SAMPLE_RATE)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--pipelines', type=int, default=4, help='Concurrent pipelines per step')
+    parser.add_argument('--duration', type=float, default=60.0, help='Seconds of audio per pipeline')
+    parser.add_argument('--whisper-model', default='tiny')
+    args = parser.parse_args()
+
+    segmenter = AudioSegmenter()
+    clips = [synthetic_speechlike_audio(args.duration, seed) for seed in range(args.pipelines)]
+    plans = [segmenter.plan_segments(len(clip) / SAMPLE_RATE) for clip in clips]
+    total_audio = args.duration * args.pipelines
+
+    worker_counts = sorted({1, *[2 ** k for k in range(1, 8) if 2 ** k < args.max_workers], args.max_workers})
+    baseline = None
+
+    print(f"{'workers':>8} {'wall (s)':>10} {'audio s / s':>12} {'speedup':>8}")
+    for workers in worker_counts:
+        pool = InferencePool(workers, whisper_model_size=args.whisper_model)
+        # Warm up: spawn every worker and load its models before timing
+        pool.labels
+        with SharedAudio(clips[0][:SAMPLE_RATE * 8]) as shared:
+            pool.classify_windows(shared, [(0.0, 4.0)] * workers, SAMPLE_RATE)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.pipelines) as pipelines:
+            list(pipelines.map(lambda job: run_pipeline(pool, *job), zip(clips, plans)))
+        wall = time.perf_counter() - started
+        pool.close()
+
+        throughput = total_audio / wall
+        baseline = baseline or throughput
+        print(f"{workers:>8} {wall:>10.2f} {throughput:>12.1f} {throughput / baseline:>8.2f}")
+
+if __name__ == '__main__':
+    main()
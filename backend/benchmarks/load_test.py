@@ -0,0 +1,250 @@
+"""
+End-to-end HTTP load test of the upload endpoint.
+
+Starts the Flask app (or gunicorn) against a local Gemini stand-in
+(benchmarks/fake_gemini.py), replays synthetic clips of realistic lengths
+from closed-loop clients at increasing concurrency, and reports per step:
+throughput (requests/s and audio seconds/s), p50/p95/p99 latency, error
+rate and peak RSS per server process. The knee is the first step where
+adding clients no longer raises throughput by --knee-gain.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py --concurrency 1,2,4,8,16 --step-seconds 60
+    python benchmarks/load_test.py --server gunicorn --workers 2 --threads 4 \\
+        --gemini-latency 2.0 --gemini-error-rate 0.05 --json results.json
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import numpy as np
+
+from fake_gemini import FakeGeminiServer
+from synthetic import write_clip
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Clip lengths (s) and their share of the replayed traffic
+CLIP_MIX = [(30, 0.4), (90, 0.35), (300, 0.2), (900, 0.05)]
+
+def start_server(kind: str, host: str, port: int, workers: int, threads: int, gemini_url: str) -> subprocess.Popen:
+    """Launch the backend in its own process group."""
+    env = dict(os.environ, GEMINI_API_KEY='fake', GEMINI_API_ENDPOINT=gemini_url, PYTHONUNBUFFERED='1')
+    if kind == 'gunicorn':
+        cmd = ['gunicorn', '-w', str(workers), '--threads', str(threads),
+               '--timeout', '0', '-b', f'{host}:{port}', 'app:create_app()']
+    else:
+        cmd = [sys.executable, '-c',
+               f"from app import create_app; create_app().run(host={host!r}, port={port}, threaded=True)"]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def wait_ready(base_url: str, server: subprocess.Popen, timeout: float):
+    """Poll the healthcheck until the server answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited: {server.stderr.read().decode(errors='replace')[-2000:]}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/healthcheck", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server not ready after {timeout:.0f}s")
+
+def server_pids(root_pid: int) -> list:
+    """The server process and all its descendants (gunicorn workers)."""
+    pids = [root_pid]
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/task/{pid}/children') as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MB (0 if it is gone)."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def upload(base_url: str, clip_path: str, client_id: str, timeout: float) -> int:
+    """POST one clip as multipart/form-data and return the HTTP status (0 on transport errors)."""
+    boundary = uuid.uuid4().hex
+    with open(clip_path, 'rb') as f:
+        data = f.read()
+    body = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="video"; filename="{os.path.basename(clip_path)}"\r\n'
+        f'Content-Type: video/mp4\r\n\r\n'
+    ).encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    request = urllib.request.Request(
+        f"{base_url}/api/upload", data=body, method='POST',
+        headers={'Content-Type': f'multipart/form-data; boundary={boundary}', 'X-Client-Id': client_id}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0
+
+def run_step(base_url: str, clips: list, weights: list, concurrency: int, step_seconds: float,
+             max_requests: int, timeout: float, root_pid, seed: int) -> dict:
+    """
+    Run closed-loop clients for one concurrency level.
+    Each client uploads a randomly drawn clip, waits for the response and repeats.
+
+    Returns:
+        Dictionary with throughput, latency percentiles, error rate and memory
+    """
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + step_seconds
+    peak_rss = {}
+    stop = threading.Event()
+
+    def sample_memory():
+        while not stop.wait(0.5):
+            for pid in (server_pids(root_pid) if root_pid else []):
+                peak_rss[pid] = max(peak_rss.get(pid, 0.0), rss_mb(pid))
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            with lock:
+                if max_requests and len(samples) >= max_requests:
+                    return
+            duration, clip_path = rng.choices(clips, weights=weights)[0]
+            started = time.perf_counter()
+            status = upload(base_url, clip_path, f"load-{index}", timeout)
+            with lock:
+                samples.append((time.perf_counter() - started, status, duration))
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+
+    ok = [(latency, duration) for latency, status, duration in samples if status == 200]
+    latencies = np.array([latency for latency, _ in ok]) if ok else np.zeros(1)
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 4),
+        "audio_s_per_s": round(sum(duration for _, duration in ok) / elapsed, 2),
+        "p50_s": round(float(np.percentile(latencies, 50)), 2),
+        "p95_s": round(float(np.percentile(latencies, 95)), 2),
+        "p99_s": round(float(np.percentile(latencies, 99)), 2),
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "statuses": {str(status): sum(1 for _, s, _ in samples if s == status) for status in {s for _, s, _ in samples}},
+        "peak_rss_mb": {str(pid): round(rss, 1) for pid, rss in sorted(peak_rss.items()) if rss}
+    }
+
+def find_knee(steps: list, min_gain: float):
+    """Concurrency of the first step whose throughput gain over the previous one is below min_gain."""
+    for previous, step in zip(steps, steps[1:]):
+        if previous["audio_s_per_s"] <= 0:
+            continue
+        if step["audio_s_per_s"] / previous["audio_s_per_s"] - 1 < min_gain:
+            return previous["concurrency"]
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    parser.add_argument('--url', help='Load an already running server instead of starting one')
+    parser.add_argument('--concurrency', default='1,2,4,8,16', help='Comma-separated client counts')
+    parser.add_argument('--step-seconds', type=float, default=60.0, help='Duration of each step')
+    parser.add_argument('--max-requests', type=int, default=0, help='Cap on requests per step (0 = none)')
+    parser.add_argument('--clips', default='30,90,300,900', help='Clip lengths in seconds to generate')
+    parser.add_argument('--request-timeout', type=float, default=1800.0)
+    parser.add_argument('--startup-timeout', type=float, default=300.0)
+    parser.add_argument('--gemini-latency', type=float, default=1.5, help='Mean fake Gemini delay (s)')
+    parser.add_argument('--gemini-jitter', type=float, default=0.5)
+    parser.add_argument('--gemini-error-rate', type=float, default=0.0)
+    parser.add_argument('--knee-gain', type=float, default=0.1, help='Minimum relative throughput gain per step')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write the step results to this file')
+    args = parser.parse_args()
+
+    lengths = [float(length) for length in args.clips.split(',')]
+    shares = dict(CLIP_MIX)
+    weights = [shares.get(length, 1.0 / len(lengths)) for length in lengths]
+
+    gemini = FakeGeminiServer(latency=args.gemini_latency, jitter=args.gemini_jitter,
+                              error_rate=args.gemini_error_rate, seed=args.seed).start()
+    server = None
+    with tempfile.TemporaryDirectory() as clip_dir:
+        clips = [
+            (length, write_clip(os.path.join(clip_dir, f'clip_{int(length)}s.mp4'), length, seed=i))
+            for i, length in enumerate(lengths)
+        ]
+        try:
+            if args.url:
+                base_url = args.url.rstrip('/')
+                root_pid = None
+            else:
+                server = start_server(args.server, args.host, args.port, args.workers, args.threads, gemini.url)
+                base_url = f"http://{args.host}:{args.port}"
+                root_pid = server.pid
+                wait_ready(base_url, server, args.startup_timeout)
+
+            steps = []
+            print(f"{'clients':>7} {'reqs':>5} {'req/s':>7} {'audio s/s':>10} {'p50 (s)':>8} "
+                  f"{'p95 (s)':>8} {'p99 (s)':>8} {'errors':>7} {'max RSS (MB)':>13}")
+            for concurrency in [int(c) for c in args.concurrency.split(',')]:
+                step = run_step(base_url, clips, weights, concurrency, args.step_seconds, args.max_requests,
+                                args.request_timeout, root_pid, args.seed)
+                steps.append(step)
+                max_rss = max(step["peak_rss_mb"].values(), default=0.0)
+                print(f"{concurrency:>7} {step['requests']:>5} {step['throughput_rps']:>7.3f} "
+                      f"{step['audio_s_per_s']:>10.1f} {step['p50_s']:>8.1f} {step['p95_s']:>8.1f} "
+                      f"{step['p99_s']:>8.1f} {step['error_rate']:>7.1%} {max_rss:>13.0f}")
+        finally:
+            if server is not None:
+                os.killpg(server.pid, signal.SIGTERM)
+                server.wait(timeout=30)
+            gemini.stop()
+
+    knee = find_knee(steps, args.knee_gain)
+    print(f"\nGemini calls: {gemini.requests} ({gemini.errors} injected errors)")
+    print(f"Saturation knee: {knee} clients" if knee else "No knee within the tested concurrency range")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({"args": vars(args), "steps": steps, "knee_concurrency": knee}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Measure the speed of the model-free prosody analysis.
+
+Runs ProsodyAnalyzer over synthetic speech-like audio of several lengths and
+reports wall time and the real-time factor (seconds of audio per second
+of compute).
+
+Usage (from the backend directory):
+    python benchmarks/prosody_speed.py --minutes 1,10,30 --repeats 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import SAMPLE_RATE, synthetic_speechlike_audio
+from services.prosody import ProsodyAnalyzer, ProsodyConfig
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', default='1,10,30', help='Comma-separated recording lengths')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--window', type=float, default=5.0, help='Window length in seconds')
+    args = parser.parse_args()
+
+    analyzer = ProsodyAnalyzer(ProsodyConfig(sample_rate=SAMPLE_RATE))
+    print(f"{'minutes':>8} {'time (s)':>10} {'x real time':>12}")
+    for minutes in [float(value) for value in args.minutes.split(',')]:
+        audio = synthetic_speechlike_audio(minutes * 60, seed=0)
+        times = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            result = analyzer.analyze(audio, window_duration=args.window)
+            times.append(time.perf_counter() - started)
+        elapsed = min(times)
+        print(f"{minutes:>8.0f} {elapsed:>10.3f} {minutes * 60 / elapsed:>12.0f}")
+
+    print("\nSummary of the last run:")
+    for key, value in result["summary"].items():
+        print(f"  {key}: {value}")
+
+if __name__ == '__main__':
+    main()
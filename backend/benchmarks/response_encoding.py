@@ -0,0 +1,115 @@
+"""
+Measure payload size and serialization time of the analysis response.
+
+Builds the response of a synthetic analysis (default: 30 minutes of speech
+in 4-7 s windows) and compares the previous path (DataFrame.to_json,
+json.loads, then jsonify's json.dumps) with the ResponseEncoder: orjson on
+native records, the columnar layout, and gzip/brotli compression.
+
+Usage (from the backend directory):
+    python benchmarks/response_encoding.py --minutes 30 --repeats 20
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_processor import DataProcessor
+from utils.response_encoding import ResponseEncoder, brotli
+from utils.visualization import VisualizationHelper
+
+EMOTIONS = ["neutral", "calm", "happy", "sad", "angry", "surprised", "fearful"]
+WORDS = "so the main point here is that we really need to think about how our users actually experience the product".split()
+
+def synthetic_analysis(minutes: float, seed: int):
+    """Emotion segments and transcription segments of a recording of the given length."""
+    rng = random.Random(seed)
+    processor = DataProcessor('ffmpeg')
+    emotion_segments, transcription_data = [], []
+    start = 0.0
+    while start < minutes * 60:
+        end = min(start + rng.uniform(4, 7), minutes * 60)
+        emotion = rng.choice(EMOTIONS)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20)))
+        emotion_segments.append((f"{processor.format_timestamp(start)} - {processor.format_timestamp(end)}", emotion))
+        transcription_data.append({
+            "index": len(transcription_data),
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "text": text,
+            "wps": round(len(text.split()) / (end - start), 2),
+            "emotion": emotion
+        })
+        start = end
+    return emotion_segments, transcription_data
+
+def build_payload(helper: VisualizationHelper, emotion_segments, transcription_data, wps_data):
+    emotion_df = helper.prepare_emotion_timeline_data(emotion_segments)
+    return {
+        'success': True,
+        'video_id': 'benchmark',
+        'emotion_segments': [{'time_range': tr, 'emotion': e} for tr, e in emotion_segments],
+        'transcription_data': transcription_data,
+        'gemini_analysis': None,
+        'emotion_metrics': helper.calculate_emotion_metrics(emotion_df),
+        'speech_clarity': helper.prepare_speech_clarity_data(transcription_data),
+        'wps_data': wps_data,
+        'duration': transcription_data[-1]["end"]
+    }
+
+def timed(fn, repeats: int):
+    """Median wall time of fn in milliseconds, and its last result."""
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return sorted(times)[len(times) // 2], result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=30)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    helper = VisualizationHelper()
+    encoder = ResponseEncoder()
+    emotion_segments, transcription_data = synthetic_analysis(args.minutes, args.seed)
+    print(f"{args.minutes:.0f} min recording, {len(transcription_data)} segments\n")
+
+    legacy_wps_ms, legacy_wps = timed(
+        lambda: json.loads(helper.prepare_wps_data(transcription_data).to_json(orient='records')), args.repeats
+    )
+    native_wps_ms, native_wps = timed(lambda: helper.prepare_wps_records(transcription_data), args.repeats)
+    payload = build_payload(helper, emotion_segments, transcription_data, native_wps)
+    legacy_payload = build_payload(helper, emotion_segments, transcription_data, legacy_wps)
+
+    # jsonify in production mode: sorted keys, compact separators
+    legacy_ms, legacy_body = timed(
+        lambda: json.dumps(legacy_payload, sort_keys=True, separators=(',', ':')).encode(), args.repeats
+    )
+    legacy_ms += legacy_wps_ms
+
+    rows = [("legacy (to_json + json.loads + jsonify)", legacy_ms, legacy_body)]
+    ms, body = timed(lambda: encoder.dumps(payload), args.repeats)
+    rows.append(("orjson, records", native_wps_ms + ms, body))
+    ms, body = timed(lambda: encoder.dumps(encoder.to_columnar(payload)), args.repeats)
+    rows.append(("orjson, columnar", native_wps_ms + ms, body))
+    for coding in encoder.encodings:
+        for name, columnar in (("records", False), ("columnar", True)):
+            ms, (body, _) = timed(lambda: encoder.encode(payload, coding, columnar), args.repeats)
+            rows.append((f"orjson, {name} + {coding}", native_wps_ms + ms, body))
+
+    print(f"{'encoding':<42} {'time (ms)':>10} {'size (KB)':>10} {'vs legacy':>10}")
+    for name, ms, body in rows:
+        print(f"{name:<42} {ms:>10.2f} {len(body) / 1024:>10.1f} {len(body) / len(legacy_body):>10.1%}")
+    if brotli is None:
+        print("\nbrotli not installed; install the Brotli package to compare it")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the peak memory of the file-based and the streaming analysis.
+
+Writes synthetic recordings of several lengths and analyzes each one in a
+fresh process, once through AnalysisPipeline.run (decoded WAV, segment
+files) and once through StreamingAnalyzer (PCM pipe, bounded queues), and
+reports wall time and peak RSS. The streaming peak should stay flat as the
+recordings get longer. Requires FFmpeg and the emotion and Whisper models.
+
+Usage (from the backend directory):
+    python benchmarks/streaming_memory.py --minutes 5,60,180
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import write_clip
+
+def run_once(mode: str, path: str) -> None:
+    """Analyze one file in this process and print wall time and peak RSS as JSON."""
+    from batch import get_pipeline
+    from services.streaming_pipeline import StreamingAnalyzer
+
+    pipeline = get_pipeline(use_llm=False)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if mode == 'streaming':
+        result = StreamingAnalyzer(pipeline).analyze(path, os.path.basename(path), use_llm=False)
+    else:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio = pipeline.prepare_audio(path, temp_dir)
+            result = pipeline.run(audio, temp_dir, os.path.basename(path), use_llm=False)
+    print(json.dumps({
+        'seconds': time.perf_counter() - started,
+        'windows': len(result['emotion_segments']),
+        # ru_maxrss is in kilobytes on Linux
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'models_mb': baseline / 1024
+    }))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', default='5,60,180', help='Comma-separated recording lengths')
+    parser.add_argument('--ffmpeg', default=os.environ.get('FFMPEG_PATH', 'ffmpeg'))
+    parser.add_argument('--run', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_once(*args.run)
+        return
+
+    print(f"{'minutes':>8} {'mode':>10} {'windows':>8} {'time (s)':>10} {'peak (MB)':>10} {'models (MB)':>12}")
+    with tempfile.TemporaryDirectory() as root:
+        for minutes in [float(value) for value in args.minutes.split(',')]:
+            path = write_clip(os.path.join(root, f"clip-{minutes:.0f}.mp4"), minutes * 60, seed=0, ffmpeg_path=args.ffmpeg)
+            for mode in ('files', 'streaming'):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--run', mode, path],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                stats = json.loads(output.strip().splitlines()[-1])
+                print(f"{minutes:>8.0f} {mode:>10} {stats['windows']:>8} {stats['seconds']:>10.1f} "
+                      f"{stats['peak_mb']:>10.0f} {stats['models_mb']:>12.0f}")
+
+if __name__ == '__main__':
+    main()
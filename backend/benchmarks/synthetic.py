@@ -0,0 +1,43 @@
+"""
+Synthetic speech-like recordings shared by the benchmarks.
+"""
+import os
+import subprocess
+import tempfile
+import numpy as np
+import soundfile as sf
+
+SAMPLE_RATE = 16000
+
+def synthetic_speechlike_audio(duration: float, seed: int) -> np.ndarray:
+    """Amplitude-modulated harmonic noise with pauses, roughly speech-shaped."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    voiced = np.sin(2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE)
+    syllables = (np.sin(2 * np.pi * 4 * t) > 0).astype(np.float32)
+    pauses = (np.sin(2 * np.pi * 0.2 * t) > -0.7).astype(np.float32)
+    noise = rng.standard_normal(len(t)) * 0.05
+    return ((voiced * syllables * pauses) * 0.3 + noise).astype(np.float32)
+
+def write_clip(path: str, duration: float, seed: int, ffmpeg_path: str = 'ffmpeg') -> str:
+    """
+    Write a synthetic recording as an audio-only MP4 (AAC), like a browser upload.
+
+    Args:
+        path: Output .mp4 path
+        duration: Length in seconds
+        seed: Random seed for the noise component
+        ffmpeg_path: FFmpeg executable
+
+    Returns:
+        The output path
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        wav_path = os.path.join(temp_dir, 'clip.wav')
+        sf.write(wav_path, synthetic_speechlike_audio(duration, seed), SAMPLE_RATE, subtype='PCM_16')
+        subprocess.run(
+            [ffmpeg_path, '-y', '-i', wav_path, '-c:a', 'aac', '-b:a', '64k', path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        )
+    return path
@@ -0,0 +1,67 @@
+"""
+Compare startup time and resident memory of the Flask app (models loaded
+in-process) with the ASGI web tier (models in separate inference workers).
+
+Each app is imported in a fresh interpreter; the script reports wall time to
+a ready app object, peak RSS of that process, and whether torch was imported.
+
+Usage (from the backend directory):
+    python benchmarks/web_tier_startup.py --runs 3
+"""
+import argparse
+import json
+import os
+import secrets
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module} as target
+target.{attribute}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "startup_s": round(elapsed, 3),
+    "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "torch_loaded": "torch" in sys.modules
+}}))
+"""
+
+TARGETS = {
+    'flask (app.py)': ('app', 'create_app()'),
+    'asgi (web/app.py)': ('web.app', 'app')
+}
+
+def measure(module: str, attribute: str):
+    """Import one app in a fresh interpreter and return its probe output."""
+    # The web tier refuses to start without a worker key; the probe never connects
+    env = dict(os.environ, INFERENCE_WORKER_AUTHKEY=os.environ.get('INFERENCE_WORKER_AUTHKEY') or secrets.token_hex(16))
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, attribute=attribute)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'app':<20} {'startup (s)':>12} {'peak RSS (MB)':>14} {'torch':>6}")
+    for name, (module, attribute) in TARGETS.items():
+        runs = [measure(module, attribute) for _ in range(args.runs)]
+        failed = [run for run in runs if 'error' in run]
+        if failed:
+            print(f"{name:<20} failed: {failed[0]['error']}")
+            continue
+        startup = sorted(run['startup_s'] for run in runs)[len(runs) // 2]
+        rss = max(run['peak_rss_mb'] for run in runs)
+        print(f"{name:<20} {startup:>12.2f} {rss:>14.1f} {str(runs[0]['torch_loaded']):>6}")
+
+if __name__ == '__main__':
+    main()
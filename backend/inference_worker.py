@@ -0,0 +1,182 @@
+"""
+Inference worker process for the split deployment.
+
+Loads the models and analysis services once, then serves analysis jobs from
+the ASGI web tier (web/app.py) over a local authenticated socket.
+
+Usage (from the backend directory):
+    INFERENCE_WORKER_AUTHKEY=<secret> python inference_worker.py --address 127.0.0.1:6100
+"""
+import argparse
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Listener
+
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+from utils.tracing import configure_logging
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = os.environ.get('INFERENCE_WORKER_ADDRESS', '127.0.0.1:6100')
+# Connections unpickle what they receive, so the shared secret has no default
+AUTHKEY = os.environ.get('INFERENCE_WORKER_AUTHKEY', '').encode()
+if not AUTHKEY:
+    raise SystemExit("INFERENCE_WORKER_AUTHKEY must be set to a shared secret (e.g. `python -c 'import secrets; print(secrets.token_hex(32))'`)")
+
+# The worker reuses the services configured for the Flask API
+from api import routes
+
+def parse_address(address):
+    """Turn "host:port" into a Listener/Client address (anything else is a Unix socket path)."""
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return (host, int(port))
+    return address
+
+class InferenceWorker:
+    """
+    Runs analysis jobs submitted by the web tier and answers status queries.
+    Jobs run on a bounded thread pool; results live in the shared ResultStore.
+    """
+
+    def __init__(self, job_threads: int = 16):
+        """
+        Initialize the worker.
+
+        Args:
+            job_threads: Number of analysis jobs accepted at once (admission to
+                the pipeline is then decided by the fair scheduler)
+        """
+        self.executor = ThreadPoolExecutor(max_workers=job_threads)
+        self.active_jobs = 0
+        self._lock = threading.Lock()
+
+    def handle(self, message):
+        """
+        Dispatch one request from the web tier.
+
+        Args:
+            message: Dictionary with an "op" key
+
+        Returns:
+            Reply dictionary
+        """
+        op = message.get('op')
+        if op == 'ping':
+            return {'ok': True, 'active_jobs': self.active_jobs}
+        if op == 'submit':
+            return self.submit(message)
+        if op == 'status':
+            job = routes.result_store.get(message['job_id'])
+            if job is not None and message.get('points'):
+                # Downsample here so only the display points cross the socket
+                job = routes.visualization_helper.downsample_payload(job, message['points'])
+            return {'ok': True, 'job': job}
+        if op == 'timeline':
+            return self.timeline(message)
+        if op == 'profile':
+            profiler = routes.result_store.get_artifact(message['job_id'], 'profile')
+            if profiler is None:
+                return {'ok': True, 'profile': None}
+            return {'ok': True, 'profile': profiler.folded() if message.get('format') == 'folded' else profiler.report()}
+        if op == 'stats':
+            cache = routes.window_cache
+            return {
+                'ok': True,
+                'cache': {'enabled': True, **cache.stats()} if cache is not None else {'enabled': False},
+                'scheduler': {**routes.scheduler.stats(), 'analysis_profiles': routes.profile_selector.stats()}
+            }
+        if op == 'sessions':
+            # Completed sessions for the web tier's practice history
+            return {'ok': True, 'sessions': routes.result_store.drain_sessions()}
+        if op == 'cancel':
+            status = routes.result_store.cancel(message['job_id'], message.get('reason', 'cancelled'))
+            return {'ok': status is not None, 'status': status}
+        return {'ok': False, 'error': f"Unknown op: {op}"}
+
+    def timeline(self, message):
+        """Serve one level of a job's timeline pyramid (None when the job has no pyramid here)."""
+        pyramid = routes.result_store.get_artifact(message['job_id'], 'pyramid')
+        if pyramid is None:
+            return {'ok': True, 'timeline': None}
+        try:
+            timeline = pyramid.level(message.get('level', 15.0))
+        except ValueError as e:
+            return {'ok': False, 'error': str(e), 'status': 400}
+        return {'ok': True, 'timeline': {
+            'video_id': message['job_id'],
+            'available_levels': pyramid.available_levels(),
+            'timeline': timeline
+        }}
+
+    def submit(self, message):
+        """Choose the analysis profile and queue an uploaded file for analysis."""
+        job_id = message['job_id']
+        try:
+            analysis_profile, selection, cost = routes._select_profile(message['path'], message.get('analysis'))
+        except ValueError as e:
+            return {'ok': False, 'error': str(e), 'status': 400}
+        routes.result_store.create_job(job_id)
+        # Profiles without a preview pass (lite) run as one pass even in progressive mode
+        progressive = message.get('mode', 'full') == 'progressive' and analysis_profile.preview
+        self.executor.submit(
+            self._run,
+            routes._run_progressive_job if progressive else routes._run_full_job,
+            job_id,
+            message['path'],
+            message.get('timeline', False),
+            message.get('client_id', 'anonymous'),
+            cost,
+            message.get('profile', False),
+            analysis_profile.name,
+            selection
+        )
+        return {'ok': True, 'job_id': job_id}
+
+    def _run(self, runner, job_id, upload_path, build_pyramid, client_id, cost, profile, analysis, selection):
+        with self._lock:
+            self.active_jobs += 1
+        try:
+            runner(job_id, upload_path, build_pyramid, client_id, cost, profile, analysis=analysis, selection=selection)
+        finally:
+            with self._lock:
+                self.active_jobs -= 1
+
+    def serve(self, address):
+        """Accept connections forever, one short request/reply per connection."""
+        with Listener(address, authkey=AUTHKEY) as listener:
+            logger.info("Inference worker listening on %s", address)
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # A client that fails authentication must not stop the worker
+                    logger.warning("Rejected connection: %s", e)
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            try:
+                conn.send(self.handle(conn.recv()))
+            except Exception as e:
+                logger.exception("Inference worker request failed")
+                conn.send({'ok': False, 'error': str(e)})
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Speechably inference worker')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help='host:port or Unix socket path')
+    parser.add_argument('--job-threads', type=int, default=int(os.environ.get('INFERENCE_JOB_THREADS', 16)))
+    args = parser.parse_args()
+
+    # The web tier keeps the practice history of all workers
+    routes.result_store.export_sessions()
+    routes.resume_interrupted_jobs()
+    InferenceWorker(args.job_threads).serve(parse_address(args.address))
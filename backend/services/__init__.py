@@ -1,15 +1,38 @@
 """
 Services package for core functionality of Speechably.
+
+Exports are resolved lazily so that importing one light service module
+(e.g. from the web tier) does not pull in torch, transformers or whisper.
 """
-from services.audio_service import AudioSegmenter, AudioSegmenterConfig
-from services.speech_analysis import SpeechAnalyzer
-from services.transcription import TranscriptionService
-from services.gemini_service import GeminiService
-
-__all__ = [
-    'AudioSegmenter',
-    'AudioSegmenterConfig',
-    'SpeechAnalyzer',
-    'TranscriptionService',
-    'GeminiService'
-]
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'AudioSegmenter': 'services.audio_service',
+    'AudioSegmenterConfig': 'services.audio_service',
+    'SpeechAnalyzer': 'services.speech_analysis',
+    'TranscriptionService': 'services.transcription',
+    'TranscriptionProfile': 'services.transcription',
+    'GeminiService': 'services.gemini_service',
+    'LiveAnalysisSession': 'services.live_session',
+    'LiveSessionConfig': 'services.live_session',
+    'AnalysisPipeline': 'services.pipeline',
+    'TimelinePyramid': 'services.timeline_pyramid',
+    'PyramidConfig': 'services.timeline_pyramid',
+    'InferencePool': 'services.inference_pool',
+    'SharedAudio': 'services.inference_pool',
+    'BatchAnalyzer': 'services.batch_analysis',
+    'StreamingAnalyzer': 'services.streaming_pipeline',
+    'ProsodyAnalyzer': 'services.prosody',
+    'ProsodyConfig': 'services.prosody',
+    'MotionAnalyzer': 'services.motion',
+    'MotionConfig': 'services.motion',
+    'AnalysisProfile': 'services.analysis_profiles',
+    'ProfileSelector': 'services.analysis_profiles'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'services' has no attribute '{name}'")
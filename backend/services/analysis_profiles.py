@@ -0,0 +1,218 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """A named bundle of analysis settings, from model-free to the richest models"""
+    name: str
+    # False runs the model-free pass (prosody and motion only)
+    use_models: bool = True
+    whisper_model_size: str = "tiny"
+    beam_size: Optional[int] = None
+    # Window lengths (seconds) of the emotion and transcription timeline
+    min_window: float = 4.0
+    max_window: float = 7.0
+    # Progressive uploads publish a preview before the refined result
+    preview: bool = True
+    use_llm: bool = True
+    build_pyramid: bool = False
+    # Initial latency model: fixed seconds per job plus seconds per second of audio
+    overhead: float = 3.0
+    realtime_factor: float = 0.3
+
+# Richest first; selection walks down this list
+DEFAULT_PROFILES = (
+    AnalysisProfile(
+        "deep", whisper_model_size="base", beam_size=5, min_window=3.0, max_window=5.0,
+        build_pyramid=True, overhead=5.0, realtime_factor=1.0
+    ),
+    AnalysisProfile("standard"),
+    AnalysisProfile("lite", use_models=False, preview=False, use_llm=False, overhead=0.5, realtime_factor=0.01)
+)
+
+class ProfileSelector:
+    """
+    Picks the analysis profile of each request.
+
+    A client may name a profile or get the default one; with "auto" the
+    selector predicts each profile's latency from the probed duration and the
+    scheduler's current backlog and picks the richest profile within the
+    latency SLO.
+    The per-profile realtime factors are refined from completed jobs.
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[List[AnalysisProfile]] = None,
+        slo_seconds: float = 120.0,
+        max_concurrent: int = 2,
+        default: str = "standard",
+        smoothing: float = 0.2
+    ):
+        """
+        Initialize the selector.
+
+        Args:
+            profiles: Available profiles, richest first (default: DEFAULT_PROFILES)
+            slo_seconds: Target end-to-end latency for automatically selected profiles
+            max_concurrent: Number of scheduler slots working through the backlog
+            default: Profile used when a request names none ("auto" selects by SLO)
+            smoothing: Weight of each completed job in the realtime factor estimates
+        """
+        self.profiles = list(profiles or DEFAULT_PROFILES)
+        self.slo_seconds = slo_seconds
+        self.max_concurrent = max_concurrent
+        self.default = default
+        self.smoothing = smoothing
+        self._by_name = {profile.name: profile for profile in self.profiles}
+        self._lock = threading.Lock()
+        self._realtime_factors = {profile.name: profile.realtime_factor for profile in self.profiles}
+        self._completed = {profile.name: 0 for profile in self.profiles}
+        # Scheduler costs are expressed in seconds of audio at this profile's speed
+        self.reference = "standard" if "standard" in self._by_name else self.profiles[0].name
+
+    def get(self, name: str) -> AnalysisProfile:
+        """
+        Look a profile up by name.
+
+        Args:
+            name: Profile name
+
+        Returns:
+            The profile
+
+        Raises:
+            ValueError: If no profile has that name
+        """
+        if name not in self._by_name:
+            raise ValueError(f"Unknown analysis profile '{name}' (available: {', '.join(self._by_name)}, auto)")
+        return self._by_name[name]
+
+    def realtime_factor(self, profile: AnalysisProfile) -> float:
+        """Current estimate of processing seconds per second of audio"""
+        with self._lock:
+            return self._realtime_factors[profile.name]
+
+    def cost_weight(self, profile: AnalysisProfile) -> float:
+        """
+        Scheduler cost of the profile relative to the reference profile.
+
+        Args:
+            profile: Analysis profile
+
+        Returns:
+            Multiplier applied to FairScheduler.estimate_cost
+        """
+        with self._lock:
+            return self._realtime_factors[profile.name] / self._realtime_factors[self.reference]
+
+    def queue_wait(self, load: Dict[str, float]) -> float:
+        """
+        Predict how long a new job waits for a slot.
+
+        Args:
+            load: Output of FairScheduler.load
+
+        Returns:
+            Estimated seconds; running jobs are assumed half done
+        """
+        if load["free_slots"] > 0 and load["queued"] == 0:
+            return 0.0
+        with self._lock:
+            seconds_per_cost = self._realtime_factors[self.reference]
+        backlog = load["queued_cost"] + load["running_cost"] / 2
+        return backlog * seconds_per_cost / max(self.max_concurrent, 1)
+
+    def predict(self, profile: AnalysisProfile, duration: float, load: Dict[str, float]) -> float:
+        """
+        Predict a job's end-to-end latency under a profile.
+
+        Args:
+            profile: Analysis profile
+            duration: Probed audio duration in seconds
+            load: Output of FairScheduler.load
+
+        Returns:
+            Predicted seconds from submission to result
+        """
+        return self.queue_wait(load) + profile.overhead + self.realtime_factor(profile) * duration
+
+    def select(
+        self,
+        duration: float,
+        load: Dict[str, float],
+        requested: Optional[str] = None
+    ) -> Tuple[AnalysisProfile, Dict[str, Any]]:
+        """
+        Choose the profile of a request.
+
+        Args:
+            duration: Probed audio duration in seconds
+            load: Output of FairScheduler.load
+            requested: Profile named by the client, "auto", or None for the default
+
+        Returns:
+            Tuple of (profile, selection record for the response)
+
+        Raises:
+            ValueError: If the requested profile does not exist
+        """
+        requested = requested or self.default
+        if requested != "auto":
+            profile = self.get(requested)
+            selected_by = "client" if requested != self.default else "default"
+        else:
+            # Richest profile predicted to meet the SLO; the cheapest one otherwise
+            profile = next(
+                (candidate for candidate in self.profiles if self.predict(candidate, duration, load) <= self.slo_seconds),
+                self.profiles[-1]
+            )
+            selected_by = "slo"
+
+        return profile, {
+            "name": profile.name,
+            "requested": requested,
+            "selected_by": selected_by,
+            "predicted_latency": round(self.predict(profile, duration, load), 1),
+            "slo_seconds": self.slo_seconds,
+            "queued_jobs": load["queued"]
+        }
+
+    def record(self, profile: AnalysisProfile, duration: float, elapsed: float):
+        """
+        Refine a profile's realtime factor from a completed job.
+
+        Args:
+            profile: Profile the job ran with
+            duration: Audio duration in seconds
+            elapsed: Processing time in seconds (excluding the queue wait)
+        """
+        if duration <= 0:
+            return
+        observed = max(elapsed - profile.overhead, 0.0) / duration
+        with self._lock:
+            current = self._realtime_factors[profile.name]
+            self._realtime_factors[profile.name] = (1 - self.smoothing) * current + self.smoothing * observed
+            self._completed[profile.name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the profiles and their current latency model.
+
+        Returns:
+            Dictionary of selector settings and per-profile estimates
+        """
+        with self._lock:
+            return {
+                "default": self.default,
+                "slo_seconds": self.slo_seconds,
+                "profiles": {
+                    profile.name: {
+                        "realtime_factor": round(self._realtime_factors[profile.name], 4),
+                        "overhead": profile.overhead,
+                        "completed_jobs": self._completed[profile.name]
+                    }
+                    for profile in self.profiles
+                }
+            }
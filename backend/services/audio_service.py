@@ -1,9 +1,19 @@
 import subprocess
 from pathlib import Path
 import os
+import queue
+import threading
 from dataclasses import dataclass
-from typing import Optional, Tuple, List
+from contextlib import nullcontext
+from typing import Optional, Tuple, List, Dict, Any, Iterator
 import re
+import logging
+import numpy as np
+import soundfile as sf
+
+from utils.cancellation import CancellationToken, run_process, check_cancelled
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class AudioSegmenterConfig:
@@ -13,7 +23,106 @@ class AudioSegmenterConfig:
     audio_sample_rate: int = 16000
     audio_channels: int = 1
 
+class StreamingDecoder:
+    """
+    Decodes a media file to the analysis WAV format while the file is still
+    being written. Byte ranges are fed to ffmpeg's stdin from a background
+    thread as they are committed, so the decode finishes shortly after the
+    last byte arrives. Only works for containers readable front to back
+    (WebM/Matroska, AVI, MP4/MOV with the moov box before the media data).
+    """
+
+    def __init__(self, cmd: List[str], output_path: str):
+        """
+        Start ffmpeg and the feeding thread.
+
+        Args:
+            cmd: ffmpeg command reading from pipe:0
+            output_path: WAV file ffmpeg writes
+        """
+        self.output_path = output_path
+        self.failed = False
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._ranges: "queue.Queue[Optional[Tuple[str, int, int]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._pump, name="stream-decode", daemon=True)
+        self._thread.start()
+
+    def feed(self, path: str, start: int, end: int):
+        """
+        Queue bytes [start, end) of a file for decoding.
+
+        Args:
+            path: File being received
+            start: First byte offset
+            end: End byte offset (exclusive)
+        """
+        if end > start:
+            self._ranges.put((path, start, end))
+
+    def _pump(self):
+        """Copy queued byte ranges into ffmpeg until the end marker."""
+        try:
+            while True:
+                item = self._ranges.get()
+                if item is None:
+                    break
+                path, start, end = item
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    remaining = end - start
+                    while remaining > 0:
+                        block = f.read(min(remaining, 1024 * 1024))
+                        if not block:
+                            break
+                        self._process.stdin.write(block)
+                        remaining -= len(block)
+        except (OSError, ValueError):
+            # ffmpeg exited early (unreadable stream); the caller decodes the complete file instead
+            self.failed = True
+        finally:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+
+    def finish(self, timeout: float = 60.0) -> Optional[str]:
+        """
+        Signal the end of the input and wait for ffmpeg.
+
+        Args:
+            timeout: Seconds to wait for the remaining decode
+
+        Returns:
+            Path of the decoded WAV, or None if the streaming decode failed
+        """
+        self._ranges.put(None)
+        self._thread.join(timeout)
+        try:
+            returncode = self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.abort()
+            return None
+        if self.failed or returncode != 0 or not os.path.exists(self.output_path):
+            return None
+        return self.output_path
+
+    def abort(self):
+        """Stop decoding and discard the output."""
+        self._ranges.put(None)
+        self._process.kill()
+        self._process.wait()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
 class AudioSegmenter:
+    # Random per-sample-value table for the rolling (gear) hash used by plan_content_segments
+    _GEAR_TABLE = np.random.default_rng(0x5EEC4).integers(0, 2**63, size=65536, dtype=np.uint64).astype(np.uint32)
+    # Rolling hash window (samples) and boundary mask (~one candidate cut per second at 16 kHz)
+    _ROLLING_WINDOW = 512
+    _BOUNDARY_MASK = np.uint32((1 << 14) - 1)
+    # Samples hashed at a time, so the hash arrays stay a few MB for any recording length
+    _HASH_BLOCK = 1 << 20
+
     def __init__(self, config: Optional[AudioSegmenterConfig] = None):
         """
         Initialize the audio segmenter with optional configuration.
@@ -51,6 +160,120 @@ class AudioSegmenter:
             return hours * 3600 + minutes * 60 + seconds
         return 0.0
 
+    def probe_duration(self, media_path: str) -> float:
+        """
+        Read the container duration from the file header without decoding.
+        Cheap enough to call before a job is scheduled.
+
+        Args:
+            media_path: Path to the video or audio file
+
+        Returns:
+            Duration in seconds (0.0 if it cannot be determined)
+        """
+        # Without an output file FFmpeg only probes the input (and exits non-zero)
+        result = subprocess.run([self.config.ffmpeg_path, '-hide_banner', '-i', media_path],
+                                capture_output=True, text=True)
+        duration_match = re.search(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)', result.stderr)
+        if duration_match:
+            hours, minutes, seconds = duration_match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        return 0.0
+
+    def probe_streams(self, media_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the container format and stream codecs from the file header.
+        Works on a partially received file when its header is complete.
+
+        Args:
+            media_path: Path to the (possibly incomplete) media file
+
+        Returns:
+            Dictionary with container, audio_codec and video_codec (None when
+            the stream is absent), or None if FFmpeg cannot parse the header yet
+        """
+        result = subprocess.run([self.config.ffmpeg_path, '-hide_banner', '-i', media_path],
+                                capture_output=True, text=True)
+        container_match = re.search(r'Input #0, ([\w,]+), from', result.stderr)
+        if not container_match or ' Stream #' not in result.stderr:
+            return None
+        audio_match = re.search(r'Stream #\d+:\d+.*?: Audio: (\w+)', result.stderr)
+        video_match = re.search(r'Stream #\d+:\d+.*?: Video: (\w+)', result.stderr)
+        return {
+            "container": container_match.group(1),
+            "audio_codec": audio_match.group(1) if audio_match else None,
+            "video_codec": video_match.group(1) if video_match else None
+        }
+
+    def open_stream_decoder(self, output_path: str) -> StreamingDecoder:
+        """
+        Start decoding a file that is still being received.
+
+        Args:
+            output_path: WAV file to write (same format as extract_full_audio)
+
+        Returns:
+            StreamingDecoder fed with byte ranges of the incoming file
+        """
+        return StreamingDecoder(self._full_audio_command('pipe:0', output_path), output_path)
+
+    def stream_pcm(
+        self,
+        media_path: str,
+        chunk_seconds: float = 30.0,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        Decode the audio track through a pipe, yielding fixed-size chunks.
+        Nothing is written to disk and only one chunk is held here at a time,
+        whatever the length of the recording.
+
+        Args:
+            media_path: Path to the video or audio file
+            chunk_seconds: Length of each chunk (the last one may be shorter)
+            cancel_token: Optional token; cancelling it kills the ffmpeg process
+
+        Yields:
+            1-D float32 arrays in [-1, 1] at the configured sample rate
+
+        Raises:
+            RuntimeError: If no audio could be decoded
+        """
+        check_cancelled(cancel_token)
+        # Raw samples instead of a WAV container, so a chunk never straddles a header
+        cmd = self._full_audio_command(media_path, 'pipe:1', output_format='s16le')
+        chunk_bytes = int(chunk_seconds * self.config.audio_sample_rate) * 2 * self.config.audio_channels
+        decoded = 0
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+            with cancel_token.track(process) if cancel_token is not None else nullcontext():
+                try:
+                    while True:
+                        buffer = bytearray(chunk_bytes)
+                        view = memoryview(buffer)
+                        filled = 0
+                        while filled < chunk_bytes:
+                            read = process.stdout.readinto(view[filled:])
+                            if not read:
+                                break
+                            filled += read
+                        filled -= filled % (2 * self.config.audio_channels)
+                        if filled == 0:
+                            break
+                        samples = np.frombuffer(buffer, dtype='<i2', count=filled // 2).astype(np.float32) / 32768.0
+                        if self.config.audio_channels > 1:
+                            samples = samples.reshape(-1, self.config.audio_channels).mean(axis=1)
+                        decoded += len(samples)
+                        yield samples
+                        if filled < chunk_bytes:
+                            break
+                finally:
+                    # Also reached when the consumer stops early
+                    if process.poll() is None:
+                        process.kill()
+        check_cancelled(cancel_token)
+        if decoded == 0:
+            raise RuntimeError(f"No audio could be decoded from {os.path.basename(media_path)}")
+
     def extract_and_split_audio(self, video_path: str, output_dir: str) -> Tuple[str, List[str]]:
         """
         Extract audio from video and split it into segments.
@@ -62,16 +285,49 @@ class AudioSegmenter:
         Returns:
             Tuple containing (full_audio_path, list_of_segment_paths)
         """
+        full_audio_path = self.extract_full_audio(video_path, output_dir)
+
+        # Get duration of the audio file
+        duration = self._get_audio_duration(full_audio_path)
+        windows = self.plan_segments(duration)
+
+        segment_paths = self.extract_segments(full_audio_path, windows, output_dir)
+        return full_audio_path, segment_paths
+
+    def extract_full_audio(
+        self,
+        video_path: str,
+        output_dir: str,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> str:
+        """
+        Extract the full audio track of a video into the output directory.
+        
+        Args:
+            video_path: Path to the input video file
+            output_dir: Directory to save the extracted audio
+            cancel_token: Optional token; cancelling it kills the ffmpeg process
+            
+        Returns:
+            Path to the extracted full_audio.wav
+        """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # First extract the full audio
         full_audio_path = str(output_dir / "full_audio.wav")
-        self._extract_full_audio(video_path, full_audio_path)
-
-        # Get duration of the audio file
-        duration = self._get_audio_duration(full_audio_path)
+        self._extract_full_audio(video_path, full_audio_path, cancel_token)
+        return full_audio_path
 
+    def plan_segments(self, duration: float) -> List[Tuple[float, float]]:
+        """
+        Compute the (start, end) boundaries of the analysis segments.
+        
+        Args:
+            duration: Total audio duration in seconds
+            
+        Returns:
+            List of (start, end) tuples in seconds
+        """
         # Calculate number of segments
         num_segments = int(duration // self.config.max_duration) + 1
         segment_duration = duration / num_segments
@@ -83,41 +339,160 @@ class AudioSegmenter:
                 num_segments = 1
             segment_duration = duration / num_segments
 
-        print(f"Splitting audio into {num_segments} segments of ~{segment_duration:.2f}s each")
+        logger.info("Splitting audio into %d segments of ~%.2fs each", num_segments, segment_duration)
+        
+        return [
+            (i * segment_duration, min((i + 1) * segment_duration, duration))
+            for i in range(num_segments)
+        ]
+
+    def plan_content_segments(self, samples: np.ndarray) -> List[Tuple[float, float]]:
+        """
+        Compute content-defined segment boundaries within the min/max duration.
+        
+        Cut points are placed where a rolling hash of the PCM samples hits a
+        boundary pattern, so they move with the audio content: after trimming
+        the start or end of a recording, the remaining boundaries (and window
+        contents) stay the same.
+        
+        Args:
+            samples: 1-D float32 decoded audio
+            
+        Returns:
+            List of (start, end) tuples in seconds
+        """
+        sample_rate = self.config.audio_sample_rate
+        total = len(samples)
+        min_len = int(self.config.min_duration * sample_rate)
+        max_len = int(self.config.max_duration * sample_rate)
+
+        if total <= max_len:
+            return [(0.0, total / sample_rate)]
+
+        candidates = self._hash_candidates(samples)
+
+        cuts = [0]
+        while total - cuts[-1] > max_len:
+            start = cuts[-1]
+            position = np.searchsorted(candidates, start + min_len)
+            if position < len(candidates) and candidates[position] <= start + max_len:
+                cuts.append(int(candidates[position]))
+            else:
+                cuts.append(start + max_len)
+        cuts.append(total)
+
+        windows = [(cuts[i] / sample_rate, cuts[i + 1] / sample_rate) for i in range(len(cuts) - 1)]
+        logger.info("Splitting audio into %d content-defined segments", len(windows))
+        return windows
+
+    def _hash_candidates(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Sample positions where the rolling hash of the preceding _ROLLING_WINDOW
+        samples hits the boundary pattern. The hash is computed block by block
+        (uint32 arithmetic wraps, which leaves the masked low bits exact).
+        """
+        window = self._ROLLING_WINDOW
+        candidates = []
+        for begin in range(0, len(samples), self._HASH_BLOCK):
+            # Each block starts with the previous block's last window so no position is skipped
+            offset = max(begin - window, 0)
+            block = samples[offset:begin + self._HASH_BLOCK]
+            pcm = np.clip(np.round(block * 32768), -32768, 32767).astype(np.int16)
+            prefix = np.zeros(len(pcm) + 1, dtype=np.uint32)
+            np.cumsum(self._GEAR_TABLE[pcm.view(np.uint16)], dtype=np.uint32, out=prefix[1:])
+            rolling = prefix[window:] - prefix[:-window]
+            ends = np.flatnonzero((rolling & self._BOUNDARY_MASK) == 0) + window + offset
+            candidates.append(ends[ends > begin])
+        return np.concatenate(candidates) if candidates else np.zeros(0, dtype=np.int64)
+
+    def extract_segments(
+        self, 
+        full_audio_path: str, 
+        windows: List[Tuple[float, float]], 
+        output_dir: str,
+        indices: Optional[List[int]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[str]:
+        """
+        Extract planned segments from the full audio.
         
+        Args:
+            full_audio_path: Path to the full extracted audio
+            windows: Segment boundaries from plan_segments
+            output_dir: Directory to save the audio segments
+            indices: Optional subset of segment indices to extract (default: all)
+            cancel_token: Optional token checked between segments; cancelling it kills ffmpeg
+            
+        Returns:
+            List of segment paths, named segment_<index+1>.wav
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if indices is None:
+            indices = list(range(len(windows)))
+
         segment_paths = []
-        for i in range(num_segments):
-            start = i * segment_duration
-            end = min((i + 1) * segment_duration, duration)
+        for i in indices:
+            check_cancelled(cancel_token)
+            start, end = windows[i]
             
             audio_segment_path = str(output_dir / f"segment_{i+1}.wav")
-            self._extract_audio_segment(full_audio_path, start, end, audio_segment_path)
+            self._extract_audio_segment(full_audio_path, start, end, audio_segment_path, cancel_token)
             
             segment_paths.append(audio_segment_path)
-            print(f"Saved segment {i+1}: {audio_segment_path}")
+            logger.debug("Saved segment %d: %s", i + 1, audio_segment_path)
 
-        return full_audio_path, segment_paths
+        return segment_paths
+
+    def load_audio(self, audio_path: str) -> np.ndarray:
+        """
+        Load an extracted WAV file into a mono float32 buffer.
+        
+        Args:
+            audio_path: Path to a WAV file produced by extract_full_audio
+            
+        Returns:
+            1-D float32 array with samples in [-1, 1]
+        """
+        samples, _ = sf.read(audio_path, dtype='float32', always_2d=True)
+        return np.ascontiguousarray(samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0])
 
-    def _extract_full_audio(self, video_path: str, output_path: str):
+    def _extract_full_audio(self, video_path: str, output_path: str, cancel_token: Optional[CancellationToken] = None):
         """
         Extract full audio from a video file.
         
         Args:
             video_path: Path to the video file
             output_path: Path to save the extracted audio
+            cancel_token: Optional token that kills ffmpeg when cancelled
         """
+        cmd = self._full_audio_command(str(video_path), output_path)
+        run_process(cmd, cancel_token, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+
+    def _full_audio_command(self, source: str, output_path: str, output_format: Optional[str] = None) -> List[str]:
+        """FFmpeg command decoding the audio track of source into 16-bit PCM (WAV unless output_format is given)."""
         cmd = [
             self.config.ffmpeg_path,
-            '-i', str(video_path),
+            '-i', source,
             '-vn',  # no video
             '-acodec', 'pcm_s16le',
             '-ar', str(self.config.audio_sample_rate),
             '-ac', str(self.config.audio_channels),
-            output_path
+            '-y'
         ]
-        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        if output_format:
+            cmd += ['-f', output_format]
+        return cmd + [output_path]
 
-    def _extract_audio_segment(self, audio_path: str, start: float, end: float, output_path: str):
+    def _extract_audio_segment(
+        self,
+        audio_path: str,
+        start: float,
+        end: float,
+        output_path: str,
+        cancel_token: Optional[CancellationToken] = None
+    ):
         """
         Extract a segment of audio from a larger audio file.
         
@@ -126,6 +501,7 @@ class AudioSegmenter:
             start: Start time in seconds
             end: End time in seconds
             output_path: Path to save the segment
+            cancel_token: Optional token that kills ffmpeg when cancelled
         """
         cmd = [
             self.config.ffmpeg_path,
@@ -137,4 +513,4 @@ class AudioSegmenter:
             '-ac', str(self.config.audio_channels),
             output_path
         ]
-        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
\ No newline at end of file
+        run_process(cmd, cancel_token, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
\ No newline at end of file
@@ -0,0 +1,205 @@
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+import numpy as np
+
+from utils.cancellation import CancellationToken, JobCancelled, check_cancelled
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+class BatchAnalyzer:
+    """
+    Analyzes several recordings together.
+    Audio is decoded in parallel, then the windows of all files are fed to
+    the emotion model and Whisper in shared batches instead of one
+    pipeline per file.
+    """
+
+    def __init__(self, pipeline, batch_size: int = 16, decode_workers: int = 4):
+        """
+        Initialize the batch analyzer on top of an AnalysisPipeline.
+
+        Args:
+            pipeline: AnalysisPipeline providing the shared services
+            batch_size: Number of windows per model call
+            decode_workers: Number of ffmpeg decodes run in parallel
+        """
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        self.decode_workers = decode_workers
+
+    def analyze_files(
+        self,
+        video_paths: List[str],
+        work_dir: str,
+        video_ids: Optional[List[str]] = None,
+        use_llm: bool = True,
+        progress: Optional[Callable[[str, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze a group of videos with cross-file model batching.
+
+        Args:
+            video_paths: Paths of the videos to analyze
+            work_dir: Temporary working directory for the group
+            video_ids: Optional identifiers returned with each result (default: file names)
+            use_llm: Whether to request Gemini insights for each file
+            progress: Optional callable(stage, fraction) for progress reporting
+            cancel_token: Optional CancellationToken checked between model batches
+
+        Returns:
+            One response payload per input, in input order; failed files
+            get {"success": False, "error": ...}
+
+        Raises:
+            JobCancelled: If cancel_token is cancelled before the analysis completes
+        """
+        report = progress or (lambda stage, fraction: None)
+        video_ids = video_ids or [os.path.basename(path) for path in video_paths]
+        sample_rate = self.pipeline.audio_segmenter.config.audio_sample_rate
+
+        # Decode every file in parallel (ffmpeg runs outside the GIL)
+        started = time.perf_counter()
+        with span("batch.decode", files=len(video_paths)), ThreadPoolExecutor(max_workers=self.decode_workers) as executor:
+            # Each decode runs in a copy of this context so its spans join the batch's trace
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, self._decode, path, os.path.join(work_dir, f"file_{index}"), cancel_token
+                )
+                for index, path in enumerate(video_paths)
+            ]
+            decoded = [future.result() for future in futures]
+        check_cancelled(cancel_token)
+        report("decode", 1.0)
+        decode_time = round(time.perf_counter() - started, 3)
+
+        # Flatten the windows of all successfully decoded files
+        window_refs = []
+        for file_index, item in enumerate(decoded):
+            if "error" in item:
+                continue
+            for window_index, (start, end) in enumerate(item["audio"]["windows"]):
+                window_refs.append((file_index, window_index, int(start * sample_rate), int(end * sample_rate)))
+
+        # Sort by length so each batch pads as little as possible
+        window_refs.sort(key=lambda ref: ref[3] - ref[2])
+
+        def window_samples(ref):
+            file_index, _, start, end = ref
+            return decoded[file_index]["samples"][start:end]
+
+        started = time.perf_counter()
+        labels = self.pipeline.speech_analyzer.labels
+        emotions: Dict[tuple, str] = {}
+        emotion_rows: Dict[tuple, np.ndarray] = {}
+        with span("batch.emotion", windows=len(window_refs), model=self.pipeline.speech_analyzer.model_name):
+            for offset in range(0, len(window_refs), self.batch_size):
+                check_cancelled(cancel_token)
+                batch = window_refs[offset:offset + self.batch_size]
+                probabilities = self.pipeline.speech_analyzer.predict_proba_batch(
+                    [window_samples(ref) for ref in batch], sample_rate, self.batch_size
+                )
+                for ref, row in zip(batch, probabilities):
+                    emotions[ref[:2]] = labels[int(row.argmax())]
+                    emotion_rows[ref[:2]] = row
+                report("emotion", min((offset + len(batch)) / len(window_refs), 1.0))
+        emotion_time = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        texts: Dict[tuple, Tuple[str, Dict[str, Any]]] = {}
+        with span("batch.transcription", windows=len(window_refs), model=self.pipeline.transcription_service.model_size):
+            for offset in range(0, len(window_refs), self.batch_size):
+                check_cancelled(cancel_token)
+                batch = window_refs[offset:offset + self.batch_size]
+                transcribed = self.pipeline.transcription_service.transcribe_batch(
+                    [window_samples(ref) for ref in batch]
+                )
+                for ref, text_and_stats in zip(batch, transcribed):
+                    texts[ref[:2]] = text_and_stats
+                report("transcription", min((offset + len(batch)) / len(window_refs), 1.0))
+        transcription_time = round(time.perf_counter() - started, 3)
+
+        logger.info(
+            "Batch of %d file(s), %d window(s): decode %ss, emotion %ss, transcription %ss",
+            len(video_paths), len(window_refs), decode_time, emotion_time, transcription_time
+        )
+
+        responses = []
+        for file_index, item in enumerate(decoded):
+            if "error" in item:
+                responses.append({"success": False, "video_id": video_ids[file_index], "error": item["error"]})
+                continue
+            if use_llm:
+                report("insights", file_index / len(decoded))
+            response = self._assemble(file_index, item["audio"], emotions, texts, video_ids[file_index], use_llm, cancel_token)
+            response["timings"] = {
+                "decode": item["audio"]["timings"]["decode"],
+                "batch_decode": decode_time,
+                "batch_emotion": emotion_time,
+                "batch_transcription": transcription_time
+            }
+            rows = [emotion_rows[(file_index, i)] for i in range(len(item["audio"]["windows"]))]
+            self.pipeline.export_analytics(response, np.stack(rows) if rows else None, labels)
+            responses.append(response)
+        return responses
+
+    def _decode(self, video_path: str, work_dir: str, cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Extract, plan and load the audio of one file."""
+        try:
+            check_cancelled(cancel_token)
+            audio = self.pipeline.prepare_audio(video_path, work_dir, cancel_token)
+            samples = self.pipeline.audio_segmenter.load_audio(audio["full_audio_path"])
+            return {"audio": audio, "samples": samples}
+        except JobCancelled:
+            raise
+        except Exception as e:
+            logger.warning("Error decoding %s: %s", video_path, e)
+            return {"error": str(e)}
+
+    def _assemble(
+        self,
+        file_index: int,
+        audio: Dict[str, Any],
+        emotions: Dict[tuple, str],
+        texts: Dict[tuple, Tuple[str, Dict[str, Any]]],
+        video_id: str,
+        use_llm: bool,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """Build one file's response from the batched model outputs."""
+        windows = audio["windows"]
+        results = {
+            f"segment_{i+1}.wav": emotions.get((file_index, i), "neutral")
+            for i in range(len(windows))
+        }
+        emotion_segments = self.pipeline.data_processor.process_emotion_data(
+            results,
+            audio["duration"],
+            [end - start for start, end in windows]
+        )
+        transcription_data = []
+        for i, (start, end) in enumerate(windows):
+            text, decode_stats = texts.get((file_index, i), ("", None))
+            transcription_data.append(self.pipeline.transcription_service.build_segment_data(
+                i, start, end, text, emotion_segments[i][1], decode_stats or None
+            ))
+
+        gemini_analysis = None
+        if use_llm:
+            gemini_analysis = self.pipeline.gemini_service.analyze_speech(emotion_segments, transcription_data, cancel_token)
+
+        response = self.pipeline.build_response(
+            video_id,
+            emotion_segments,
+            transcription_data,
+            gemini_analysis,
+            audio["duration"]
+        )
+        response["phase"] = "complete"
+        return response
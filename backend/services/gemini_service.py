@@ -2,9 +2,18 @@ import google.generativeai as genai
 import json
 import re
 import os
-import sys
+import logging
+import threading
 from typing import Dict, List, Tuple, Any, Optional, Union
 
+from utils.cancellation import CancellationToken, JobCancelled
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Model used for analysis and chat
+GEMINI_MODEL = "gemini-1.5-pro"
+
 class GeminiService:
     """
     Service class for interacting with the Gemini API to generate feedback
@@ -19,11 +28,10 @@ class GeminiService:
             api_key: The Gemini API key. If None, attempts to load from environment.
         """
         self.model = self.init_gemini(api_key)
-        # Log init status
         if self.model is None:
-            print("WARNING: Gemini model initialization failed. Analysis will be limited.", file=sys.stderr)
+            logger.warning("Gemini model initialization failed. Analysis will be limited.")
         else:
-            print("Gemini model initialized successfully.")
+            logger.info("Gemini model initialized successfully.")
     
     def init_gemini(self, api_key: Optional[str] = None) -> Any:
         """
@@ -39,12 +47,20 @@ class GeminiService:
             # Get API key from parameter or environment variable
             API_KEY = api_key or os.environ.get("GEMINI_API_KEY")
             if not API_KEY:
-                print("GEMINI_API_KEY not found in environment variables or parameters", file=sys.stderr)
-                print("Environment variables:", {k: v for k, v in os.environ.items() if 'API' in k}, file=sys.stderr)
+                # Only variable names are logged; their values may be secrets
+                logger.warning(
+                    "GEMINI_API_KEY not found in environment variables or parameters (API variables set: %s)",
+                    sorted(k for k in os.environ if 'API' in k)
+                )
                 return None
                 
-            # Configure the API client
-            genai.configure(api_key=API_KEY)
+            # Configure the API client (GEMINI_API_ENDPOINT points it at another
+            # REST endpoint, e.g. the local stand-in used by the load tests)
+            endpoint = os.environ.get("GEMINI_API_ENDPOINT")
+            if endpoint:
+                genai.configure(api_key=API_KEY, transport="rest", client_options={"api_endpoint": endpoint})
+            else:
+                genai.configure(api_key=API_KEY)
             
             # Set up the model
             generation_config = {
@@ -63,7 +79,7 @@ class GeminiService:
             
             # Try to create the model
             model = genai.GenerativeModel(
-                model_name="gemini-1.5-pro",
+                model_name=GEMINI_MODEL,
                 generation_config=generation_config,
                 safety_settings=safety_settings
             )
@@ -74,11 +90,8 @@ class GeminiService:
                 raise Exception("Model did not return a response for test call")
                 
             return model
-        except Exception as e:
-            print(f"Error initializing Gemini: {str(e)}", file=sys.stderr)
-            # Print the full exception traceback for debugging
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+        except Exception:
+            logger.exception("Error initializing Gemini")
             return None
     
     def generate_speech_analysis_prompt(self, transcription_data: List[Dict[str, Any]]) -> str:
@@ -254,10 +267,46 @@ Format your response in JSON with the following structure:
         
         return analysis
     
+    def _generate(self, prompt: str, cancel_token: Optional[CancellationToken] = None) -> Any:
+        """
+        Call the model, returning early with JobCancelled if the job is cancelled.
+        The HTTP request cannot be aborted, so a cancelled call is left to finish
+        in a daemon thread and its response is dropped.
+        
+        Args:
+            prompt: Prompt text
+            cancel_token: Optional CancellationToken of the current job
+            
+        Returns:
+            The model response
+        """
+        if cancel_token is None:
+            return self.model.generate_content(prompt)
+
+        cancel_token.raise_if_cancelled()
+        outcome = {}
+        done = threading.Event()
+
+        def call():
+            try:
+                outcome["response"] = self.model.generate_content(prompt)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=call, daemon=True).start()
+        while not done.wait(0.1):
+            cancel_token.raise_if_cancelled()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
+
     def analyze_speech(
         self, 
         emotion_segments: List[Tuple[str, str]], 
-        transcription_data: Optional[List[Dict[str, Any]]] = None
+        transcription_data: Optional[List[Dict[str, Any]]] = None,
+        cancel_token: Optional[CancellationToken] = None
     ) -> Dict[str, Any]:
         """
         Use Gemini to analyze speech patterns and provide coaching feedback.
@@ -265,12 +314,13 @@ Format your response in JSON with the following structure:
         Args:
             emotion_segments: List of (time_range, emotion) tuples
             transcription_data: Optional list of transcription segment dictionaries
+            cancel_token: Optional CancellationToken; stops waiting for Gemini when cancelled
             
         Returns:
             Dictionary containing analysis results
         """
         if self.model is None:
-            print("Using fallback analysis because Gemini model is not available", file=sys.stderr)
+            logger.warning("Using fallback analysis because Gemini model is not available")
             return self.generate_fallback_analysis(emotion_segments)
         
         # Generate appropriate prompt based on available data
@@ -281,7 +331,8 @@ Format your response in JSON with the following structure:
         
         try:
             # Get response from Gemini
-            response = self.model.generate_content(prompt)
+            with span("gemini.generate", model=GEMINI_MODEL, prompt_chars=len(prompt)):
+                response = self._generate(prompt, cancel_token)
             response_text = response.text
             
             # Extract JSON data from response
@@ -309,15 +360,15 @@ Format your response in JSON with the following structure:
                     analysis_data = json.loads(json_str)
                 except json.JSONDecodeError:
                     # If JSON parsing still fails, create a structured response manually
-                    print(f"Failed to parse JSON from Gemini response. Raw response: {response_text[:500]}...", file=sys.stderr)
+                    logger.warning("Failed to parse JSON from Gemini response. Raw response: %.500s", response_text)
                     return self.generate_fallback_analysis(emotion_segments)
                 
             return analysis_data
             
-        except Exception as e:
-            print(f"Error during Gemini analysis: {str(e)}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
+        except JobCancelled:
+            raise
+        except Exception:
+            logger.exception("Error during Gemini analysis")
             return self.generate_fallback_analysis(emotion_segments)
             
     def generate_chat_response(self, user_input: str, emotion_context: str) -> str:
@@ -349,9 +400,10 @@ Keep your response concise (3-5 sentences) unless detailed instructions are need
         
         try:
             # Get response from Gemini
-            response = self.model.generate_content(prompt)
+            with span("gemini.chat", model=GEMINI_MODEL, prompt_chars=len(prompt)):
+                response = self.model.generate_content(prompt)
             return response.text.strip()
         except Exception as e:
             # Provide a fallback response if Gemini fails
-            print(f"Error generating chat response: {str(e)}", file=sys.stderr)
+            logger.warning("Error generating chat response: %s", e)
             return "I'm having trouble generating a personalized response right now. Here's some general advice: focus on maintaining a consistent pace, practice in front of a mirror to work on your delivery, and record yourself to identify specific areas for improvement. Would you like advice on a particular aspect of public speaking?"
\ No newline at end of file
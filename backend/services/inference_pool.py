@@ -0,0 +1,257 @@
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, Future, wait
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Dict, Tuple, Optional, Any
+
+from utils.cancellation import CancellationToken
+
+# Models loaded once per worker process by _init_worker
+_worker_speech_analyzer = None
+_worker_transcription_service = None
+
+def _init_worker(emotion_model_name: str, whisper_model_size: str, torch_threads: int, transcription_profile=None):
+    """Load the models into a freshly spawned worker process."""
+    global _worker_speech_analyzer, _worker_transcription_service
+
+    import torch
+    from services.speech_analysis import SpeechAnalyzer
+    from services.transcription import TranscriptionService
+
+    # One intra-op thread per worker: parallelism comes from the processes
+    torch.set_num_threads(torch_threads)
+    _worker_speech_analyzer = SpeechAnalyzer(emotion_model_name)
+    _worker_transcription_service = TranscriptionService(model_size=whisper_model_size, profile=transcription_profile)
+
+def _attach(shm_name: str, num_samples: int) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Attach to the parent's audio buffer without copying it."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # The parent owns (and unlinks) the segment; stop this process's tracker from doing it too
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, np.ndarray((num_samples,), dtype=np.float32, buffer=shm.buf)
+
+def _classify_task(shm_name: str, num_samples: int, bounds: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Emotion probabilities for each (start, end) sample range, as one float32 array."""
+    shm, audio = _attach(shm_name, num_samples)
+    try:
+        num_labels = len(_worker_speech_analyzer.labels)
+        probabilities = np.zeros((len(bounds), num_labels), dtype=np.float32)
+        for row, (start, end) in enumerate(bounds):
+            _, window_probabilities = _worker_speech_analyzer.predict_waveform(audio[start:end], sample_rate)
+            if window_probabilities is not None:
+                probabilities[row] = window_probabilities
+        return probabilities
+    finally:
+        del audio
+        shm.close()
+
+def _detect_language_task(shm_name: str, num_samples: int, bounds: np.ndarray) -> Optional[str]:
+    """Language of the first window loud enough to contain speech (None if all are silent)."""
+    shm, audio = _attach(shm_name, num_samples)
+    try:
+        service = _worker_transcription_service
+        if service.model is None:
+            return None
+        for start, end in bounds:
+            window = np.array(audio[start:end])
+            if len(window) and np.sqrt(np.mean(np.square(window))) >= service.profile.silence_rms:
+                return service.detect_language(window)
+        return None
+    finally:
+        del audio
+        shm.close()
+
+def _transcribe_task(shm_name: str, num_samples: int, bounds: np.ndarray, language: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Whisper text and decode statistics for each (start, end) sample range."""
+    shm, audio = _attach(shm_name, num_samples)
+    try:
+        service = _worker_transcription_service
+        if service.model is None:
+            return [("", None) for _ in bounds]
+        results = []
+        for start, end in bounds:
+            text, stats, language = service.decode_window(np.array(audio[start:end]), language)
+            results.append((text, stats))
+        return results
+    finally:
+        del audio
+        shm.close()
+
+class SharedAudio:
+    """
+    Decoded audio placed once in shared memory so worker processes can read
+    windows from it directly instead of receiving pickled arrays.
+    """
+
+    def __init__(self, samples: np.ndarray):
+        """
+        Copy the decoded samples into a new shared memory segment.
+
+        Args:
+            samples: 1-D decoded audio
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.num_samples = len(samples)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        np.ndarray(samples.shape, dtype=np.float32, buffer=self.shm.buf)[:] = samples
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        """Release and unlink the shared memory segment."""
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class InferencePool:
+    """
+    Persistent pool of worker processes with preloaded SpeechAnalyzer and
+    TranscriptionService models, used to spread CPU-bound inference across
+    cores without contending for the GIL of the web process.
+    """
+
+    # Windows per task for cancellable jobs (bounds the work left after a cancel)
+    CANCELLABLE_CHUNK_WINDOWS = 4
+
+    def __init__(
+        self,
+        num_workers: int,
+        emotion_model_name: str = "r-f/wav2vec-english-speech-emotion-recognition",
+        whisper_model_size: str = "tiny",
+        torch_threads: int = 1,
+        transcription_profile=None
+    ):
+        """
+        Start the worker processes and preload their models.
+
+        Args:
+            num_workers: Number of worker processes
+            emotion_model_name: HuggingFace model identifier for SpeechAnalyzer
+            whisper_model_size: Whisper model size for TranscriptionService
+            torch_threads: Intra-op threads per worker
+            transcription_profile: Optional TranscriptionProfile for the workers' decodes
+        """
+        self.num_workers = num_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(emotion_model_name, whisper_model_size, torch_threads, transcription_profile)
+        )
+        self._labels: Optional[List[str]] = None
+        self.transcription_profile = transcription_profile
+
+    @property
+    def labels(self) -> List[str]:
+        """Emotion labels in probability column order (queried from a worker once)"""
+        if self._labels is None:
+            self._labels = self._executor.submit(_worker_labels).result()
+        return self._labels
+
+    def _chunks(
+        self,
+        windows: List[Tuple[float, float]],
+        sample_rate: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[np.ndarray]:
+        """
+        Split windows into contiguous (start, end) sample-bound arrays: one per
+        worker, or small chunks when the job is cancellable so a cancel frees
+        the pool after the few windows already running.
+        """
+        bounds = np.array(
+            [(int(start * sample_rate), int(end * sample_rate)) for start, end in windows],
+            dtype=np.int64
+        ).reshape(-1, 2)
+        num_chunks = self.num_workers
+        if cancel_token is not None:
+            num_chunks = max(num_chunks, -(-len(bounds) // self.CANCELLABLE_CHUNK_WINDOWS))
+        return [chunk for chunk in np.array_split(bounds, max(num_chunks, 1)) if len(chunk)]
+
+    def classify_windows(
+        self,
+        audio: SharedAudio,
+        windows: List[Tuple[float, float]],
+        sample_rate: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> np.ndarray:
+        """
+        Compute emotion probabilities for every window in parallel.
+
+        Args:
+            audio: Shared decoded audio
+            windows: (start, end) times in seconds
+            sample_rate: Sample rate of the audio in Hz
+            cancel_token: Optional CancellationToken; pending chunks are dropped when cancelled
+
+        Returns:
+            Float32 array of shape (num_windows, num_labels)
+        """
+        futures = [
+            self._executor.submit(_classify_task, audio.name, audio.num_samples, chunk, sample_rate)
+            for chunk in self._chunks(windows, sample_rate, cancel_token)
+        ]
+        results = self._gather(futures, cancel_token)
+        if not results:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+        return np.concatenate(results)
+
+    def transcribe_windows(
+        self,
+        audio: SharedAudio,
+        windows: List[Tuple[float, float]],
+        sample_rate: int,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Transcribe every window in parallel.
+        The language is detected once for the recording (unless the profile
+        pins it) and passed to every chunk.
+
+        Args:
+            audio: Shared decoded audio
+            windows: (start, end) times in seconds
+            sample_rate: Sample rate of the audio in Hz
+            cancel_token: Optional CancellationToken; pending chunks are dropped when cancelled
+
+        Returns:
+            (text, decode statistics) per window
+        """
+        chunks = self._chunks(windows, sample_rate, cancel_token)
+        language = self.transcription_profile.language if self.transcription_profile else None
+        if language is None and chunks:
+            language = self._executor.submit(
+                _detect_language_task, audio.name, audio.num_samples, np.concatenate(chunks)
+            ).result()
+        futures = [
+            self._executor.submit(_transcribe_task, audio.name, audio.num_samples, chunk, language)
+            for chunk in chunks
+        ]
+        return [item for items in self._gather(futures, cancel_token) for item in items]
+
+    def _gather(self, futures: List[Future], cancel_token: Optional[CancellationToken]) -> List[Any]:
+        """Collect future results in order, abandoning the rest if the job is cancelled."""
+        if cancel_token is not None:
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=0.1)
+                if cancel_token.cancelled:
+                    for future in pending:
+                        future.cancel()
+                    cancel_token.raise_if_cancelled()
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Shut the worker processes down."""
+        self._executor.shutdown(wait=True)
+
+def _worker_labels() -> List[str]:
+    """Emotion labels of the worker's SpeechAnalyzer."""
+    return _worker_speech_analyzer.labels
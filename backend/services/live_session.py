@@ -0,0 +1,242 @@
+import time
+import uuid
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+@dataclass
+class LiveSessionConfig:
+    sample_rate: int = 16000
+    window_duration: float = 4      # Emotion window, matches AudioSegmenterConfig.min_duration
+    decode_interval: float = 1.0    # Seconds of new audio between incremental Whisper decodes
+    max_uncommitted: float = 12.0   # Force-commit the hypothesis once this much audio is pending
+    wps_window: float = 4.0         # Trailing window used for live words-per-second
+
+class LiveAnalysisSession:
+    """
+    Incremental analysis of a live microphone stream.
+
+    PCM chunks are appended to a rolling buffer. Every completed emotion window
+    is classified with the shared SpeechAnalyzer, and the uncommitted tail of the
+    buffer is re-decoded with Whisper; words are only committed once two
+    consecutive hypotheses agree on them (stable-prefix commit).
+    """
+
+    def __init__(self, speech_analyzer, transcription_service, visualization_helper,
+                 config: Optional[LiveSessionConfig] = None):
+        """
+        Initialize a live session on top of the shared services.
+
+        Args:
+            speech_analyzer: SpeechAnalyzer used for per-window emotion labels
+            transcription_service: TranscriptionService used for incremental decoding
+            visualization_helper: VisualizationHelper used for filler and pace logic
+            config: The live session configuration
+        """
+        self.session_id = str(uuid.uuid4())
+        self.speech_analyzer = speech_analyzer
+        self.transcription_service = transcription_service
+        self.visualization_helper = visualization_helper
+        self.config = config or LiveSessionConfig()
+
+        # Rolling buffer of float32 samples; buffer_start is the absolute sample index of buffer[0]
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0
+        self.total_samples = 0
+        # Odd trailing byte of the last chunk; WebSocket messages need not hold whole samples
+        self._pending_byte = b""
+
+        self.next_emotion_start = 0
+        self.committed_until = 0
+        self.last_decode_at = 0
+        self.previous_hypothesis: List[Dict[str, Any]] = []
+        self.committed_words: List[Dict[str, Any]] = []
+        # Committed words inside the trailing wps_window
+        self._recent_words: deque = deque()
+        self.emotion_segments: List[Dict[str, Any]] = []
+
+    def _seconds(self, samples: int) -> float:
+        return samples / self.config.sample_rate
+
+    def _samples(self, seconds: float) -> int:
+        return int(round(seconds * self.config.sample_rate))
+
+    def _slice(self, start: int, end: int) -> np.ndarray:
+        """Return buffer samples between two absolute sample indices."""
+        return self.buffer[start - self.buffer_start:end - self.buffer_start]
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """
+        Append a chunk of 16-bit little-endian mono PCM and run any analysis that is due.
+
+        Args:
+            chunk: Raw PCM bytes
+
+        Returns:
+            List of events produced by this chunk
+        """
+        received_at = time.perf_counter()
+        data = self._pending_byte + chunk
+        usable = len(data) - len(data) % 2
+        self._pending_byte = data[usable:]
+        samples = np.frombuffer(data, dtype='<i2', count=usable // 2).astype(np.float32) / 32768.0
+        self.buffer = np.concatenate([self.buffer, samples])
+        self.total_samples += len(samples)
+
+        events = self._classify_completed_windows()
+
+        if self.total_samples - self.last_decode_at >= self._samples(self.config.decode_interval):
+            events.extend(self._decode_tail(final=False))
+            self.last_decode_at = self.total_samples
+
+        self._trim_buffer()
+
+        latency_ms = round((time.perf_counter() - received_at) * 1000, 1)
+        for event in events:
+            event["latency_ms"] = latency_ms
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Flush the remaining audio at the end of the stream.
+
+        Returns:
+            Final events including a session summary
+        """
+        events = self._classify_completed_windows(final=True)
+        events.extend(self._decode_tail(final=True))
+        events.append(self._summary_event())
+        return events
+
+    def _classify_completed_windows(self, final: bool = False) -> List[Dict[str, Any]]:
+        """Classify every emotion window that is fully inside the buffer."""
+        events = []
+        window = self._samples(self.config.window_duration)
+
+        while self.total_samples - self.next_emotion_start >= window or (
+            final and self.total_samples - self.next_emotion_start >= self._samples(1.0)
+        ):
+            start = self.next_emotion_start
+            end = min(start + window, self.total_samples)
+            emotion = self.speech_analyzer.analyze_waveform(self._slice(start, end), self.config.sample_rate)
+
+            segment = {
+                "type": "emotion",
+                "start": round(self._seconds(start), 2),
+                "end": round(self._seconds(end), 2),
+                "emotion": emotion
+            }
+            self.emotion_segments.append(segment)
+            events.append(segment)
+            self.next_emotion_start = end
+
+        return events
+
+    def _decode_tail(self, final: bool) -> List[Dict[str, Any]]:
+        """Re-decode the uncommitted tail and commit the prefix shared with the last hypothesis."""
+        if self.total_samples - self.committed_until < self._samples(0.5):
+            return []
+
+        tail = self._slice(self.committed_until, self.total_samples)
+        prompt = " ".join(word["word"] for word in self.committed_words[-30:]) or None
+        hypothesis = self.transcription_service.transcribe_array(
+            tail,
+            time_offset=self._seconds(self.committed_until),
+            initial_prompt=prompt
+        )
+
+        forced = final or self.total_samples - self.committed_until >= self._samples(self.config.max_uncommitted)
+        if forced:
+            # Nothing more will arrive (or the tail is too long to keep waiting): commit everything
+            stable = hypothesis
+        else:
+            stable = []
+            for previous, current in zip(self.previous_hypothesis, hypothesis):
+                if self._normalize(previous["word"]) != self._normalize(current["word"]):
+                    break
+                stable.append(current)
+
+        self.previous_hypothesis = hypothesis[len(stable):]
+        events = []
+
+        if stable:
+            self.committed_words.extend(stable)
+            self._recent_words.extend(stable)
+            self.committed_until = max(self.committed_until, self._samples(stable[-1]["end"]))
+            events.append({
+                "type": "transcript",
+                "words": stable,
+                "text": " ".join(word["word"] for word in stable)
+            })
+            events.extend(self._filler_events(stable))
+            events.append(self._wps_event())
+        elif forced:
+            # A forced commit without words (silence): skip the whole tail so it is
+            # not re-decoded and the buffer stays bounded
+            self.committed_until = self.total_samples
+
+        if hypothesis[len(stable):]:
+            events.append({
+                "type": "partial",
+                "text": " ".join(word["word"] for word in hypothesis[len(stable):])
+            })
+
+        return events
+
+    def _filler_events(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Report each filler word (and repeated word) found in newly committed words."""
+        return [
+            {"type": "filler", "count": 1, "time": event["end"], **event}
+            for event in self.visualization_helper.filler_detector.detect_words(words)
+        ]
+
+    def _wps_event(self) -> Dict[str, Any]:
+        """Words per second over the trailing window of committed words."""
+        now = self._seconds(self.committed_until)
+        window_start = max(0.0, now - self.config.wps_window)
+        # committed_until only grows, so words that left the window never return
+        while self._recent_words and self._recent_words[0]["end"] <= window_start:
+            self._recent_words.popleft()
+        duration = now - window_start
+        wps = len(self._recent_words) / duration if duration > 0 else 0
+        return {
+            "type": "wps",
+            "time": round(now, 2),
+            "wps": round(wps, 2),
+            "category": self.visualization_helper.get_speed_category(wps)
+        }
+
+    def _trim_buffer(self):
+        """Drop samples that are both classified and committed."""
+        keep_from = min(self.committed_until, self.next_emotion_start)
+        drop = keep_from - self.buffer_start
+        if drop > 0:
+            self.buffer = self.buffer[drop:]
+            self.buffer_start = keep_from
+
+    def _summary_event(self) -> Dict[str, Any]:
+        """Summarize the session with the same metrics used for uploaded videos."""
+        emotion_segments = [
+            (f"{self._format(segment['start'])} - {self._format(segment['end'])}", segment["emotion"])
+            for segment in self.emotion_segments
+        ]
+        emotion_df = self.visualization_helper.prepare_emotion_timeline_data(emotion_segments)
+        duration = self._seconds(self.total_samples)
+
+        return {
+            "type": "summary",
+            "duration": round(duration, 2),
+            "total_words": len(self.committed_words),
+            "avg_wps": round(len(self.committed_words) / duration, 2) if duration > 0 else 0,
+            "emotion_metrics": self.visualization_helper.calculate_emotion_metrics(emotion_df),
+            "text": " ".join(word["word"] for word in self.committed_words)
+        }
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return word.lower().strip(".,!?;:\"'")
+
+    @staticmethod
+    def _format(seconds: float) -> str:
+        return f"{int(seconds // 60):02d}:{int(seconds % 60):02d}"
@@ -0,0 +1,188 @@
+import logging
+import subprocess
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.cancellation import CancellationToken, run_process
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MotionConfig:
+    ffmpeg_path: str = 'ffmpeg'
+    # Frames are sampled at a low fixed rate and shrunk to a small grayscale image
+    fps: float = 5.0
+    width: int = 64
+    height: int = 48
+    # Frames whose mean absolute change (0-1 scale) stays below this are still
+    still_threshold: float = 0.01
+    # Bursts are runs above max(burst_floor, median + burst_mad * MAD) lasting min_burst seconds
+    burst_floor: float = 0.03
+    burst_mad: float = 4.0
+    min_burst: float = 0.2
+
+class MotionAnalyzer:
+    """
+    Cheap body-language signals from the video track.
+
+    FFmpeg decodes the video at a low fixed frame rate and tiny resolution
+    straight into a pipe (no audio, loop filter skipped), and the frames are
+    compared with NumPy: motion energy from frame differencing, a stillness
+    ratio and gesture bursts, reduced onto the analysis windows.
+    """
+
+    def __init__(self, config: Optional[MotionConfig] = None):
+        """
+        Initialize the motion analyzer with optional configuration.
+
+        Args:
+            config: The motion configuration
+        """
+        self.config = config or MotionConfig()
+
+    def read_frames(self, video_path: str, cancel_token: Optional[CancellationToken] = None) -> Optional[np.ndarray]:
+        """
+        Decode the sampled grayscale frames of a video.
+
+        Args:
+            video_path: Path to the uploaded video
+            cancel_token: Optional token; cancelling it kills the ffmpeg process
+
+        Returns:
+            uint8 array of shape (frames, height, width), or None when the file
+            has no video stream
+        """
+        config = self.config
+        cmd = [
+            config.ffmpeg_path, '-hide_banner', '-nostdin',
+            '-skip_loop_filter', 'all',
+            '-i', video_path,
+            '-map', '0:v:0', '-an', '-sn',
+            '-vf', f"fps={config.fps},scale={config.width}:{config.height}:flags=area,format=gray",
+            '-f', 'rawvideo', '-pix_fmt', 'gray', '-'
+        ]
+        result = run_process(cmd, cancel_token, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        frame_size = config.width * config.height
+        if result.returncode != 0 or len(result.stdout) < frame_size:
+            return None
+        usable = len(result.stdout) // frame_size * frame_size
+        return np.frombuffer(result.stdout[:usable], dtype=np.uint8).reshape(-1, config.height, config.width)
+
+    def frame_motion(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Motion energy between consecutive frames.
+
+        Args:
+            frames: uint8 array of shape (frames, height, width)
+
+        Returns:
+            Mean absolute pixel change (0-1) per frame; the first frame has 0
+        """
+        motion = np.zeros(len(frames))
+        if len(frames) > 1:
+            # int16 keeps the difference exact without a float copy of the video
+            difference = np.abs(np.diff(frames.astype(np.int16), axis=0))
+            motion[1:] = difference.reshape(len(frames) - 1, -1).mean(axis=1) / 255
+        return motion
+
+    def _bursts(self, motion: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Start frames of gesture bursts, and the threshold that defined them."""
+        median = np.median(motion)
+        mad = np.median(np.abs(motion - median))
+        threshold = max(self.config.burst_floor, median + self.config.burst_mad * mad)
+        edges = np.diff(np.concatenate(([0], (motion > threshold).astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        min_frames = max(1, int(round(self.config.min_burst * self.config.fps)))
+        return starts[(ends - starts) >= min_frames], threshold
+
+    def analyze(
+        self,
+        video_path: str,
+        windows: List[Tuple[float, float]],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compute per-window motion metrics aligned to the analysis windows.
+
+        Args:
+            video_path: Path to the uploaded video
+            windows: (start, end) times in seconds of the emotion windows
+            cancel_token: Optional token; cancelling it kills the decode
+
+        Returns:
+            Dictionary with "windows" (parallel arrays), "summary" and "tips",
+            or None when the file has no video stream
+        """
+        frames = self.read_frames(video_path, cancel_token)
+        if frames is None:
+            logger.info("No video stream in %s; skipping motion analysis", video_path)
+            return None
+
+        motion = self.frame_motion(frames)
+        times = np.arange(len(frames)) / self.config.fps
+        burst_starts, threshold = self._bursts(motion)
+        still = motion < self.config.still_threshold
+
+        starts = np.array([start for start, _ in windows], dtype=np.float64)
+        ends = np.array([end for _, end in windows], dtype=np.float64)
+        n = len(windows)
+        index = np.searchsorted(starts, times, side="right") - 1
+        valid = (index >= 0) & (times < ends[np.maximum(index, 0)]) if n else np.zeros(len(times), dtype=bool)
+        # Frame differences belong to the later frame; the first frame has no motion sample
+        valid[0] = False
+        index = np.where(valid, index, n)
+
+        frame_counts = np.bincount(index, minlength=n + 1)[:n]
+        motion_sums = np.bincount(index, weights=motion, minlength=n + 1)[:n]
+        still_counts = np.bincount(index, weights=still, minlength=n + 1)[:n]
+        burst_counts = np.bincount(index[burst_starts], minlength=n + 1)[:n]
+        peaks = np.zeros(n + 1)
+        np.maximum.at(peaks, index, motion)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            motion_energy = np.where(frame_counts > 0, motion_sums / frame_counts, np.nan)
+            stillness = np.where(frame_counts > 0, still_counts / frame_counts, np.nan)
+
+        duration = len(frames) / self.config.fps
+        sampled = motion[1:]
+        summary = {
+            "frames": int(len(frames)),
+            "fps": self.config.fps,
+            "motion_energy": round(float(sampled.mean()), 4) if len(sampled) else 0.0,
+            "stillness_ratio": round(float((sampled < self.config.still_threshold).mean()), 3) if len(sampled) else 1.0,
+            "gesture_bursts": int(len(burst_starts)),
+            "bursts_per_minute": round(len(burst_starts) / (duration / 60), 2) if duration > 0 else 0.0,
+            "burst_threshold": round(float(threshold), 4)
+        }
+        return {
+            "windows": {
+                "start": np.round(starts, 2).tolist(),
+                "end": np.round(ends, 2).tolist(),
+                "motion_energy": [None if np.isnan(value) else round(float(value), 4) for value in motion_energy],
+                "stillness_ratio": [None if np.isnan(value) else round(float(value), 3) for value in stillness],
+                "peak_motion": np.round(peaks[:n], 4).tolist(),
+                "gesture_bursts": burst_counts.tolist()
+            },
+            "summary": summary,
+            "tips": self.coaching_tips(summary)
+        }
+
+    @staticmethod
+    def coaching_tips(summary: Dict[str, Any]) -> List[str]:
+        """
+        Rule-based body-language tips from the motion summary.
+
+        Args:
+            summary: Summary computed by analyze
+
+        Returns:
+            List of tips (empty when nothing stands out)
+        """
+        tips = []
+        if summary["stillness_ratio"] > 0.9:
+            tips.append("You stay very still; natural hand gestures help emphasize key points.")
+        elif summary["bursts_per_minute"] > 30:
+            tips.append("There is a lot of sudden movement; keep gestures deliberate and avoid fidgeting.")
+        return tips
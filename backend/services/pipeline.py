@@ -0,0 +1,777 @@
+import contextvars
+import copy
+import logging
+import os
+import shutil
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Tuple, Any, Optional, Callable
+
+from services.timeline_pyramid import TimelinePyramid, PyramidConfig
+from services.inference_pool import SharedAudio
+from services.prosody import ProsodyAnalyzer, ProsodyConfig
+from utils.cancellation import CancellationToken, JobCancelled, check_cancelled
+from utils.checkpoint_store import JobCheckpoint
+from utils.profiler import profiled_thread
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+class AnalysisPipeline:
+    """
+    Runs the video analysis stages shared by the API routes.
+    Supports a fast preview pass over a stratified sample of windows
+    followed by a refinement pass over every window, and a lite pass that
+    computes prosody metrics without any model.
+    """
+
+    def __init__(
+        self,
+        audio_segmenter,
+        speech_analyzer,
+        transcription_service,
+        gemini_service,
+        data_processor,
+        visualization_helper,
+        preview_transcription_service=None,
+        result_store=None,
+        pyramid_config: Optional[PyramidConfig] = None,
+        window_cache=None,
+        inference_pool=None,
+        prosody_analyzer: Optional[ProsodyAnalyzer] = None,
+        motion_analyzer=None,
+        analytics_exporter=None
+    ):
+        """
+        Initialize the pipeline with the shared service instances.
+
+        Args:
+            audio_segmenter: AudioSegmenter used for extraction and splitting
+            speech_analyzer: SpeechAnalyzer used for emotion labels
+            transcription_service: TranscriptionService used for the full pass
+            gemini_service: GeminiService used for LLM insights
+            data_processor: DataProcessor used for durations and persistence
+            visualization_helper: VisualizationHelper used for metrics
+            preview_transcription_service: Optional (smaller) TranscriptionService for previews
+            result_store: Optional ResultStore where per-video artifacts are kept
+            pyramid_config: Configuration of the multi-resolution timeline
+            window_cache: Optional WindowCache enabling content-defined windows and result reuse
+            inference_pool: Optional InferencePool running the models in worker processes
+            prosody_analyzer: ProsodyAnalyzer used by the lite pass (created when omitted)
+            motion_analyzer: Optional MotionAnalyzer; its video stage runs alongside the audio stages
+            analytics_exporter: Optional AnalyticsExporter receiving per-window rows of completed analyses
+        """
+        self.audio_segmenter = audio_segmenter
+        self.speech_analyzer = speech_analyzer
+        self.transcription_service = transcription_service
+        self.gemini_service = gemini_service
+        self.data_processor = data_processor
+        self.visualization_helper = visualization_helper
+        self.preview_transcription_service = preview_transcription_service or transcription_service
+        self.result_store = result_store
+        self.pyramid_config = pyramid_config or PyramidConfig()
+        self.window_cache = window_cache
+        self.inference_pool = inference_pool
+        self.prosody_analyzer = prosody_analyzer or ProsodyAnalyzer(
+            ProsodyConfig(sample_rate=audio_segmenter.config.audio_sample_rate)
+        )
+        self.motion_analyzer = motion_analyzer
+        self.analytics_exporter = analytics_exporter
+        # ffmpeg does the decoding, so a few threads overlap it with the audio stages
+        self._motion_executor = (
+            ThreadPoolExecutor(max_workers=4, thread_name_prefix="motion") if motion_analyzer is not None else None
+        )
+
+    def with_services(self, **overrides) -> "AnalysisPipeline":
+        """
+        Copy the pipeline with some services replaced (e.g. a larger Whisper
+        model or another window length for an analysis profile).
+
+        Args:
+            **overrides: Attribute names and replacement services
+
+        Returns:
+            New AnalysisPipeline sharing every other service
+        """
+        pipeline = copy.copy(self)
+        for name, service in overrides.items():
+            if not hasattr(pipeline, name):
+                raise AttributeError(f"AnalysisPipeline has no service '{name}'")
+            setattr(pipeline, name, service)
+        return pipeline
+
+    def prepare_audio(
+        self,
+        video_path: str,
+        work_dir: str,
+        cancel_token: Optional[CancellationToken] = None,
+        checkpoint: Optional[JobCheckpoint] = None,
+        decoded_audio: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract the full audio track and plan the analysis windows.
+
+        Args:
+            video_path: Path to the uploaded video
+            work_dir: Temporary working directory for this job
+            cancel_token: Optional CancellationToken; cancelling kills the decode
+            checkpoint: Optional JobCheckpoint; restores or saves the decoded audio
+            decoded_audio: Optional WAV already decoded while the video was uploaded;
+                it is moved into work_dir instead of running ffmpeg again
+
+        Returns:
+            Dictionary with video_path, full_audio_path, duration, windows, window_keys
+            (window cache keys, None when the cache is off or the decode was restored)
+            and decode timing
+        """
+        with span("decode") as stage:
+            started = time.perf_counter()
+            if checkpoint is not None and checkpoint.has("decode"):
+                audio = checkpoint.load_decode(work_dir)
+                audio["video_path"] = video_path
+                audio["timings"] = {"decode": round(time.perf_counter() - started, 3)}
+                audio["resumed_stages"] = ["decode"]
+                stage.set(resumed=True, audio_seconds=round(audio["duration"], 2), windows=len(audio["windows"]))
+                return audio
+
+            if decoded_audio is not None and os.path.exists(decoded_audio):
+                os.makedirs(work_dir, exist_ok=True)
+                full_audio_path = shutil.move(decoded_audio, os.path.join(work_dir, "full_audio.wav"))
+                stage.set(streamed=True)
+            else:
+                full_audio_path = self.audio_segmenter.extract_full_audio(video_path, work_dir, cancel_token)
+            duration = self.data_processor.get_audio_duration(full_audio_path)
+
+            window_keys = None
+            if self.window_cache is not None:
+                # Content-defined boundaries keep windows identical across trimmed re-uploads;
+                # the cache keys hash the exact samples of each window
+                samples = self.audio_segmenter.load_audio(full_audio_path)
+                windows = self.audio_segmenter.plan_content_segments(samples)
+                sample_rate = self.audio_segmenter.config.audio_sample_rate
+                window_keys = [
+                    self.window_cache.content_key(samples[round(start * sample_rate):round(end * sample_rate)])
+                    for start, end in windows
+                ]
+            else:
+                windows = self.audio_segmenter.plan_segments(duration)
+            decode_time = round(time.perf_counter() - started, 3)
+            stage.set(audio_seconds=round(duration, 2), windows=len(windows))
+
+            if checkpoint is not None:
+                checkpoint.save_decode(full_audio_path, duration, windows)
+
+            return {
+                "video_path": video_path,
+                "full_audio_path": full_audio_path,
+                "duration": duration,
+                "windows": windows,
+                "window_keys": window_keys,
+                "timings": {"decode": decode_time}
+            }
+
+    def run(
+        self,
+        audio: Dict[str, Any],
+        work_dir: str,
+        video_id: str,
+        progress: Optional[Callable[[str, float], None]] = None,
+        build_pyramid: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+        checkpoint: Optional[JobCheckpoint] = None,
+        use_llm: bool = True,
+        analysis_profile: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the full analysis over every window.
+
+        Args:
+            audio: Output of prepare_audio
+            work_dir: Temporary working directory for this job
+            video_id: Identifier returned to the client
+            progress: Optional callable(stage, fraction) for progress reporting
+            build_pyramid: Run the models once over fine windows, build the multi-resolution
+                timeline for /timeline queries and derive the standard timeline from it
+            cancel_token: Optional CancellationToken checked between windows and stages
+            checkpoint: Optional JobCheckpoint; completed stages are restored from it
+                and newly computed stages are saved to it
+            use_llm: Whether to request Gemini insights
+            analysis_profile: Profile name recorded with the exported analytics rows
+
+        Returns:
+            Response payload for the client
+
+        Raises:
+            JobCancelled: If cancel_token is cancelled before the analysis completes
+        """
+        report = progress or (lambda stage, fraction: None)
+        timings = dict(audio["timings"])
+        total_duration = audio["duration"]
+        motion_future = self._start_motion(audio, cancel_token)
+
+        output_dir = os.path.join(work_dir, "output_segments")
+        resumed_stages = list(audio.get("resumed_stages", []))
+        if checkpoint is not None:
+            # The pyramid pass reruns both models, so only the insights can be restored on that path
+            restorable = ("insights",) if build_pyramid else ("emotion", "transcription", "insights")
+            resumed_stages += [
+                stage for stage in restorable
+                if checkpoint.has(stage) and (stage != "insights" or use_llm)
+            ]
+
+        pyramid = None
+        if build_pyramid:
+            # One fine-hop pass feeds both the pyramid and the standard timeline
+            pyramid, emotion_segments, transcription_data, probabilities = self._infer_pyramid(
+                audio, report, timings, cancel_token
+            )
+            labels = pyramid.labels
+        elif self.inference_pool is not None:
+            emotion_segments, transcription_data, probabilities = self._infer_pooled(
+                audio, output_dir, report, timings, cancel_token, checkpoint
+            )
+            labels = self.inference_pool.labels
+        else:
+            emotion_segments, transcription_data, probabilities = self._infer_segments(
+                audio, output_dir, report, timings, cancel_token, checkpoint
+            )
+            labels = None
+
+        # Generate LLM insights
+        gemini_analysis = None
+        if use_llm:
+            started = time.perf_counter()
+            report("insights", 0.0)
+            with span("insights", segments=len(transcription_data)) as stage:
+                if checkpoint is not None and checkpoint.has("insights"):
+                    gemini_analysis = checkpoint.load_json("insights")
+                    stage.set(resumed=True)
+                else:
+                    gemini_analysis = self.gemini_service.analyze_speech(emotion_segments, transcription_data, cancel_token)
+                    if checkpoint is not None:
+                        checkpoint.save_json("insights", gemini_analysis)
+            timings["insights"] = round(time.perf_counter() - started, 3)
+            logger.debug("Gemini analysis summary: %.100s", gemini_analysis.get("summary", "Not available"))
+
+        # Save all analysis results to a file
+        self.data_processor.save_analysis_results(
+            output_dir,
+            emotion_segments,
+            transcription_data,
+            gemini_analysis
+        )
+
+        response_data = self.build_response(
+            video_id,
+            emotion_segments,
+            transcription_data,
+            gemini_analysis,
+            total_duration
+        )
+        response_data["body_language"] = self._finish_motion(motion_future, timings)
+        if pyramid is not None:
+            if self.result_store is not None:
+                self.result_store.set_artifact(video_id, "pyramid", pyramid)
+            response_data["timeline_levels"] = pyramid.available_levels()
+
+        response_data["phase"] = "complete"
+        response_data["timings"] = timings
+        if resumed_stages:
+            response_data["resumed_stages"] = resumed_stages
+        self.export_analytics(response_data, probabilities, labels if probabilities is not None else None, analysis_profile)
+        return response_data
+
+    def run_lite(
+        self,
+        audio: Dict[str, Any],
+        video_id: str,
+        progress: Optional[Callable[[str, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the model-free analysis: loudness, pitch, pauses and pace computed
+        directly on the decoded audio. No emotion, transcription or LLM stage
+        runs, so the speech models are never needed.
+
+        Args:
+            audio: Output of prepare_audio
+            video_id: Identifier returned to the client
+            progress: Optional callable(stage, fraction) for progress reporting
+            cancel_token: Optional CancellationToken checked before the analysis
+
+        Returns:
+            Response payload for the client, with the per-window metrics,
+            summary and tips under "prosody"
+        """
+        report = progress or (lambda stage, fraction: None)
+        timings = dict(audio["timings"])
+        check_cancelled(cancel_token)
+        motion_future = self._start_motion(audio, cancel_token)
+
+        started = time.perf_counter()
+        report("prosody", 0.0)
+        with span("prosody", audio_seconds=round(audio["duration"], 2), windows=len(audio["windows"])):
+            samples = self.audio_segmenter.load_audio(audio["full_audio_path"])
+            prosody = self.prosody_analyzer.analyze(samples, audio["windows"])
+        report("prosody", 1.0)
+        timings["prosody"] = round(time.perf_counter() - started, 3)
+
+        response_data = self.build_response(video_id, [], [], None, audio["duration"])
+        response_data["analysis_mode"] = "lite"
+        response_data["prosody"] = prosody
+        response_data["body_language"] = self._finish_motion(motion_future, timings)
+        response_data["phase"] = "complete"
+        response_data["timings"] = timings
+        return response_data
+
+    def _start_motion(self, audio: Dict[str, Any], cancel_token: Optional[CancellationToken]) -> Optional[Future]:
+        """
+        Start the video motion stage in the background.
+
+        Args:
+            audio: Output of prepare_audio
+            cancel_token: Optional CancellationToken; cancelling kills the video decode
+
+        Returns:
+            Future of (motion result, seconds taken), or None when there is no
+            motion analyzer or the video is no longer available
+        """
+        video_path = audio.get("video_path")
+        if self.motion_analyzer is None or not video_path or not os.path.exists(video_path):
+            return None
+
+        def analyze():
+            started = time.perf_counter()
+            with profiled_thread(), span("motion", windows=len(audio["windows"])):
+                result = self.motion_analyzer.analyze(video_path, audio["windows"], cancel_token)
+            return result, round(time.perf_counter() - started, 3)
+
+        # Run in a copy of this context so the stage joins the job's trace
+        return self._motion_executor.submit(contextvars.copy_context().run, analyze)
+
+    def _finish_motion(self, future: Optional[Future], timings: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the motion stage; a failure only drops the body-language metrics.
+
+        Args:
+            future: Output of _start_motion
+            timings: Stage timings, updated with the motion stage
+
+        Returns:
+            Motion metrics, or None
+        """
+        if future is None:
+            return None
+        started = time.perf_counter()
+        try:
+            motion, elapsed = future.result()
+        except JobCancelled:
+            raise
+        except Exception:
+            logger.exception("Motion analysis failed")
+            return None
+        timings["motion"] = elapsed
+        # Time the response actually waited for the video stage
+        timings["motion_wait"] = round(time.perf_counter() - started, 3)
+        return motion
+
+    def _infer_segments(
+        self,
+        audio: Dict[str, Any],
+        output_dir: str,
+        report: Callable[[str, float], None],
+        timings: Dict[str, float],
+        cancel_token: Optional[CancellationToken] = None,
+        checkpoint: Optional[JobCheckpoint] = None
+    ) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]], None]:
+        """Split the audio into segment files and run both models in this process (no probabilities are kept)."""
+        windows = audio["windows"]
+        total_duration = audio["duration"]
+
+        results = None
+        transcription_data = None
+        if checkpoint is not None:
+            results = checkpoint.load_emotion() if checkpoint.has("emotion") else None
+            transcription_data = checkpoint.load_json("transcription") if checkpoint.has("transcription") else None
+
+        segment_paths = []
+        if results is None or transcription_data is None:
+            started = time.perf_counter()
+            report("split", 0.0)
+            with span("split", windows=len(windows)):
+                segment_paths = self.audio_segmenter.extract_segments(
+                    audio["full_audio_path"], windows, output_dir, cancel_token=cancel_token
+                )
+            timings["split"] = round(time.perf_counter() - started, 3)
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Analyze the segments for emotions
+        started = time.perf_counter()
+        if results is None:
+            with span("emotion", windows=len(windows), model=self.speech_analyzer.model_name):
+                results = self.speech_analyzer.analyze_segments(
+                    output_dir,
+                    progress_callback=lambda done, total: report("emotion", done / total),
+                    window_cache=self.window_cache,
+                    window_keys=audio.get("window_keys"),
+                    cancel_token=cancel_token
+                )
+            if checkpoint is not None:
+                checkpoint.save_emotion(results)
+        timings["emotion"] = round(time.perf_counter() - started, 3)
+
+        # Segment durations come from the plan (sample-accurate, no extra ffmpeg calls)
+        segment_durations = [end - start for start, end in windows]
+
+        # Process emotion data into time-based segments
+        emotion_segments = self.data_processor.process_emotion_data(
+            results,
+            total_duration,
+            segment_durations
+        )
+
+        # Calculate average segment duration (for WPS)
+        average_segment_duration = total_duration / len(windows) if windows else 0
+
+        # Transcribe segments
+        started = time.perf_counter()
+        if transcription_data is None:
+            with span("transcription", windows=len(windows), model=self.transcription_service.model_size):
+                transcription_data = self.transcription_service.transcribe_segments(
+                    segment_paths,
+                    average_segment_duration,
+                    emotion_data=emotion_segments,
+                    progress_callback=lambda done, total: report("transcription", done / total),
+                    segment_bounds=windows,
+                    window_cache=self.window_cache,
+                    window_keys=audio.get("window_keys"),
+                    cancel_token=cancel_token
+                )
+            if checkpoint is not None:
+                checkpoint.save_json("transcription", transcription_data)
+        timings["transcription"] = round(time.perf_counter() - started, 3)
+
+        return emotion_segments, transcription_data, None
+
+    def _infer_pooled(
+        self,
+        audio: Dict[str, Any],
+        output_dir: str,
+        report: Callable[[str, float], None],
+        timings: Dict[str, float],
+        cancel_token: Optional[CancellationToken] = None,
+        checkpoint: Optional[JobCheckpoint] = None
+    ) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Run both models on the worker pool over a shared-memory copy of the decoded audio.
+        Also returns the emotion probabilities (None when restored from a checkpoint).
+        """
+        windows = audio["windows"]
+        total_duration = audio["duration"]
+        sample_rate = self.audio_segmenter.config.audio_sample_rate
+        os.makedirs(output_dir, exist_ok=True)
+
+        results = None
+        probabilities = None
+        transcription_data = None
+        if checkpoint is not None:
+            results = checkpoint.load_emotion() if checkpoint.has("emotion") else None
+            transcription_data = checkpoint.load_json("transcription") if checkpoint.has("transcription") else None
+
+        started = time.perf_counter()
+        report("split", 0.0)
+        samples = self.audio_segmenter.load_audio(audio["full_audio_path"])
+        timings["split"] = round(time.perf_counter() - started, 3)
+
+        with SharedAudio(samples) as shared:
+            started = time.perf_counter()
+            report("emotion", 0.0)
+            if results is None:
+                with span("emotion", windows=len(windows), model=self.speech_analyzer.model_name, pooled=True):
+                    probabilities = self.inference_pool.classify_windows(shared, windows, sample_rate, cancel_token)
+                labels = self.inference_pool.labels
+                results = {
+                    f"segment_{i+1}.wav": labels[int(row.argmax())]
+                    for i, row in enumerate(probabilities)
+                }
+                if checkpoint is not None:
+                    checkpoint.save_emotion(results, probabilities)
+            timings["emotion"] = round(time.perf_counter() - started, 3)
+
+            emotion_segments = self.data_processor.process_emotion_data(
+                results,
+                total_duration,
+                [end - start for start, end in windows]
+            )
+
+            started = time.perf_counter()
+            report("transcription", 0.0)
+            if transcription_data is None:
+                with span("transcription", windows=len(windows), model=self.transcription_service.model_size, pooled=True):
+                    decoded = self.inference_pool.transcribe_windows(shared, windows, sample_rate, cancel_token)
+                transcription_data = [
+                    self.transcription_service.build_segment_data(i, start, end, text, emotion_segments[i][1], stats)
+                    for i, ((start, end), (text, stats)) in enumerate(zip(windows, decoded))
+                ]
+                if checkpoint is not None:
+                    checkpoint.save_json("transcription", transcription_data)
+            timings["transcription"] = round(time.perf_counter() - started, 3)
+
+        return emotion_segments, transcription_data, probabilities
+
+    def export_analytics(
+        self,
+        response_data: Dict[str, Any],
+        probabilities: Optional[np.ndarray] = None,
+        labels: Optional[List[str]] = None,
+        analysis_profile: Optional[str] = None
+    ):
+        """
+        Append a completed analysis to the analytics dataset, if one is configured.
+        A failed export is logged and never fails the analysis.
+
+        Args:
+            response_data: Final response payload
+            probabilities: Optional (windows, labels) emotion probabilities
+            labels: Emotion labels in probability column order
+            analysis_profile: Profile name recorded with the rows
+        """
+        if self.analytics_exporter is None:
+            return
+        try:
+            with span("analytics_export", windows=len(response_data.get("emotion_segments") or [])):
+                self.analytics_exporter.append(response_data, probabilities, labels, analysis_profile)
+        except Exception:
+            logger.exception("Analytics export failed for %s", response_data.get("video_id"))
+
+    def _infer_pyramid(
+        self,
+        audio: Dict[str, Any],
+        report: Callable[[str, float], None],
+        timings: Dict[str, float],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Tuple[TimelinePyramid, List[Tuple[str, str]], List[Dict[str, Any]], np.ndarray]:
+        """
+        Run the models once for the multi-resolution timeline: the emotion model
+        over the fine windows and Whisper over runs of planned windows. The planned
+        windows of the standard timeline are reduced from that pass, so no
+        segment is inferred twice. Not checkpointed per stage.
+
+        Args:
+            audio: Output of prepare_audio
+            report: Progress callable(stage, fraction)
+            timings: Stage timings, updated with emotion, transcription and pyramid
+            cancel_token: Optional CancellationToken checked between emotion batches
+                and transcription chunks
+
+        Returns:
+            Tuple of (pyramid, emotion segments, transcription data, emotion
+            probabilities of the planned windows)
+        """
+        windows = audio["windows"]
+        total_duration = audio["duration"]
+        sample_rate = self.audio_segmenter.config.audio_sample_rate
+        samples = self.audio_segmenter.load_audio(audio["full_audio_path"])
+        fine_windows = TimelinePyramid.fine_windows(samples, sample_rate, self.pyramid_config)
+
+        started = time.perf_counter()
+        report("emotion", 0.0)
+        with span("emotion", windows=len(fine_windows), model=self.speech_analyzer.model_name, pyramid=True):
+            fine_probabilities = self.speech_analyzer.predict_proba_batch(
+                fine_windows, sample_rate, self.pyramid_config.batch_size, cancel_token
+            )
+        report("emotion", 1.0)
+        timings["emotion"] = round(time.perf_counter() - started, 3)
+
+        # Whisper runs over chunks of whole planned windows (up to its 30 s context),
+        # so a cancelled job stops after the chunk in progress
+        chunks = []
+        for start, end in windows:
+            if chunks and end - chunks[-1][0] <= self.pyramid_config.transcription_chunk:
+                chunks[-1][1] = end
+            else:
+                chunks.append([start, end])
+        started = time.perf_counter()
+        report("transcription", 0.0)
+        words = []
+        with span("transcription", windows=len(windows), model=self.transcription_service.model_size, pyramid=True):
+            for done, (start, end) in enumerate(chunks, start=1):
+                check_cancelled(cancel_token)
+                words.extend(self.transcription_service.transcribe_array(
+                    samples[round(start * sample_rate):round(end * sample_rate)],
+                    time_offset=start,
+                    initial_prompt=" ".join(word["word"] for word in words[-30:]) or None
+                ))
+                report("transcription", done / len(chunks))
+        timings["transcription"] = round(time.perf_counter() - started, 3)
+
+        started = time.perf_counter()
+        with span("pyramid", audio_seconds=round(total_duration, 2)):
+            pyramid = TimelinePyramid(
+                self.speech_analyzer.labels, fine_probabilities, words, total_duration, self.pyramid_config
+            )
+            probabilities, texts = pyramid.summarize_windows(windows)
+        timings["pyramid"] = round(time.perf_counter() - started, 3)
+
+        labels = np.asarray(pyramid.labels)
+        emotions = labels[probabilities.argmax(axis=1)].tolist()
+        emotion_segments = self.data_processor.process_emotion_data(
+            {f"segment_{i+1}.wav": emotion for i, emotion in enumerate(emotions)},
+            total_duration,
+            [end - start for start, end in windows]
+        )
+        transcription_data = []
+        if self.transcription_service.model:
+            transcription_data = [
+                self.transcription_service.build_segment_data(i, start, end, text, emotion)
+                for i, ((start, end), text, emotion) in enumerate(zip(windows, texts, emotions))
+            ]
+        return pyramid, emotion_segments, transcription_data, probabilities
+
+    def run_preview(
+        self,
+        audio: Dict[str, Any],
+        work_dir: str,
+        video_id: str,
+        sample_size: int = 8,
+        progress: Optional[Callable[[str, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a fast approximate analysis over a stratified sample of windows.
+        Skips the LLM call; emotion distribution and pace metrics are
+        estimated from the sampled windows only.
+
+        Args:
+            audio: Output of prepare_audio
+            work_dir: Temporary working directory for this job
+            video_id: Identifier returned to the client
+            sample_size: Number of windows to sample
+            progress: Optional callable(stage, fraction) for progress reporting
+            cancel_token: Optional CancellationToken checked between windows
+
+        Returns:
+            Preview response payload for the client
+        """
+        report = progress or (lambda stage, fraction: None)
+        timings = dict(audio["timings"])
+        windows = audio["windows"]
+        total_duration = audio["duration"]
+
+        indices = self.stratified_sample(len(windows), sample_size)
+        preview_dir = os.path.join(work_dir, "preview_segments")
+
+        started = time.perf_counter()
+        with span("preview.emotion", windows=len(indices), model=self.speech_analyzer.model_name):
+            segment_paths = self.audio_segmenter.extract_segments(
+                audio["full_audio_path"], windows, preview_dir, indices, cancel_token
+            )
+            results = self.speech_analyzer.analyze_segments(
+                preview_dir,
+                progress_callback=lambda done, total: report("emotion", done / total),
+                cancel_token=cancel_token
+            )
+        timings["emotion"] = round(time.perf_counter() - started, 3)
+
+        # Sampled windows are not contiguous, so build time ranges from the plan
+        emotion_segments = []
+        for i in indices:
+            start, end = windows[i]
+            time_range = f"{self.data_processor.format_timestamp(start)} - {self.data_processor.format_timestamp(end)}"
+            emotion_segments.append((time_range, results.get(f"segment_{i+1}.wav", "neutral")))
+
+        average_segment_duration = total_duration / len(windows) if windows else 0
+
+        started = time.perf_counter()
+        with span("preview.transcription", windows=len(indices), model=self.preview_transcription_service.model_size):
+            transcription_data = self.preview_transcription_service.transcribe_segments(
+                segment_paths,
+                average_segment_duration,
+                emotion_data=emotion_segments,
+                segment_indices=indices,
+                progress_callback=lambda done, total: report("transcription", done / total),
+                segment_bounds=[windows[i] for i in indices],
+                cancel_token=cancel_token
+            )
+        timings["transcription"] = round(time.perf_counter() - started, 3)
+
+        response_data = self.build_response(
+            video_id,
+            emotion_segments,
+            transcription_data,
+            None,
+            total_duration
+        )
+        response_data["phase"] = "preview"
+        response_data["sampled_windows"] = len(indices)
+        response_data["total_windows"] = len(windows)
+        response_data["timings"] = timings
+        return response_data
+
+    def build_response(
+        self,
+        video_id: str,
+        emotion_segments: List[Tuple[str, str]],
+        transcription_data: List[Dict[str, Any]],
+        gemini_analysis: Optional[Dict[str, Any]],
+        total_duration: float
+    ) -> Dict[str, Any]:
+        """
+        Prepare visualization data and assemble the client response.
+
+        Args:
+            video_id: Identifier returned to the client
+            emotion_segments: List of (time_range, emotion) tuples
+            transcription_data: List of transcription segment dictionaries
+            gemini_analysis: Optional Gemini analysis results
+            total_duration: Total audio duration in seconds
+
+        Returns:
+            Response payload for the client
+        """
+        emotion_df = self.visualization_helper.prepare_emotion_timeline_data(emotion_segments)
+        emotion_metrics = self.visualization_helper.calculate_emotion_metrics(emotion_df)
+        wps_data = None
+        speech_clarity = None
+        transcription_profile = None
+
+        if transcription_data:
+            wps_data = self.visualization_helper.prepare_wps_records(transcription_data)
+            speech_clarity = self.visualization_helper.prepare_speech_clarity_data(transcription_data)
+            transcription_profile = self.transcription_service.summarize_decode_stats(transcription_data)
+
+        response_data = {
+            'success': True,
+            'video_id': video_id,
+            'emotion_segments': [{'time_range': tr, 'emotion': e} for tr, e in emotion_segments],
+            'transcription_data': transcription_data,
+            'gemini_analysis': gemini_analysis,
+            'emotion_metrics': emotion_metrics,
+            'speech_clarity': speech_clarity,
+            'wps_data': wps_data,
+            'duration': total_duration
+        }
+        if transcription_profile is not None:
+            # Latency of each decode option (silence gate, language detection, decode, fallback)
+            response_data['transcription_profile'] = transcription_profile
+        return response_data
+
+    @staticmethod
+    def stratified_sample(total: int, sample_size: int) -> List[int]:
+        """
+        Pick one window from the middle of each of sample_size equal strata.
+
+        Args:
+            total: Number of windows in the recording
+            sample_size: Number of windows to pick
+
+        Returns:
+            Sorted list of window indices
+        """
+        if total <= sample_size:
+            return list(range(total))
+
+        stratum = total / sample_size
+        return sorted({int(stratum * k + stratum / 2) for k in range(sample_size)})
@@ -0,0 +1,358 @@
+import numpy as np
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Any, Optional, Tuple
+
+@dataclass
+class ProsodyConfig:
+    sample_rate: int = 16000
+    frame_duration: float = 0.025
+    hop_duration: float = 0.010
+    min_pitch: float = 70.0
+    max_pitch: float = 400.0
+    # Cumulative mean normalized difference below which a lag counts as a period (YIN)
+    yin_threshold: float = 0.2
+    # Frames this far below the recording's loud level, within the margin of its
+    # noise floor, or below the absolute floor are silent
+    silence_range_db: float = 35.0
+    noise_margin_db: float = 6.0
+    silence_floor_db: float = -55.0
+    min_pause: float = 0.3
+    # Frames analyzed per batched FFT
+    block_frames: int = 2048
+
+class ProsodyAnalyzer:
+    """
+    Model-free delivery metrics computed directly on the decoded buffer.
+
+    Frames are strided views of the audio processed a block at a time with
+    batched FFTs: K-weighted loudness, speech activity and pauses, YIN pitch
+    on active frames (difference function from an FFT cross-correlation)
+    and syllable nuclei from the loudness envelope. Frames are then reduced
+    per window.
+    """
+
+    def __init__(self, config: Optional[ProsodyConfig] = None):
+        """
+        Initialize the analyzer and precompute the frame layout.
+
+        Args:
+            config: The prosody configuration
+        """
+        self.config = config or ProsodyConfig()
+        sr = self.config.sample_rate
+        self.window = int(self.config.frame_duration * sr)
+        self.hop = int(self.config.hop_duration * sr)
+        self.nfft = 1 << int(np.ceil(np.log2(self.window)))
+
+        # Pitch is tracked at half the sample rate: each frame holds the
+        # analysis window plus the longest lag
+        pitch_rate = sr / 2
+        self.pitch_window = self.window // 2
+        self.min_lag = int(pitch_rate / self.config.max_pitch)
+        self.max_lag = int(np.ceil(pitch_rate / self.config.min_pitch))
+        self.pitch_frame = self.pitch_window + self.max_lag
+        self.pitch_nfft = 1 << int(np.ceil(np.log2(self.pitch_frame)))
+
+        # One-sided spectrum weights (Parseval) times the K-weighting power response
+        frequencies = np.fft.rfftfreq(self.nfft, 1 / sr)
+        sides = np.full(len(frequencies), 2.0)
+        sides[0] = sides[-1] = 1.0
+        self._k_weights = sides * self._k_weighting(frequencies) / (self.nfft * self.window)
+
+    @staticmethod
+    def _k_weighting(frequencies: np.ndarray) -> np.ndarray:
+        """Power response approximating the BS.1770 K-weighting (high-pass plus high shelf)."""
+        high_pass = frequencies ** 4 / (frequencies ** 4 + 38.0 ** 4)
+        shelf_gain = 10 ** (4.0 / 10)
+        shelf = 1 + (shelf_gain - 1) * frequencies ** 2 / (frequencies ** 2 + 1500.0 ** 2)
+        return high_pass * shelf
+
+    @staticmethod
+    def _frames(audio: np.ndarray, num_frames: int, length: int, hop: int) -> np.ndarray:
+        """Strided (num_frames, length) view of zero-padded audio."""
+        padded = np.zeros((num_frames - 1) * hop + length, dtype=np.float32)
+        padded[:min(len(audio), len(padded))] = audio[:len(padded)]
+        return sliding_window_view(padded, length)[::hop][:num_frames]
+
+    def frame_features(self, audio: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Compute per-frame loudness, level, pitch and activity.
+
+        Args:
+            audio: 1-D float32 decoded audio at the configured sample rate
+
+        Returns:
+            Dictionary of per-frame arrays: time, rms_db, loudness, k_power,
+            f0 (NaN when unvoiced), active, voiced, paused and syllable
+            (nucleus flags)
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        num_frames = max(1, 1 + (len(audio) - self.window) // self.hop)
+        frames = self._frames(audio, num_frames, self.window, self.hop)
+        block_frames = self.config.block_frames
+
+        mean_square = np.empty(num_frames)
+        k_power = np.empty(num_frames)
+        for offset in range(0, num_frames, block_frames):
+            block = frames[offset:offset + block_frames].astype(np.float64)
+            rows = slice(offset, offset + len(block))
+            mean_square[rows] = np.mean(block ** 2, axis=1)
+            spectrum = np.fft.rfft(block, n=self.nfft)
+            k_power[rows] = (spectrum.real ** 2 + spectrum.imag ** 2) @ self._k_weights
+
+        rms_db = 10 * np.log10(mean_square + 1e-12)
+        loudness = -0.691 + 10 * np.log10(k_power + 1e-12)
+
+        # Active frames clear the noise floor and sit within range of the loud level
+        loud, quiet = np.percentile(rms_db, [95, 5])
+        threshold = max(loud - self.config.silence_range_db, quiet + self.config.noise_margin_db, self.config.silence_floor_db)
+        threshold = min(threshold, loud - self.config.noise_margin_db)
+        active = rms_db > max(threshold, self.config.silence_floor_db)
+
+        # YIN only on active frames, on the 2x decimated signal
+        decimated = audio[:len(audio) // 2 * 2].reshape(-1, 2).mean(axis=1)
+        pitch_frames = self._frames(decimated, num_frames, self.pitch_frame, self.hop // 2)
+        f0 = np.full(num_frames, np.nan)
+        candidates = np.flatnonzero(active)
+        for offset in range(0, len(candidates), block_frames):
+            rows = candidates[offset:offset + block_frames]
+            f0[rows] = self._yin(pitch_frames[rows].astype(np.float64))
+        voiced = ~np.isnan(f0)
+
+        return {
+            "time": (np.arange(num_frames) * self.hop + self.window / 2) / self.config.sample_rate,
+            "rms_db": rms_db,
+            "loudness": loudness,
+            "k_power": k_power,
+            "f0": f0,
+            "active": active,
+            "voiced": voiced,
+            "paused": self._long_runs(~active, int(round(self.config.min_pause / self.config.hop_duration))),
+            "syllable": self._nuclei(loudness, voiced)
+        }
+
+    def _yin(self, block: np.ndarray) -> np.ndarray:
+        """YIN pitch of every frame in a block (NaN where no period is found)."""
+        window, max_lag, min_lag = self.pitch_window, self.max_lag, self.min_lag
+
+        # r[tau] = sum_j x[j] * x[j + tau] over the analysis window
+        spectrum = np.fft.rfft(block, n=self.pitch_nfft)
+        head_spectrum = np.fft.rfft(block[:, :window], n=self.pitch_nfft)
+        correlation = np.fft.irfft(np.conj(head_spectrum) * spectrum, n=self.pitch_nfft)[:, :max_lag + 1]
+        energy = np.concatenate((np.zeros((len(block), 1)), np.cumsum(block ** 2, axis=1)), axis=1)
+        lags = np.arange(max_lag + 1)
+        shifted_energy = energy[:, lags + window] - energy[:, lags]
+        difference = np.maximum(energy[:, [window]] + shifted_energy - 2 * correlation, 0.0)
+
+        # Cumulative mean normalized difference
+        cumulative = np.cumsum(difference[:, 1:], axis=1)
+        cmndf = np.ones_like(difference)
+        cmndf[:, 1:] = difference[:, 1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+
+        # First lag below the threshold that is also a local minimum
+        candidates = cmndf[:, min_lag:max_lag]
+        dips = (candidates < self.config.yin_threshold) & (candidates <= cmndf[:, min_lag + 1:max_lag + 1])
+        found = dips.any(axis=1)
+        tau = dips.argmax(axis=1) + min_lag
+
+        # Parabolic interpolation around the chosen lag
+        rows = np.arange(len(block))
+        left = cmndf[rows, np.maximum(tau - 1, 1)]
+        centre = cmndf[rows, tau]
+        right = cmndf[rows, np.minimum(tau + 1, max_lag)]
+        denominator = left - 2 * centre + right
+        shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / np.where(denominator == 0, 1, denominator), 0.0)
+        period = tau + np.clip(shift, -1, 1)
+        return np.where(found, self.config.sample_rate / 2 / period, np.nan)
+
+    @staticmethod
+    def _long_runs(mask: np.ndarray, min_length: int) -> np.ndarray:
+        """Flag the frames belonging to runs of True at least min_length long."""
+        edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        keep = (ends - starts) >= max(min_length, 1)
+        delta = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.add.at(delta, starts[keep], 1)
+        np.add.at(delta, ends[keep], -1)
+        return np.cumsum(delta[:-1]) > 0
+
+    @staticmethod
+    def _nuclei(loudness: np.ndarray, voiced: np.ndarray, radius: int = 7, prominence_db: float = 2.0) -> np.ndarray:
+        """
+        Syllable nuclei: voiced frames where the smoothed loudness peaks within
+        +/- radius frames and rises prominence_db above the surrounding dip.
+        """
+        envelope = np.convolve(loudness, np.ones(5) / 5, mode="full")[2:2 + len(loudness)]
+        padded = np.pad(envelope, 2 * radius, mode="edge")
+        local_max = sliding_window_view(padded[radius:-radius], 2 * radius + 1).max(axis=1)
+        local_min = sliding_window_view(padded, 4 * radius + 1).min(axis=1)
+        return voiced & (envelope >= local_max) & (envelope - local_min >= prominence_db)
+
+    def analyze(self, audio: np.ndarray, windows: Optional[List[Tuple[float, float]]] = None,
+                window_duration: float = 5.0) -> Dict[str, Any]:
+        """
+        Compute per-window prosody metrics, a recording summary and coaching tips.
+
+        Args:
+            audio: 1-D float32 decoded audio at the configured sample rate
+            windows: (start, end) times in seconds; fixed windows of
+                window_duration when omitted
+            window_duration: Width of the fixed windows in seconds
+
+        Returns:
+            Dictionary with "windows" (parallel arrays), "summary" and "tips"
+        """
+        features = self.frame_features(audio)
+        duration = len(audio) / self.config.sample_rate
+        if not windows:
+            starts = np.arange(0, max(duration, 1e-9), window_duration)
+            windows = list(zip(starts, np.minimum(starts + window_duration, duration)))
+
+        summary = self._summary(features, duration)
+        return {
+            "windows": self._per_window(features, windows),
+            "summary": summary,
+            "tips": self.coaching_tips(summary)
+        }
+
+    def _per_window(self, features: Dict[str, np.ndarray], windows: List[Tuple[float, float]]) -> Dict[str, List[Any]]:
+        """Reduce the frame features to each window."""
+        starts = np.array([start for start, _ in windows], dtype=np.float64)
+        ends = np.array([end for _, end in windows], dtype=np.float64)
+        n = len(windows)
+
+        index = np.searchsorted(starts, features["time"], side="right") - 1
+        valid = (index >= 0) & (features["time"] < ends[np.maximum(index, 0)])
+        index = np.where(valid, index, n)
+
+        def count(mask):
+            return np.bincount(index[mask], minlength=n + 1)[:n].astype(np.float64)
+
+        def total(values, mask):
+            return np.bincount(index[mask], weights=values[mask], minlength=n + 1)[:n]
+
+        active, voiced = features["active"], features["voiced"]
+        frames = count(np.ones_like(active))
+        active_frames = count(active)
+        voiced_frames = count(voiced)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            loudness = -0.691 + 10 * np.log10(total(features["k_power"], active) / active_frames)
+            rms_db = total(features["rms_db"], active) / active_frames
+            semitones = 12 * np.log2(np.where(voiced, features["f0"], 1.0))
+            mean_st = total(semitones, voiced) / voiced_frames
+            pitch_std = np.sqrt(np.maximum(total(semitones ** 2, voiced) / voiced_frames - mean_st ** 2, 0))
+            level = features["loudness"]
+            mean_level = total(level, active) / active_frames
+            energy_std = np.sqrt(np.maximum(total(level ** 2, active) / active_frames - mean_level ** 2, 0))
+            speech_seconds = count(~features["paused"]) * self.config.hop_duration
+            syllable_rate = count(features["syllable"]) / speech_seconds
+
+        highest = np.full(n + 1, -np.inf)
+        lowest = np.full(n + 1, np.inf)
+        np.maximum.at(highest, index[active], level[active])
+        np.minimum.at(lowest, index[active], level[active])
+
+        return {
+            "start": np.round(starts, 2).tolist(),
+            "end": np.round(ends, 2).tolist(),
+            "loudness_lufs": self._values(loudness, 1),
+            "rms_db": self._values(rms_db, 1),
+            "pitch_hz": self._values(2 ** (mean_st / 12), 1),
+            "pitch_std_st": self._values(np.where(voiced_frames > 1, pitch_std, np.nan), 2),
+            "voiced_ratio": self._values(voiced_frames / np.maximum(frames, 1), 3),
+            "pause_ratio": self._values(count(features["paused"]) / np.maximum(frames, 1), 3),
+            "syllable_rate": self._values(np.where(active_frames > 0, syllable_rate, np.nan), 2),
+            "energy_std_db": self._values(energy_std, 2),
+            "dynamic_range_db": self._values(highest[:n] - lowest[:n], 1)
+        }
+
+    def _summary(self, features: Dict[str, np.ndarray], duration: float) -> Dict[str, Any]:
+        """Recording-level metrics."""
+        hop = self.config.hop_duration
+        active, voiced = features["active"], features["voiced"]
+
+        # Integrated loudness with BS.1770-style absolute (-70) and relative (-10 LU) gates
+        gated = features["loudness"] > -70
+        integrated = None
+        if gated.any():
+            relative = -0.691 + 10 * np.log10(features["k_power"][gated].mean()) - 10
+            gated &= features["loudness"] > relative
+            integrated = -0.691 + 10 * np.log10(features["k_power"][gated].mean())
+
+        semitones = 12 * np.log2(features["f0"][voiced]) if voiced.any() else np.array([])
+        levels = features["loudness"][active]
+
+        paused = features["paused"]
+        edges = np.diff(np.concatenate(([0], paused.astype(np.int8), [0])))
+        pause_lengths = (np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)) * hop
+        speech_seconds = (~paused).sum() * hop
+
+        return {
+            "duration": round(duration, 2),
+            "loudness_lufs": self._value(integrated, 1),
+            "pitch_hz": self._value(2 ** (semitones.mean() / 12) if len(semitones) else None, 1),
+            "pitch_std_st": self._value(semitones.std() if len(semitones) > 1 else None, 2),
+            "pitch_range_st": self._value(
+                np.percentile(semitones, 90) - np.percentile(semitones, 10) if len(semitones) > 1 else None, 2
+            ),
+            "voiced_ratio": round(float(voiced.mean()), 3),
+            "speech_ratio": round(float(active.mean()), 3),
+            "pause_ratio": round(float(paused.mean()), 3),
+            "pause_count": int(len(pause_lengths)),
+            "mean_pause_s": self._value(pause_lengths.mean() if len(pause_lengths) else None, 2),
+            "long_pauses": int((pause_lengths > 2.0).sum()),
+            "syllable_rate": self._value(
+                features["syllable"].sum() / speech_seconds if active.any() and speech_seconds else None, 2
+            ),
+            "energy_std_db": self._value(levels.std() if len(levels) > 1 else None, 2),
+            "dynamic_range_db": self._value(
+                np.percentile(levels, 95) - np.percentile(levels, 10) if len(levels) > 1 else None, 1
+            )
+        }
+
+    @staticmethod
+    def coaching_tips(summary: Dict[str, Any]) -> List[str]:
+        """
+        Rule-based delivery tips from the recording summary.
+
+        Args:
+            summary: Output of the analyzer's summary
+
+        Returns:
+            List of tips (empty when nothing stands out)
+        """
+        if summary["speech_ratio"] == 0:
+            return ["No speech was detected; check that the microphone was recording."]
+
+        tips = []
+        if summary["pitch_std_st"] is not None and summary["pitch_std_st"] < 2.0:
+            tips.append("Your pitch stays in a narrow range; vary your intonation to sound more engaging.")
+        if summary["syllable_rate"] is not None and summary["syllable_rate"] > 6.0:
+            tips.append("You are speaking quickly; slow down so key points land.")
+        elif summary["syllable_rate"] is not None and summary["syllable_rate"] < 3.0:
+            tips.append("Your pace is slow; tighten up sentences to keep momentum.")
+        if summary["pause_ratio"] < 0.05:
+            tips.append("You rarely pause; short pauses after key points help listeners follow.")
+        elif summary["pause_ratio"] > 0.35 or summary["long_pauses"] > 3:
+            tips.append("There are long silences; plan transitions so pauses feel intentional.")
+        if summary["energy_std_db"] is not None and summary["energy_std_db"] < 3.0:
+            tips.append("Your volume is very even; add emphasis on important words.")
+        if summary["loudness_lufs"] is not None and summary["loudness_lufs"] < -35:
+            tips.append("The recording is quiet; speak up or move closer to the microphone.")
+        return tips
+
+    @staticmethod
+    def _value(value, decimals: int):
+        """Round a scalar metric, mapping missing or non-finite values to None."""
+        if value is None or not np.isfinite(value):
+            return None
+        return round(float(value), decimals)
+
+    @staticmethod
+    def _values(values: np.ndarray, decimals: int) -> List[Optional[float]]:
+        """Round an array of metrics, mapping non-finite values to None."""
+        rounded = np.round(values, decimals)
+        return [float(value) if np.isfinite(value) else None for value in rounded]
@@ -1,8 +1,15 @@
 import torch
 import torchaudio
+import numpy as np
 from transformers import Wav2Vec2FeatureExtractor, AutoModelForAudioClassification
 from pathlib import Path
 import os
+import logging
+
+from utils.cancellation import check_cancelled
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
 
 class SpeechAnalyzer:
     """
@@ -24,9 +31,9 @@ class SpeechAnalyzer:
         try:
             self.feature_extractor = Wav2Vec2FeatureExtractor.from_pretrained(self.model_name)
             self.model = AutoModelForAudioClassification.from_pretrained(self.model_name)
-            print(f"Successfully loaded model: {self.model_name}")
+            logger.info("Successfully loaded model: %s", self.model_name)
         except Exception as e:
-            print(f"Error loading model: {str(e)}")
+            logger.error("Error loading model %s: %s", self.model_name, e)
             self.feature_extractor = None
             self.model = None
 
@@ -41,11 +48,48 @@ class SpeechAnalyzer:
             The predicted emotion label
         """
         if not self.model or not self.feature_extractor:
-            print("Model not loaded. Cannot analyze speech.")
+            logger.warning("Model not loaded. Cannot analyze speech.")
             return "neutral"
             
         try:
             waveform, sample_rate = torchaudio.load(audio_file_path)
+            return self.analyze_waveform(waveform, sample_rate)
+            
+        except Exception as e:
+            logger.warning("Error analyzing speech: %s", e)
+            return "neutral"
+
+    def analyze_waveform(self, waveform, sample_rate):
+        """
+        Analyze an in-memory waveform and return the emotion label.
+        
+        Args:
+            waveform: Mono waveform as a torch tensor or NumPy array
+            sample_rate: Sample rate of the waveform in Hz
+            
+        Returns:
+            The predicted emotion label
+        """
+        return self.predict_waveform(waveform, sample_rate)[0]
+
+    def predict_waveform(self, waveform, sample_rate):
+        """
+        Analyze an in-memory waveform and return the label with its class probabilities.
+        
+        Args:
+            waveform: Mono waveform as a torch tensor or NumPy array
+            sample_rate: Sample rate of the waveform in Hz
+            
+        Returns:
+            Tuple of (emotion label, list of probabilities in label order or None on failure)
+        """
+        if not self.model or not self.feature_extractor:
+            logger.warning("Model not loaded. Cannot analyze speech.")
+            return "neutral", None
+            
+        try:
+            if not isinstance(waveform, torch.Tensor):
+                waveform = torch.as_tensor(waveform, dtype=torch.float32)
             waveform = waveform.squeeze()
 
             # Convert to model inputs
@@ -56,21 +100,91 @@ class SpeechAnalyzer:
                 outputs = self.model(**inputs)
                 logits = outputs.logits
                 predicted_class_id = torch.argmax(logits, dim=-1).item()
+                probabilities = torch.softmax(logits, dim=-1).squeeze(0)
 
             # Convert ID to label
             emotion_label = self.model.config.id2label[predicted_class_id]
-            return emotion_label
+            return emotion_label, [round(p, 4) for p in probabilities.tolist()]
             
         except Exception as e:
-            print(f"Error analyzing speech: {str(e)}")
-            return "neutral"
+            logger.warning("Error analyzing speech: %s", e)
+            return "neutral", None
+
+    @property
+    def labels(self):
+        """Emotion labels in model output order"""
+        if not self.model:
+            return ["neutral"]
+        id2label = self.model.config.id2label
+        return [id2label[i] for i in range(len(id2label))]
 
-    def analyze_segments(self, output_folder):
+    def predict_proba_batch(self, windows, sample_rate, batch_size=16, cancel_token=None):
+        """
+        Compute emotion probabilities for a batch of windows.
+        Windows of different lengths are padded with an attention mask when the
+        feature extractor supports one; otherwise (e.g. wav2vec2-base, whose
+        group norm sees the padding) only windows of equal length share a batch.
+        
+        Args:
+            windows: Array of shape (num_windows, window_samples), which may be a strided view,
+                or a list of 1-D arrays (sort by length to limit padding)
+            sample_rate: Sample rate of the windows in Hz
+            batch_size: Number of windows per forward pass
+            cancel_token: Optional CancellationToken checked before each forward pass
+            
+        Returns:
+            Float32 array of shape (num_windows, num_labels), in the order of windows
+
+        Raises:
+            JobCancelled: If cancel_token is cancelled before the last batch
+        """
+        if not self.model or not self.feature_extractor:
+            logger.warning("Model not loaded. Cannot analyze speech.")
+            probabilities = np.zeros((len(windows), 1), dtype=np.float32)
+            probabilities[:, 0] = 1.0
+            return probabilities
+        if len(windows) == 0:
+            return np.zeros((0, len(self.labels)), dtype=np.float32)
+
+        use_mask = bool(getattr(self.feature_extractor, "return_attention_mask", False))
+        lengths = [len(window) for window in windows]
+        if use_mask:
+            groups = [list(range(len(windows)))]
+        else:
+            by_length = {}
+            for index, length in enumerate(lengths):
+                by_length.setdefault(length, []).append(index)
+            groups = list(by_length.values())
+
+        probabilities = np.zeros((len(windows), len(self.labels)), dtype=np.float32)
+        for group in groups:
+            for start in range(0, len(group), batch_size):
+                check_cancelled(cancel_token)
+                indices = group[start:start + batch_size]
+                # The feature extractor copies each window, so strided views are never materialized as a whole
+                batch = [np.asarray(windows[index]) for index in indices]
+                with span("emotion.batch", windows=len(batch), model=self.model_name):
+                    inputs = self.feature_extractor(
+                        batch, sampling_rate=sample_rate, return_tensors="pt", padding=True,
+                        return_attention_mask=use_mask
+                    )
+                    with torch.no_grad():
+                        logits = self.model(**inputs).logits
+                probabilities[indices] = torch.softmax(logits, dim=-1).numpy()
+        return probabilities
+
+    def analyze_segments(self, output_folder, progress_callback=None, window_cache=None, cancel_token=None,
+                         window_keys=None):
         """
         Analyze all audio segments in the specified folder.
         
         Args:
             output_folder: Path to the folder containing audio segments
+            progress_callback: Optional callable(done, total) invoked after each segment
+            window_cache: Optional WindowCache; segments with already-seen audio skip the model
+            cancel_token: Optional CancellationToken checked before each segment
+            window_keys: Cache key of each planned window (segment_<i+1>.wav); the
+                cache is only used when they are given
             
         Returns:
             Dictionary mapping segment filenames to their emotion labels
@@ -83,15 +197,50 @@ class SpeechAnalyzer:
         audio_files = [f for f in output_path.glob("segment_*.wav") if f.is_file()]
         
         if not audio_files:
-            print("No audio files found in the output folder.")
+            logger.warning("No audio files found in %s", output_folder)
             return {}
 
         results = {}
-        print(f"Found {len(audio_files)} audio segment(s).")
-        for audio_file in sorted(audio_files):
-            print(f"Analyzing segment: {audio_file.name}")
-            emotion = self.analyze_speech(audio_file)
+        logger.info("Found %d audio segment(s)", len(audio_files))
+        # Sort by segment number so segment_10 follows segment_9
+        audio_files.sort(key=lambda f: int(f.stem.split("_")[-1]))
+        for done, audio_file in enumerate(audio_files, start=1):
+            check_cancelled(cancel_token)
+            if window_cache is not None and window_keys is not None:
+                key = window_keys[int(audio_file.stem.split("_")[-1]) - 1]
+                emotion = self._analyze_cached(audio_file, window_cache, key)
+            else:
+                emotion = self.analyze_speech(audio_file)
             results[audio_file.name] = emotion
-            print(f"Detected emotion for {audio_file.name}: {emotion}")
+            logger.debug("Detected emotion for %s: %s", audio_file.name, emotion)
+            if progress_callback:
+                progress_callback(done, len(audio_files))
+            
+        return results
+
+    def _analyze_cached(self, audio_file, window_cache, key):
+        """
+        Analyze a segment file, reusing a cached result for identical audio.
+        
+        Args:
+            audio_file: Path to the segment file
+            window_cache: WindowCache keyed by PCM content
+            key: Content key of the window's samples
             
-        return results
\ No newline at end of file
+        Returns:
+            The predicted emotion label
+        """
+        emotion = window_cache.get(key, "emotion")
+        if emotion is not None:
+            return emotion
+
+        try:
+            waveform, sample_rate = torchaudio.load(audio_file)
+        except Exception as e:
+            logger.warning("Error analyzing speech: %s", e)
+            return "neutral"
+
+        emotion, probabilities = self.predict_waveform(waveform, sample_rate)
+        if probabilities is not None:
+            window_cache.put(key, emotion=emotion, probabilities=probabilities)
+        return emotion
@@ -0,0 +1,326 @@
+import contextvars
+import logging
+import queue
+import threading
+import time
+from contextlib import closing
+from typing import List, Dict, Tuple, Any, Optional, Callable, Iterator
+
+import numpy as np
+
+from utils.cancellation import CancellationToken, check_cancelled
+from utils.profiler import profiled_thread
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# End of a stage's output
+_DONE = object()
+
+class StreamingAnalyzer:
+    """
+    Analyzes a recording of any length in bounded memory.
+
+    FFmpeg decodes the audio into a pipe that is read in fixed-size chunks,
+    and analysis windows are cut from a rolling buffer as soon as they are
+    complete. Decode, emotion inference and transcription run as three
+    stages joined by bounded queues, so chunk k+1 is decoded while chunk k
+    is classified and chunk k-1 transcribed. Only the per-window results
+    grow with the recording; no WAV or segment files are written.
+    """
+
+    def __init__(self, pipeline, chunk_seconds: float = 30.0, queue_size: int = 2, batch_size: int = 16):
+        """
+        Initialize the streaming analyzer on top of an AnalysisPipeline.
+
+        Args:
+            pipeline: AnalysisPipeline providing the shared services
+            chunk_seconds: Audio decoded per chunk
+            queue_size: Chunks buffered between two stages (bounds memory
+                at about (2 * queue_size + 3) chunks)
+            batch_size: Number of windows per emotion model call
+        """
+        self.pipeline = pipeline
+        self.chunk_seconds = chunk_seconds
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+
+    def plan(self, duration: float) -> Callable[[int], Tuple[float, float]]:
+        """
+        Window plan for a recording whose container reports the given duration.
+        The windows match AnalysisPipeline.run; past the reported duration (or
+        when it is unknown) the plan continues with maximum-length windows.
+
+        Args:
+            duration: Probed duration in seconds (0 when unknown)
+
+        Returns:
+            Callable mapping a window index to its (start, end) in seconds
+        """
+        config = self.pipeline.audio_segmenter.config
+        planned = self.pipeline.audio_segmenter.plan_segments(duration) if duration > 0 else []
+        planned_end = planned[-1][1] if planned else 0.0
+
+        def window(index: int) -> Tuple[float, float]:
+            if index < len(planned):
+                return planned[index]
+            offset = index - len(planned)
+            return planned_end + offset * config.max_duration, planned_end + (offset + 1) * config.max_duration
+        return window
+
+    def cut_windows(
+        self,
+        chunks: Iterator[np.ndarray],
+        window: Callable[[int], Tuple[float, float]],
+        decoded: Dict[str, float]
+    ) -> Iterator[List[Tuple[int, float, float, np.ndarray]]]:
+        """
+        Cut analysis windows out of a stream of PCM chunks.
+        A window is released once a full maximum window of audio follows it,
+        so the windows at the end can still be adjusted to the decoded length.
+
+        Args:
+            chunks: PCM chunks from AudioSegmenter.stream_pcm
+            window: Window plan from plan()
+            decoded: Updated with the decoded duration under "seconds"
+
+        Yields:
+            Lists of (index, start, end, samples) windows completed by a chunk
+        """
+        config = self.pipeline.audio_segmenter.config
+        sample_rate = config.audio_sample_rate
+        holdback = int(config.max_duration * sample_rate)
+        buffer = np.zeros(0, dtype=np.float32)
+        buffer_start = 0
+        total = 0
+        index = 0
+
+        def cut(start: float, end: float) -> np.ndarray:
+            return buffer[int(start * sample_rate) - buffer_start:int(end * sample_rate) - buffer_start]
+
+        for chunk in chunks:
+            buffer = np.concatenate([buffer, chunk])
+            total += len(chunk)
+            decoded["seconds"] = total / sample_rate
+            ready = []
+            while int(window(index)[1] * sample_rate) + holdback <= total:
+                start, end = window(index)
+                ready.append((index, start, end, cut(start, end)))
+                index += 1
+            # Windows hold views of the old buffer, so dropping its head copies nothing
+            keep_from = int(window(index)[0] * sample_rate)
+            buffer = buffer[keep_from - buffer_start:]
+            buffer_start = keep_from
+            if ready:
+                yield ready
+
+        # Fit the remaining windows to the decoded length
+        duration = total / sample_rate
+        tail = []
+        while window(index + len(tail))[0] < duration:
+            start, end = window(index + len(tail))
+            tail.append([start, min(end, duration)])
+        if len(tail) > 1 and tail[-1][1] - tail[-1][0] < config.min_duration:
+            short = tail.pop()
+            tail[-1][1] = short[1]
+        if tail:
+            yield [(index + i, start, end, cut(start, end)) for i, (start, end) in enumerate(tail)]
+
+    def analyze(
+        self,
+        source_path: str,
+        video_id: str,
+        video_path: Optional[str] = None,
+        progress: Optional[Callable[[str, float], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        use_llm: bool = True,
+        analysis_profile: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the full analysis while decoding.
+
+        Args:
+            source_path: Video (or already decoded audio) to stream from
+            video_id: Identifier returned to the client
+            video_path: Video for the motion stage (default: source_path)
+            progress: Optional callable(stage, fraction) for progress reporting
+            cancel_token: Optional CancellationToken; cancelling kills the decode
+            use_llm: Whether to request Gemini insights
+            analysis_profile: Profile name recorded with the exported analytics rows
+            timings: Optional timings measured before the analysis (e.g. queue_wait)
+
+        Returns:
+            Response payload in the same shape as AnalysisPipeline.run
+
+        Raises:
+            JobCancelled: If cancel_token is cancelled before the analysis completes
+        """
+        report = progress or (lambda stage, fraction: None)
+        timings = dict(timings or {})
+        pipeline = self.pipeline
+        sample_rate = pipeline.audio_segmenter.config.audio_sample_rate
+        probed = pipeline.audio_segmenter.probe_duration(source_path)
+        window = self.plan(probed)
+        planned = pipeline.audio_segmenter.plan_segments(probed) if probed > 0 else []
+        expected = max(len(planned), 1)
+        motion_future = pipeline._start_motion({"video_path": video_path or source_path, "windows": planned}, cancel_token)
+
+        stop = threading.Event()
+        decoded_queue: "queue.Queue[Any]" = queue.Queue(self.queue_size)
+        classified_queue: "queue.Queue[Any]" = queue.Queue(self.queue_size)
+        decoded: Dict[str, float] = {"seconds": 0.0}
+        busy = {"decode": 0.0, "emotion": 0.0}
+
+        def put(target: queue.Queue, item: Any) -> bool:
+            # Blocking put that gives up once the analysis has stopped
+            while not stop.is_set():
+                try:
+                    target.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(source: queue.Queue) -> Any:
+            # Blocking get that gives up once the analysis has stopped
+            while not stop.is_set():
+                try:
+                    return source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def decode_stage():
+            try:
+                chunks = pipeline.audio_segmenter.stream_pcm(source_path, self.chunk_seconds, cancel_token)
+                with span("stream.decode", audio_seconds=round(probed, 2)) as stage, closing(chunks):
+                    windows = self.cut_windows(chunks, window, decoded)
+                    while True:
+                        started = time.perf_counter()
+                        ready = next(windows, None)
+                        busy["decode"] += time.perf_counter() - started
+                        if ready is None or not put(decoded_queue, ready):
+                            break
+                    stage.set(decoded_seconds=round(decoded["seconds"], 2))
+                put(decoded_queue, _DONE)
+            except BaseException as e:
+                put(decoded_queue, e)
+
+        def emotion_stage():
+            labels = pipeline.speech_analyzer.labels
+            try:
+                with span("stream.emotion", model=pipeline.speech_analyzer.model_name):
+                    while True:
+                        item = get(decoded_queue)
+                        if item is _DONE or isinstance(item, BaseException):
+                            put(classified_queue, item)
+                            return
+                        check_cancelled(cancel_token)
+                        started = time.perf_counter()
+                        probabilities = pipeline.speech_analyzer.predict_proba_batch(
+                            [samples for _, _, _, samples in item], sample_rate, self.batch_size
+                        )
+                        busy["emotion"] += time.perf_counter() - started
+                        emotions = [labels[int(row.argmax())] for row in probabilities]
+                        if not put(classified_queue, (item, probabilities, emotions)):
+                            return
+            except BaseException as e:
+                put(classified_queue, e)
+
+        def run_stage(stage):
+            with profiled_thread():
+                stage()
+
+        started = time.perf_counter()
+        # Stage threads run in copies of this context so their spans join the job's trace
+        # (and a profiled job samples them)
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(run_stage, stage), name=f"stream-{name}", daemon=True)
+            for name, stage in (("decode", decode_stage), ("emotion", emotion_stage))
+        ]
+        for thread in threads:
+            thread.start()
+
+        windows: List[Tuple[float, float]] = []
+        emotion_labels: List[str] = []
+        probability_rows: List[np.ndarray] = []
+        transcription_data: List[Dict[str, Any]] = []
+        transcription_service = pipeline.transcription_service
+        language = transcription_service.profile.language
+        transcription_time = 0.0
+        try:
+            with span("stream.transcription", model=transcription_service.model_size) as stage:
+                while True:
+                    item = classified_queue.get()
+                    if item is _DONE:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+                    ready, probabilities, emotions = item
+                    probability_rows.extend(probabilities)
+                    emotion_labels.extend(emotions)
+                    report("emotion", min(len(emotion_labels) / expected, 1.0))
+
+                    transcribe_started = time.perf_counter()
+                    for (index, start, end, samples), emotion in zip(ready, emotions):
+                        check_cancelled(cancel_token)
+                        windows.append((start, end))
+                        if not transcription_service.model:
+                            continue
+                        try:
+                            text, stats, language = transcription_service.decode_window(samples, language)
+                        except Exception as e:
+                            logger.warning("Error transcribing segment %d: %s", index + 1, e)
+                            continue
+                        transcription_data.append(
+                            transcription_service.build_segment_data(index, start, end, text, emotion, stats)
+                        )
+                    transcription_time += time.perf_counter() - transcribe_started
+                    report("transcription", min(len(windows) / expected, 1.0))
+                stage.set(windows=len(windows))
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        total_duration = decoded["seconds"]
+        timings["streaming"] = round(time.perf_counter() - started, 3)
+        timings["decode"] = round(busy["decode"], 3)
+        timings["emotion"] = round(busy["emotion"], 3)
+        timings["transcription"] = round(transcription_time, 3)
+        logger.info(
+            "Streamed %.0fs of audio in %d window(s): wall %ss, decode %ss, emotion %ss, transcription %ss",
+            total_duration, len(windows), timings["streaming"], timings["decode"], timings["emotion"], timings["transcription"]
+        )
+
+        emotion_segments = pipeline.data_processor.process_emotion_data(
+            {f"segment_{i+1}.wav": emotion for i, emotion in enumerate(emotion_labels)},
+            total_duration,
+            [end - start for start, end in windows]
+        )
+
+        gemini_analysis = None
+        if use_llm:
+            insights_started = time.perf_counter()
+            report("insights", 0.0)
+            with span("insights", segments=len(transcription_data)):
+                gemini_analysis = pipeline.gemini_service.analyze_speech(emotion_segments, transcription_data, cancel_token)
+            timings["insights"] = round(time.perf_counter() - insights_started, 3)
+
+        response_data = pipeline.build_response(
+            video_id,
+            emotion_segments,
+            transcription_data,
+            gemini_analysis,
+            total_duration
+        )
+        response_data["body_language"] = pipeline._finish_motion(motion_future, timings)
+        response_data["analysis_mode"] = "streaming"
+        response_data["phase"] = "complete"
+        response_data["timings"] = timings
+        probabilities = np.stack(probability_rows) if probability_rows else None
+        pipeline.export_analytics(
+            response_data, probabilities, pipeline.speech_analyzer.labels if probabilities is not None else None, analysis_profile
+        )
+        return response_data
@@ -0,0 +1,202 @@
+import numpy as np
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Dict, Any, Optional, Tuple
+
+@dataclass
+class PyramidConfig:
+    window_duration: float = 2.0
+    hop_duration: float = 1.0
+    levels: Tuple[float, ...] = (5.0, 15.0, 60.0)
+    batch_size: int = 16
+    transcription_chunk: float = 30.0   # Longest run of planned windows per Whisper call
+
+class TimelinePyramid:
+    """
+    Multi-resolution emotion/pace timeline.
+
+    Inference runs once over overlapping fine windows (strided views of the
+    decoded buffer). Coarser levels, and the standard 4-7 s timeline, are
+    built by reducing the stored per-window probabilities and word timings,
+    never by re-running models.
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        probabilities: np.ndarray,
+        words: List[Dict[str, Any]],
+        duration: float,
+        config: Optional[PyramidConfig] = None
+    ):
+        """
+        Initialize the pyramid from fine-level inference outputs.
+
+        Args:
+            labels: Emotion labels in probability column order
+            probabilities: Array of shape (num_windows, num_labels)
+            words: Timed words as returned by TranscriptionService.transcribe_array
+            duration: Total audio duration in seconds
+            config: The pyramid configuration
+        """
+        self.config = config or PyramidConfig()
+        self.labels = list(labels)
+        self.probabilities = probabilities
+        self.words = words
+        self.word_starts = np.sort(np.array([word["start"] for word in words], dtype=np.float64))
+        self.duration = duration
+        # One window per hop; the last one may be pulled back to end with the recording
+        starts = np.minimum(
+            np.arange(len(probabilities)) * self.config.hop_duration,
+            max(duration - self.config.window_duration, 0.0)
+        )
+        self.window_centers = starts + min(self.config.window_duration, duration) / 2
+        self._levels: Dict[float, Dict[str, Any]] = {}
+
+        for level in self.config.levels:
+            self.level(level)
+
+    @classmethod
+    def build(
+        cls,
+        audio: np.ndarray,
+        sample_rate: int,
+        speech_analyzer,
+        transcription_service,
+        config: Optional[PyramidConfig] = None
+    ) -> "TimelinePyramid":
+        """
+        Run fine-hop inference over a decoded buffer and build the pyramid.
+
+        Args:
+            audio: 1-D float32 decoded audio
+            sample_rate: Sample rate of the audio in Hz
+            speech_analyzer: SpeechAnalyzer used for window probabilities
+            transcription_service: TranscriptionService used for word timings
+            config: The pyramid configuration
+
+        Returns:
+            Built TimelinePyramid
+        """
+        config = config or PyramidConfig()
+        duration = len(audio) / sample_rate
+        windows = cls.fine_windows(audio, sample_rate, config)
+
+        probabilities = speech_analyzer.predict_proba_batch(windows, sample_rate, config.batch_size)
+        words = transcription_service.transcribe_array(audio)
+
+        return cls(speech_analyzer.labels, probabilities, words, duration, config)
+
+    @staticmethod
+    def fine_windows(audio: np.ndarray, sample_rate: int, config: PyramidConfig) -> List[np.ndarray]:
+        """
+        Zero-copy views of overlapping fine windows over the decoded buffer,
+        one per hop, plus a last window ending at the last sample when the
+        hops do not reach it.
+
+        Args:
+            audio: 1-D float32 decoded audio
+            sample_rate: Sample rate of the audio in Hz
+            config: The pyramid configuration
+
+        Returns:
+            List of 1-D windows of window_duration each
+        """
+        window = int(config.window_duration * sample_rate)
+        hop = int(config.hop_duration * sample_rate)
+        if len(audio) < window:
+            # Short clips get a single zero-padded window
+            return [np.pad(audio, (0, window - len(audio)))]
+        windows = list(sliding_window_view(audio, window)[::hop])
+        if (len(audio) - window) % hop:
+            windows.append(audio[len(audio) - window:])
+        return windows
+
+    def summarize_windows(self, bounds: List[Tuple[float, float]]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Reduce the fine level to arbitrary analysis windows (e.g. the 4-7 s
+        plan of the standard timeline) without running the models again.
+
+        Args:
+            bounds: (start, end) of each window in seconds, in time order
+
+        Returns:
+            Tuple of (mean probabilities of the fine windows centred in each
+            window, shape (len(bounds), num_labels), and the text of the words
+            starting in each window)
+        """
+        starts = np.array([start for start, _ in bounds], dtype=np.float64)
+        ends = np.array([end for _, end in bounds], dtype=np.float64)
+        last = len(bounds) - 1
+
+        window_index = np.clip(np.searchsorted(starts, self.window_centers, side="right") - 1, 0, last)
+        sums = np.zeros((len(bounds), self.probabilities.shape[1]), dtype=np.float64)
+        np.add.at(sums, window_index, self.probabilities)
+        counts = np.bincount(window_index, minlength=len(bounds))
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Windows shorter than the hop take the nearest fine window
+            middles = (starts[empty] + ends[empty]) / 2
+            nearest = np.abs(self.window_centers[None, :] - middles[:, None]).argmin(axis=1)
+            sums[empty] = self.probabilities[nearest]
+            counts[empty] = 1
+        probabilities = (sums / counts[:, None]).astype(np.float32)
+
+        texts: List[List[str]] = [[] for _ in bounds]
+        if self.words:
+            word_starts = np.array([word["start"] for word in self.words], dtype=np.float64)
+            word_index = np.clip(np.searchsorted(starts, word_starts, side="right") - 1, 0, last)
+            for word, index in zip(self.words, word_index):
+                texts[index].append(word["word"])
+        return probabilities, [" ".join(words) for words in texts]
+
+    def available_levels(self) -> List[float]:
+        """Precomputed levels, finest first (any level >= the hop can be requested)"""
+        return sorted({self.config.hop_duration, *self._levels.keys()})
+
+    def level(self, seconds: float) -> Dict[str, Any]:
+        """
+        Aggregate the fine windows into bins of the requested width.
+
+        Args:
+            seconds: Bin width in seconds (at least the fine hop)
+
+        Returns:
+            Dictionary of parallel arrays describing each bin
+        """
+        if seconds < self.config.hop_duration:
+            raise ValueError(f"Level must be at least {self.config.hop_duration}s")
+
+        if seconds in self._levels:
+            return self._levels[seconds]
+
+        num_bins = max(1, int(np.ceil(self.duration / seconds)))
+        bin_starts = np.arange(num_bins) * seconds
+        bin_ends = np.minimum(bin_starts + seconds, self.duration)
+
+        # Mean probability of the fine windows whose centre falls in each bin
+        window_bins = np.minimum((self.window_centers // seconds).astype(np.int64), num_bins - 1)
+        sums = np.zeros((num_bins, self.probabilities.shape[1]), dtype=np.float64)
+        np.add.at(sums, window_bins, self.probabilities)
+        window_counts = np.bincount(window_bins, minlength=num_bins)
+        probabilities = sums / np.maximum(window_counts, 1)[:, None]
+
+        word_bins = np.minimum((self.word_starts // seconds).astype(np.int64), num_bins - 1)
+        word_counts = np.bincount(word_bins, minlength=num_bins)
+        bin_durations = np.maximum(bin_ends - bin_starts, 1e-9)
+        wps = word_counts / bin_durations
+
+        labels = np.asarray(self.labels)
+        aggregated = {
+            "level": seconds,
+            "labels": self.labels,
+            "start": np.round(bin_starts, 2).tolist(),
+            "end": np.round(bin_ends, 2).tolist(),
+            "emotion": labels[probabilities.argmax(axis=1)].tolist(),
+            "probabilities": np.round(probabilities, 4).tolist(),
+            "word_count": word_counts.tolist(),
+            "wps": np.round(wps, 2).tolist()
+        }
+        if seconds in self.config.levels:
+            self._levels[seconds] = aggregated
+        return aggregated
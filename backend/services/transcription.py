@@ -1,6 +1,31 @@
 import whisper
+import torch
+import numpy as np
 import os
-from typing import List, Dict, Tuple, Any, Optional
+import time
+import soundfile as sf
+from dataclasses import dataclass
+import logging
+from typing import List, Dict, Tuple, Any, Optional, Callable
+
+from utils.cancellation import CancellationToken, check_cancelled
+from utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TranscriptionProfile:
+    # Beam width for the first (temperature 0) decode; None decodes greedily
+    beam_size: Optional[int] = None
+    # Pinned language code; when None it is detected once per recording
+    language: Optional[str] = None
+    # Temperature fallback schedule (Whisper's default tries six temperatures)
+    temperatures: Tuple[float, ...] = (0.0, 0.4)
+    compression_ratio_threshold: float = 2.4
+    logprob_threshold: float = -1.0
+    no_speech_threshold: float = 0.6
+    # Windows with a lower RMS level are not decoded at all
+    silence_rms: float = 0.003
 
 class TranscriptionService:
     """
@@ -8,14 +33,16 @@ class TranscriptionService:
     This handles the speech-to-text conversion for the application.
     """
     
-    def __init__(self, model_size: str = "tiny"):
+    def __init__(self, model_size: str = "tiny", profile: Optional[TranscriptionProfile] = None):
         """
         Initialize the transcription service with a Whisper model.
         
         Args:
             model_size: Size of the Whisper model to use ("tiny", "base", "small", "medium", "large")
+            profile: Decode profile for per-window transcription
         """
         self.model_size = model_size
+        self.profile = profile or TranscriptionProfile()
         self.model = self._load_whisper_model()
     
     def _load_whisper_model(self):
@@ -27,17 +54,23 @@ class TranscriptionService:
         """
         try:
             model = whisper.load_model(self.model_size)
-            print(f"Successfully loaded Whisper model: {self.model_size}")
+            logger.info("Successfully loaded Whisper model: %s", self.model_size)
             return model
         except Exception as e:
-            print(f"Error loading Whisper model: {str(e)}")
+            logger.error("Error loading Whisper model %s: %s", self.model_size, e)
             return None
     
     def transcribe_segments(
         self, 
         segment_paths: List[str], 
         segment_duration: float,
-        emotion_data: Optional[List[Tuple[str, str]]] = None
+        emotion_data: Optional[List[Tuple[str, str]]] = None,
+        segment_indices: Optional[List[int]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        segment_bounds: Optional[List[Tuple[float, float]]] = None,
+        window_cache: Optional[Any] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        window_keys: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         Transcribe audio segments using the Whisper model.
@@ -46,55 +79,389 @@ class TranscriptionService:
             segment_paths: List of paths to audio segment files
             segment_duration: Approximate duration of each segment
             emotion_data: Optional list of (time_range, emotion) tuples
+            segment_indices: Optional timeline index of each path, for sampled subsets
+            progress_callback: Optional callable(done, total) invoked after each segment
+            segment_bounds: Optional exact (start, end) of each path, for variable-length segments
+            window_cache: Optional WindowCache; segments with already-seen audio skip Whisper
+            cancel_token: Optional CancellationToken checked before each segment
+            window_keys: Cache key of each timeline window; the cache is only
+                used when they are given
             
         Returns:
-            List of dictionaries containing transcription data for each segment
+            List of dictionaries containing transcription data for each segment,
+            with the decode statistics of every decoded segment under "decode"
         """
         if not self.model:
-            print("Whisper model not loaded. Cannot transcribe audio.")
+            logger.warning("Whisper model not loaded. Cannot transcribe audio.")
             return []
             
         transcripts = []
+        # Detected on the first decoded segment, then pinned for the recording
+        language = self.profile.language
         
-        for i, segment_path in enumerate(segment_paths):
+        for position, segment_path in enumerate(segment_paths):
+            check_cancelled(cancel_token)
+            if progress_callback:
+                progress_callback(position, len(segment_paths))
+
             if not os.path.exists(segment_path):
-                print(f"Segment file not found: {segment_path}")
+                logger.warning("Segment file not found: %s", segment_path)
                 continue
+            
+            i = segment_indices[position] if segment_indices else position
                 
             try:
                 # Get emotion from emotion_data if available
-                emotion = emotion_data[i][1] if emotion_data and i < len(emotion_data) else "unknown"
+                emotion = emotion_data[position][1] if emotion_data and position < len(emotion_data) else "unknown"
                 
                 # Calculate segment times
-                start_time = i * segment_duration
-                end_time = (i + 1) * segment_duration
-                
-                # Transcribe with Whisper
-                result = self.model.transcribe(segment_path)
-                transcribed_text = result["text"].strip()
+                if segment_bounds:
+                    start_time, end_time = segment_bounds[position]
+                else:
+                    start_time = i * segment_duration
+                    end_time = (i + 1) * segment_duration
                 
-                # Count words and calculate WPS
-                word_count = len(transcribed_text.split())
-                wps = word_count / segment_duration if segment_duration > 0 else 0
-                
-                # Create segment data
-                segment_data = {
-                    "index": i,
-                    "start": round(start_time, 2),
-                    "end": round(end_time, 2),
-                    "text": transcribed_text,
-                    "wps": round(wps, 2),
-                    "emotion": emotion
-                }
+                # Transcribe with Whisper (or reuse the text of identical audio)
+                transcribed_text = None
+                decode_stats = None
+                cache_key = None
+                if window_cache is not None and window_keys is not None:
+                    cache_key = window_keys[i]
+                    transcribed_text = window_cache.get(cache_key, "text")
+                if transcribed_text is None:
+                    transcribed_text, decode_stats, language = self.decode_window(
+                        self._load_segment(segment_path), language
+                    )
+                    if cache_key is not None:
+                        window_cache.put(cache_key, text=transcribed_text)
                 
+                segment_data = self.build_segment_data(
+                    i, start_time, end_time, transcribed_text, emotion, decode_stats
+                )
                 transcripts.append(segment_data)
-                print(f"Transcribed segment {i+1}: {segment_data['text'][:50]}...")
+                logger.debug("Transcribed segment %d: %.50s", i + 1, segment_data["text"])
             except Exception as e:
-                print(f"Error transcribing segment {i+1}: {str(e)}")
+                logger.warning("Error transcribing segment %d: %s", i + 1, e)
                 continue
         
+        if progress_callback and segment_paths:
+            progress_callback(len(segment_paths), len(segment_paths))
+        
         return transcripts
-    
+
+    @staticmethod
+    def _load_segment(segment_path: str) -> np.ndarray:
+        """Read a segment file as 16 kHz mono float32 (segments are already PCM WAV)."""
+        samples, sample_rate = sf.read(segment_path, dtype="float32", always_2d=True)
+        if sample_rate != whisper.audio.SAMPLE_RATE:
+            return whisper.load_audio(segment_path)
+        return samples.mean(axis=1)
+
+    def _log_mel(self, audio: np.ndarray) -> "torch.Tensor":
+        """Log-Mel spectrogram of a window padded to 30 s, with the model's number of Mel bins (128 for large-v3)."""
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        return whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audio)), n_mels=self.model.dims.n_mels)
+
+    def _decode_verdict(self, result) -> Optional[str]:
+        """
+        Judge one decode against the profile's thresholds.
+
+        Returns:
+            "accept" to keep the text, "no_speech" to drop it, or None to retry
+            at the next temperature
+        """
+        profile = self.profile
+        if result.no_speech_prob > profile.no_speech_threshold:
+            # Likely no speech: hotter decodes would not help
+            return "no_speech" if result.avg_logprob < profile.logprob_threshold else "accept"
+        if (result.compression_ratio <= profile.compression_ratio_threshold
+                and result.avg_logprob >= profile.logprob_threshold):
+            return "accept"
+        return None
+
+    def detect_language(self, audio: np.ndarray) -> str:
+        """
+        Detect the spoken language of a waveform (first 30 s).
+        
+        Args:
+            audio: 16 kHz mono float32 array
+            
+        Returns:
+            Language code, e.g. "en"
+        """
+        if not self.model.is_multilingual:
+            return "en"
+        mel = self._log_mel(audio).to(self.model.device)
+        _, probabilities = self.model.detect_language(mel)
+        return max(probabilities, key=probabilities.get)
+
+    def decode_window(self, audio: np.ndarray, language: Optional[str] = None) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        """
+        Transcribe one window (up to 30 s) with the service's decode profile.
+        Near-silent windows are skipped; the language is detected when not
+        given; the temperature fallback stops as soon as a decode is good
+        enough or the window is judged to contain no speech.
+        
+        Args:
+            audio: 16 kHz mono float32 array
+            language: Language code to decode with (detected when None)
+            
+        Returns:
+            Tuple of (text, decode statistics with the latency of each step,
+            language to pin for the following windows)
+        """
+        profile = self.profile
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        stats = {"decoding": "beam" if profile.beam_size else "greedy", "fallbacks": 0}
+        
+        started = time.perf_counter()
+        rms = float(np.sqrt(np.mean(np.square(audio)))) if len(audio) else 0.0
+        stats["silence_gate_s"] = round(time.perf_counter() - started, 4)
+        if rms < profile.silence_rms:
+            stats["skipped"] = "silence"
+            return "", stats, language
+        
+        if language is None:
+            started = time.perf_counter()
+            language = self.detect_language(audio)
+            stats["language_detection_s"] = round(time.perf_counter() - started, 4)
+        stats["language"] = language
+        
+        mel = self._log_mel(audio).to(self.model.device)
+        result = None
+        decode_time = fallback_time = 0.0
+        for attempt, temperature in enumerate(profile.temperatures):
+            options = whisper.DecodingOptions(
+                language=language,
+                temperature=temperature,
+                # Beam search only applies to the deterministic first pass
+                beam_size=profile.beam_size if temperature == 0 else None,
+                without_timestamps=True,
+                fp16=False
+            )
+            started = time.perf_counter()
+            result = whisper.decode(self.model, mel, options)
+            if attempt == 0:
+                decode_time += time.perf_counter() - started
+            else:
+                fallback_time += time.perf_counter() - started
+                stats["fallbacks"] += 1
+            stats["temperature"] = temperature
+            
+            verdict = self._decode_verdict(result)
+            if verdict == "no_speech":
+                stats["skipped"] = "no_speech"
+            if verdict is not None:
+                break
+        
+        stats["decode_s"] = round(decode_time, 4)
+        stats["fallback_s"] = round(fallback_time, 4)
+        text = "" if result is None or "skipped" in stats else result.text.strip()
+        return text, stats, language
+
+    @staticmethod
+    def summarize_decode_stats(transcription_data: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate the per-segment decode statistics of a transcription.
+        
+        Args:
+            transcription_data: List of transcription segment dictionaries
+            
+        Returns:
+            Totals per decode step (seconds), skip and fallback counts, or None
+            when no segment was decoded with a profile
+        """
+        stats = [segment["decode"] for segment in transcription_data if segment.get("decode")]
+        if not stats:
+            return None
+        languages = [item["language"] for item in stats if item.get("language")]
+        return {
+            "decoding": stats[0]["decoding"],
+            "language": languages[0] if languages else None,
+            "decoded_segments": len(stats),
+            "skipped_silence": sum(1 for item in stats if item.get("skipped") == "silence"),
+            "skipped_no_speech": sum(1 for item in stats if item.get("skipped") == "no_speech"),
+            "fallback_decodes": sum(item["fallbacks"] for item in stats),
+            "latency_s": {
+                step: round(sum(item.get(f"{step}_s", 0.0) for item in stats), 3)
+                for step in ("silence_gate", "language_detection", "decode", "fallback")
+            }
+        }
+
+    @staticmethod
+    def build_segment_data(
+        index: int,
+        start_time: float,
+        end_time: float,
+        transcribed_text: str,
+        emotion: str,
+        decode_stats: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the transcription record of one segment.
+        
+        Args:
+            index: Segment index in the timeline
+            start_time: Segment start in seconds
+            end_time: Segment end in seconds
+            transcribed_text: Whisper output for the segment
+            emotion: Emotion label of the segment
+            decode_stats: Optional decode statistics from decode_window
+            
+        Returns:
+            Segment dictionary with index, start, end, text, wps and emotion
+            (and decode, when statistics are given)
+        """
+        # Count words and calculate WPS
+        duration = end_time - start_time
+        word_count = len(transcribed_text.split())
+        wps = word_count / duration if duration > 0 else 0
+        
+        segment_data = {
+            "index": index,
+            "start": round(start_time, 2),
+            "end": round(end_time, 2),
+            "text": transcribed_text,
+            "wps": round(wps, 2),
+            "emotion": emotion
+        }
+        if decode_stats is not None:
+            segment_data["decode"] = decode_stats
+        return segment_data
+
+    def transcribe_array(
+        self,
+        audio: Any,
+        time_offset: float = 0.0,
+        initial_prompt: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe an in-memory 16 kHz mono waveform into timed words.
+
+        Args:
+            audio: Float32 NumPy array with samples in [-1, 1]
+            time_offset: Absolute time (seconds) of the first sample
+            initial_prompt: Optional previously committed text used as decoding context
+
+        Returns:
+            List of word dictionaries with "word", "start", "end" and "probability" keys
+        """
+        if not self.model:
+            logger.warning("Whisper model not loaded. Cannot transcribe audio.")
+            return []
+
+        result = self.model.transcribe(
+            audio,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=initial_prompt,
+            language=self.profile.language,
+            beam_size=self.profile.beam_size,
+            temperature=self.profile.temperatures,
+            compression_ratio_threshold=self.profile.compression_ratio_threshold,
+            logprob_threshold=self.profile.logprob_threshold,
+            no_speech_threshold=self.profile.no_speech_threshold,
+            fp16=False
+        )
+
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                text = word["word"].strip()
+                if not text:
+                    continue
+                words.append({
+                    "word": text,
+                    "start": round(time_offset + word["start"], 2),
+                    "end": round(time_offset + word["end"], 2),
+                    "probability": round(word.get("probability", 0.0), 3)
+                })
+
+        return words
+
+    def transcribe_batch(
+        self,
+        audios: List[Any],
+        language: Optional[str] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Transcribe several short waveforms (up to 30 s each) in batched decodes
+        with the service's decode profile, like decode_window: near-silent
+        waveforms are skipped, and the waveforms whose decode fails the
+        thresholds are decoded again together at the next temperature.
+        
+        Args:
+            audios: List of 16 kHz mono float32 arrays, possibly from different recordings
+            language: Optional language code; the profile's pinned language, else
+                detected per item, when None
+            
+        Returns:
+            Tuple of (text, decode statistics) per waveform; the latency of a
+            batched step is shared equally by its waveforms
+        """
+        if not self.model:
+            logger.warning("Whisper model not loaded. Cannot transcribe audio.")
+            return [("", {}) for _ in audios]
+        if not audios:
+            return []
+
+        profile = self.profile
+        language = language or profile.language
+        texts = [""] * len(audios)
+        stats = [{"decoding": "beam" if profile.beam_size else "greedy", "fallbacks": 0} for _ in audios]
+
+        started = time.perf_counter()
+        pending = []
+        for index, audio in enumerate(audios):
+            audio = np.asarray(audio, dtype=np.float32)
+            rms = float(np.sqrt(np.mean(np.square(audio)))) if len(audio) else 0.0
+            if rms < profile.silence_rms:
+                stats[index]["skipped"] = "silence"
+            else:
+                pending.append(index)
+        gate_time = (time.perf_counter() - started) / len(audios)
+        for item in stats:
+            item["silence_gate_s"] = round(gate_time, 4)
+        if not pending:
+            return list(zip(texts, stats))
+
+        mels = {index: self._log_mel(audios[index]) for index in pending}
+        with span("transcription.batch", windows=len(audios), model=self.model_size):
+            for attempt, temperature in enumerate(profile.temperatures):
+                if not pending:
+                    break
+                options = whisper.DecodingOptions(
+                    language=language,
+                    temperature=temperature,
+                    # Beam search only applies to the deterministic first pass
+                    beam_size=profile.beam_size if temperature == 0 else None,
+                    without_timestamps=True,
+                    fp16=False
+                )
+                started = time.perf_counter()
+                results = whisper.decode(self.model, torch.stack([mels[index] for index in pending]).to(self.model.device), options)
+                elapsed = (time.perf_counter() - started) / len(pending)
+
+                retry = []
+                for index, result in zip(pending, results):
+                    item = stats[index]
+                    item["decode_s" if attempt == 0 else "fallback_s"] = round(
+                        item.get("decode_s" if attempt == 0 else "fallback_s", 0.0) + elapsed, 4)
+                    if attempt > 0:
+                        item["fallbacks"] += 1
+                    item["temperature"] = temperature
+                    item["language"] = result.language
+                    verdict = self._decode_verdict(result)
+                    if verdict == "no_speech":
+                        item["skipped"] = "no_speech"
+                        texts[index] = ""
+                    else:
+                        texts[index] = result.text.strip()
+                        if verdict is None:
+                            retry.append(index)
+                pending = retry
+        return list(zip(texts, stats))
+
     def get_speech_metrics(self, transcription_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Calculate speech metrics based on transcription data.
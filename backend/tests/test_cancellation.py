@@ -0,0 +1,56 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from utils.cancellation import CancellationToken, JobCancelled, check_cancelled, run_process
+
+def test_cancel_records_the_first_reason():
+    token = CancellationToken()
+    assert not token.cancelled
+    token.raise_if_cancelled()
+    token.cancel("client disconnected")
+    token.cancel("cancelled by client")
+    assert token.cancelled and token.reason == "client disconnected"
+    with pytest.raises(JobCancelled, match="client disconnected"):
+        token.raise_if_cancelled()
+
+def test_check_cancelled_accepts_no_token():
+    check_cancelled(None)
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(JobCancelled):
+        check_cancelled(token)
+
+def test_wait_returns_on_cancel():
+    token = CancellationToken()
+    assert token.wait(0.01) is False
+    threading.Timer(0.05, token.cancel).start()
+    assert token.wait(5) is True
+
+def test_cancel_kills_a_running_process():
+    token = CancellationToken()
+    threading.Timer(0.2, token.cancel, args=("stop",)).start()
+    started = time.monotonic()
+    with pytest.raises(JobCancelled):
+        token.run_process([sys.executable, "-c", "import time; time.sleep(30)"])
+    assert time.monotonic() - started < 10
+
+def test_cancelled_token_does_not_start_a_process():
+    token = CancellationToken()
+    token.cancel()
+    with pytest.raises(JobCancelled):
+        run_process([sys.executable, "-c", "raise SystemExit(3)"], token)
+
+def test_run_process_without_a_token():
+    result = run_process([sys.executable, "-c", "print('ok')"], None, capture_output=True, text=True)
+    assert result.returncode == 0 and result.stdout.strip() == "ok"
+
+def test_tracked_process_is_killed_when_already_cancelled():
+    token = CancellationToken()
+    token.cancel()
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    with token.track(process):
+        assert process.wait(10) != 0
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+from utils.checkpoint_store import CheckpointStore
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+def claim_in_another_process(root):
+    """Job ids claimed by a separate process that stays alive while the test runs."""
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys; from utils.checkpoint_store import CheckpointStore; "
+        f"print(','.join(m['job_id'] for m in CheckpointStore({root!r}, 1 << 20).claim_interrupted_jobs()))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=backend, capture_output=True, text=True, check=True)
+    return [job_id for job_id in output.stdout.strip().split(",") if job_id]
+
+def interrupt(store, job_id, pid):
+    """Leave a running job behind as if owned by the given process."""
+    checkpoint = store.open(job_id, metadata={"client_id": "alice"})
+    checkpoint.manifest["owner"]["pid"] = pid
+    store._write_manifest(checkpoint.directory, checkpoint.manifest)
+    store._active.discard(job_id)
+
+def test_an_interrupted_job_is_claimed_by_one_process(tmp_path):
+    interrupt(CheckpointStore(str(tmp_path), 1 << 20), "job-1", exited_pid())
+    first = CheckpointStore(str(tmp_path), 1 << 20)
+    assert [manifest["job_id"] for manifest in first.claim_interrupted_jobs()] == ["job-1"]
+    # This process (the owner now) is alive, so another worker leaves the job alone
+    assert claim_in_another_process(str(tmp_path)) == []
+
+def test_jobs_of_a_live_process_are_not_claimed(tmp_path):
+    with subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]) as process:
+        try:
+            interrupt(CheckpointStore(str(tmp_path), 1 << 20), "job-1", process.pid)
+            assert CheckpointStore(str(tmp_path), 1 << 20).claim_interrupted_jobs() == []
+        finally:
+            process.kill()
+
+def test_a_restarted_process_with_the_same_pid_claims_its_jobs(tmp_path):
+    interrupt(CheckpointStore(str(tmp_path), 1 << 20), "job-1", exited_pid())
+    restarted = CheckpointStore(str(tmp_path), 1 << 20)
+    manifest = restarted._read_manifest(restarted._directory("job-1"))
+    manifest["owner"] = restarted._owner()
+    restarted._write_manifest(restarted._directory("job-1"), manifest)
+    assert [manifest["job_id"] for manifest in restarted.claim_interrupted_jobs()] == ["job-1"]
+    # The claimed job now belongs to this process and is not claimed twice
+    assert restarted.claim_interrupted_jobs() == []
+
+def test_finished_jobs_are_not_claimed(tmp_path):
+    store = CheckpointStore(str(tmp_path), 1 << 20)
+    store.open("job-1").set_status("completed")
+    assert CheckpointStore(str(tmp_path), 1 << 20).claim_interrupted_jobs() == []
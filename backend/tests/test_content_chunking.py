@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from services.audio_service import AudioSegmenter, AudioSegmenterConfig
+from utils.window_cache import WindowCache
+
+SAMPLE_RATE = 16000
+
+@pytest.fixture
+def segmenter():
+    return AudioSegmenter(AudioSegmenterConfig(min_duration=4, max_duration=7, audio_sample_rate=SAMPLE_RATE))
+
+def speech_like(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    return (0.1 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+def test_short_audio_is_one_window(segmenter):
+    samples = speech_like(6)
+    assert segmenter.plan_content_segments(samples) == [(0.0, 6.0)]
+
+def test_windows_tile_the_audio_within_bounds(segmenter):
+    samples = speech_like(120)
+    windows = segmenter.plan_content_segments(samples)
+    assert windows[0][0] == 0.0
+    assert windows[-1][1] == pytest.approx(120.0)
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        assert start == end
+    lengths = [end - start for start, end in windows]
+    assert max(lengths) <= 7.0 + 1e-9
+    # Only the final window may be shorter than the minimum
+    assert min(lengths[:-1]) >= 4.0 - 1e-9
+
+def test_cuts_are_content_defined(segmenter):
+    samples = speech_like(120)
+    # Most cuts come from the rolling hash rather than the maximum length
+    windows = segmenter.plan_content_segments(samples)
+    forced = sum(1 for start, end in windows[:-1] if end - start == pytest.approx(7.0))
+    assert forced < len(windows) // 2
+
+def test_boundaries_survive_trimming_the_start(segmenter):
+    samples = speech_like(120)
+    trim = int(10.3 * SAMPLE_RATE)
+    original = segmenter.plan_content_segments(samples)
+    trimmed = segmenter.plan_content_segments(samples[trim:])
+
+    original_cuts = {round(end * SAMPLE_RATE) for _, end in original[:-1]}
+    shifted_cuts = {round(end * SAMPLE_RATE) + trim for _, end in trimmed[:-1]}
+    # After resynchronizing, the trimmed recording reuses the original cut points
+    shared = original_cuts & shifted_cuts
+    assert len(shared) >= len(shifted_cuts) - 1
+
+def test_shared_windows_have_the_same_cache_key(segmenter):
+    samples = speech_like(120)
+    trim = int(10.3 * SAMPLE_RATE)
+    def keys(audio):
+        return {
+            WindowCache.content_key(audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+            for start, end in segmenter.plan_content_segments(audio)
+        }
+    assert len(keys(samples) & keys(samples[trim:])) >= len(keys(samples[trim:])) - 2
+
+def test_content_key_matches_int16_and_float_input():
+    pcm = np.array([0, 1000, -1000, 32767, -32768], dtype=np.int16)
+    assert WindowCache.content_key(pcm) == WindowCache.content_key(pcm.astype(np.float32) / 32768)
+    assert WindowCache.content_key(pcm) != WindowCache.content_key(pcm[::-1].copy())
+
+def test_window_cache_evicts_least_recently_used():
+    cache = WindowCache(max_entries=2)
+    cache.put("a", emotion="calm")
+    cache.put("b", emotion="angry")
+    assert cache.get("a", "emotion") == "calm"
+    cache.put("c", emotion="sad")
+    assert cache.get("b", "emotion") is None
+    assert cache.get("a", "emotion") == "calm"
+    cache.put("a", text="hello")
+    assert cache.get("a", "text") == "hello" and cache.get("a", "emotion") == "calm"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["hits"] == 4 and stats["misses"] == 1
+
+def test_block_size_does_not_move_the_cuts(segmenter):
+    samples = speech_like(120)
+    expected = segmenter.plan_content_segments(samples)
+    # Blocks that do not line up with the rolling window or the cuts
+    segmenter._HASH_BLOCK = 5000
+    assert segmenter.plan_content_segments(samples) == expected
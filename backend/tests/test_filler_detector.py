@@ -0,0 +1,61 @@
+from utils.filler_detector import FillerDetector
+
+def test_counts_words_and_phrases():
+    detector = FillerDetector()
+    text = "Um, so I was, like, you know, kind of nervous. Uh, you know?"
+    assert detector.count(text) == {"um": 1, "uh": 1, "like": 1, "you know": 2, "kind of": 1}
+
+def test_does_not_match_inside_longer_words():
+    detector = FillerDetector()
+    assert detector.count("My umbrella is likely humming") == {}
+
+def test_longest_phrase_wins_and_consumes_its_tokens():
+    detector = FillerDetector(["you", "you know", "you know what"])
+    assert detector.scan(["you", "know", "what", "you", "know"]) == [(0, 3, "you know what"), (3, 2, "you know")]
+
+def test_elongated_hesitations_are_normalized():
+    detector = FillerDetector()
+    assert detector.count("Ummm, uhhh, well") == {"um": 1, "uh": 1}
+    # Words that only look elongated keep their spelling
+    assert detector.count("The bee was good") == {}
+
+def test_repetitions():
+    detector = FillerDetector()
+    assert detector.scan(detector.tokenize("I I think the the plan works")) == [(0, 1, "repetition"), (3, 1, "repetition")]
+    assert FillerDetector(detect_repetitions=False).scan(["i", "i"]) == []
+
+def test_detect_words_uses_word_timings():
+    detector = FillerDetector()
+    words = [
+        {"word": " So", "start": 0.0, "end": 0.2},
+        {"word": " you", "start": 0.2, "end": 0.4},
+        {"word": " know,", "start": 0.4, "end": 0.7},
+        {"word": " um", "start": 1.0, "end": 1.3},
+    ]
+    assert detector.detect_words(words) == [
+        {"filler": "you know", "start": 0.2, "end": 0.7},
+        {"filler": "um", "start": 1.0, "end": 1.3},
+    ]
+
+def test_analyze_rates_and_estimated_times():
+    detector = FillerDetector()
+    transcription = [
+        {"index": 0, "start": 0.0, "end": 30.0, "text": "um this is um fine"},
+        {"index": 1, "start": 30.0, "end": 60.0, "text": "like like so",
+         "words": [
+             {"word": "like", "start": 31.0, "end": 31.5},
+             {"word": "like", "start": 31.5, "end": 32.0},
+             {"word": "so", "start": 32.0, "end": 32.5},
+         ]},
+    ]
+    report = detector.analyze(transcription)
+    assert report["counts"] == {"um": 2, "like": 2}
+    assert report["total"] == 4 and report["total_per_minute"] == 4.0
+    assert report["repetitions"] == 0
+    first = report["events"][0]
+    assert first == {"filler": "um", "start": 0.0, "end": 6.0, "segment": 0, "estimated": True}
+    assert report["events"][2]["estimated"] is False and report["events"][2]["start"] == 31.0
+
+def test_analyze_empty_transcript():
+    report = FillerDetector().analyze([])
+    assert report["total"] == 0 and report["total_per_minute"] == 0 and report["events"] == []
@@ -0,0 +1,92 @@
+import numpy as np
+
+from services.live_session import LiveAnalysisSession, LiveSessionConfig
+from utils.visualization import VisualizationHelper
+
+SAMPLE_RATE = 16000
+
+class FakeSpeechAnalyzer:
+    def analyze_waveform(self, samples, sample_rate):
+        return "calm"
+
+class FakeTranscriber:
+    """One word per whole second of sound inside the tail; records each tail length."""
+
+    def __init__(self):
+        self.tail_seconds = []
+
+    def transcribe_array(self, audio, time_offset=0.0, initial_prompt=None):
+        self.tail_seconds.append(len(audio) / SAMPLE_RATE)
+        end = time_offset + len(audio) / SAMPLE_RATE
+        words = []
+        for second in range(int(np.ceil(time_offset)), int(end)):
+            offset = int(round((second - time_offset) * SAMPLE_RATE))
+            if np.abs(audio[offset:offset + SAMPLE_RATE]).mean() > 0.01:
+                words.append({"word": f"w{second}", "start": second + 0.05, "end": second + 0.95})
+        return words
+
+def pcm(seconds, amplitude):
+    samples = np.full(int(seconds * SAMPLE_RATE), amplitude, dtype=np.float32)
+    return (samples * 32767).astype("<i2").tobytes()
+
+def stream(session, audio, chunk_seconds=0.25):
+    chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+    events = []
+    for offset in range(0, len(audio), chunk_bytes):
+        events.extend(session.feed(audio[offset:offset + chunk_bytes]))
+    return events
+
+def new_session(transcriber):
+    return LiveAnalysisSession(FakeSpeechAnalyzer(), transcriber, VisualizationHelper(), LiveSessionConfig())
+
+def test_silence_keeps_the_tail_and_buffer_bounded():
+    transcriber = FakeTranscriber()
+    session = new_session(transcriber)
+    stream(session, pcm(60, 0.0))
+    config = session.config
+    assert max(transcriber.tail_seconds) <= config.max_uncommitted + config.decode_interval
+    assert len(session.buffer) <= (config.max_uncommitted + config.window_duration) * SAMPLE_RATE
+    assert session.committed_until >= (60 - config.max_uncommitted - config.decode_interval) * SAMPLE_RATE
+
+def test_words_are_committed_once_two_hypotheses_agree():
+    transcriber = FakeTranscriber()
+    session = new_session(transcriber)
+    events = stream(session, pcm(6, 0.5))
+    committed = [word["word"] for event in events if event["type"] == "transcript" for word in event["words"]]
+    # The last word heard is still only a partial hypothesis
+    assert committed and committed == [f"w{i}" for i in range(len(committed))]
+    assert len(committed) < 6
+    assert any(event["type"] == "partial" for event in events)
+
+    final = session.finish()
+    assert [word["word"] for word in session.committed_words] == [f"w{i}" for i in range(6)]
+    summary = final[-1]
+    assert summary["type"] == "summary" and summary["total_words"] == 6 and summary["duration"] == 6.0
+
+def test_speech_after_silence_is_transcribed():
+    transcriber = FakeTranscriber()
+    session = new_session(transcriber)
+    stream(session, pcm(30, 0.0) + pcm(4, 0.5))
+    session.finish()
+    assert [word["word"] for word in session.committed_words] == ["w30", "w31", "w32", "w33"]
+    # Emotion windows cover the whole stream
+    assert session.emotion_segments[-1]["end"] == 34.0
+
+def test_chunks_with_an_odd_byte_count_are_reassembled():
+    audio = pcm(3, 0.25)
+    session = new_session(FakeTranscriber())
+    for offset in range(0, len(audio), 1001):
+        session.feed(audio[offset:offset + 1001])
+    assert session.total_samples == 3 * SAMPLE_RATE
+    assert session.buffer[-1] == np.float32(int(0.25 * 32767) / 32768.0)
+
+def test_wps_counts_the_trailing_window_only():
+    session = new_session(FakeTranscriber())
+    events = stream(session, pcm(20, 0.5))
+    wps = [event for event in events if event["type"] == "wps"]
+    assert wps
+    for event in wps:
+        window_start = max(0.0, event["time"] - session.config.wps_window)
+        expected = sum(1 for word in session.committed_words if window_start < word["end"] <= event["time"])
+        assert event["wps"] == round(expected / (event["time"] - window_start), 2)
+    assert len(session._recent_words) <= session.config.wps_window + 1
@@ -0,0 +1,55 @@
+import numpy as np
+
+from utils.visualization import VisualizationHelper
+
+lttb_indices = VisualizationHelper.lttb_indices
+
+def test_short_series_is_kept_whole():
+    x = np.arange(5, dtype=np.float64)
+    assert lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+def test_keeps_endpoints_and_point_count():
+    rng = np.random.default_rng(0)
+    x = np.arange(1000, dtype=np.float64)
+    y = rng.normal(size=1000)
+    selected = lttb_indices(x, y, 50)
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert np.all(np.diff(selected) > 0)
+
+def test_keeps_spike():
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[123] = 10.0
+    assert 123 in lttb_indices(x, y, 20)
+
+def test_last_point_is_not_averaged_into_last_bucket():
+    # Buckets are [1, 4) and [4, 7); the mean of [4, 7) is (5, 0). Counting the
+    # final y = 100 in it would pull the first bucket's choice to index 3.
+    x = np.arange(8, dtype=np.float64)
+    y = np.array([0.0, 3.0, -3.0, 1.0, 0.0, 5.0, -5.0, 100.0])
+    assert lttb_indices(x, y, 4).tolist() == [0, 1, 6, 7]
+
+def test_matches_reference_implementation():
+    rng = np.random.default_rng(1)
+    x = np.sort(rng.uniform(0, 100, size=257))
+    y = rng.normal(size=257)
+    points = 17
+
+    # Straightforward LTTB with the same bucket edges
+    n = len(x)
+    edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+    expected = [0]
+    a = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 1 < points - 2:
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = [abs((x[a] - next_x) * (y[j] - y[a]) - (x[a] - x[j]) * (next_y - y[a])) for j in range(start, end)]
+        a = start + int(np.argmax(areas))
+        expected.append(a)
+    expected.append(n - 1)
+
+    assert lttb_indices(x, y, points).tolist() == expected
@@ -0,0 +1,47 @@
+import contextvars
+import threading
+import time
+import tracemalloc
+
+from utils.profiler import RequestProfiler, profiled_thread
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+def stage_thread(name, work):
+    def run():
+        with profiled_thread():
+            work()
+    return threading.Thread(target=contextvars.copy_context().run, args=(run,), name=name)
+
+def test_stage_threads_are_sampled_under_their_name():
+    with RequestProfiler("job-1", interval=0.002) as profiler:
+        threads = [stage_thread("stream-emotion", lambda: busy(0.2)), threading.Thread(target=busy, args=(0.2,))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    threads = profiler.report()["threads"]
+    assert threads.get("job", 0) > 0 and threads.get("stream-emotion", 0) > 0
+    # Threads that do not register with the profiler are left out
+    assert set(threads) == {"job", "stream-emotion"}
+    assert any(stack.startswith("stream-emotion;") and "busy" in stack for stack in profiler.stacks)
+
+def test_overlapping_jobs_keep_tracemalloc_until_the_last_one_stops():
+    assert not tracemalloc.is_tracing()
+    first, second = RequestProfiler("job-1"), RequestProfiler("job-2")
+    # Each job runs in its own thread, and so in its own context
+    first_job, second_job = contextvars.copy_context(), contextvars.copy_context()
+    first_job.run(first.start)
+    second_job.run(second.start)
+    first_job.run(first.stop)
+    assert tracemalloc.is_tracing()
+    second.mark("emotion")
+    data = bytearray(4 * 1024 * 1024)
+    second.mark("transcription")
+    del data
+    second_job.run(second.stop)
+    assert not tracemalloc.is_tracing()
+    assert second.stages["emotion"]["peak_bytes"] >= 4 * 1024 * 1024
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from utils.progress_history import RunningStats, UserProgress
+from utils.result_store import ResultStore
+
+def result(wps, emotions, duration=20.0, fillers=None, versatility=50.0):
+    """A minimal final analysis payload with 5 s emotion windows."""
+    return {
+        "duration": duration,
+        "transcription_data": [{"wps": value} for value in wps],
+        "emotion_segments": [
+            {"time_range": f"00:{5 * i:02d} - 00:{5 * (i + 1):02d}", "emotion": emotion}
+            for i, emotion in enumerate(emotions)
+        ],
+        "emotion_metrics": {"versatility_score": versatility, "main_emotion": emotions[0] if emotions else None},
+        "speech_clarity": {"fillers": fillers} if fillers else None,
+        "analysis_profile": {"name": "standard"}
+    }
+
+def test_running_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(2.0, 0.5, size=101)
+    stats = RunningStats()
+    for value in values[:40]:
+        stats.add(value)
+    stats.merge(values[40:90])
+    stats.merge(np.array([]))
+    stats.merge(values[90:])
+    assert stats.count == 101
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.variance == pytest.approx(values.var())
+
+def test_aggregates_and_trends():
+    progress = UserProgress("user")
+    progress.add("s1", result([2.0, 2.0], ["calm", "calm", "calm", "angry"], fillers={"total": 4, "total_per_minute": 12.0}), 1.0)
+    progress.add("s2", result([2.5, 3.5], ["calm", "happy"], versatility=70.0,
+                              fillers={"total": 2, "total_per_minute": 6.0}), 2.0)
+    summary = progress.summary()
+
+    assert summary["sessions"] == 2 and summary["total_duration"] == 40.0
+    assert summary["wps"]["mean"] == pytest.approx(2.5)
+    assert summary["session_wps"]["mean"] == pytest.approx(2.5)
+    assert summary["filler_rate"] == pytest.approx(9.0)
+    assert summary["emotion_distribution"] == {"calm": pytest.approx(4 / 6, abs=1e-3), "angry": pytest.approx(1 / 6, abs=1e-3),
+                                               "happy": pytest.approx(1 / 6, abs=1e-3)}
+    assert summary["trends"]["avg_wps"]["slope_per_session"] == pytest.approx(1.0)
+    assert summary["trends"]["versatility_score"]["slope_per_session"] == pytest.approx(20.0)
+    assert summary["first"]["session_id"] == "s1" and summary["last"]["session_id"] == "s2"
+    assert [session["session_id"] for session in progress.recent()] == ["s2", "s1"]
+
+def test_same_session_is_counted_once():
+    progress = UserProgress("user")
+    first = progress.add("s1", result([2.0], ["calm"]), 1.0)
+    assert progress.add("s1", result([9.0], ["angry"]), 2.0) == first
+    assert progress.summary()["sessions"] == 1
+
+def test_only_recent_timelines_are_kept():
+    progress = UserProgress("user", max_sessions=2)
+    for i in range(3):
+        progress.add(f"s{i}", result([2.0], ["calm"]), float(i))
+    assert progress.session("s0") is None
+    assert progress.compare("s0") is None
+    assert progress.summary()["sessions"] == 3
+
+def test_compare_two_sessions():
+    progress = UserProgress("user")
+    progress.add("a", result([2.0], ["calm", "calm", "calm", "calm"]), 1.0)
+    progress.add("b", result([3.0], ["calm", "calm", "angry", "angry"]), 2.0)
+
+    comparison = progress.compare("a", "b", bins=4)
+    assert comparison["delta"]["avg_wps"] == pytest.approx(1.0)
+    timeline = comparison["emotion_timeline"]
+    assert timeline["agreement"] == 0.5
+    assert timeline["share_change"] == {"calm": -0.5, "angry": 0.5}
+    assert timeline["differences"] == [{"start": 50.0, "end": 100.0, "a": "calm", "b": "angry"}]
+
+    absolute = progress.compare("a", "b", align="absolute")["emotion_timeline"]
+    assert absolute["differences"] == [{"start": 10.0, "end": 20.0, "a": "calm", "b": "angry"}]
+
+def test_compare_with_averages():
+    progress = UserProgress("user")
+    progress.add("a", result([2.0], ["calm"]), 1.0)
+    progress.add("b", result([4.0], ["calm"]), 2.0)
+    comparison = progress.compare("b")
+    assert comparison["versus"] == "average"
+    assert comparison["delta"]["avg_wps"] == pytest.approx(1.0)
+    assert comparison["avg_wps_zscore"] == pytest.approx(1.0)
+
+def test_exported_sessions_are_handed_over_once():
+    worker = ResultStore()
+    worker.export_sessions()
+    assert worker.record_session("user", "job", result([2.0], ["calm"]), 5.0) is None
+    assert worker.get_progress("user") is None
+
+    web = ResultStore()
+    sessions = worker.drain_sessions()
+    assert worker.drain_sessions() == []
+    for user_id, job_id, payload, timestamp in sessions:
+        web.record_session(user_id, job_id, payload, timestamp)
+    progress = web.get_progress("user")
+    assert progress["sessions"] == 1 and progress["last"]["timestamp"] == 5.0
+
+def test_failing_a_completed_job_keeps_it_completed():
+    store = ResultStore()
+    store.create_job("job")
+    store.set_result("job", {"success": True}, final=True)
+    store.fail("job", "recording the session failed")
+    job = store.get("job")
+    assert job["status"] == "completed" and job["error"] is None
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from services.audio_service import AudioSegmenter, AudioSegmenterConfig
+from services.pipeline import AnalysisPipeline
+from utils.cancellation import CancellationToken, JobCancelled
+from utils.data_processor import DataProcessor
+
+SAMPLE_RATE = 16000
+
+class FakeSegmenter(AudioSegmenter):
+    def __init__(self, samples):
+        super().__init__(AudioSegmenterConfig(audio_sample_rate=SAMPLE_RATE))
+        self.samples = samples
+
+    def load_audio(self, audio_path):
+        return self.samples
+
+class FakeSpeechAnalyzer:
+    model_name = "fake"
+    labels = ["calm", "angry"]
+
+    def __init__(self):
+        self.batches = 0
+
+    def predict_proba_batch(self, windows, sample_rate, batch_size=16, cancel_token=None):
+        probabilities = np.zeros((len(windows), 2), dtype=np.float32)
+        for start in range(0, len(windows), batch_size):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            self.batches += 1
+            probabilities[start:start + batch_size, 0] = 1.0
+        return probabilities
+
+class FakeTranscriber:
+    model = True
+    model_size = "fake"
+
+    def __init__(self, cancel_after=None, token=None):
+        self.calls = []
+        self.cancel_after = cancel_after
+        self.token = token
+
+    def transcribe_array(self, audio, time_offset=0.0, initial_prompt=None):
+        self.calls.append((time_offset, len(audio) / SAMPLE_RATE, initial_prompt))
+        if len(self.calls) == self.cancel_after:
+            self.token.cancel("client disconnected")
+        return [{"word": f"w{len(self.calls)}", "start": time_offset + 0.5, "end": time_offset + 1.0}]
+
+    def build_segment_data(self, index, start, end, text, emotion, stats=None):
+        return {"index": index, "text": text}
+
+def pipeline(duration, transcriber, speech_analyzer=None):
+    samples = np.zeros(int(duration * SAMPLE_RATE), dtype=np.float32)
+    segmenter = FakeSegmenter(samples)
+    built = AnalysisPipeline(segmenter, speech_analyzer or FakeSpeechAnalyzer(), transcriber, None,
+                             DataProcessor("ffmpeg"), None)
+    audio = {"full_audio_path": "unused.wav", "duration": duration, "windows": segmenter.plan_segments(duration)}
+    return built, audio
+
+def test_whisper_runs_over_chunks_of_planned_windows():
+    transcriber = FakeTranscriber()
+    built, audio = pipeline(120.0, transcriber)
+    _, _, transcription_data, _ = built._infer_pyramid(audio, lambda stage, fraction: None, {})
+    offsets = [offset for offset, _, _ in transcriber.calls]
+    starts = {start for start, _ in audio["windows"]}
+    assert len(transcriber.calls) > 1 and set(offsets) <= starts
+    assert all(seconds <= built.pyramid_config.transcription_chunk for _, seconds, _ in transcriber.calls)
+    assert sum(seconds for _, seconds, _ in transcriber.calls) == pytest.approx(120.0)
+    # Each chunk is decoded with the preceding words as context
+    assert transcriber.calls[0][2] is None and transcriber.calls[1][2] == "w1"
+    assert len(transcription_data) == len(audio["windows"])
+
+def test_cancelling_stops_after_the_chunk_in_progress():
+    token = CancellationToken()
+    transcriber = FakeTranscriber(cancel_after=2, token=token)
+    built, audio = pipeline(600.0, transcriber)
+    with pytest.raises(JobCancelled):
+        built._infer_pyramid(audio, lambda stage, fraction: None, {}, token)
+    assert len(transcriber.calls) == 2
+
+def test_cancelled_jobs_skip_the_emotion_batches():
+    token = CancellationToken()
+    token.cancel()
+    speech_analyzer = FakeSpeechAnalyzer()
+    transcriber = FakeTranscriber()
+    built, audio = pipeline(600.0, transcriber, speech_analyzer)
+    with pytest.raises(JobCancelled):
+        built._infer_pyramid(audio, lambda stage, fraction: None, {}, token)
+    assert speech_analyzer.batches == 0 and transcriber.calls == []
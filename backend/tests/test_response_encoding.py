@@ -0,0 +1,65 @@
+import gzip
+
+import numpy as np
+import orjson
+import pytest
+
+from utils import response_encoding
+from utils.response_encoding import ResponseEncoder
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(response_encoding, "brotli", None)
+    return ResponseEncoder(min_compress_bytes=0)
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*;q=0.1, gzip;q=0", None),
+    ("GZIP ; q=1.0", "gzip"),
+    ("gzip;q=abc", None),
+])
+def test_negotiate_gzip_only(gzip_only, header, expected):
+    assert gzip_only.negotiate(header) == expected
+
+def test_negotiate_prefers_brotli_when_available(monkeypatch):
+    monkeypatch.setattr(response_encoding, "brotli", object())
+    encoder = ResponseEncoder()
+    assert encoder.negotiate("gzip, deflate, br") == "br"
+    assert encoder.negotiate("gzip, br;q=0.5") == "gzip"
+    assert encoder.negotiate("br;q=0, *") == "gzip"
+
+def test_small_bodies_are_not_compressed(gzip_only):
+    gzip_only.min_compress_bytes = 1024
+    body, headers = gzip_only.encode({"success": True}, "gzip")
+    assert orjson.loads(body) == {"success": True}
+    assert "Content-Encoding" not in headers and headers["Vary"] == "Accept-Encoding"
+
+def test_compressed_round_trip_with_numpy(gzip_only):
+    payload = {"probabilities": np.array([[0.25, 0.75]], dtype=np.float32), "count": np.int64(3)}
+    body, headers = gzip_only.encode(payload, "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(body)) == {"probabilities": [[0.25, 0.75]], "count": 3}
+
+def test_columnar_layout_is_applied_to_nested_payloads(gzip_only):
+    payload = {
+        "status": "completed",
+        "result": {
+            "emotion_segments": [{"time_range": "00:00 - 00:05", "emotion": "calm"},
+                                 {"time_range": "00:05 - 00:10", "emotion": "happy"}],
+            "transcription_data": [{"index": 0, "text": "hi"}, {"index": 1, "text": "there", "words": []}],
+            "other": [{"kept": True}]
+        }
+    }
+    body, _ = gzip_only.encode(payload, None, columnar=True)
+    decoded = orjson.loads(body)
+    assert decoded["layout"] == "columnar"
+    result = decoded["result"]
+    assert result["emotion_segments"] == {"time_range": ["00:00 - 00:05", "00:05 - 00:10"], "emotion": ["calm", "happy"]}
+    assert result["transcription_data"] == {"index": [0, 1], "text": ["hi", "there"], "words": [None, []]}
+    assert result["other"] == [{"kept": True}]
@@ -0,0 +1,67 @@
+from utils.result_store import ResultStore
+
+def finish(store, job_id):
+    store.create_job(job_id)
+    store.set_result(job_id, {"video_id": job_id}, final=True)
+
+def test_preview_is_replaced_by_the_final_result():
+    store = ResultStore()
+    store.create_job("job")
+    store.update_progress("job", "preview", "emotion", 0.1)
+    store.set_result("job", {"phase": "preview"})
+    assert store.get("job")["status"] == "running"
+    assert store.get_token("job") is not None
+    store.set_result("job", {"phase": "complete"}, final=True)
+    job = store.get("job")
+    assert job["status"] == "completed" and job["progress"] == 1.0 and job["result"] == {"phase": "complete"}
+    assert store.get_token("job") is None
+
+def test_finished_jobs_beyond_the_cap_are_evicted_oldest_first():
+    store = ResultStore(max_finished_jobs=2)
+    for job_id in ("a", "b", "c"):
+        finish(store, job_id)
+    assert store.get("a") is None
+    assert store.get("b") is not None and store.get("c") is not None
+
+def test_running_jobs_are_never_evicted():
+    store = ResultStore(max_finished_jobs=1, finished_ttl=0.0)
+    store.create_job("running")
+    finish(store, "done")
+    store.create_job("next")
+    assert store.get("running")["status"] == "queued"
+    assert store.get("done") is None
+
+def test_finished_jobs_expire_after_the_ttl():
+    store = ResultStore(finished_ttl=60.0)
+    finish(store, "old")
+    store._finished["old"] -= 120.0
+    store.create_job("new")
+    assert store.get("old") is None
+
+def test_cancelled_and_failed_jobs_are_evicted_too():
+    store = ResultStore(max_finished_jobs=1)
+    store.create_job("cancelled")
+    assert store.cancel("cancelled") == "cancelled"
+    store.create_job("failed")
+    store.fail("failed", "boom")
+    assert store.get("cancelled") is None
+    assert store.get("failed")["status"] == "failed"
+
+def test_history_keeps_the_most_recently_used_users():
+    store = ResultStore(max_users=2)
+    payload = {"duration": 10.0, "transcription_data": [], "emotion_segments": []}
+    store.record_session("a", "a1", payload)
+    store.record_session("b", "b1", payload)
+    assert store.get_progress("a") is not None
+    store.record_session("c", "c1", payload)
+    assert store.get_progress("b") is None
+    assert store.get_progress("a") is not None and store.get_progress("c") is not None
+
+def test_artifacts_are_evicted_least_recently_used():
+    store = ResultStore(max_artifacts=2)
+    store.set_artifact("v1", "pyramid", 1)
+    store.set_artifact("v2", "pyramid", 2)
+    assert store.get_artifact("v1", "pyramid") == 1
+    store.set_artifact("v3", "pyramid", 3)
+    assert store.get_artifact("v2", "pyramid") is None
+    assert store.get_artifact("v1", "pyramid") == 1
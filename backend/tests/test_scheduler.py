@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from utils.cancellation import CancellationToken, JobCancelled
+from utils.scheduler import FairScheduler
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+def run_queued(scheduler, jobs):
+    """Queue jobs behind a held slot, release it and return the order in which they started."""
+    order = []
+
+    def run(client_id, cost, name):
+        with scheduler.slot(client_id, cost, name):
+            order.append(name)
+
+    with scheduler.slot("holder", 1.0):
+        threads = []
+        for client_id, cost, name in jobs:
+            thread = threading.Thread(target=run, args=(client_id, cost, name))
+            thread.start()
+            threads.append(thread)
+            # Enqueue in a known order
+            wait_until(lambda: scheduler.load()["queued"] == len(threads))
+    for thread in threads:
+        thread.join(5)
+    return order
+
+def test_estimate_cost_adds_base_cost():
+    scheduler = FairScheduler(base_cost=5.0)
+    assert scheduler.estimate_cost(60.0) == 65.0
+    assert scheduler.estimate_cost(-1.0) == 5.0
+
+def test_short_clip_is_not_stuck_behind_another_clients_long_jobs():
+    scheduler = FairScheduler(max_concurrent=1, per_client_limit=1)
+    order = run_queued(scheduler, [
+        ("a", 600.0, "a1"),
+        ("a", 600.0, "a2"),
+        ("a", 600.0, "a3"),
+        ("b", 10.0, "b1"),
+    ])
+    assert order.index("b1") < order.index("a1")
+    assert sorted(order) == ["a1", "a2", "a3", "b1"]
+
+def test_cheapest_job_of_a_client_goes_first():
+    scheduler = FairScheduler(max_concurrent=1)
+    order = run_queued(scheduler, [("a", 300.0, "long"), ("a", 20.0, "short")])
+    assert order == ["short", "long"]
+
+def test_weights_share_slots_by_cost():
+    scheduler = FairScheduler(max_concurrent=1, client_weights={"heavy": 2.0})
+    order = run_queued(scheduler, [
+        ("light", 100.0, "l1"),
+        ("light", 100.0, "l2"),
+        ("heavy", 100.0, "h1"),
+        ("heavy", 100.0, "h2"),
+    ])
+    # Twice the weight: both heavy jobs finish their virtual time before the second light job
+    assert order.index("h2") < order.index("l2")
+
+def test_per_client_limit():
+    scheduler = FairScheduler(max_concurrent=2, per_client_limit=1)
+    with scheduler.slot("a", 10.0):
+        started = threading.Event()
+
+        def second():
+            with scheduler.slot("a", 10.0):
+                started.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        wait_until(lambda: scheduler.load()["queued"] == 1)
+        assert scheduler.load()["free_slots"] == 1
+        assert not started.is_set()
+    thread.join(5)
+    assert started.is_set()
+
+def test_cancelled_job_leaves_the_queue():
+    scheduler = FairScheduler(max_concurrent=1)
+    token = CancellationToken()
+    errors = []
+
+    def queued():
+        try:
+            with scheduler.slot("b", 10.0, "b1", token):
+                pass
+        except JobCancelled as e:
+            errors.append(e)
+
+    with scheduler.slot("a", 10.0):
+        thread = threading.Thread(target=queued)
+        thread.start()
+        wait_until(lambda: scheduler.load()["queued"] == 1)
+        token.cancel("client disconnected")
+        thread.join(5)
+        assert scheduler.load()["queued"] == 0
+    assert len(errors) == 1
+    assert scheduler.load() == {"queued": 0, "queued_cost": 0, "running": 0, "running_cost": 0.0, "free_slots": 1}
+
+def test_stats_report_queue_waits():
+    scheduler = FairScheduler(max_concurrent=1)
+    with scheduler.slot("a", 10.0, "a1") as job:
+        assert job.queue_wait >= 0.0
+    stats = scheduler.stats()
+    assert stats["running"] == 0 and stats["queued"] == 0
+    assert stats["queue_wait"]["max"] >= stats["queue_wait"]["p50"] >= 0.0
+
+def test_slot_is_released_when_the_job_raises():
+    scheduler = FairScheduler(max_concurrent=1)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot("a", 10.0):
+            raise RuntimeError("boom")
+    assert scheduler.load()["free_slots"] == 1
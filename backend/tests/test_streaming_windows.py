@@ -0,0 +1,71 @@
+import types
+
+import numpy as np
+import pytest
+
+from services.audio_service import AudioSegmenter, AudioSegmenterConfig
+from services.streaming_pipeline import StreamingAnalyzer
+
+SAMPLE_RATE = 1000
+
+@pytest.fixture
+def analyzer():
+    segmenter = AudioSegmenter(AudioSegmenterConfig(min_duration=4, max_duration=7, audio_sample_rate=SAMPLE_RATE))
+    return StreamingAnalyzer(types.SimpleNamespace(audio_segmenter=segmenter))
+
+def chunked(samples, seconds):
+    size = int(seconds * SAMPLE_RATE)
+    for start in range(0, len(samples), size):
+        yield samples[start:start + size]
+
+def cut_all(analyzer, samples, probed, chunk_seconds=3.3):
+    decoded = {"seconds": 0.0}
+    batches = list(analyzer.cut_windows(chunked(samples, chunk_seconds), analyzer.plan(probed), decoded))
+    return [window for batch in batches for window in batch], batches, decoded
+
+@pytest.mark.parametrize("chunk_seconds", [0.5, 3.3, 30.0])
+def test_windows_match_the_file_based_plan(analyzer, chunk_seconds):
+    samples = np.arange(95 * SAMPLE_RATE, dtype=np.float32)
+    windows, _, decoded = cut_all(analyzer, samples, 95.0, chunk_seconds)
+
+    planned = analyzer.pipeline.audio_segmenter.plan_segments(95.0)
+    assert [(start, end) for _, start, end, _ in windows] == pytest.approx(planned)
+    assert [index for index, _, _, _ in windows] == list(range(len(planned)))
+    for _, start, end, window in windows:
+        np.testing.assert_array_equal(window, samples[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)])
+    assert decoded["seconds"] == pytest.approx(95.0)
+
+def test_windows_are_released_before_the_stream_ends(analyzer):
+    samples = np.zeros(120 * SAMPLE_RATE, dtype=np.float32)
+    _, batches, _ = cut_all(analyzer, samples, 120.0, chunk_seconds=10.0)
+    # One batch per chunk once a window plus the holdback is decoded, then the tail
+    assert len(batches) > 5
+    assert all(len(batch) <= 3 for batch in batches[:-1])
+
+def test_unknown_duration_uses_maximum_windows(analyzer):
+    samples = np.ones(30 * SAMPLE_RATE, dtype=np.float32)
+    windows, _, _ = cut_all(analyzer, samples, 0.0)
+    bounds = [(start, end) for _, start, end, _ in windows]
+    # 30 s = 4 x 7 s + 2 s; the short tail is merged into the previous window
+    assert bounds == pytest.approx([(0, 7), (7, 14), (14, 21), (21, 30)])
+    assert sum(len(window) for _, _, _, window in windows) == len(samples)
+
+def test_overstated_duration_is_fit_to_the_decoded_audio(analyzer):
+    samples = np.ones(50 * SAMPLE_RATE, dtype=np.float32)
+    windows, _, decoded = cut_all(analyzer, samples, 80.0)
+    assert windows[-1][2] == pytest.approx(50.0)
+    assert all(end > start for _, start, end, _ in windows)
+    assert all(len(window) > 0 for _, _, _, window in windows)
+    assert decoded["seconds"] == pytest.approx(50.0)
+
+def test_understated_duration_continues_past_the_plan(analyzer):
+    samples = np.ones(40 * SAMPLE_RATE, dtype=np.float32)
+    windows, _, _ = cut_all(analyzer, samples, 20.0)
+    assert windows[-1][2] == pytest.approx(40.0)
+    for (_, _, end, _), (_, start, _, _) in zip(windows, windows[1:]):
+        assert start == pytest.approx(end)
+    assert max(end - start for _, start, end, _ in windows[:-1]) <= 7.0 + 1e-9
+
+def test_empty_stream_yields_nothing(analyzer):
+    windows, batches, decoded = cut_all(analyzer, np.zeros(0, dtype=np.float32), 10.0)
+    assert windows == [] and batches == [] and decoded["seconds"] == 0.0
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from services.timeline_pyramid import PyramidConfig, TimelinePyramid
+
+SAMPLE_RATE = 100
+CONFIG = PyramidConfig(window_duration=2.0, hop_duration=1.0, levels=(5.0,))
+
+def test_fine_windows_reach_the_last_sample():
+    audio = np.arange(1050, dtype=np.float32)
+    windows = TimelinePyramid.fine_windows(audio, SAMPLE_RATE, CONFIG)
+    assert all(len(window) == 200 for window in windows)
+    assert windows[0][0] == 0 and windows[1][0] == 100
+    # 10.5 s: hops start at 0..8 s, plus a last window pulled back to end at 10.5 s
+    assert len(windows) == 10
+    assert windows[-1][-1] == 1049 and windows[-1][0] == 850
+
+def test_fine_windows_without_a_partial_hop():
+    audio = np.arange(1000, dtype=np.float32)
+    windows = TimelinePyramid.fine_windows(audio, SAMPLE_RATE, CONFIG)
+    assert len(windows) == 9 and windows[-1][-1] == 999
+
+def test_short_clip_is_padded_to_one_window():
+    windows = TimelinePyramid.fine_windows(np.ones(50, dtype=np.float32), SAMPLE_RATE, CONFIG)
+    assert len(windows) == 1 and len(windows[0]) == 200 and windows[0][49] == 1 and windows[0][50] == 0
+
+def pyramid(duration, probabilities, words=()):
+    return TimelinePyramid(["calm", "angry"], np.asarray(probabilities, dtype=np.float32), list(words), duration, CONFIG)
+
+def test_window_centers_follow_the_fine_windows():
+    windows = TimelinePyramid.fine_windows(np.zeros(1050, dtype=np.float32), SAMPLE_RATE, CONFIG)
+    built = pyramid(10.5, np.tile([1.0, 0.0], (len(windows), 1)))
+    assert built.window_centers[:3].tolist() == [1.0, 2.0, 3.0]
+    assert built.window_centers[-1] == pytest.approx(9.5)
+
+def test_summarize_windows_derives_the_standard_timeline():
+    # Calm for the first half of a 10 s clip, angry for the second
+    probabilities = [[1.0, 0.0]] * 4 + [[0.0, 1.0]] * 5
+    words = [{"word": "hello", "start": 0.5, "end": 0.9}, {"word": "there", "start": 5.2, "end": 5.6},
+             {"word": "friend", "start": 9.0, "end": 9.5}]
+    built = pyramid(10.0, probabilities, words)
+    summary, texts = built.summarize_windows([(0.0, 5.0), (5.0, 10.0)])
+    assert summary.shape == (2, 2)
+    assert summary[0].argmax() == 0 and summary[1].argmax() == 1
+    np.testing.assert_allclose(summary.sum(axis=1), 1.0, rtol=1e-6)
+    assert texts == ["hello", "there friend"]
+
+def test_summarize_windows_fills_windows_without_a_fine_centre():
+    built = pyramid(4.0, [[1.0, 0.0], [0.0, 1.0], [0.0, 1.0]])
+    summary, texts = built.summarize_windows([(0.0, 1.2), (1.2, 1.8), (1.8, 4.0)])
+    assert summary[1].tolist() == [1.0, 0.0]
+    assert texts == ["", "", ""]
+
+def test_levels_aggregate_the_fine_windows():
+    probabilities = [[1.0, 0.0]] * 4 + [[0.0, 1.0]] * 5
+    words = [{"word": "a", "start": 1.0, "end": 1.2}, {"word": "b", "start": 7.0, "end": 7.2}]
+    level = pyramid(10.0, probabilities, words).level(5.0)
+    assert level["emotion"] == ["calm", "angry"]
+    assert level["word_count"] == [1, 1] and level["wps"] == [0.2, 0.2]
+    with pytest.raises(ValueError):
+        pyramid(10.0, probabilities).level(0.5)
@@ -0,0 +1,88 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from utils.tracing import OTLPSpanHandler
+
+class Collector:
+    """OTLP/HTTP stand-in that records the spans it receives, optionally slowly."""
+
+    def __init__(self, delay=0.0):
+        self.spans = []
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(delay)
+                collector.spans.extend(body["resourceSpans"][0]["scopeSpans"][0]["spans"])
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def collector():
+    started = Collector()
+    yield started
+    started.close()
+
+def span_record(index):
+    return logging.makeLogRecord({"span": {
+        "trace_id": "0" * 32, "span_id": f"{index:016x}", "parent_id": None, "name": "stage",
+        "start_time": time.time(), "duration": 0.01, "attributes": {"index": index}, "status": "ok"
+    }})
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_spans_are_posted_on_a_timer(collector):
+    handler = OTLPSpanHandler(collector.url, batch_size=64, flush_interval=0.2)
+    for index in range(3):
+        handler.emit(span_record(index))
+    # No further span arrives, yet the partial batch goes out after flush_interval
+    assert wait_for(lambda: len(collector.spans) == 3)
+    assert [span["spanId"] for span in collector.spans] == [f"{index:016x}" for index in range(3)]
+    handler.close()
+
+def test_a_slow_collector_never_blocks_emit():
+    slow = Collector(delay=0.3)
+    handler = OTLPSpanHandler(slow.url, batch_size=2, flush_interval=0.05, max_queue=4, timeout=2.0)
+    started = time.perf_counter()
+    for index in range(200):
+        handler.emit(span_record(index))
+    assert time.perf_counter() - started < 0.5
+    # Spans beyond the bounded queue are dropped and counted
+    assert handler.dropped >= 200 - 4 - 2
+    handler.close()
+    slow.close()
+
+def test_close_posts_the_queued_spans(collector):
+    handler = OTLPSpanHandler(collector.url, batch_size=4, flush_interval=60.0)
+    for index in range(10):
+        handler.emit(span_record(index))
+    handler.close()
+    assert len(collector.spans) == 10 and handler.dropped == 0
+
+def test_an_unreachable_collector_counts_dropped_spans():
+    handler = OTLPSpanHandler("http://127.0.0.1:9", batch_size=2, flush_interval=0.05, timeout=0.5)
+    for index in range(4):
+        handler.emit(span_record(index))
+    assert wait_for(lambda: handler.dropped == 4)
+    handler.close()
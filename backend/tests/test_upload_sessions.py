@@ -0,0 +1,172 @@
+import base64
+import hashlib
+import io
+import os
+
+import pytest
+
+from utils.upload_sessions import UploadSessionStore, UploadError, sniff_container, mp4_moov_first
+
+def box(kind, payload=b""):
+    return (8 + len(payload)).to_bytes(4, "big") + kind + payload
+
+# A faststart MP4: ftyp, then the index (moov), then the media data
+FASTSTART_MP4 = box(b"ftyp", b"isom\x00\x00\x02\x00") + box(b"moov", b"\x00" * 32) + box(b"mdat", os.urandom(4000))
+
+def checksum(data, algorithm="sha1"):
+    return f"{algorithm} {base64.b64encode(hashlib.new(algorithm, data).digest()).decode()}"
+
+class FakeDecoder:
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.ranges = []
+
+    def feed(self, path, start, end):
+        self.ranges.append((start, end))
+
+    def finish(self, timeout):
+        with open(self.output_path, "wb") as f:
+            f.write(b"RIFF")
+        return self.output_path
+
+    def abort(self):
+        pass
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadSessionStore(
+        str(tmp_path / "sessions"),
+        max_bytes=1024 * 1024,
+        probe_bytes=64,
+        media_probe=lambda path: {"audio_codec": "aac", "video_codec": "h264"}
+    )
+
+def upload(store, data, chunk_size):
+    session = store.create("talk.mp4", len(data))
+    for offset in range(0, len(data), chunk_size):
+        chunk = data[offset:offset + chunk_size]
+        session = store.append(session.upload_id, offset, io.BytesIO(chunk), checksum(chunk))
+    return session
+
+def test_chunks_reassemble_the_file(store, tmp_path):
+    session = upload(store, FASTSTART_MP4, 1000)
+    assert session.complete and session.offset == len(FASTSTART_MP4)
+    assert session.container == "mp4" and session.streamable is True
+
+    destination = str(tmp_path / "talk.mp4")
+    files = store.finish(session.upload_id, destination)
+    assert files == {"video_path": destination, "decoded_audio": None}
+    with open(destination, "rb") as f:
+        assert f.read() == FASTSTART_MP4
+    assert store.get(session.upload_id) is None
+
+def test_checksum_mismatch_keeps_the_offset(store):
+    session = store.create("talk.mp4", len(FASTSTART_MP4))
+    first = FASTSTART_MP4[:1000]
+    store.append(session.upload_id, 0, io.BytesIO(first), checksum(first))
+
+    second = FASTSTART_MP4[1000:2000]
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 1000, io.BytesIO(second), checksum(b"corrupted"))
+    assert error.value.status == 460
+    assert store.get(session.upload_id).offset == 1000
+    assert os.path.getsize(store.data_path(session.upload_id)) == 1000
+
+    # The client resends the same chunk
+    store.append(session.upload_id, 1000, io.BytesIO(second), checksum(second, "md5"))
+    assert store.get(session.upload_id).offset == 2000
+
+@pytest.mark.parametrize("header, status", [
+    ("crc32 AAAA", 400),
+    ("sha1 not-base64!", 400),
+])
+def test_invalid_checksum_header(store, header, status):
+    session = store.create("talk.mp4", len(FASTSTART_MP4))
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 0, io.BytesIO(FASTSTART_MP4[:100]), header)
+    assert error.value.status == status
+
+def test_offset_mismatch_is_rejected(store):
+    session = store.create("talk.mp4", len(FASTSTART_MP4))
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 500, io.BytesIO(FASTSTART_MP4[500:600]))
+    assert error.value.status == 409
+
+def test_chunk_past_the_length_is_rejected(store):
+    session = store.create("talk.mp4", 100)
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 0, io.BytesIO(FASTSTART_MP4[:200]))
+    assert error.value.status == 413
+    assert store.get(session.upload_id).offset == 0
+
+def test_length_limits(store):
+    with pytest.raises(UploadError) as error:
+        store.create("talk.mp4", 0)
+    assert error.value.status == 400
+    with pytest.raises(UploadError) as error:
+        store.create("talk.mp4", 2 * 1024 * 1024)
+    assert error.value.status == 413
+
+def test_non_video_is_rejected_on_the_first_chunk(store):
+    session = store.create("talk.mp4", 4000)
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 0, io.BytesIO(b"%PDF-1.7" + b"\x00" * 100))
+    assert error.value.status == 415
+    assert store.get(session.upload_id) is None
+    assert not os.path.exists(store.data_path(session.upload_id))
+
+def test_video_without_audio_is_rejected(tmp_path):
+    store = UploadSessionStore(str(tmp_path), 1024 * 1024, probe_bytes=64,
+                               media_probe=lambda path: {"audio_codec": None, "video_codec": "h264"})
+    session = store.create("talk.mp4", len(FASTSTART_MP4))
+    with pytest.raises(UploadError) as error:
+        store.append(session.upload_id, 0, io.BytesIO(FASTSTART_MP4[:1000]))
+    assert error.value.status == 415
+
+def test_streamable_upload_is_decoded_while_received(tmp_path):
+    decoders = []
+
+    def decoder_factory(output_path):
+        decoders.append(FakeDecoder(output_path))
+        return decoders[-1]
+
+    store = UploadSessionStore(str(tmp_path / "sessions"), 1024 * 1024, probe_bytes=64,
+                               media_probe=lambda path: {"audio_codec": "aac"}, decoder_factory=decoder_factory)
+    session = upload(store, FASTSTART_MP4, 1500)
+    assert len(decoders) == 1
+    # Every byte is fed exactly once, in order
+    assert decoders[0].ranges == [(0, 1500), (1500, 3000), (3000, len(FASTSTART_MP4))]
+
+    files = store.finish(session.upload_id, str(tmp_path / "talk.mp4"))
+    assert files["decoded_audio"] == str(tmp_path / "talk.wav")
+    assert os.path.exists(files["decoded_audio"])
+
+def test_sessions_survive_a_restart(store):
+    session = store.create("talk.mp4", len(FASTSTART_MP4))
+    store.append(session.upload_id, 0, io.BytesIO(FASTSTART_MP4[:1000]))
+
+    reloaded = UploadSessionStore(store.root, store.max_bytes)
+    assert reloaded.get(session.upload_id).offset == 1000
+    reloaded.append(session.upload_id, 1000, io.BytesIO(FASTSTART_MP4[1000:]))
+    assert reloaded.get(session.upload_id).complete
+
+def test_delete_and_expiry(store):
+    session = store.create("talk.mp4", 100)
+    assert store.delete(session.upload_id)
+    assert not store.delete(session.upload_id)
+
+    idle = store.create("talk.mp4", 100)
+    store.expire_seconds = -1
+    assert store.collect_expired() == 1
+    assert store.get(idle.upload_id) is None
+
+def test_container_sniffing():
+    assert sniff_container(FASTSTART_MP4[:12]) == "mp4"
+    assert sniff_container(b"\x1a\x45\xdf\xa3" + b"\x00" * 8) == "matroska"
+    assert sniff_container(b"RIFF\x00\x00\x00\x00AVI ") == "avi"
+    assert sniff_container(b"RIFF\x00\x00\x00\x00WAVE") is None
+
+def test_moov_position():
+    assert mp4_moov_first(FASTSTART_MP4) is True
+    assert mp4_moov_first(box(b"ftyp", b"isom") + box(b"mdat", b"\x00" * 16) + box(b"moov")) is False
+    assert mp4_moov_first(box(b"ftyp", b"isom")) is None
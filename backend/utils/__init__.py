@@ -1,10 +1,38 @@
 """
 Utilities package for Speechably application.
+
+Exports are resolved lazily so that importing one light utility module
+does not pull in pandas or NumPy.
 """
-from utils.data_processor import DataProcessor
-from utils.visualization import VisualizationHelper
+import importlib
+
+_EXPORTS = {
+    'DataProcessor': 'utils.data_processor',
+    'VisualizationHelper': 'utils.visualization',
+    'ResultStore': 'utils.result_store',
+    'WindowCache': 'utils.window_cache',
+    'FairScheduler': 'utils.scheduler',
+    'ScheduledJob': 'utils.scheduler',
+    'CancellationToken': 'utils.cancellation',
+    'JobCancelled': 'utils.cancellation',
+    'CheckpointStore': 'utils.checkpoint_store',
+    'JobCheckpoint': 'utils.checkpoint_store',
+    'RequestProfiler': 'utils.profiler',
+    'ResponseEncoder': 'utils.response_encoding',
+    'FillerDetector': 'utils.filler_detector',
+    'UserProgress': 'utils.progress_history',
+    'RunningStats': 'utils.progress_history',
+    'AnalyticsExporter': 'utils.analytics_export',
+    'UploadSessionStore': 'utils.upload_sessions',
+    'UploadError': 'utils.upload_sessions',
+    'configure_logging': 'utils.tracing',
+    'span': 'utils.tracing',
+    'trace': 'utils.tracing'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'DataProcessor',
-    'VisualizationHelper'
-] 
\ No newline at end of file
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'utils' has no attribute '{name}'")
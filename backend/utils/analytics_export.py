@@ -0,0 +1,286 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+import numpy as np
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from utils.data_processor import DataProcessor
+
+logger = logging.getLogger(__name__)
+
+class AnalyticsExporter:
+    """
+    Appends completed analyses to a columnar dataset for offline analytics.
+
+    Each analysis becomes one row per window (video id, start, end, emotion,
+    emotion probabilities, words, WPS, fillers). Rows are buffered and written
+    as Parquet or Arrow IPC files under Hive-style date partitions
+    (date=YYYY-MM-DD), so analytics jobs can scan months of sessions with
+    column pruning, partition filters and memory mapping instead of
+    parsing JSON. Requires the optional pyarrow package.
+    """
+
+    FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+
+    def __init__(
+        self,
+        root: str,
+        format: str = "parquet",
+        max_buffered_rows: int = 20000,
+        max_buffer_seconds: float = 300.0,
+        compression: str = "zstd"
+    ):
+        """
+        Initialize the exporter.
+
+        Args:
+            root: Dataset directory (created when missing)
+            format: "parquet" or "arrow" (Arrow IPC file format, memory-mappable)
+            max_buffered_rows: Rows buffered before a file is written
+            max_buffer_seconds: Oldest buffered row age that also triggers a write
+            compression: Parquet codec, or Arrow IPC buffer codec ("zstd", "lz4" or None)
+
+        Raises:
+            RuntimeError: If pyarrow is not installed
+            ValueError: If the format is unknown
+        """
+        if pa is None:
+            raise RuntimeError("Analytics export requires the pyarrow package")
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown export format '{format}' (available: {', '.join(self.FORMATS)})")
+        self.root = root
+        self.format = format
+        self.max_buffered_rows = max_buffered_rows
+        self.max_buffer_seconds = max_buffer_seconds
+        self.compression = compression
+        self._buffers: Dict[str, List["pa.Table"]] = {}
+        self._buffered_rows = 0
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        atexit.register(self.flush)
+
+    @classmethod
+    def from_env(cls) -> Optional["AnalyticsExporter"]:
+        """
+        Create the exporter configured by ANALYTICS_EXPORT_DIR and
+        ANALYTICS_EXPORT_FORMAT (parquet or arrow).
+
+        Returns:
+            AnalyticsExporter, or None when export is disabled or pyarrow is missing
+        """
+        root = os.environ.get("ANALYTICS_EXPORT_DIR")
+        if not root:
+            return None
+        if pa is None:
+            logger.warning("ANALYTICS_EXPORT_DIR is set but pyarrow is not installed; analytics export disabled")
+            return None
+        return cls(root, format=os.environ.get("ANALYTICS_EXPORT_FORMAT", "parquet"))
+
+    @staticmethod
+    def schema(labels: Optional[List[str]] = None) -> "pa.Schema":
+        """
+        Row schema of the dataset.
+
+        Args:
+            labels: Emotion labels in probability order (stored as schema metadata)
+
+        Returns:
+            pyarrow Schema
+        """
+        return pa.schema([
+            ("video_id", pa.string()),
+            ("analyzed_at", pa.timestamp("ms", tz="UTC")),
+            ("analysis_profile", pa.string()),
+            ("window", pa.int32()),
+            ("start", pa.float32()),
+            ("end", pa.float32()),
+            ("emotion", pa.dictionary(pa.int8(), pa.string())),
+            ("probabilities", pa.list_(pa.float32())),
+            ("text", pa.string()),
+            ("words", pa.int32()),
+            ("wps", pa.float32()),
+            ("fillers", pa.int16())
+        ], metadata={"emotion_labels": json.dumps(labels or [])})
+
+    def to_table(
+        self,
+        result: Dict[str, Any],
+        analyzed_at: Optional[float] = None,
+        probabilities: Optional[np.ndarray] = None,
+        labels: Optional[List[str]] = None,
+        analysis_profile: Optional[str] = None
+    ) -> Optional["pa.Table"]:
+        """
+        Convert a response payload into per-window rows.
+
+        Args:
+            result: Final response payload (records layout)
+            analyzed_at: Completion time in epoch seconds (default: now)
+            probabilities: Optional (windows, labels) emotion probabilities
+            labels: Emotion labels in probability column order
+            analysis_profile: Profile name (default: the payload's analysis_profile)
+
+        Returns:
+            Table with one row per window, or None when the result has no windows
+        """
+        segments = result.get("emotion_segments") or []
+        n = len(segments)
+        if not n:
+            return None
+
+        # Window bounds from the timeline; transcribed windows carry exact times
+        start = np.array([DataProcessor.parse_timestamp(segment["time_range"].split(" - ")[0]) for segment in segments], dtype=np.float32)
+        end = np.array([DataProcessor.parse_timestamp(segment["time_range"].split(" - ")[1]) for segment in segments], dtype=np.float32)
+        text: List[Optional[str]] = [None] * n
+        words = np.zeros(n, dtype=np.int32)
+        wps = np.zeros(n, dtype=np.float32)
+        transcribed = np.zeros(n, dtype=bool)
+        for position, segment in enumerate(result.get("transcription_data") or []):
+            index = segment.get("index", position)
+            if 0 <= index < n:
+                start[index], end[index] = segment["start"], segment["end"]
+                text[index] = segment["text"]
+                words[index] = len(segment["text"].split())
+                wps[index] = segment["wps"]
+                transcribed[index] = True
+
+        fillers = np.zeros(n, dtype=np.int16)
+        filler_data = (result.get("speech_clarity") or {}).get("fillers") or {}
+        indices = [
+            event["segment"] for event in filler_data.get("events", [])
+            if event["filler"] != "repetition" and event.get("segment") is not None
+        ]
+        if indices:
+            fillers += np.bincount(np.array(indices), minlength=n)[:n].astype(np.int16)
+
+        if probabilities is not None and len(probabilities) == n:
+            flat = np.ascontiguousarray(probabilities, dtype=np.float32)
+            probability_column = pa.FixedSizeListArray.from_arrays(pa.array(flat.ravel()), flat.shape[1]).cast(pa.list_(pa.float32()))
+        else:
+            probability_column = pa.nulls(n, pa.list_(pa.float32()))
+
+        analyzed_at = analyzed_at if analyzed_at is not None else time.time()
+        analysis_profile = analysis_profile or (result.get("analysis_profile") or {}).get("name")
+        schema = self.schema(labels)
+        columns = [
+            pa.array([result.get("video_id")] * n, pa.string()),
+            pa.array(np.full(n, int(analyzed_at * 1000), dtype=np.int64), pa.int64()).cast(schema.field("analyzed_at").type),
+            pa.array([analysis_profile] * n, pa.string()),
+            pa.array(np.arange(n, dtype=np.int32)),
+            pa.array(start),
+            pa.array(end),
+            pa.array([segment["emotion"] for segment in segments], pa.string()).dictionary_encode().cast(schema.field("emotion").type),
+            probability_column,
+            pa.array(text, pa.string()),
+            pa.array(words, mask=~transcribed),
+            pa.array(wps, mask=~transcribed),
+            pa.array(fillers, mask=~transcribed)
+        ]
+        return pa.Table.from_arrays(columns, schema=schema)
+
+    def append(
+        self,
+        result: Dict[str, Any],
+        probabilities: Optional[np.ndarray] = None,
+        labels: Optional[List[str]] = None,
+        analysis_profile: Optional[str] = None
+    ) -> int:
+        """
+        Buffer the windows of a completed analysis; writes a file when the
+        buffer is full or its oldest rows are too old.
+
+        Args:
+            result: Final response payload
+            probabilities: Optional (windows, labels) emotion probabilities
+            labels: Emotion labels in probability column order
+            analysis_profile: Profile name (default: the payload's analysis_profile)
+
+        Returns:
+            Number of rows added
+        """
+        now = time.time()
+        table = self.to_table(result, now, probabilities, labels, analysis_profile)
+        if table is None:
+            return 0
+        partition = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        with self._lock:
+            self._buffers.setdefault(partition, []).append(table)
+            self._buffered_rows += table.num_rows
+            self._oldest = self._oldest or now
+            due = self._buffered_rows >= self.max_buffered_rows or now - self._oldest >= self.max_buffer_seconds
+        if due:
+            self.flush()
+        return table.num_rows
+
+    def flush(self) -> List[str]:
+        """
+        Write the buffered rows, one file per date partition.
+
+        Returns:
+            Paths of the written files
+        """
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            self._buffered_rows = 0
+            self._oldest = None
+
+        paths = []
+        for partition, tables in buffers.items():
+            # Keep the label order of the latest rows that carry probabilities
+            metadata = next(
+                (t.schema.metadata for t in reversed(tables) if t.schema.metadata[b"emotion_labels"] != b"[]"),
+                tables[-1].schema.metadata
+            )
+            # One emotion dictionary per file (required by the IPC file format) and one batch per file
+            table = pa.concat_tables(tables).unify_dictionaries().combine_chunks().replace_schema_metadata(metadata)
+            directory = os.path.join(self.root, f"date={partition}")
+            os.makedirs(directory, exist_ok=True)
+            name = f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.{self.FORMATS[self.format]}"
+            path = os.path.join(directory, name)
+            # Scanners skip dot-files, so a half-written file is never read
+            tmp_path = os.path.join(directory, f".{name}.tmp")
+            try:
+                if self.format == "parquet":
+                    pq.write_table(table, tmp_path, compression=self.compression)
+                else:
+                    options = pa.ipc.IpcWriteOptions(compression=self.compression)
+                    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                        writer.write_table(table)
+                os.replace(tmp_path, path)
+                paths.append(path)
+            except Exception:
+                logger.exception("Failed to write %d analytics rows to %s", table.num_rows, directory)
+        return paths
+
+    @staticmethod
+    def open_dataset(root: str, format: str = "parquet") -> "ds.Dataset":
+        """
+        Open an exported dataset for scanning (date is a partition column).
+        Arrow IPC files are memory-mapped.
+
+        Args:
+            root: Dataset directory
+            format: "parquet" or "arrow"
+
+        Returns:
+            pyarrow Dataset; use .to_table(columns=..., filter=...) to prune
+        """
+        if pa is None:
+            raise RuntimeError("Analytics export requires the pyarrow package")
+        if format == "arrow":
+            return ds.dataset(root, format="ipc", partitioning="hive", filesystem=pafs.LocalFileSystem(use_mmap=True))
+        return ds.dataset(root, format="parquet", partitioning="hive")
@@ -0,0 +1,120 @@
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+class JobCancelled(Exception):
+    """Raised inside a pipeline stage once its job has been cancelled"""
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag shared by the stages of one job.
+    Stages call raise_if_cancelled() between windows and batches; child
+    processes started through run_process() are killed on cancel().
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called"""
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        Cancel the job and kill its running child processes.
+
+        Args:
+            reason: Why the job was cancelled (reported in JobCancelled)
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+    def raise_if_cancelled(self):
+        """Raise JobCancelled if the job has been cancelled."""
+        if self._event.is_set():
+            raise JobCancelled(self.reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the job is cancelled or the timeout expires.
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            True if the job was cancelled
+        """
+        return self._event.wait(timeout)
+
+    def run_process(self, cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """
+        subprocess.run() equivalent whose child is killed on cancel().
+
+        Args:
+            cmd: Command line
+            **kwargs: Popen keyword arguments (stdout, stderr, text, ...)
+
+        Returns:
+            CompletedProcess of the finished command
+        """
+        self.raise_if_cancelled()
+        with subprocess.Popen(cmd, **kwargs) as process, self.track(process):
+            stdout, stderr = process.communicate()
+        self.raise_if_cancelled()
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    @contextmanager
+    def track(self, process: subprocess.Popen) -> Iterator[subprocess.Popen]:
+        """
+        Kill a child process on cancel() while the context is open
+        (for processes read incrementally through a pipe).
+
+        Args:
+            process: Started child process
+
+        Yields:
+            The same process
+        """
+        with self._lock:
+            self._processes.add(process)
+        try:
+            # The token may have been cancelled between Popen and registration
+            if self._event.is_set():
+                process.kill()
+            yield process
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+def run_process(cmd: List[str], cancel_token: Optional[CancellationToken] = None, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run a command, through the cancellation token when one is given.
+
+    Args:
+        cmd: Command line
+        cancel_token: Optional CancellationToken of the current job
+        **kwargs: subprocess keyword arguments
+
+    Returns:
+        CompletedProcess of the finished command
+    """
+    if cancel_token is None:
+        return subprocess.run(cmd, **kwargs)
+    return cancel_token.run_process(cmd, **kwargs)
+
+def check_cancelled(cancel_token: Optional[CancellationToken]):
+    """Raise JobCancelled if the (optional) token has been cancelled."""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
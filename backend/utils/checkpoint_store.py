@@ -0,0 +1,360 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+import numpy as np
+import soundfile as sf
+from typing import Dict, List, Any, Optional
+
+class JobCheckpoint:
+    """
+    Stage outputs of one job, persisted so a restarted job can resume from
+    the last completed stage. Every file is written to a temporary name and
+    renamed, and a stage is only recorded in the manifest after its file is
+    in place, so a crash mid-write leaves the stage missing rather than corrupt.
+    """
+
+    def __init__(self, store: "CheckpointStore", directory: str, manifest: Dict[str, Any]):
+        """
+        Initialize a handle on a job's checkpoint directory.
+
+        Args:
+            store: Owning CheckpointStore (for quota enforcement)
+            directory: Checkpoint directory of the job
+            manifest: Parsed manifest.json of the job
+        """
+        self.store = store
+        self.directory = directory
+        self.manifest = manifest
+
+    @property
+    def job_id(self) -> str:
+        return self.manifest["job_id"]
+
+    @property
+    def audio_hash(self) -> str:
+        return self.manifest["audio_hash"]
+
+    def has(self, stage: str) -> bool:
+        """Whether a stage's output has been checkpointed"""
+        return stage in self.manifest["stages"]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _commit(self, stage: str, **info):
+        """Record a completed stage in the manifest."""
+        self.manifest["stages"][stage] = {"saved_at": time.time(), **info}
+        self.store._write_manifest(self.directory, self.manifest)
+        self.store.collect_garbage()
+
+    def save_decode(self, full_audio_path: str, duration: float, windows: List[tuple]):
+        """
+        Persist the decoded PCM (as FLAC) and the window plan.
+
+        Args:
+            full_audio_path: Extracted 16-bit PCM WAV
+            duration: Audio duration in seconds
+            windows: Planned (start, end) windows
+        """
+        samples, sample_rate = sf.read(full_audio_path, dtype='int16')
+        tmp_path = self._path("audio.flac.tmp")
+        sf.write(tmp_path, samples, sample_rate, format='FLAC', subtype='PCM_16')
+        os.replace(tmp_path, self._path("audio.flac"))
+        self._commit("decode", duration=duration, windows=[list(window) for window in windows])
+
+    def load_decode(self, work_dir: str) -> Dict[str, Any]:
+        """
+        Restore the decoded audio into a job's working directory.
+
+        Args:
+            work_dir: Temporary working directory for the job
+
+        Returns:
+            Dictionary with full_audio_path, duration and windows (as from prepare_audio)
+        """
+        samples, sample_rate = sf.read(self._path("audio.flac"), dtype='int16')
+        os.makedirs(work_dir, exist_ok=True)
+        full_audio_path = os.path.join(work_dir, "full_audio.wav")
+        sf.write(full_audio_path, samples, sample_rate, subtype='PCM_16')
+        info = self.manifest["stages"]["decode"]
+        return {
+            "full_audio_path": full_audio_path,
+            "duration": info["duration"],
+            "windows": [tuple(window) for window in info["windows"]]
+        }
+
+    def save_emotion(self, results: Dict[str, str], probabilities: Optional[np.ndarray] = None):
+        """
+        Persist per-window emotion labels (and probabilities when available).
+
+        Args:
+            results: Mapping of segment file name to emotion label
+            probabilities: Optional (num_windows, num_labels) array
+        """
+        arrays = {
+            "segments": np.array(list(results.keys()), dtype=str),
+            "labels": np.array(list(results.values()), dtype=str)
+        }
+        if probabilities is not None:
+            arrays["probabilities"] = np.asarray(probabilities, dtype=np.float32)
+        tmp_path = self._path("emotion.tmp.npz")
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, self._path("emotion.npz"))
+        self._commit("emotion")
+
+    def load_emotion(self) -> Dict[str, str]:
+        """
+        Load the checkpointed emotion labels.
+
+        Returns:
+            Mapping of segment file name to emotion label
+        """
+        with np.load(self._path("emotion.npz")) as arrays:
+            return dict(zip(arrays["segments"].tolist(), arrays["labels"].tolist()))
+
+    def save_json(self, stage: str, data: Any):
+        """
+        Persist a JSON-serializable stage output (transcript, insights).
+
+        Args:
+            stage: Stage name, e.g. "transcription" or "insights"
+            data: Stage output
+        """
+        tmp_path = self._path(f"{stage}.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path(f"{stage}.json"))
+        self._commit(stage)
+
+    def load_json(self, stage: str) -> Any:
+        """
+        Load a JSON stage output saved with save_json.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            The stage output
+        """
+        with open(self._path(f"{stage}.json")) as f:
+            return json.load(f)
+
+    def set_status(self, status: str):
+        """
+        Mark the job as "running", "completed" or "failed".
+        Only running jobs are resumed after a restart.
+
+        Args:
+            status: New job status
+        """
+        self.manifest["status"] = status
+        self.store._write_manifest(self.directory, self.manifest)
+        if status != "running":
+            self.store._active.discard(self.job_id)
+
+class CheckpointStore:
+    """
+    Directory of per-job checkpoints keyed by job id and source audio hash.
+    The oldest checkpoints (finished jobs first) are removed whenever the
+    total size exceeds the disk quota.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Initialize the store.
+
+        Args:
+            root: Checkpoint directory (created if missing)
+            max_bytes: Disk quota for all checkpoints together
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Jobs in progress in this process; never garbage-collected
+        self._active = set()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """
+        Hash the contents of an uploaded file.
+
+        Args:
+            path: File path
+
+        Returns:
+            Hex digest identifying the source audio
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _directory(self, job_id: str) -> str:
+        return os.path.join(self.root, os.path.basename(job_id))
+
+    def _read_manifest(self, directory: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(directory, "manifest.json")) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_manifest(self, directory: str, manifest: Dict[str, Any]):
+        manifest["updated_at"] = time.time()
+        tmp_path = os.path.join(directory, "manifest.json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(directory, "manifest.json"))
+
+    def open(self, job_id: str, source_path: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> JobCheckpoint:
+        """
+        Open (or create) the checkpoint of a job.
+        Existing stage outputs are kept only if they were produced from the
+        same source audio; with no source file (already consumed), the
+        existing checkpoint is trusted.
+
+        Args:
+            job_id: Job identifier
+            source_path: Uploaded file the job analyzes
+            metadata: Extra fields needed to resubmit the job (client id, options)
+
+        Returns:
+            JobCheckpoint handle
+        """
+        directory = self._directory(job_id)
+        audio_hash = self.hash_file(source_path) if source_path and os.path.exists(source_path) else None
+
+        with self._lock:
+            manifest = self._read_manifest(directory)
+            if manifest is not None and audio_hash is not None and manifest["audio_hash"] != audio_hash:
+                shutil.rmtree(directory, ignore_errors=True)
+                manifest = None
+            if manifest is None:
+                os.makedirs(directory, exist_ok=True)
+                manifest = {
+                    "job_id": job_id,
+                    "audio_hash": audio_hash,
+                    "source_path": source_path,
+                    "metadata": metadata or {},
+                    "status": "running",
+                    "stages": {},
+                    "created_at": time.time()
+                }
+            manifest["status"] = "running"
+            manifest["owner"] = self._owner()
+            self._write_manifest(directory, manifest)
+            self._active.add(job_id)
+        return JobCheckpoint(self, directory, manifest)
+
+    def discard(self, job_id: str):
+        """
+        Delete the checkpoint of a job (e.g. after cancellation).
+
+        Args:
+            job_id: Job identifier
+        """
+        with self._lock:
+            self._active.discard(job_id)
+            shutil.rmtree(self._directory(job_id), ignore_errors=True)
+
+    @staticmethod
+    def _owner() -> Dict[str, Any]:
+        return {"host": socket.gethostname(), "pid": os.getpid()}
+
+    def _owner_alive(self, owner: Optional[Dict[str, Any]], job_id: str) -> bool:
+        """
+        Whether the process that runs a job is still alive. Owners on other
+        hosts cannot be checked and are assumed alive.
+        """
+        if not owner:
+            return False
+        if owner.get("host") != socket.gethostname():
+            return True
+        if owner.get("pid") == os.getpid():
+            # A restarted process can get its predecessor's pid (e.g. pid 1 in a container)
+            return job_id in self._active
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def claim_interrupted_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Claim the jobs whose process stopped while they were running.
+        Every web and inference worker sharing the directory calls this at
+        startup; the claim is made under a file lock and records this process
+        as the owner, so each interrupted job is resumed by exactly one process
+        and jobs of live processes are left alone.
+
+        Returns:
+            Manifests of the claimed jobs, oldest first
+        """
+        claimed = []
+        with self._lock, open(os.path.join(self.root, ".claim.lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            for name in os.listdir(self.root):
+                directory = os.path.join(self.root, name)
+                manifest = self._read_manifest(directory)
+                if manifest is None or manifest.get("status") != "running":
+                    continue
+                if self._owner_alive(manifest.get("owner"), manifest["job_id"]):
+                    continue
+                manifest["owner"] = self._owner()
+                self._write_manifest(directory, manifest)
+                self._active.add(manifest["job_id"])
+                claimed.append(manifest)
+        return sorted(claimed, key=lambda manifest: manifest["created_at"])
+
+    def usage(self) -> int:
+        """Total size of all checkpoints in bytes"""
+        return sum(
+            os.path.getsize(os.path.join(directory, name))
+            for directory, _, names in os.walk(self.root)
+            for name in names
+        )
+
+    def collect_garbage(self, keep: Optional[set] = None) -> int:
+        """
+        Delete checkpoints, finished jobs and least recently updated first,
+        until the store fits in its quota.
+
+        Args:
+            keep: Additional job ids that must not be deleted (jobs opened
+                in this process are always kept)
+
+        Returns:
+            Number of bytes freed
+        """
+        with self._lock:
+            keep = set(keep or ()) | self._active
+            entries = []
+            total = 0
+            for name in os.listdir(self.root):
+                directory = os.path.join(self.root, name)
+                try:
+                    size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+                except OSError:
+                    continue
+                total += size
+                manifest = self._read_manifest(directory) or {"status": "failed", "updated_at": 0}
+                if name in keep:
+                    continue
+                entries.append((manifest.get("status") == "running", manifest.get("updated_at", 0), size, directory))
+
+            freed = 0
+            for _, _, size, directory in sorted(entries):
+                if total - freed <= self.max_bytes:
+                    break
+                shutil.rmtree(directory, ignore_errors=True)
+                freed += size
+            return freed
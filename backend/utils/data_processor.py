@@ -2,6 +2,7 @@ import os
 import subprocess
 import re
 import json
+import orjson
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional
 
@@ -61,6 +62,20 @@ class DataProcessor:
         seconds = int(seconds % 60)
         return f"{minutes:02d}:{seconds:02d}"
     
+    @staticmethod
+    def parse_timestamp(timestamp: str) -> float:
+        """
+        Convert MM:SS format (as produced by format_timestamp) to seconds.
+        
+        Args:
+            timestamp: Time string in MM:SS format
+            
+        Returns:
+            Time in seconds
+        """
+        minutes, seconds = timestamp.strip().split(":")
+        return int(minutes) * 60 + int(seconds)
+    
     def process_emotion_data(
         self, 
         emotion_results: Dict[str, str], 
@@ -147,10 +162,10 @@ class DataProcessor:
         if gemini_analysis:
             results["gemini_analysis"] = gemini_analysis
         
-        # Save to file
+        # Save to file (compact; analytics read the columnar export, not these files)
         json_path = os.path.join(output_dir, "analysis_results.json")
-        with open(json_path, "w") as f:
-            json.dump(results, f, indent=4)
+        with open(json_path, "wb") as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_SERIALIZE_NUMPY))
         
         return json_path
     
@@ -0,0 +1,198 @@
+import re
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+# Lowercase word tokens; apostrophes stay inside words ("don't", "y'know")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z0-9]+)*")
+
+# Elongated hesitations ("ummm", "uhhh") collapse to the lexicon spelling
+REPEATED_LETTERS = re.compile(r"(.)\1+")
+
+class FillerDetector:
+    """
+    Finds filler words and phrases in transcripts in a single pass.
+
+    The lexicon is compiled into a trie over word tokens, so multi-word
+    phrases ("you know") are matched alongside single words, matches never
+    fall inside longer words ("um" in "umbrella"), and each token is visited
+    once regardless of the lexicon size. Immediate word repetitions ("I I")
+    are reported as disfluencies.
+    """
+
+    DEFAULT_FILLERS = ("um", "uh", "like", "you know", "sort of", "kind of")
+
+    # Trie key marking the end of a lexicon entry
+    _END = ""
+
+    def __init__(self, fillers: Optional[Iterable[str]] = None, detect_repetitions: bool = True):
+        """
+        Compile the filler lexicon.
+
+        Args:
+            fillers: Filler words and phrases (default: DEFAULT_FILLERS)
+            detect_repetitions: Also report immediately repeated words
+        """
+        self.fillers = list(fillers) if fillers is not None else list(self.DEFAULT_FILLERS)
+        self.detect_repetitions = detect_repetitions
+        self.trie: Dict[str, Any] = {}
+        self.max_length = 0
+        for filler in self.fillers:
+            tokens = self.tokenize(filler)
+            if not tokens:
+                continue
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[self._END] = filler
+            self.max_length = max(self.max_length, len(tokens))
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        Split text into lowercase word tokens.
+
+        Args:
+            text: Transcribed text
+
+        Returns:
+            List of tokens (punctuation dropped)
+        """
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def _normalize(self, token: str) -> str:
+        """Map an elongated hesitation to its lexicon spelling when there is one."""
+        if token in self.trie:
+            return token
+        collapsed = REPEATED_LETTERS.sub(r"\1", token)
+        return collapsed if self._END in self.trie.get(collapsed, {}) else token
+
+    def scan(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """
+        Find fillers and repetitions in a token sequence.
+        At each position the longest lexicon entry wins, and matched tokens
+        are consumed, so phrases are not also counted as their parts.
+
+        Args:
+            tokens: Output of tokenize (or word texts of timed words, lowercased)
+
+        Returns:
+            List of (first token index, token count, label) in order; label is
+            the lexicon entry, or "repetition" for a repeated word
+        """
+        tokens = [self._normalize(token) for token in tokens]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self.trie
+            match = None
+            for j in range(i, min(i + self.max_length, len(tokens))):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if self._END in node:
+                    match = (i, j - i + 1, node[self._END])
+            if match is not None:
+                matches.append(match)
+                i += match[1]
+                continue
+            if self.detect_repetitions and i + 1 < len(tokens) and tokens[i] == tokens[i + 1]:
+                matches.append((i, 1, "repetition"))
+            i += 1
+        return matches
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count each filler in a piece of text.
+
+        Args:
+            text: Transcribed text
+
+        Returns:
+            Dictionary mapping fillers to their (non-zero) counts, in lexicon order
+        """
+        found: Dict[str, int] = {}
+        for _, _, label in self.scan(self.tokenize(text)):
+            if label != "repetition":
+                found[label] = found.get(label, 0) + 1
+        return {filler: found[filler] for filler in self.fillers if filler in found}
+
+    def detect_words(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Find fillers in timed words (e.g. Whisper word timestamps).
+
+        Args:
+            words: Word dictionaries with "word", "start" and "end" keys
+
+        Returns:
+            One event per occurrence: {"filler", "start", "end"}
+        """
+        # A timed word may hold more than one token ("you-know"), so keep each token's word
+        tokens, owners = [], []
+        for index, word in enumerate(words):
+            for token in self.tokenize(word["word"]):
+                tokens.append(token)
+                owners.append(index)
+
+        events = []
+        for first, length, label in self.scan(tokens):
+            events.append({
+                "filler": label,
+                "start": words[owners[first]]["start"],
+                "end": words[owners[first + length - 1]]["end"]
+            })
+        return events
+
+    def analyze(self, transcription_data: List[Dict[str, Any]], duration: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Count fillers over a transcript and locate every occurrence.
+        Segments with a "words" list use its timings; otherwise occurrence
+        times are estimated by spreading the segment's tokens evenly over it.
+
+        Args:
+            transcription_data: List of transcription segment dictionaries
+            duration: Recording length in seconds (default: end of the last segment)
+
+        Returns:
+            Dictionary with per-filler counts and rates per minute, the total
+            and its rate, the repetition count and the occurrence events
+        """
+        counts = {filler: 0 for filler in self.fillers}
+        repetitions = 0
+        events = []
+        for segment in transcription_data:
+            if segment.get("words"):
+                found = self.detect_words(segment["words"])
+                estimated = False
+            else:
+                tokens = self.tokenize(segment.get("text", ""))
+                step = (segment["end"] - segment["start"]) / len(tokens) if tokens else 0
+                found = [
+                    {
+                        "filler": label,
+                        "start": round(segment["start"] + first * step, 2),
+                        "end": round(segment["start"] + (first + length) * step, 2)
+                    }
+                    for first, length, label in self.scan(tokens)
+                ]
+                estimated = True
+
+            for event in found:
+                if event["filler"] == "repetition":
+                    repetitions += 1
+                else:
+                    counts[event["filler"]] += 1
+                events.append({**event, "segment": segment.get("index"), "estimated": estimated})
+
+        if duration is None:
+            duration = transcription_data[-1]["end"] if transcription_data else 0
+        minutes = duration / 60
+        total = sum(counts.values())
+        return {
+            "counts": {filler: count for filler, count in counts.items() if count > 0},
+            "per_minute": {
+                filler: round(count / minutes, 2) for filler, count in counts.items() if count > 0 and minutes > 0
+            },
+            "total": total,
+            "total_per_minute": round(total / minutes, 2) if minutes > 0 else 0,
+            "repetitions": repetitions,
+            "events": events
+        }
@@ -0,0 +1,247 @@
+import contextvars
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Callable
+
+# Profiler of the job running in this context (stage threads run in copies of it)
+_active_profiler: contextvars.ContextVar[Optional["RequestProfiler"]] = contextvars.ContextVar(
+    "speechably_profiler", default=None
+)
+
+@contextmanager
+def profiled_thread() -> Iterator[None]:
+    """
+    Sample the calling thread with the job's profiler, if the job is profiled,
+    for the duration of the block. Used by the stage threads a job starts
+    (streaming stages, motion), which run in a copy of the job's context.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler._threads[thread_id] = threading.current_thread().name
+    try:
+        yield
+    finally:
+        profiler._threads.pop(thread_id, None)
+
+class RequestProfiler:
+    """
+    Opt-in profiler for one analysis job.
+    Collects a sampling CPU profile of the job thread and of the stage threads
+    that register with profiled_thread() (as folded stacks for flamegraph
+    tools, rooted at the thread name), torch operator timings when torch is
+    loaded, and the tracemalloc peak of every pipeline stage.
+
+    Work done in other processes (the inference pool, ffmpeg) is not sampled.
+    tracemalloc is process-wide, so peaks include allocations of other jobs
+    running at the same time; torch operator timings are only collected
+    for one profiled job at a time.
+    """
+
+    _torch_profiler_lock = threading.Lock()
+    # tracemalloc is shared by overlapping profiled jobs and stopped after the last one
+    _tracemalloc_lock = threading.Lock()
+    _tracemalloc_users = 0
+    _tracemalloc_owned = False
+
+    def __init__(self, job_id: str, interval: float = 0.005, top_ops: int = 40):
+        """
+        Initialize the profiler.
+
+        Args:
+            job_id: Job being profiled
+            interval: Seconds between stack samples
+            top_ops: Number of torch operators kept in the report
+        """
+        self.job_id = job_id
+        self.interval = interval
+        self.top_ops = top_ops
+        self.stacks: Counter = Counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.torch_ops: List[Dict[str, Any]] = []
+        # Sampled threads: id -> name used as the root frame
+        self._threads: Dict[int, str] = {}
+        self._context_token: Optional[contextvars.Token] = None
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._torch_profile = None
+        self._stage: Optional[str] = None
+        self._stage_started = 0.0
+        self._started = 0.0
+        self._finished = 0.0
+        self._holds_torch_profiler = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """Start sampling the calling thread (and the stage threads it starts)."""
+        self._threads[threading.get_ident()] = "job"
+        self._context_token = _active_profiler.set(self)
+        self._started = time.perf_counter()
+        with RequestProfiler._tracemalloc_lock:
+            if RequestProfiler._tracemalloc_users == 0:
+                # Leave tracing that someone else started running
+                RequestProfiler._tracemalloc_owned = not tracemalloc.is_tracing()
+                if RequestProfiler._tracemalloc_owned:
+                    tracemalloc.start()
+            RequestProfiler._tracemalloc_users += 1
+
+        if 'torch' in sys.modules and self._torch_profiler_lock.acquire(blocking=False):
+            self._holds_torch_profiler = True
+            from torch.profiler import profile, ProfilerActivity
+            self._torch_profile = profile(activities=[ProfilerActivity.CPU])
+            self._torch_profile.__enter__()
+
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self.mark("decode")
+
+    def stop(self):
+        """Stop sampling and collect the torch and memory results."""
+        self._close_stage()
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self._finished = time.perf_counter()
+
+        if self._torch_profile is not None:
+            self._torch_profile.__exit__(None, None, None)
+            averages = sorted(
+                self._torch_profile.key_averages(),
+                key=lambda event: event.self_cpu_time_total,
+                reverse=True
+            )
+            self.torch_ops = [
+                {
+                    "name": event.key,
+                    "calls": event.count,
+                    "self_cpu_ms": round(event.self_cpu_time_total / 1000, 3),
+                    "total_cpu_ms": round(event.cpu_time_total / 1000, 3)
+                }
+                for event in averages[:self.top_ops]
+            ]
+            self._torch_profile = None
+        if self._holds_torch_profiler:
+            self._torch_profiler_lock.release()
+            self._holds_torch_profiler = False
+
+        with RequestProfiler._tracemalloc_lock:
+            RequestProfiler._tracemalloc_users -= 1
+            if RequestProfiler._tracemalloc_users == 0 and RequestProfiler._tracemalloc_owned:
+                tracemalloc.stop()
+                RequestProfiler._tracemalloc_owned = False
+
+        if self._context_token is not None:
+            _active_profiler.reset(self._context_token)
+            self._context_token = None
+
+    def mark(self, stage: str):
+        """
+        Record that the job entered a pipeline stage.
+        Repeated marks of the current stage (progress updates) are ignored.
+
+        Args:
+            stage: Stage name
+        """
+        if stage == self._stage:
+            return
+        self._close_stage()
+        self._stage = stage
+        self._stage_started = time.perf_counter()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def wrap_progress(self, callback: Optional[Callable[[str, float], None]]) -> Callable[[str, float], None]:
+        """
+        Wrap a pipeline progress callback so stage changes are marked.
+
+        Args:
+            callback: Original callable(stage, fraction), or None
+
+        Returns:
+            Callable(stage, fraction) that marks the stage and forwards the call
+        """
+        def report(stage, fraction):
+            self.mark(stage)
+            if callback is not None:
+                callback(stage, fraction)
+        return report
+
+    def _close_stage(self):
+        if self._stage is None:
+            return
+        stats = self.stages.setdefault(self._stage, {"wall_s": 0.0, "peak_bytes": 0})
+        stats["wall_s"] = round(stats["wall_s"] + time.perf_counter() - self._stage_started, 3)
+        if tracemalloc.is_tracing():
+            stats["peak_bytes"] = max(stats["peak_bytes"], tracemalloc.get_traced_memory()[1])
+        self._stage = None
+
+    def _sample(self):
+        """Sampler thread: record the stack of every job thread each interval."""
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id, name in list(self._threads.items()):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(name)
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """
+        The CPU profile in folded-stack format (flamegraph.pl, speedscope, inferno).
+
+        Returns:
+            One "frame;frame;frame count" line per distinct stack
+        """
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def report(self, top_functions: int = 30) -> Dict[str, Any]:
+        """
+        Summarize the profile as a JSON-serializable report.
+
+        Args:
+            top_functions: Number of hottest functions (by self samples) to list
+
+        Returns:
+            Dictionary with stage timings and memory peaks, hottest functions, torch
+            operators and the threads sampled (per-thread sample counts)
+        """
+        self_samples: Counter = Counter()
+        thread_samples: Counter = Counter()
+        for stack, count in self.stacks.items():
+            self_samples[stack.rsplit(";", 1)[-1]] += count
+            thread_samples[stack.split(";", 1)[0]] += count
+        total = sum(self.stacks.values())
+
+        return {
+            "job_id": self.job_id,
+            "wall_s": round(self._finished - self._started, 3),
+            "samples": total,
+            "sample_interval_ms": self.interval * 1000,
+            "threads": dict(thread_samples),
+            "not_sampled": "inference pool processes and ffmpeg",
+            "stages": self.stages,
+            "hot_functions": [
+                {"function": function, "samples": count, "share": round(count / total, 4)}
+                for function, count in self_samples.most_common(top_functions)
+            ],
+            "torch_ops": self.torch_ops
+        }
@@ -0,0 +1,363 @@
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+from utils.data_processor import DataProcessor
+
+class RunningStats:
+    """
+    Count, mean and variance maintained incrementally (Welford), so new
+    values or whole batches can be folded in without revisiting old ones.
+    """
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.m2 = 0.0
+
+    def add(self, value: float):
+        """
+        Fold in one value.
+
+        Args:
+            value: New observation
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, values: np.ndarray):
+        """
+        Fold in a batch of values (Chan et al. parallel combination).
+
+        Args:
+            values: 1-D array of observations
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        count = len(values)
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        total = self.count + count
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance (0 for fewer than two values)"""
+        return self.m2 / self.count if self.count > 1 else 0.0
+
+    def to_dict(self, digits: int = 3) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.mean, digits) if self.count else None,
+            "variance": round(self.variance, digits) if self.count else None,
+            "std": round(self.variance ** 0.5, digits) if self.count else None
+        }
+
+class TrendLine:
+    """Least-squares slope of a metric over session numbers, kept as running sums"""
+
+    __slots__ = ("n", "sum_x", "sum_y", "sum_xx", "sum_xy")
+
+    def __init__(self):
+        self.n = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = 0.0
+
+    def add(self, x: float, y: float):
+        self.n += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+
+    @property
+    def slope(self) -> Optional[float]:
+        """Change of the metric per session, or None with fewer than two points"""
+        denominator = self.n * self.sum_xx - self.sum_x * self.sum_x
+        if self.n < 2 or denominator == 0:
+            return None
+        return (self.n * self.sum_xy - self.sum_x * self.sum_y) / denominator
+
+@dataclass
+class SessionRecord:
+    """A retained session: its summary and its emotion timeline as arrays"""
+    summary: Dict[str, Any]
+    # Window start times (s) and emotion codes into the owner's vocabulary
+    starts: np.ndarray
+    codes: np.ndarray
+
+class UserProgress:
+    """
+    Practice history of one user.
+
+    Every analysis updates running aggregates (WPS mean and variance over
+    all segments and over sessions, emotion time shares, filler rate,
+    versatility, per-session trends) in time independent of the history
+    length, so summaries never rescan past sessions. The most recent
+    sessions keep their emotion timelines for comparison.
+    """
+
+    # Metrics tracked per session for trends
+    TREND_METRICS = ("avg_wps", "filler_rate", "versatility_score")
+
+    def __init__(self, user_id: str, max_sessions: int = 50):
+        """
+        Initialize an empty history.
+
+        Args:
+            user_id: User (client) identifier
+            max_sessions: Number of recent sessions whose timelines are retained
+        """
+        self.user_id = user_id
+        self.max_sessions = max_sessions
+        self.sessions = 0
+        self.total_duration = 0.0
+        self.segment_wps = RunningStats()
+        self.session_wps = RunningStats()
+        self.versatility = RunningStats()
+        self.filler_count = 0
+        self.filler_minutes = 0.0
+        self.emotion_seconds: Dict[str, float] = {}
+        self.trends = {metric: TrendLine() for metric in self.TREND_METRICS}
+        self.first: Optional[Dict[str, Any]] = None
+        self.last: Optional[Dict[str, Any]] = None
+        self.emotions: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._recent: "OrderedDict[str, SessionRecord]" = OrderedDict()
+
+    def _code(self, emotion: str) -> int:
+        if emotion not in self._codes:
+            self._codes[emotion] = len(self.emotions)
+            self.emotions.append(emotion)
+        return self._codes[emotion]
+
+    def add(self, session_id: str, result: Dict[str, Any], timestamp: float) -> Dict[str, Any]:
+        """
+        Fold a completed analysis into the aggregates.
+
+        Args:
+            session_id: Job (video) identifier of the analysis
+            result: Final response payload of the analysis
+            timestamp: Completion time (epoch seconds)
+
+        Returns:
+            Summary of the session
+        """
+        if session_id in self._recent:
+            # A resumed or re-reported job is counted once
+            return self._recent[session_id].summary
+        duration = float(result.get("duration") or 0.0)
+        transcription = result.get("transcription_data") or []
+        wps = np.array([segment["wps"] for segment in transcription], dtype=np.float64)
+        emotion_metrics = result.get("emotion_metrics") or {}
+        fillers = (result.get("speech_clarity") or {}).get("fillers")
+
+        segments = result.get("emotion_segments") or []
+        starts = np.array([DataProcessor.parse_timestamp(segment["time_range"].split(" - ")[0]) for segment in segments], dtype=np.float32)
+        ends = np.array([DataProcessor.parse_timestamp(segment["time_range"].split(" - ")[1]) for segment in segments], dtype=np.float32)
+        codes = np.array([self._code(segment["emotion"]) for segment in segments], dtype=np.uint8)
+
+        self.sessions += 1
+        self.total_duration += duration
+        summary = {
+            "session_id": session_id,
+            "number": self.sessions,
+            "timestamp": timestamp,
+            "duration": round(duration, 2),
+            "analysis_profile": (result.get("analysis_profile") or {}).get("name"),
+            "avg_wps": round(float(wps.mean()), 3) if len(wps) else None,
+            "filler_rate": fillers["total_per_minute"] if fillers and duration > 0 else None,
+            "versatility_score": emotion_metrics.get("versatility_score") if segments else None,
+            "main_emotion": emotion_metrics.get("main_emotion") if segments else None
+        }
+
+        if len(wps):
+            self.segment_wps.merge(wps)
+            self.session_wps.add(summary["avg_wps"])
+        if summary["versatility_score"] is not None:
+            self.versatility.add(summary["versatility_score"])
+        if summary["filler_rate"] is not None:
+            self.filler_count += fillers["total"]
+            self.filler_minutes += duration / 60
+        if len(codes):
+            seconds = np.bincount(codes, weights=np.maximum(ends - starts, 0), minlength=len(self.emotions))
+            for code, value in enumerate(seconds):
+                if value:
+                    emotion = self.emotions[code]
+                    self.emotion_seconds[emotion] = self.emotion_seconds.get(emotion, 0.0) + float(value)
+        for metric, trend in self.trends.items():
+            if summary[metric] is not None:
+                trend.add(self.sessions, summary[metric])
+
+        if self.first is None:
+            self.first = summary
+        self.last = summary
+        self._recent[session_id] = SessionRecord(summary, starts, codes)
+        while len(self._recent) > self.max_sessions:
+            self._recent.popitem(last=False)
+        return summary
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregates and trends of the whole history (independent of its length).
+
+        Returns:
+            Dictionary of running statistics, emotion distribution, per-session
+            slopes and the first and latest sessions
+        """
+        emotion_total = sum(self.emotion_seconds.values())
+        return {
+            "user_id": self.user_id,
+            "sessions": self.sessions,
+            "total_duration": round(self.total_duration, 2),
+            "wps": self.segment_wps.to_dict(),
+            "session_wps": self.session_wps.to_dict(),
+            "filler_rate": round(self.filler_count / self.filler_minutes, 2) if self.filler_minutes > 0 else None,
+            "versatility_score": self.versatility.to_dict(1),
+            "emotion_distribution": {
+                emotion: round(seconds / emotion_total, 3) for emotion, seconds in self.emotion_seconds.items()
+            } if emotion_total > 0 else {},
+            "trends": {
+                metric: {
+                    "slope_per_session": round(trend.slope, 4) if trend.slope is not None else None,
+                    "sessions": trend.n
+                }
+                for metric, trend in self.trends.items()
+            },
+            "first": self.first,
+            "last": self.last
+        }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Summaries of the retained sessions, newest first."""
+        return [record.summary for record in reversed(self._recent.values())]
+
+    def session(self, session_id: str) -> Optional[SessionRecord]:
+        """The retained session with this id, or None if unknown or evicted."""
+        return self._recent.get(session_id)
+
+    def _resample(self, record: SessionRecord, positions: np.ndarray) -> np.ndarray:
+        """Emotion code of each position (seconds from the start)."""
+        index = np.searchsorted(record.starts, positions, side="right") - 1
+        return record.codes[np.clip(index, 0, len(record.codes) - 1)]
+
+    def diff_timelines(self, a: SessionRecord, b: SessionRecord, bins: int = 100, align: str = "relative") -> Dict[str, Any]:
+        """
+        Compare the emotion timelines of two sessions on a common grid.
+
+        Args:
+            a: Earlier (reference) session
+            b: Session compared with it
+            bins: Grid points for relative alignment
+            align: "relative" compares the same fraction of each session;
+                "absolute" compares second by second over the shorter one
+
+        Returns:
+            Agreement ratio, per-emotion share changes and the spans where
+            the emotions differ (grid units: percent of the session, or seconds)
+        """
+        if not len(a.codes) or not len(b.codes):
+            return {"align": align, "agreement": None, "share_change": {}, "differences": []}
+
+        if align == "absolute":
+            length = int(min(a.summary["duration"], b.summary["duration"]))
+            grid = np.arange(max(length, 1)) + 0.5
+            codes_a, codes_b = self._resample(a, grid), self._resample(b, grid)
+            unit = 1.0
+        else:
+            grid = (np.arange(bins) + 0.5) / bins
+            codes_a = self._resample(a, grid * a.summary["duration"])
+            codes_b = self._resample(b, grid * b.summary["duration"])
+            unit = 100.0 / bins
+
+        same = codes_a == codes_b
+        shares_a = np.bincount(codes_a, minlength=len(self.emotions)) / len(grid)
+        shares_b = np.bincount(codes_b, minlength=len(self.emotions)) / len(grid)
+        change = shares_b - shares_a
+
+        # Runs of grid points where the two timelines disagree
+        edges = np.diff(np.concatenate(([0], (~same).astype(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        return {
+            "align": align,
+            "agreement": round(float(same.mean()), 3),
+            "share_change": {
+                self.emotions[code]: round(float(change[code]), 3) for code in np.flatnonzero(change)
+            },
+            "differences": [
+                {
+                    "start": round(start * unit, 2),
+                    "end": round(end * unit, 2),
+                    "a": self.emotions[codes_a[start]],
+                    "b": self.emotions[codes_b[start]]
+                }
+                for start, end in zip(run_starts.tolist(), run_ends.tolist())
+            ]
+        }
+
+    def compare(
+        self,
+        session_a: str,
+        session_b: Optional[str] = None,
+        bins: int = 100,
+        align: str = "relative"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compare a session with another one, or with the user's aggregates.
+
+        Args:
+            session_a: Reference session id
+            session_b: Compared session id (default: compare session_a with the averages)
+            bins: Grid points for relative timeline alignment
+            align: Timeline alignment ("relative" or "absolute")
+
+        Returns:
+            Metric deltas (b - a, or session - average) and, for two sessions,
+            the emotion timeline diff; None when a session is unknown or evicted
+        """
+        a = self.session(session_a)
+        if a is None:
+            return None
+        if session_b is None:
+            averages = {
+                "avg_wps": self.session_wps.mean if self.session_wps.count else None,
+                "filler_rate": self.filler_count / self.filler_minutes if self.filler_minutes > 0 else None,
+                "versatility_score": self.versatility.mean if self.versatility.count else None
+            }
+            deltas = {
+                metric: round(a.summary[metric] - average, 3)
+                if a.summary[metric] is not None and average is not None else None
+                for metric, average in averages.items()
+            }
+            wps_std = self.session_wps.variance ** 0.5
+            return {
+                "session": a.summary,
+                "versus": "average",
+                "delta": deltas,
+                "avg_wps_zscore": round(deltas["avg_wps"] / wps_std, 2)
+                if deltas["avg_wps"] is not None and wps_std > 0 else None
+            }
+
+        b = self.session(session_b)
+        if b is None:
+            return None
+        return {
+            "a": a.summary,
+            "b": b.summary,
+            "delta": {
+                metric: round(b.summary[metric] - a.summary[metric], 3)
+                if a.summary[metric] is not None and b.summary[metric] is not None else None
+                for metric in self.TREND_METRICS
+            },
+            "emotion_timeline": self.diff_timelines(a, b, bins, align)
+        }
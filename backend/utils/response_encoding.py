@@ -0,0 +1,175 @@
+import gzip
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class ResponseEncoder:
+    """
+    Serializes analysis payloads for HTTP responses.
+    Encodes with orjson (NumPy arrays and scalars are written directly),
+    optionally converts the per-segment lists into a columnar layout, and
+    compresses with brotli or gzip according to the client's Accept-Encoding.
+    """
+
+    # Lists of per-segment objects converted to parallel arrays in the columnar layout
+    COLUMNAR_FIELDS = ("emotion_segments", "transcription_data", "wps_data")
+
+    def __init__(self, min_compress_bytes: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+        """
+        Initialize the encoder.
+
+        Args:
+            min_compress_bytes: Bodies smaller than this are sent uncompressed
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+        """
+        self.min_compress_bytes = min_compress_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @property
+    def encodings(self) -> List[str]:
+        """Supported content codings, most preferred first"""
+        return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        # pandas / NumPy values orjson does not handle natively
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        if hasattr(value, "item"):
+            return value.item()
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    def dumps(self, payload: Any) -> bytes:
+        """
+        Serialize a payload to compact JSON.
+
+        Args:
+            payload: JSON-compatible data (NumPy arrays and scalars allowed)
+
+        Returns:
+            UTF-8 encoded JSON
+        """
+        return orjson.dumps(
+            payload,
+            default=self._default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+    @staticmethod
+    def columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Convert a list of objects into parallel arrays.
+
+        Args:
+            records: List of dictionaries
+
+        Returns:
+            Dictionary mapping every key (in first-seen order) to its column;
+            missing values are None
+        """
+        keys = {}
+        for record in records:
+            keys.update(dict.fromkeys(record))
+        return {key: [record.get(key) for record in records] for key in keys}
+
+    def to_columnar(self, payload: Any) -> Any:
+        """
+        Rewrite the per-segment lists of a payload in columnar form.
+        Nested payloads (job status, batch results) are rewritten as well.
+
+        Args:
+            payload: Analysis response, job status or batch response
+
+        Returns:
+            Copy of the payload with COLUMNAR_FIELDS as dictionaries of arrays
+        """
+        if isinstance(payload, list):
+            return [self.to_columnar(item) for item in payload]
+        if not isinstance(payload, dict):
+            return payload
+
+        converted = {}
+        for key, value in payload.items():
+            if key in self.COLUMNAR_FIELDS and isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                converted[key] = self.columns(value)
+            else:
+                converted[key] = self.to_columnar(value)
+        return converted
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """
+        Pick a content coding from an Accept-Encoding header.
+
+        Args:
+            accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+
+        Returns:
+            "br", "gzip" or None for identity
+        """
+        if not accept_encoding:
+            return None
+
+        weights = {}
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            weights[coding.strip().lower()] = quality
+
+        best, best_quality = None, 0.0
+        for coding in self.encodings:
+            quality = weights.get(coding, weights.get("*", 0.0))
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Compress a response body.
+
+        Args:
+            body: Encoded JSON
+            encoding: "br" or "gzip"
+
+        Returns:
+            Compressed body
+        """
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def encode(self, payload: Any, accept_encoding: Optional[str] = None, columnar: bool = False) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize and (when worthwhile) compress a payload.
+
+        Args:
+            payload: Response data
+            accept_encoding: Client's Accept-Encoding header
+            columnar: Whether to use the columnar layout
+
+        Returns:
+            Tuple of (body, headers) with Content-Type, Vary and, if compressed, Content-Encoding
+        """
+        if columnar:
+            payload = self.to_columnar(payload)
+            if isinstance(payload, dict):
+                payload = {**payload, "layout": "columnar"}
+        body = self.dumps(payload)
+
+        headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+        encoding = self.negotiate(accept_encoding) if len(body) >= self.min_compress_bytes else None
+        if encoding is not None:
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        return body, headers
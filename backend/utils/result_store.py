@@ -0,0 +1,340 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.cancellation import CancellationToken
+from utils.progress_history import UserProgress
+
+class ResultStore:
+    """
+    Thread-safe in-memory store for analysis jobs.
+    Tracks the status and progress of each job and holds its latest result,
+    so a preview result can later be replaced by the refined one, and the
+    per-user practice history updated from completed results.
+    Finished jobs are kept for finished_ttl seconds and users' histories are
+    evicted least recently used, so memory stays bounded in a long-lived process.
+    """
+
+    def __init__(
+        self,
+        max_artifacts: int = 256,
+        max_history_sessions: int = 50,
+        max_finished_jobs: int = 1024,
+        finished_ttl: float = 3600.0,
+        max_users: int = 10000
+    ):
+        """
+        Initialize an empty result store.
+
+        Args:
+            max_artifacts: Maximum number of per-video artifacts kept in memory
+            max_history_sessions: Recent sessions per user kept for timeline comparison
+            max_finished_jobs: Maximum number of completed, failed or cancelled jobs kept
+            finished_ttl: Seconds a finished job stays available for lookup
+            max_users: Maximum number of users whose practice history is kept
+        """
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._tokens: Dict[str, CancellationToken] = {}
+        # Finished job ids in the order they finished, with their finish time
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self.max_finished_jobs = max_finished_jobs
+        self.finished_ttl = finished_ttl
+        self._artifacts: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self.max_artifacts = max_artifacts
+        self._progress: "OrderedDict[str, UserProgress]" = OrderedDict()
+        self.max_history_sessions = max_history_sessions
+        self.max_users = max_users
+        # Completed sessions waiting to be collected by another store (see export_sessions)
+        self._session_outbox: Optional[deque] = None
+        self._lock = threading.Lock()
+
+    def create_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Register a new job in the queued state, with its cancellation token.
+
+        Args:
+            job_id: Unique job identifier (the video id)
+
+        Returns:
+            Snapshot of the created job record
+        """
+        now = time.time()
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "phase": None,
+            "stage": None,
+            "progress": 0.0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self._evict_finished(now)
+            self._jobs[job_id] = job
+            self._tokens[job_id] = CancellationToken()
+            return dict(job)
+
+    def _finish(self, job_id: str, now: float):
+        """Mark a job as finished for eviction. Call with the lock held."""
+        self._tokens.pop(job_id, None)
+        self._finished.pop(job_id, None)
+        self._finished[job_id] = now
+        self._evict_finished(now)
+
+    def _evict_finished(self, now: float):
+        """Drop the oldest finished jobs beyond the TTL or max_finished_jobs. Call with the lock held."""
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished_jobs and now - finished_at < self.finished_ttl:
+                break
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+
+    def update_progress(self, job_id: str, phase: str, stage: str, progress: float):
+        """
+        Record the current phase, stage and overall progress (0-1) of a job.
+
+        Args:
+            job_id: Job identifier
+            phase: Pipeline phase ("preview" or "refine")
+            stage: Current stage name within the phase
+            progress: Overall completion fraction between 0 and 1
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] == "cancelled":
+                return
+            job.update({
+                "status": "running",
+                "phase": phase,
+                "stage": stage,
+                "progress": round(min(max(progress, 0.0), 1.0), 3),
+                "updated_at": time.time()
+            })
+
+    def set_result(self, job_id: str, result: Dict[str, Any], final: bool = False):
+        """
+        Store (or replace) the result of a job.
+
+        Args:
+            job_id: Job identifier
+            result: Response payload for the job
+            final: Whether this is the completed, full-resolution result
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] == "cancelled":
+                return
+            job["result"] = result
+            job["updated_at"] = time.time()
+            if final:
+                job.update({"status": "completed", "stage": None, "progress": 1.0})
+                self._finish(job_id, job["updated_at"])
+
+    def fail(self, job_id: str, error: str):
+        """
+        Mark a job as failed. Cancelled and completed jobs keep their status.
+
+        Args:
+            job_id: Job identifier
+            error: Error message
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in ("cancelled", "completed"):
+                return
+            job.update({"status": "failed", "error": error, "updated_at": time.time()})
+            self._finish(job_id, job["updated_at"])
+
+    def get_token(self, job_id: str) -> Optional[CancellationToken]:
+        """
+        Get the cancellation token of a job that has not finished.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job's CancellationToken, or None if unknown or finished
+        """
+        with self._lock:
+            return self._tokens.get(job_id)
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> Optional[str]:
+        """
+        Cancel a queued or running job.
+        Running stages stop at their next window or batch boundary.
+
+        Args:
+            job_id: Job identifier
+            reason: Why the job was cancelled
+
+        Returns:
+            The job status after the call ("cancelled", or the unchanged status
+            of a finished job), or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            token = self._tokens.pop(job_id, None)
+            if token is None:
+                return job["status"]
+            job.update({"status": "cancelled", "error": reason, "updated_at": time.time()})
+            self._finish(job_id, job["updated_at"])
+        token.cancel(reason)
+        return "cancelled"
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a snapshot of a job record.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Copy of the job record, or None if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def set_artifact(self, video_id: str, name: str, artifact: Any):
+        """
+        Store an auxiliary analysis object (e.g. a timeline pyramid) for a video.
+        The least recently used artifacts are evicted beyond max_artifacts.
+
+        Args:
+            video_id: Video identifier
+            name: Artifact name
+            artifact: Object to store
+        """
+        with self._lock:
+            self._artifacts[(video_id, name)] = artifact
+            self._artifacts.move_to_end((video_id, name))
+            while len(self._artifacts) > self.max_artifacts:
+                self._artifacts.popitem(last=False)
+
+    def get_artifact(self, video_id: str, name: str) -> Optional[Any]:
+        """
+        Get an auxiliary analysis object for a video.
+
+        Args:
+            video_id: Video identifier
+            name: Artifact name
+
+        Returns:
+            The stored object, or None if unknown or evicted
+        """
+        with self._lock:
+            artifact = self._artifacts.get((video_id, name))
+            if artifact is not None:
+                self._artifacts.move_to_end((video_id, name))
+            return artifact
+
+    def record_session(
+        self,
+        user_id: str,
+        job_id: str,
+        result: Dict[str, Any],
+        timestamp: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fold a completed analysis into the user's practice history, or queue it
+        for collection when sessions are exported.
+
+        Args:
+            user_id: User (client) identifier
+            job_id: Job identifier of the analysis
+            result: Final response payload
+            timestamp: Completion time in epoch seconds (default: now)
+
+        Returns:
+            Summary of the recorded session, or None when it was queued for export
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            if self._session_outbox is not None:
+                self._session_outbox.append((user_id, job_id, result, timestamp))
+                return None
+            progress = self._progress.get(user_id)
+            if progress is None:
+                progress = self._progress[user_id] = UserProgress(user_id, self.max_history_sessions)
+            self._progress.move_to_end(user_id)
+            while len(self._progress) > self.max_users:
+                self._progress.popitem(last=False)
+            return progress.add(job_id, result, timestamp)
+
+    def export_sessions(self, max_pending: int = 1024):
+        """
+        Queue completed sessions for another store instead of keeping the history
+        here. Inference workers do this so the web tier keeps one history across
+        all workers. Beyond max_pending uncollected sessions, the oldest are dropped.
+
+        Args:
+            max_pending: Maximum number of sessions waiting to be collected
+        """
+        with self._lock:
+            self._session_outbox = deque(maxlen=max_pending)
+
+    def drain_sessions(self) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """
+        Hand over the sessions queued since the last call.
+
+        Returns:
+            List of (user_id, job_id, result, timestamp) in completion order
+        """
+        with self._lock:
+            if not self._session_outbox:
+                return []
+            sessions = list(self._session_outbox)
+            self._session_outbox.clear()
+            return sessions
+
+    def get_progress(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the aggregates and trends of a user's history.
+
+        Args:
+            user_id: User (client) identifier
+
+        Returns:
+            Output of UserProgress.summary with the recent sessions, or None if
+            the user has no recorded session
+        """
+        with self._lock:
+            progress = self._progress.get(user_id)
+            if progress is None:
+                return None
+            self._progress.move_to_end(user_id)
+            return {**progress.summary(), "recent_sessions": progress.recent()}
+
+    def compare_sessions(
+        self,
+        user_id: str,
+        session_a: str,
+        session_b: Optional[str] = None,
+        bins: int = 100,
+        align: str = "relative"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compare two of a user's sessions, or one session with the user's averages.
+
+        Args:
+            user_id: User (client) identifier
+            session_a: Reference session (job) id
+            session_b: Optional compared session id
+            bins: Grid points for relative timeline alignment
+            align: Timeline alignment ("relative" or "absolute")
+
+        Returns:
+            Output of UserProgress.compare, or None if the user or a session is unknown
+        """
+        with self._lock:
+            progress = self._progress.get(user_id)
+            if progress is None:
+                return None
+            self._progress.move_to_end(user_id)
+            return progress.compare(session_a, session_b, bins, align)
@@ -0,0 +1,213 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional
+
+from utils.cancellation import CancellationToken
+
+@dataclass
+class ScheduledJob:
+    """A request for a pipeline slot, as seen by the scheduler"""
+    client_id: str
+    cost: float
+    job_id: Optional[str] = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+
+    @property
+    def queue_wait(self) -> float:
+        """Seconds spent waiting for a slot (so far, if still queued)"""
+        end = self.started_at if self.started_at is not None else time.perf_counter()
+        return round(end - self.enqueued_at, 3)
+
+class FairScheduler:
+    """
+    Admits analysis jobs to a fixed number of pipeline slots.
+    Clients share the slots by weighted fair queuing on estimated cost
+    (seconds of audio), so one client's long recordings cannot hold back
+    everyone else's short clips. Within a client the cheapest job goes
+    first, and each client is capped at a number of concurrent jobs.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        per_client_limit: int = 1,
+        client_weights: Optional[Dict[str, float]] = None,
+        base_cost: float = 5.0,
+        history_size: int = 512
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Number of jobs allowed to run at once
+            per_client_limit: Number of jobs one client may run at once
+            client_weights: Share of each client relative to the default weight of 1
+            base_cost: Fixed per-job cost (seconds) added to the audio duration
+            history_size: Number of recent queue waits kept for stats
+        """
+        self.max_concurrent = max_concurrent
+        self.per_client_limit = per_client_limit
+        self.client_weights = client_weights or {}
+        self.base_cost = base_cost
+
+        self._cond = threading.Condition()
+        self._sequence = itertools.count()
+        self._pending: Dict[str, List[tuple]] = {}
+        self._running: Dict[str, int] = {}
+        self._running_cost = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._recent_waits = deque(maxlen=history_size)
+
+    def estimate_cost(self, duration: float) -> float:
+        """
+        Estimate the cost of analyzing a recording.
+
+        Args:
+            duration: Probed audio duration in seconds
+
+        Returns:
+            Cost in the scheduler's units (seconds of audio plus fixed overhead)
+        """
+        return self.base_cost + max(duration, 0.0)
+
+    @contextmanager
+    def slot(
+        self,
+        client_id: str,
+        cost: float,
+        job_id: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Block until the job is scheduled, then hold a slot for the duration
+        of the with-block.
+
+        Args:
+            client_id: Identifier of the submitting client
+            cost: Estimated cost from estimate_cost()
+            job_id: Optional job identifier (for stats)
+            cancel_token: Optional CancellationToken; a cancelled job leaves the queue
+
+        Yields:
+            ScheduledJob with the measured queue_wait
+
+        Raises:
+            JobCancelled: If the token is cancelled while the job is queued
+        """
+        job = ScheduledJob(client_id, cost, job_id)
+        entry = (cost, next(self._sequence), job)
+        with self._cond:
+            heapq.heappush(self._pending.setdefault(client_id, []), entry)
+            self._dispatch()
+            while job.started_at is None:
+                if cancel_token is not None and cancel_token.cancelled:
+                    queue = self._pending[client_id]
+                    queue.remove(entry)
+                    heapq.heapify(queue)
+                    if not queue:
+                        del self._pending[client_id]
+                    cancel_token.raise_if_cancelled()
+                self._cond.wait(0.2 if cancel_token is not None else None)
+        try:
+            yield job
+        finally:
+            with self._cond:
+                self._running_cost -= cost
+                self._running[client_id] -= 1
+                if not self._running[client_id]:
+                    del self._running[client_id]
+                self._dispatch()
+
+    def _dispatch(self):
+        """Start queued jobs while slots are free (caller holds the lock)."""
+        started = False
+        while sum(self._running.values()) < self.max_concurrent:
+            best = None
+            for client_id, queue in self._pending.items():
+                if self._running.get(client_id, 0) >= self.per_client_limit:
+                    continue
+                # Virtual finish tag of the client's cheapest pending job
+                start_tag = max(self._virtual_time, self._finish_tags.get(client_id, 0.0))
+                finish_tag = start_tag + queue[0][0] / self.client_weights.get(client_id, 1.0)
+                if best is None or finish_tag < best[0]:
+                    best = (finish_tag, start_tag, client_id)
+            if best is None:
+                break
+
+            finish_tag, start_tag, client_id = best
+            _, _, job = heapq.heappop(self._pending[client_id])
+            if not self._pending[client_id]:
+                del self._pending[client_id]
+            self._virtual_time = start_tag
+            self._finish_tags[client_id] = finish_tag
+            self._running[client_id] = self._running.get(client_id, 0) + 1
+            self._running_cost += job.cost
+            job.started_at = time.perf_counter()
+            self._recent_waits.append(job.queue_wait)
+            started = True
+
+        # Forget tags that can no longer delay anyone
+        for client_id in [c for c, tag in self._finish_tags.items()
+                          if tag <= self._virtual_time and c not in self._pending and c not in self._running]:
+            del self._finish_tags[client_id]
+        if started:
+            self._cond.notify_all()
+
+    def load(self) -> Dict[str, float]:
+        """
+        Snapshot of the work ahead of a newly submitted job.
+
+        Returns:
+            Dictionary with queued and running job counts, their total
+            estimated costs, and the number of free slots
+        """
+        with self._cond:
+            running = sum(self._running.values())
+            return {
+                "queued": sum(len(queue) for queue in self._pending.values()),
+                "queued_cost": sum(item[0] for queue in self._pending.values() for item in queue),
+                "running": running,
+                "running_cost": self._running_cost,
+                "free_slots": max(self.max_concurrent - running, 0)
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth, running jobs and recent queue-wait percentiles.
+
+        Returns:
+            Dictionary of scheduler statistics
+        """
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            clients = {
+                client_id: {
+                    "queued": len(self._pending.get(client_id, [])),
+                    "queued_cost": round(sum(item[0] for item in self._pending.get(client_id, [])), 1),
+                    "running": self._running.get(client_id, 0)
+                }
+                for client_id in set(self._pending) | set(self._running)
+            }
+
+        def percentile(q):
+            return waits[min(int(q * len(waits)), len(waits) - 1)] if waits else 0.0
+
+        return {
+            "max_concurrent": self.max_concurrent,
+            "per_client_limit": self.per_client_limit,
+            "running": sum(client["running"] for client in clients.values()),
+            "queued": sum(client["queued"] for client in clients.values()),
+            "clients": clients,
+            "queue_wait": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": waits[-1] if waits else 0.0
+            }
+        }
@@ -0,0 +1,380 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from utils.cancellation import JobCancelled
+
+# Spans are emitted as log records on this logger, with the span under record.span
+SPAN_LOGGER = "speechably.trace"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("speechably_span", default=None)
+_current_job: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("speechably_job", default=None)
+
+_span_logger = logging.getLogger(SPAN_LOGGER)
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+@dataclass
+class Span:
+    """A timed operation within a trace (one trace per job or request)"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_time: float = field(default_factory=time.time)
+    duration: Optional[float] = None
+    status: str = "ok"
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def set(self, **attributes):
+        """Add or update attributes (e.g. counts known only at the end)"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the calling context, if any"""
+    return _current_span.get()
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time a stage or batch as a child of the current span.
+
+    Args:
+        name: Span name, e.g. "transcription" or "emotion.batch"
+        **attributes: Attributes such as audio_seconds, windows or model
+
+    Yields:
+        The open Span (call .set() to add attributes)
+    """
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent is not None else uuid.uuid4().hex,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent is not None else None,
+        attributes=attributes
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "cancelled" if isinstance(e, JobCancelled) else "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.duration = round(time.perf_counter() - current._started, 6)
+        _current_span.reset(token)
+        if _span_logger.isEnabledFor(logging.INFO):
+            _span_logger.info("%s finished in %.3fs", name, current.duration, extra={"span": current.to_dict()})
+
+@contextmanager
+def trace(job_id: Optional[str] = None, name: str = "job", **attributes) -> Iterator[Span]:
+    """
+    Start a new trace with a root span; logs inside it carry the job id.
+
+    Args:
+        job_id: Request or job identifier (a UUID becomes the trace id)
+        name: Root span name
+        **attributes: Root span attributes
+
+    Yields:
+        The root Span
+    """
+    job_token = _current_job.set(job_id)
+    span_token = _current_span.set(None)
+    try:
+        with span(name, **({"job_id": job_id} if job_id else {}), **attributes) as root:
+            if job_id:
+                try:
+                    root.trace_id = uuid.UUID(job_id).hex
+                except ValueError:
+                    pass
+            yield root
+    finally:
+        _current_span.reset(span_token)
+        _current_job.reset(job_token)
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the job, trace and span of the emitting context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current_span.get()
+        record.job_id = _current_job.get()
+        record.trace_id = current.trace_id if current is not None else None
+        record.span_id = current.span_id if current is not None else None
+        return True
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the message and traceback apart for the JSON formatter"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that may not survive the queue, but keep the fields separate
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "job_id", "trace_id", "span_id", "span"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, correlation ids and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key in ("job_id", "trace_id", "span_id", "span"):
+            if getattr(record, key, None) is not None:
+                entry[key] = getattr(record, key)
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class OTLPSpanHandler(logging.Handler):
+    """
+    Exports spans to an OpenTelemetry collector with OTLP/HTTP JSON.
+    Spans are handed to an exporter thread through a bounded queue and posted
+    in batches, at most flush_interval after they end. A slow or unreachable
+    collector only delays that thread: the logging listener never waits on
+    it, and spans that do not fit in the queue are dropped and counted.
+    """
+
+    # Wakes the exporter thread to post its batch early
+    _FLUSH = object()
+
+    def __init__(self, endpoint: str, service_name: str = "speechably", batch_size: int = 64,
+                 flush_interval: float = 5.0, timeout: float = 5.0, max_queue: int = 2048):
+        """
+        Initialize the exporter and start its thread.
+
+        Args:
+            endpoint: Collector base URL, e.g. http://localhost:4318
+            service_name: service.name resource attribute
+            batch_size: Spans per request
+            flush_interval: Maximum seconds a span waits in the buffer
+            timeout: HTTP timeout in seconds
+            max_queue: Spans waiting for export before new ones are dropped
+        """
+        super().__init__()
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.dropped = 0
+        self._spans: queue.Queue = queue.Queue(max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._export_loop, name="otlp-exporter", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _otlp_span(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        start = int(data["start_time"] * 1e9)
+        otlp = {
+            "traceId": data["trace_id"],
+            "spanId": data["span_id"],
+            "name": data["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int((data["duration"] or 0) * 1e9)),
+            "attributes": [self._attribute(key, value) for key, value in data["attributes"].items()],
+            "status": {"code": 2 if data["status"] == "error" else 1}
+        }
+        if data["parent_id"]:
+            otlp["parentSpanId"] = data["parent_id"]
+        return otlp
+
+    def emit(self, record: logging.LogRecord):
+        data = getattr(record, "span", None)
+        if data is None:
+            return
+        try:
+            self._spans.put_nowait(self._otlp_span(data))
+        except queue.Full:
+            # The collector is falling behind; drop rather than hold up logging
+            self.dropped += 1
+
+    def _export_loop(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        while True:
+            timeout = max(deadline - time.monotonic(), 0.0) if batch else self.flush_interval
+            try:
+                item = self._spans.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not self._FLUSH:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size and not self._stopping.is_set():
+                    continue
+            if batch:
+                self._post(batch)
+                batch = []
+            if self._stopping.is_set():
+                self._drain()
+                return
+
+    def _drain(self):
+        """Post the spans still queued at shutdown, giving up at the first failure."""
+        spans = []
+        while True:
+            try:
+                item = self._spans.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._FLUSH:
+                spans.append(item)
+        for start in range(0, len(spans), self.batch_size):
+            if not self._post(spans[start:start + self.batch_size]):
+                # _post counted the failed batch
+                self.dropped += max(len(spans) - start - self.batch_size, 0)
+                break
+
+    def _post(self, spans: List[Dict[str, Any]]) -> bool:
+        body = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "speechably"}, "spans": spans}]
+        }]}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+            return True
+        except OSError:
+            # The collector is best effort; never let tracing fail the service
+            self.dropped += len(spans)
+            return False
+
+    def flush(self):
+        """Ask the exporter thread to post the spans it holds now."""
+        try:
+            self._spans.put_nowait(self._FLUSH)
+        except queue.Full:
+            pass
+
+    def close(self):
+        """Post what is queued (bounded by the HTTP timeout) and stop the exporter thread."""
+        self._stopping.set()
+        self.flush()
+        self._thread.join(timeout=2 * self.timeout)
+        super().close()
+
+def configure_logging(
+    level: Optional[str] = None,
+    log_file: Optional[str] = None,
+    otlp_endpoint: Optional[str] = None,
+    exporters: Optional[List[logging.Handler]] = None,
+    stream=None
+) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a non-blocking queue to structured handlers.
+    Callers only enqueue records; formatting and I/O happen on the listener
+    thread. Reconfiguring replaces the previous setup.
+
+    Args:
+        level: Root level (default: LOG_LEVEL or INFO)
+        log_file: JSON Lines file of logs and spans (default: LOG_FILE, if set)
+        otlp_endpoint: OTLP/HTTP collector URL (default: OTEL_EXPORTER_OTLP_ENDPOINT, if set)
+        exporters: Additional handlers, e.g. a custom span exporter
+        stream: Console stream (default: stderr); LOG_FORMAT=text keeps plain messages
+
+    Returns:
+        The running QueueListener
+    """
+    global _listener
+    level = level or os.environ.get("LOG_LEVEL", "INFO")
+    log_file = log_file or os.environ.get("LOG_FILE")
+    otlp_endpoint = otlp_endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+
+    console = logging.StreamHandler(stream or sys.stderr)
+    if os.environ.get("LOG_FORMAT", "json") == "text":
+        console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        console.setFormatter(JsonFormatter())
+    handlers: List[logging.Handler] = [console]
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if otlp_endpoint:
+        handlers.append(OTLPSpanHandler(otlp_endpoint, os.environ.get("OTEL_SERVICE_NAME", "speechably")))
+    handlers.extend(exporters or [])
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _StructuredQueueHandler(records)
+    queue_handler.addFilter(ContextFilter())
+
+    with _listener_lock:
+        root = logging.getLogger()
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        for handler in [h for h in root.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+    return _listener
+
+def shutdown_logging():
+    """Drain the queue and close the handlers (registered at exit)."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+atexit.register(shutdown_logging)
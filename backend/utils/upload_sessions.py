@@ -0,0 +1,383 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, Callable, BinaryIO
+
+logger = logging.getLogger(__name__)
+
+# Checksum algorithms accepted in Upload-Checksum headers
+CHECKSUM_ALGORITHMS = ("md5", "sha1", "sha256")
+# Leading bytes searched for the container signature and the MP4 box order
+HEADER_BYTES = 64 * 1024
+
+class UploadError(Exception):
+    """A rejected upload request; status is the HTTP status to return."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+@dataclass
+class UploadSession:
+    """State of one resumable upload, persisted as <upload_id>.json."""
+    upload_id: str
+    filename: str
+    length: int
+    offset: int = 0
+    metadata: Dict[str, str] = field(default_factory=dict)
+    # Container family from the magic bytes, then codecs from the header probe
+    container: Optional[str] = None
+    media: Optional[Dict[str, Any]] = None
+    streamable: Optional[bool] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def complete(self) -> bool:
+        return self.offset >= self.length
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """
+    Identify the container family from the first bytes of a file.
+
+    Args:
+        header: At least the first 12 bytes
+
+    Returns:
+        "mp4" (MP4/MOV), "matroska" (WebM/MKV), "avi", or None for anything else
+    """
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "matroska"
+    if header[:4] == b"RIFF" and header[8:12] == b"AVI ":
+        return "avi"
+    if header[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"):
+        return "mp4"
+    return None
+
+def mp4_moov_first(header: bytes) -> Optional[bool]:
+    """
+    Walk the top-level MP4 boxes to see whether the index (moov) precedes
+    the media data (mdat), which is required to decode while receiving.
+
+    Args:
+        header: Leading bytes of the file
+
+    Returns:
+        True or False, or None if neither box starts within the bytes given
+    """
+    position = 0
+    while position + 8 <= len(header):
+        size = int.from_bytes(header[position:position + 4], "big")
+        kind = header[position + 4:position + 8]
+        if kind == b"moov":
+            return True
+        if kind == b"mdat":
+            return False
+        if size == 1 and position + 16 <= len(header):
+            size = int.from_bytes(header[position + 8:position + 16], "big")
+        if size < 8:
+            return None
+        position += size
+    return None
+
+class UploadSessionStore:
+    """
+    Resumable, chunked uploads (a subset of the tus 1.0 protocol: core,
+    creation, checksum and termination). Each chunk is written at its
+    offset and only counted once its checksum matches, so a dropped
+    connection loses at most the chunk in flight. The container is checked
+    from the first bytes and the codecs are probed as soon as the header
+    is in, so unusable files are rejected before they are fully uploaded.
+    Streamable containers are decoded while the remaining chunks arrive.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int,
+        probe_bytes: int = 1024 * 1024,
+        expire_seconds: float = 24 * 3600,
+        media_probe: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+        decoder_factory: Optional[Callable[[str], Any]] = None
+    ):
+        """
+        Initialize the store and reload sessions left by a previous process.
+
+        Args:
+            root: Directory holding partial files and session manifests
+            max_bytes: Largest accepted upload
+            probe_bytes: Bytes received before the codec probe first runs
+            expire_seconds: Incomplete uploads idle this long are deleted
+            media_probe: Callable(path) returning stream info, or None while the
+                header cannot be parsed (e.g. AudioSegmenter.probe_streams)
+            decoder_factory: Optional callable(output_path) returning a
+                StreamingDecoder; enables decoding during the upload
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.probe_bytes = probe_bytes
+        self.expire_seconds = expire_seconds
+        self.media_probe = media_probe
+        self.decoder_factory = decoder_factory
+        self._sessions: Dict[str, UploadSession] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._decoders: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Reload persisted sessions (their streaming decoders are not restored)."""
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.root, name)) as f:
+                    session = UploadSession(**json.load(f))
+            except (OSError, TypeError, json.JSONDecodeError):
+                continue
+            if os.path.exists(self.data_path(session.upload_id)):
+                self._sessions[session.upload_id] = session
+                self._locks[session.upload_id] = threading.Lock()
+
+    def data_path(self, upload_id: str) -> str:
+        return os.path.join(self.root, f"{upload_id}.part")
+
+    def _manifest_path(self, upload_id: str) -> str:
+        return os.path.join(self.root, f"{upload_id}.json")
+
+    def _save(self, session: UploadSession):
+        session.updated_at = time.time()
+        tmp_path = self._manifest_path(session.upload_id) + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(session.to_dict(), f)
+        os.replace(tmp_path, self._manifest_path(session.upload_id))
+
+    def create(self, filename: str, length: int, metadata: Optional[Dict[str, str]] = None) -> UploadSession:
+        """
+        Start a new upload.
+
+        Args:
+            filename: Sanitized original file name
+            length: Total size in bytes (Upload-Length)
+            metadata: Options to apply when the upload completes
+
+        Returns:
+            New UploadSession
+
+        Raises:
+            UploadError: If the length is invalid or too large
+        """
+        if length <= 0:
+            raise UploadError(400, "Upload-Length must be positive")
+        if length > self.max_bytes:
+            raise UploadError(413, f"File is too large. Max size is {self.max_bytes // (1024 * 1024)}MB.")
+        self.collect_expired()
+
+        session = UploadSession(upload_id=str(uuid.uuid4()), filename=filename, length=length, metadata=metadata or {})
+        open(self.data_path(session.upload_id), "wb").close()
+        self._save(session)
+        with self._lock:
+            self._sessions[session.upload_id] = session
+            self._locks[session.upload_id] = threading.Lock()
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Look up an upload session by id."""
+        with self._lock:
+            return self._sessions.get(upload_id)
+
+    def append(self, upload_id: str, offset: int, stream: BinaryIO, checksum: Optional[str] = None) -> UploadSession:
+        """
+        Write one chunk at the given offset.
+
+        Args:
+            upload_id: Upload identifier
+            offset: Offset the client believes comes next (Upload-Offset)
+            stream: Readable chunk body
+            checksum: Optional "<algorithm> <base64 digest>" (Upload-Checksum)
+
+        Returns:
+            The updated UploadSession
+
+        Raises:
+            UploadError: 404 unknown upload, 409 offset mismatch or already complete, 423 concurrent
+                write, 413 chunk past the declared length, 460 checksum
+                mismatch, 415 unsupported media (the upload is then deleted)
+        """
+        session = self.get(upload_id)
+        if session is None:
+            raise UploadError(404, "Upload not found")
+        expected = self._parse_checksum(checksum)
+
+        lock = self._locks[upload_id]
+        if not lock.acquire(blocking=False):
+            raise UploadError(423, "Another chunk of this upload is being written")
+        try:
+            if session.complete:
+                raise UploadError(409, "Upload is already complete")
+            if offset != session.offset:
+                raise UploadError(409, f"Upload-Offset {offset} does not match the current offset {session.offset}")
+
+            digest = hashlib.new(expected[0]) if expected else None
+            written = 0
+            with open(self.data_path(upload_id), "r+b") as f:
+                f.seek(offset)
+                while True:
+                    block = stream.read(1024 * 1024)
+                    if not block:
+                        break
+                    written += len(block)
+                    if offset + written > session.length:
+                        f.truncate(offset)
+                        raise UploadError(413, "Chunk extends past Upload-Length")
+                    f.write(block)
+                    if digest is not None:
+                        digest.update(block)
+                if digest is not None and digest.digest() != expected[1]:
+                    # The offset is not advanced, so the client resends the same chunk
+                    f.truncate(offset)
+                    raise UploadError(460, "Checksum mismatch")
+                f.flush()
+                os.fsync(f.fileno())
+
+            session.offset = offset + written
+            # A decoder started by _validate is fed from byte 0 already
+            decoder = self._decoders.get(upload_id)
+            self._validate(session)
+            self._save(session)
+            if decoder is not None:
+                decoder.feed(self.data_path(upload_id), offset, session.offset)
+            return session
+        except UploadError as e:
+            if e.status == 415:
+                self.delete(upload_id)
+            raise
+        finally:
+            lock.release()
+
+    @staticmethod
+    def _parse_checksum(checksum: Optional[str]):
+        """Parse an Upload-Checksum header into (algorithm, digest bytes)."""
+        if not checksum:
+            return None
+        algorithm, _, encoded = checksum.strip().partition(" ")
+        if algorithm not in CHECKSUM_ALGORITHMS:
+            raise UploadError(400, f"Unsupported checksum algorithm '{algorithm}'")
+        try:
+            return algorithm, base64.b64decode(encoded, validate=True)
+        except ValueError:
+            raise UploadError(400, "Malformed Upload-Checksum")
+
+    def _validate(self, session: UploadSession):
+        """
+        Check the media as soon as enough of it has arrived: the magic bytes
+        on the first chunk, the codecs once the header parses (at the latest
+        when the upload completes). Starts the streaming decoder when the
+        container can be read front to back.
+        """
+        path = self.data_path(session.upload_id)
+        if session.streamable is None and session.offset >= 12:
+            with open(path, "rb") as f:
+                header = f.read(HEADER_BYTES)
+            if session.container is None:
+                session.container = sniff_container(header)
+                if session.container is None:
+                    raise UploadError(415, "Not a supported video file (MP4, MOV, WebM or AVI)")
+            if session.container != "mp4":
+                session.streamable = True
+            else:
+                session.streamable = mp4_moov_first(header)
+                if session.streamable is None and session.offset >= HEADER_BYTES:
+                    session.streamable = False
+
+        # A file with its index at the end cannot be probed before it is complete
+        if session.media is None and self.media_probe is not None and (
+            (session.offset >= self.probe_bytes and session.streamable) or session.complete
+        ):
+            session.media = self.media_probe(path)
+            if session.media is None and session.complete:
+                raise UploadError(415, "The file could not be read as a video")
+            if session.media is not None and session.media["audio_codec"] is None:
+                raise UploadError(415, "The video has no audio track")
+            if session.media is not None and session.streamable and self.decoder_factory is not None:
+                decoder = self.decoder_factory(os.path.join(self.root, f"{session.upload_id}.wav"))
+                decoder.feed(path, 0, session.offset)
+                self._decoders[session.upload_id] = decoder
+
+    def finish(self, upload_id: str, destination: str, decode_timeout: float = 60.0) -> Dict[str, Optional[str]]:
+        """
+        Hand over a completed upload: move the file out of the store and
+        collect the audio decoded during the upload.
+
+        Args:
+            upload_id: Upload identifier
+            destination: Path the uploaded file is moved to
+            decode_timeout: Seconds to wait for the streaming decode to finish
+
+        Returns:
+            Dictionary with video_path and decoded_audio (None when the audio
+            still has to be extracted from the complete file)
+        """
+        decoder = self._decoders.pop(upload_id, None)
+        decoded_audio = decoder.finish(decode_timeout) if decoder is not None else None
+        if decoder is not None and decoded_audio is None:
+            logger.warning("Streaming decode of upload %s failed; decoding after upload", upload_id)
+        os.replace(self.data_path(upload_id), destination)
+        if decoded_audio is not None:
+            audio_destination = os.path.splitext(destination)[0] + ".wav"
+            os.replace(decoded_audio, audio_destination)
+            decoded_audio = audio_destination
+        self._forget(upload_id)
+        return {"video_path": destination, "decoded_audio": decoded_audio}
+
+    def delete(self, upload_id: str) -> bool:
+        """
+        Terminate an upload and delete its data.
+
+        Returns:
+            Whether the upload existed
+        """
+        # Only known ids ever reach a file path
+        if self.get(upload_id) is None:
+            return False
+        decoder = self._decoders.pop(upload_id, None)
+        if decoder is not None:
+            decoder.abort()
+        for path in (self.data_path(upload_id), os.path.join(self.root, f"{upload_id}.wav")):
+            if os.path.exists(path):
+                os.remove(path)
+        self._forget(upload_id)
+        return True
+
+    def _forget(self, upload_id: str):
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+            self._locks.pop(upload_id, None)
+        if os.path.exists(self._manifest_path(upload_id)):
+            os.remove(self._manifest_path(upload_id))
+
+    def collect_expired(self) -> int:
+        """
+        Delete incomplete uploads that have been idle longer than expire_seconds.
+
+        Returns:
+            Number of uploads deleted
+        """
+        cutoff = time.time() - self.expire_seconds
+        with self._lock:
+            expired = [upload_id for upload_id, session in self._sessions.items() if session.updated_at < cutoff]
+        for upload_id in expired:
+            self.delete(upload_id)
+        if expired:
+            logger.info("Deleted %d expired upload(s)", len(expired))
+        return len(expired)
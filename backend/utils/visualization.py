@@ -1,15 +1,22 @@
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Tuple, Any, Optional
 
+from utils.data_processor import DataProcessor
+from utils.filler_detector import FillerDetector
+
 class VisualizationHelper:
     """
     Helper class for preparing data for visualization in the UI.
     Transforms raw data into formats suitable for visualization libraries.
     """
     
+    # Words and phrases counted as fillers when estimating clarity
+    FILLER_WORDS = ["um", "uh", "like", "you know", "sort of", "kind of"]
+    
     def __init__(self):
         """Initialize the visualization helper"""
-        pass
+        self.filler_detector = FillerDetector(self.FILLER_WORDS)
     
     def prepare_emotion_timeline_data(self, emotion_segments: List[Tuple[str, str]]) -> pd.DataFrame:
         """
@@ -80,12 +87,44 @@ class VisualizationHelper:
             "transitions": transitions
         }
     
-    def prepare_wps_data(self, transcription_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def prepare_wps_records(
+        self,
+        transcription_data: List[Dict[str, Any]],
+        points: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Prepare words-per-second points as plain records (for JSON responses).
+        
+        Args:
+            transcription_data: List of transcription segment dictionaries
+            points: Optional number of display points (LTTB downsampling)
+            
+        Returns:
+            List of dictionaries with Time, WPS, Optimal Min, Optimal Max and Emotion
+        """
+        records = [
+            {
+                "Time": (segment["start"] + segment["end"]) / 2,  # Midpoint of segment
+                "WPS": segment["wps"],
+                "Optimal Min": 2.0,  # Optimal minimum WPS
+                "Optimal Max": 3.0,   # Optimal maximum WPS
+                "Emotion": segment["emotion"]    # Include emotion for combined visualization
+            }
+            for segment in transcription_data
+        ]
+        return self.downsample_wps(records, points) if points else records
+    
+    def prepare_wps_data(
+        self,
+        transcription_data: List[Dict[str, Any]],
+        points: Optional[int] = None
+    ) -> pd.DataFrame:
         """
         Prepare words-per-second data for visualization.
         
         Args:
             transcription_data: List of transcription segment dictionaries
+            points: Optional number of display points (LTTB downsampling)
             
         Returns:
             DataFrame with WPS data
@@ -94,24 +133,162 @@ class VisualizationHelper:
             # Return empty DataFrame with expected columns
             return pd.DataFrame(columns=["Time", "WPS", "Optimal Min", "Optimal Max", "Emotion"])
         
-        # Extract data points
-        data_points = []
+        return pd.DataFrame(self.prepare_wps_records(transcription_data, points))
+    
+    @staticmethod
+    def lttb_indices(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+        """
+        Select display points with largest-triangle-three-buckets.
+        The first and last points are always kept; every bucket in between
+        keeps the point forming the largest triangle with the previously
+        selected point and the mean of the next bucket.
         
-        for segment in transcription_data:
-            # Use midpoint of segment for time
-            time = (segment["start"] + segment["end"]) / 2
-            wps = segment["wps"]
-            emotion = segment["emotion"]
+        Args:
+            x: Sorted x values (time)
+            y: y values
+            points: Number of points to keep (at least 3)
             
-            data_points.append({
-                "Time": time,
-                "WPS": wps,
-                "Optimal Min": 2.0,  # Optimal minimum WPS
-                "Optimal Max": 3.0,   # Optimal maximum WPS
-                "Emotion": emotion    # Include emotion for combined visualization
-            })
+        Returns:
+            Sorted indices of the selected points
+        """
+        n = len(x)
+        points = max(points, 3)
+        if n <= points:
+            return np.arange(n)
+        
+        # points - 2 buckets over the interior points; edges are strictly increasing
+        edges = np.linspace(1, n - 1, points - 1).astype(np.int64)
+        counts = np.diff(edges)
+        # Mean of each bucket, plus the last point as the "next bucket" of the final one.
+        # Slicing at the last edge keeps the last point out of the final bucket's sum.
+        mean_x = np.append(np.add.reduceat(x[:edges[-1]], edges[:-1]) / counts, x[-1])
+        mean_y = np.append(np.add.reduceat(y[:edges[-1]], edges[:-1]) / counts, y[-1])
+        
+        selected = np.empty(points, dtype=np.int64)
+        selected[0], selected[-1] = 0, n - 1
+        a = 0
+        for i in range(points - 2):
+            start, end = edges[i], edges[i + 1]
+            area = np.abs(
+                (x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a])
+            )
+            a = start + int(area.argmax())
+            selected[i + 1] = a
+        return selected
+    
+    def downsample_wps(self, wps_records: List[Dict[str, Any]], points: int) -> List[Dict[str, Any]]:
+        """
+        Reduce a WPS series to a number of display points, keeping its shape.
+        
+        Args:
+            wps_records: Records as returned by prepare_wps_records
+            points: Number of display points
+            
+        Returns:
+            Subset of the records selected by LTTB
+        """
+        if len(wps_records) <= points:
+            return wps_records
+        x = np.fromiter((record["Time"] for record in wps_records), dtype=np.float64, count=len(wps_records))
+        y = np.fromiter((record["WPS"] for record in wps_records), dtype=np.float64, count=len(wps_records))
+        return [wps_records[i] for i in self.lttb_indices(x, y, points)]
+    
+    def merge_emotion_runs(
+        self,
+        emotion_segments: List[Dict[str, str]],
+        max_segments: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Merge consecutive segments with the same emotion.
+        If more than max_segments runs remain, the timeline is split into
+        max_segments equal buckets, each taking its dominant emotion by duration,
+        and the buckets are merged instead.
         
-        return pd.DataFrame(data_points)
+        Args:
+            emotion_segments: List of {"time_range", "emotion"} dictionaries
+            max_segments: Optional upper bound on the number of segments
+            
+        Returns:
+            List of {"time_range", "emotion"} dictionaries
+        """
+        if not emotion_segments:
+            return []
+        
+        bounds = [segment["time_range"].split(" - ") for segment in emotion_segments]
+        starts = [start for start, _ in bounds]
+        ends = [end for _, end in bounds]
+        emotions = np.array([segment["emotion"] for segment in emotion_segments])
+        
+        runs = self._merge_runs(starts, ends, emotions)
+        if not max_segments or len(runs) <= max_segments:
+            return runs
+        
+        start_seconds = np.array([self._time_to_seconds(start) for start in starts], dtype=np.float64)
+        end_seconds = np.array([self._time_to_seconds(end) for end in ends], dtype=np.float64)
+        total = max(end_seconds.max(), 1e-9)
+        buckets = np.minimum(
+            ((start_seconds + end_seconds) / 2 / total * max_segments).astype(np.int64),
+            max_segments - 1
+        )
+        labels, codes = np.unique(emotions, return_inverse=True)
+        weights = np.zeros((max_segments, len(labels)))
+        np.add.at(weights, (buckets, codes), np.maximum(end_seconds - start_seconds, 1e-3))
+        
+        occupied = np.flatnonzero(np.bincount(buckets, minlength=max_segments))
+        first = np.searchsorted(buckets, occupied, side="left")
+        last = np.searchsorted(buckets, occupied, side="right") - 1
+        return self._merge_runs(
+            [starts[i] for i in first],
+            [ends[i] for i in last],
+            labels[weights[occupied].argmax(axis=1)]
+        )
+    
+    @staticmethod
+    def _merge_runs(starts: List[str], ends: List[str], emotions: np.ndarray) -> List[Dict[str, str]]:
+        """Join consecutive entries with the same emotion into one time range."""
+        changes = np.flatnonzero(emotions[1:] != emotions[:-1]) + 1
+        run_starts = np.concatenate(([0], changes))
+        run_ends = np.concatenate((changes, [len(emotions)])) - 1
+        return [
+            {"time_range": f"{starts[first]} - {ends[last]}", "emotion": str(emotions[first])}
+            for first, last in zip(run_starts, run_ends)
+        ]
+    
+    def downsample_payload(self, payload: Any, points: int) -> Any:
+        """
+        Reduce the timeline series of an analysis response for display.
+        Nested payloads (job status, batch results) are reduced as well; the
+        transcript itself is left untouched.
+        
+        Args:
+            payload: Analysis response, job status or batch response
+            points: Number of display points for wps_data and emotion_segments
+            
+        Returns:
+            Copy of the payload with downsampled series and a "downsampled"
+            entry giving the original lengths
+        """
+        if isinstance(payload, list):
+            return [self.downsample_payload(item, points) for item in payload]
+        if not isinstance(payload, dict):
+            return payload
+        if not isinstance(payload.get("wps_data"), list) and not isinstance(payload.get("emotion_segments"), list):
+            return {key: self.downsample_payload(value, points) for key, value in payload.items()}
+        
+        downsampled = dict(payload)
+        wps_data = payload.get("wps_data") or []
+        emotion_segments = payload.get("emotion_segments") or []
+        if wps_data:
+            downsampled["wps_data"] = self.downsample_wps(wps_data, points)
+        if emotion_segments:
+            downsampled["emotion_segments"] = self.merge_emotion_runs(emotion_segments, points)
+        downsampled["downsampled"] = {
+            "points": points,
+            "wps_points": len(wps_data),
+            "emotion_segments": len(emotion_segments)
+        }
+        return downsampled
     
     def prepare_combined_timeline_data(
         self, 
@@ -143,19 +320,11 @@ class VisualizationHelper:
         
         # Add WPS data points
         for _, row in wps_data.iterrows():
-            # Determine speed category
-            if row["WPS"] > 3.0:
-                speed_category = "Too Fast"
-            elif row["WPS"] < 1.0:
-                speed_category = "Too Slow"
-            else:
-                speed_category = "Optimal"
-                
             combined_data.append({
                 "Time": row["Time"],
                 "Type": "WPS",
                 "Value": row["WPS"],
-                "Category": speed_category,
+                "Category": self.get_speed_category(row["WPS"]),
                 "Emotion": row["Emotion"]
             })
         
@@ -206,7 +375,8 @@ class VisualizationHelper:
                 "avg_words_per_segment": 0,
                 "avg_wps": 0,
                 "clarity_score": 0,
-                "issues": []
+                "issues": [],
+                "fillers": self.filler_detector.analyze([])
             }
         
         # Calculate metrics
@@ -219,29 +389,62 @@ class VisualizationHelper:
         # Simplified clarity score calculation
         clarity_score = min(100, max(0, (avg_words_per_segment / 20) * 100))
         
+        # Every filler occurrence, located in one pass over the transcript
+        fillers = self.filler_detector.analyze(transcription_data)
+        fillers_by_segment = {}
+        for event in fillers["events"]:
+            if event["filler"] != "repetition":
+                fillers_by_segment[event["segment"]] = fillers_by_segment.get(event["segment"], 0) + 1
+        
         # Identify potential clarity issues
         issues = []
         for i, segment in enumerate(transcription_data):
-            text = segment["text"]
-            words = text.split()
+            words = segment["text"].split()
             
             # Check for very short segments (potentially unclear speech)
             if len(words) < 3 and segment["end"] - segment["start"] > 2:
                 issues.append(f"Segment {i+1} has very few words for its duration")
             
-            # Check for segments with too many filler words (simplified)
-            filler_words = ["um", "uh", "like", "you know", "sort of", "kind of"]
-            filler_count = sum(text.lower().count(word) for word in filler_words)
-            if filler_count > len(words) * 0.2:  # If more than 20% are filler words
+            # Check for segments with too many filler words
+            if fillers_by_segment.get(segment.get("index"), 0) > len(words) * 0.2:  # If more than 20% are filler words
                 issues.append(f"Segment {i+1} has many filler words")
         
         return {
             "avg_words_per_segment": round(avg_words_per_segment, 1),
             "avg_wps": round(avg_wps, 2),
             "clarity_score": round(clarity_score, 1),
-            "issues": issues
+            "issues": issues,
+            "fillers": fillers
         }
     
+    def count_filler_words(self, text: str) -> Dict[str, int]:
+        """
+        Count occurrences of each filler word in a piece of text.
+        
+        Args:
+            text: Transcribed text
+            
+        Returns:
+            Dictionary mapping filler words to their (non-zero) counts
+        """
+        return self.filler_detector.count(text)
+    
+    def get_speed_category(self, wps: float) -> str:
+        """
+        Classify a speaking rate against the optimal WPS range.
+        
+        Args:
+            wps: Words per second
+            
+        Returns:
+            "Too Fast", "Too Slow" or "Optimal"
+        """
+        if wps > 3.0:
+            return "Too Fast"
+        elif wps < 1.0:
+            return "Too Slow"
+        return "Optimal"
+    
     def _time_to_seconds(self, time_str: str) -> float:
         """
         Convert MM:SS format to seconds.
@@ -252,8 +455,7 @@ class VisualizationHelper:
         Returns:
             Time in seconds
         """
-        minutes, seconds = map(int, time_str.split(":"))
-        return minutes * 60 + seconds
+        return DataProcessor.parse_timestamp(time_str)
     
     def get_emotion_color_map(self) -> Dict[str, str]:
         """
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+class WindowCache:
+    """
+    LRU cache of per-window inference results keyed by PCM content.
+    Lets re-uploads of an edited recording skip windows whose audio
+    has already been through the emotion model and Whisper.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of windows kept before evicting the least recently used
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def content_key(samples: np.ndarray) -> str:
+        """
+        Hash the 16-bit PCM content of a window.
+
+        Args:
+            samples: Float waveform in [-1, 1] or int16 PCM
+
+        Returns:
+            Hex digest identifying the window content
+        """
+        samples = np.asarray(samples).squeeze()
+        if samples.dtype != np.int16:
+            # Inverse of the int16 / 32768 scaling used by torchaudio and soundfile
+            samples = np.clip(np.round(samples * 32768), -32768, 32767).astype(np.int16)
+        return hashlib.blake2b(samples.tobytes(), digest_size=16).hexdigest()
+
+    def get(self, key: str, field: str) -> Optional[Any]:
+        """
+        Look up one cached field of a window, counting a hit or a miss.
+
+        Args:
+            key: Content key from content_key
+            field: Result field, e.g. "emotion" or "text"
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or field not in entry:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[field]
+
+    def put(self, key: str, **fields):
+        """
+        Store result fields for a window, merging with fields already cached.
+
+        Args:
+            key: Content key from content_key
+            **fields: Result fields to store (emotion, probabilities, text, ...)
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, {})
+            entry.update(fields)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            Dictionary with size, hits, misses, evictions and hit rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -0,0 +1,7 @@
+"""
+Lightweight ASGI web tier for Speechably.
+
+Handles upload ingest, chat, results lookup and health checks, and hands
+analysis to separate inference worker processes. Nothing in this package
+imports torch, transformers, whisper or pandas.
+"""
@@ -0,0 +1,363 @@
+"""
+ASGI web tier.
+
+Usage (from the repository root, with INFERENCE_WORKER_AUTHKEY set for both):
+    python backend/inference_worker.py --address 127.0.0.1:6100 &
+    uvicorn web.app:app --app-dir backend --port 5000
+
+Upload ingest, chat, job/results lookup and health are served with
+non-blocking I/O; analysis runs in the inference worker processes
+(INFERENCE_WORKER_ADDRESSES). Timelines, job profiles and the cache and
+scheduler statistics are looked up on the workers. The live WebSocket mode,
+batch uploads and resumable (tus) uploads remain on the Flask app.
+"""
+import asyncio
+import hmac
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+import anyio
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route, Mount
+from starlette.staticfiles import StaticFiles
+from werkzeug.utils import secure_filename
+
+from utils.response_encoding import ResponseEncoder
+from utils.result_store import ResultStore
+from utils.tracing import configure_logging
+from web.worker_client import InferenceWorkerClient
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv(os.path.join(BASE_DIR, '.env'))
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
+FRONTEND_BUILD = os.path.join(BASE_DIR, '..', 'frontend', 'build')
+MAX_UPLOAD_BYTES = 700 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# Seconds between result polls while a synchronous upload waits for its job
+POLL_INTERVAL = float(os.environ.get('WEB_POLL_INTERVAL', 0.5))
+# Seconds between collections of completed sessions from the inference workers
+PROGRESS_SYNC_INTERVAL = float(os.environ.get('PROGRESS_SYNC_INTERVAL', 30))
+
+# Per-request profiling requires this key in X-Admin-Key (as on the Flask app)
+PROFILING_ADMIN_KEY = os.environ.get('PROFILING_ADMIN_KEY')
+
+# Same extensions as api.routes.allowed_file
+ALLOWED_EXTENSIONS = {'mp4', 'mov', 'avi', 'webm'}
+
+worker_client = InferenceWorkerClient()
+# Practice history of all clients, fed from the sessions completed on every worker
+history = ResultStore(max_history_sessions=int(os.environ.get('PROGRESS_HISTORY_SESSIONS', 50)))
+response_encoder = ResponseEncoder(min_compress_bytes=int(os.environ.get('RESPONSE_COMPRESS_MIN_BYTES', 1024)))
+
+# Gemini (google-generativeai) is only imported on the first chat request
+_gemini_service = None
+_gemini_lock = asyncio.Lock()
+
+def allowed_file(filename):
+    """Check if file has an allowed extension"""
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+def display_points(request: Request):
+    """Number of timeline display points requested with ?points=N, or None for full resolution."""
+    try:
+        points = int(request.query_params.get('points', 0))
+    except ValueError:
+        return None
+    return points if points > 0 else None
+
+def is_admin(request: Request) -> bool:
+    """Check the X-Admin-Key header against PROFILING_ADMIN_KEY"""
+    key = request.headers.get('X-Admin-Key', '')
+    return bool(PROFILING_ADMIN_KEY) and hmac.compare_digest(key.encode(), PROFILING_ADMIN_KEY.encode())
+
+def client_id(request: Request) -> str:
+    """Client identity for scheduling and history (X-Client-Id header, else remote address)."""
+    return request.headers.get('X-Client-Id') or (request.client.host if request.client else 'anonymous')
+
+async def encoded_response(request: Request, payload, status_code=200):
+    """Encode an analysis payload (Accept-Encoding, ?layout=columnar) off the event loop."""
+    body, headers = await anyio.to_thread.run_sync(
+        lambda: response_encoder.encode(
+            payload,
+            accept_encoding=request.headers.get('accept-encoding'),
+            columnar=request.query_params.get('layout') == 'columnar'
+        )
+    )
+    return Response(body, status_code=status_code, headers=headers)
+
+async def get_gemini_service():
+    """Create the GeminiService on first use, off the event loop."""
+    global _gemini_service
+    async with _gemini_lock:
+        if _gemini_service is None:
+            def load():
+                from services.gemini_service import GeminiService
+                return GeminiService(api_key=os.environ.get('GEMINI_API_KEY'))
+            _gemini_service = await anyio.to_thread.run_sync(load)
+    return _gemini_service
+
+async def save_upload(upload, path):
+    """Stream an uploaded file to disk in chunks, enforcing the size limit."""
+    written = 0
+    with open(path, 'wb') as f:
+        while True:
+            chunk = await upload.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise ValueError('File is too large. Max size is 700MB.')
+            await anyio.to_thread.run_sync(f.write, chunk)
+
+async def upload_video(request: Request):
+    """
+    Ingest an uploaded video and hand it to an inference worker.
+    Waits (asynchronously) for the result, or returns 202 with a job id
+    when called with ?mode=progressive.
+    """
+    profile = request.headers.get('X-Profile') == '1' or request.query_params.get('profile') == '1'
+    if profile and not is_admin(request):
+        return JSONResponse({'error': 'Profiling requires a valid admin key'}, status_code=403)
+
+    form = await request.form()
+    upload = form.get('file')
+    if upload is None or not hasattr(upload, 'filename'):
+        return JSONResponse({'error': 'No file part'}, status_code=400)
+    if upload.filename == '':
+        return JSONResponse({'error': 'No selected file'}, status_code=400)
+    if not allowed_file(upload.filename):
+        return JSONResponse({'error': 'File type not allowed'}, status_code=400)
+
+    job_id = str(uuid.uuid4())
+    upload_path = os.path.join(UPLOAD_FOLDER, f"{job_id}_{secure_filename(upload.filename)}")
+    try:
+        await save_upload(upload, upload_path)
+    except ValueError as e:
+        os.remove(upload_path)
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except BaseException:
+        # I/O errors and disconnects must not leave the partial upload behind
+        if os.path.exists(upload_path):
+            os.remove(upload_path)
+        raise
+    finally:
+        await upload.close()
+
+    progressive = request.query_params.get('mode') == 'progressive'
+    try:
+        reply = await worker_client.submit(
+            job_id,
+            upload_path,
+            mode='progressive' if progressive else 'full',
+            timeline=request.query_params.get('timeline') == '1',
+            client_id=client_id(request),
+            analysis=request.query_params.get('analysis'),
+            profile=profile
+        )
+    except OSError as e:
+        reply = {'ok': False, 'error': f"Inference worker unavailable: {str(e)}"}
+    if not reply.get('ok'):
+        os.remove(upload_path)
+        return JSONResponse({'error': reply.get('error', 'Worker rejected job')}, status_code=reply.get('status', 503))
+
+    if progressive:
+        return JSONResponse({
+            'success': True,
+            'job_id': job_id,
+            'status_url': f"/api/jobs/{job_id}"
+        }, status_code=202)
+
+    while True:
+        job = await worker_client.status(job_id, display_points(request))
+        if job is not None and job['status'] == 'completed':
+            return await encoded_response(request, job['result'])
+        if job is not None and job['status'] == 'failed':
+            return JSONResponse({'error': job['error']}, status_code=500)
+        if job is not None and job['status'] == 'cancelled':
+            return JSONResponse({'error': f"Job cancelled: {job['error']}"}, status_code=409)
+        if await request.is_disconnected():
+            # Nobody is waiting for the result any more
+            await worker_client.cancel(job_id, 'client disconnected')
+            return JSONResponse({'error': 'Client disconnected'}, status_code=499)
+        await asyncio.sleep(POLL_INTERVAL)
+
+async def get_job(request: Request):
+    """Return the status, progress and latest result of a job"""
+    job = await worker_client.status(request.path_params['job_id'], display_points(request))
+    if job is None:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+    return await encoded_response(request, job)
+
+async def get_job_profile(request: Request):
+    """Download the profile of a job run with profiling enabled (admin only, ?format=json|folded)"""
+    if not is_admin(request):
+        return JSONResponse({'error': 'Admin key required'}, status_code=403)
+    job_id = request.path_params['job_id']
+    folded = request.query_params.get('format') == 'folded'
+    reply = await worker_client.profile(job_id, 'folded' if folded else 'json')
+    if reply is None:
+        return JSONResponse({'error': 'No profile for this job'}, status_code=404)
+    if folded:
+        return Response(reply['profile'], media_type='text/plain',
+                        headers={'Content-Disposition': f'attachment; filename={job_id}.folded'})
+    return JSONResponse(reply['profile'], headers={'Content-Disposition': f'attachment; filename={job_id}.profile.json'})
+
+async def get_timeline(request: Request):
+    """Return the emotion/pace timeline of an analyzed video at ?level=<seconds> (default 15)"""
+    try:
+        level = float(request.query_params.get('level', 15))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    reply = await worker_client.timeline(request.path_params['video_id'], level)
+    if reply is None:
+        return JSONResponse({'error': 'No timeline available for this video'}, status_code=404)
+    if not reply.get('ok'):
+        return JSONResponse({'error': reply.get('error')}, status_code=reply.get('status', 500))
+    return await encoded_response(request, reply['timeline'])
+
+async def cache_stats(request: Request):
+    """Window cache statistics of every inference worker"""
+    workers = await worker_client.stats()
+    return JSONResponse({'workers': {name: reply.get('cache', reply) for name, reply in workers.items()}})
+
+async def scheduler_stats(request: Request):
+    """Scheduler and analysis profile statistics of every inference worker"""
+    workers = await worker_client.stats()
+    return JSONResponse({'workers': {name: reply.get('scheduler', reply) for name, reply in workers.items()}})
+
+async def sync_history():
+    """Fold the sessions completed on the inference workers into the history."""
+    for user_id, job_id, result, timestamp in await worker_client.collect_sessions():
+        history.record_session(user_id, job_id, result, timestamp)
+
+async def get_progress(request: Request):
+    """Return the practice history of the calling client"""
+    await sync_history()
+    progress = history.get_progress(client_id(request))
+    if progress is None:
+        return JSONResponse({'error': 'No completed analyses for this client'}, status_code=404)
+    return await encoded_response(request, progress)
+
+async def compare_progress(request: Request):
+    """Compare two of the caller's sessions (?a=&b=), or one session with the caller's averages"""
+    params = request.query_params
+    if not params.get('a'):
+        return JSONResponse({'error': 'Query parameter a is required'}, status_code=400)
+    align = params.get('align', 'relative')
+    if align not in ('relative', 'absolute'):
+        return JSONResponse({'error': 'align must be relative or absolute'}, status_code=400)
+    try:
+        bins = min(max(int(params.get('bins', 100)), 1), 1000)
+    except ValueError:
+        bins = 100
+    await sync_history()
+    comparison = history.compare_sessions(client_id(request), params['a'], params.get('b'), bins, align)
+    if comparison is None:
+        return JSONResponse({'error': "Session not found in this client's recent history"}, status_code=404)
+    return await encoded_response(request, comparison)
+
+async def cancel_job(request: Request):
+    """Cancel a queued or running job"""
+    job_id = request.path_params['job_id']
+    status = await worker_client.cancel(job_id, 'cancelled by client')
+    if status is None:
+        return JSONResponse({'error': 'Job not found'}, status_code=404)
+    if status != 'cancelled':
+        return JSONResponse({'error': f"Job already {status}"}, status_code=409)
+    return JSONResponse({'success': True, 'job_id': job_id, 'status': status}, status_code=202)
+
+async def chat_with_coach(request: Request):
+    """Handle chat requests to the AI coach"""
+    try:
+        data = await request.json()
+        user_input = data.get('message', '')
+        emotion_segments = data.get('emotion_segments', [])
+
+        emotion_context = "\n".join([f"{seg['time_range']}: {seg['emotion']}"
+                                     for seg in emotion_segments])
+
+        gemini_service = await get_gemini_service()
+        response = await anyio.to_thread.run_sync(
+            gemini_service.generate_chat_response, user_input, emotion_context
+        )
+        return JSONResponse({'response': response})
+
+    except Exception as e:
+        logger.exception("Chat request failed")
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+async def healthcheck(request: Request):
+    """Health of the web tier and of every inference worker"""
+    if _gemini_service is None:
+        gemini_status = "not_loaded"
+    else:
+        gemini_status = "available" if _gemini_service.model is not None else "unavailable"
+    return JSONResponse({
+        'status': 'ok',
+        'services': {
+            'gemini': gemini_status,
+            'workers': await worker_client.health()
+        }
+    })
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Create the upload folder on startup, then collect completed sessions
+    periodically so the workers' queues stay short.
+    """
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+    async def collect():
+        while True:
+            await anyio.sleep(PROGRESS_SYNC_INTERVAL)
+            try:
+                await sync_history()
+            except Exception:
+                logger.exception("Collecting sessions from the inference workers failed")
+
+    async with anyio.create_task_group() as tasks:
+        tasks.start_soon(collect)
+        yield
+        tasks.cancel_scope.cancel()
+
+def create_app():
+    """Create and configure the ASGI application (the upload folder is created on startup)"""
+    routes = [
+        Route('/api/upload', upload_video, methods=['POST']),
+        Route('/api/jobs/{job_id}', get_job, methods=['GET']),
+        Route('/api/jobs/{job_id}', cancel_job, methods=['DELETE']),
+        Route('/api/jobs/{job_id}/profile', get_job_profile, methods=['GET']),
+        Route('/api/results/{video_id}/timeline', get_timeline, methods=['GET']),
+        Route('/api/progress', get_progress, methods=['GET']),
+        Route('/api/progress/compare', compare_progress, methods=['GET']),
+        Route('/api/chat', chat_with_coach, methods=['POST']),
+        Route('/api/cache/stats', cache_stats, methods=['GET']),
+        Route('/api/scheduler/stats', scheduler_stats, methods=['GET']),
+        Route('/api/healthcheck', healthcheck, methods=['GET']),
+        # Serve the React build (index.html for client-side routes)
+        Mount('/', StaticFiles(directory=FRONTEND_BUILD, html=True, check_dir=False))
+    ]
+    middleware = [
+        Middleware(
+            CORSMiddleware,
+            allow_origins=['http://localhost:3000'],
+            allow_credentials=True,
+            allow_methods=['*'],
+            allow_headers=['*']
+        )
+    ]
+    return Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+app = create_app()
@@ -0,0 +1,227 @@
+import itertools
+import os
+from multiprocessing.connection import Client
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+import anyio
+
+Address = Union[str, Tuple[str, int]]
+
+def parse_addresses(value: str) -> List[Address]:
+    """
+    Parse a comma-separated list of "host:port" entries or Unix socket paths.
+
+    Args:
+        value: Address list, e.g. "127.0.0.1:6100,127.0.0.1:6101"
+
+    Returns:
+        List of Listener/Client addresses
+    """
+    addresses = []
+    for entry in value.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(':')
+        addresses.append((host, int(port)) if host and port.isdigit() else entry)
+    return addresses
+
+class InferenceWorkerClient:
+    """
+    Async client for the inference workers.
+    Each request is a short blocking socket exchange run in a worker thread,
+    so the event loop never waits on the models.
+    """
+
+    def __init__(self, addresses: Optional[List[Address]] = None, authkey: Optional[bytes] = None):
+        """
+        Initialize the client.
+
+        Args:
+            addresses: Worker addresses (default: INFERENCE_WORKER_ADDRESSES)
+            authkey: Shared secret (default: INFERENCE_WORKER_AUTHKEY)
+
+        Raises:
+            RuntimeError: If no shared secret is configured
+        """
+        self.addresses = addresses or parse_addresses(
+            os.environ.get('INFERENCE_WORKER_ADDRESSES', '127.0.0.1:6100')
+        )
+        # Workers unpickle every message, so there is no built-in default key
+        self.authkey = authkey or os.environ.get('INFERENCE_WORKER_AUTHKEY', '').encode()
+        if not self.authkey:
+            raise RuntimeError("INFERENCE_WORKER_AUTHKEY must be set to the secret shared with the inference workers")
+        self._next_address = itertools.cycle(self.addresses)
+
+    def _request(self, address: Address, message: Dict[str, Any]) -> Dict[str, Any]:
+        with Client(address, authkey=self.authkey) as conn:
+            conn.send(message)
+            return conn.recv()
+
+    async def request(self, address: Address, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one message to a worker without blocking the event loop.
+
+        Args:
+            address: Worker address
+            message: Request dictionary with an "op" key
+
+        Returns:
+            Reply dictionary
+        """
+        return await anyio.to_thread.run_sync(self._request, address, message)
+
+    async def submit(
+        self,
+        job_id: str,
+        path: str,
+        mode: str = 'full',
+        timeline: bool = False,
+        client_id: str = 'anonymous',
+        analysis: Optional[str] = None,
+        profile: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Submit an uploaded file to the next worker (round robin).
+
+        Args:
+            job_id: Job identifier
+            path: Path of the uploaded video on the shared filesystem
+            mode: "full" or "progressive"
+            timeline: Whether to build the multi-resolution timeline
+            client_id: Client identifier used for fair scheduling
+            analysis: Analysis profile ("lite", "standard", "deep", "auto"), or None for the worker's default
+            profile: Whether to profile the job (the caller checks the admin key)
+
+        Returns:
+            Worker reply
+        """
+        address = next(self._next_address)
+        return await self.request(address, {
+            'op': 'submit', 'job_id': job_id, 'path': path, 'mode': mode, 'timeline': timeline,
+            'client_id': client_id, 'analysis': analysis, 'profile': profile
+        })
+
+    async def status(self, job_id: str, points: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look a job up on every worker until one knows it.
+
+        Args:
+            job_id: Job identifier
+            points: Optional number of display points for the timeline series
+
+        Returns:
+            Job record, or None if no worker knows the job
+        """
+        for address in self.addresses:
+            try:
+                reply = await self.request(address, {'op': 'status', 'job_id': job_id, 'points': points})
+            except OSError:
+                continue
+            if reply.get('job') is not None:
+                return reply['job']
+        return None
+
+    async def _lookup(self, message: Dict[str, Any], field: str) -> Optional[Dict[str, Any]]:
+        # First reply that has the field, or that reports an error
+        for address in self.addresses:
+            try:
+                reply = await self.request(address, message)
+            except OSError:
+                continue
+            if not reply.get('ok') or reply.get(field) is not None:
+                return reply
+        return None
+
+    async def timeline(self, job_id: str, level: float) -> Optional[Dict[str, Any]]:
+        """
+        Look up one level of a job's timeline pyramid on the workers.
+
+        Args:
+            job_id: Job identifier
+            level: Bin width in seconds
+
+        Returns:
+            Worker reply with the payload under "timeline" (or an error), or
+            None if no worker has a pyramid for the job
+        """
+        return await self._lookup({'op': 'timeline', 'job_id': job_id, 'level': level}, 'timeline')
+
+    async def profile(self, job_id: str, format: str = 'json') -> Optional[Dict[str, Any]]:
+        """
+        Look up the profile of a profiled job on the workers.
+
+        Args:
+            job_id: Job identifier
+            format: "json" for the report, "folded" for folded stacks
+
+        Returns:
+            Worker reply with the report or folded stacks under "profile", or
+            None if no worker has a profile for the job
+        """
+        return await self._lookup({'op': 'profile', 'job_id': job_id, 'format': format}, 'profile')
+
+    async def collect_sessions(self) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """
+        Collect the sessions completed on every worker since the last call.
+        Workers hand each session over once, so the caller must record them.
+
+        Returns:
+            List of (client_id, job_id, result, timestamp), oldest first
+        """
+        sessions = []
+        for address in self.addresses:
+            try:
+                reply = await self.request(address, {'op': 'sessions'})
+            except OSError:
+                continue
+            sessions.extend(reply.get('sessions') or [])
+        return sorted(sessions, key=lambda session: session[3])
+
+    async def cancel(self, job_id: str, reason: str = 'cancelled') -> Optional[str]:
+        """
+        Cancel a job on whichever worker runs it.
+
+        Args:
+            job_id: Job identifier
+            reason: Why the job was cancelled
+
+        Returns:
+            Job status after the call, or None if no worker knows the job
+        """
+        for address in self.addresses:
+            try:
+                reply = await self.request(address, {'op': 'cancel', 'job_id': job_id, 'reason': reason})
+            except OSError:
+                continue
+            if reply.get('ok'):
+                return reply['status']
+        return None
+
+    async def _broadcast(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        results = {}
+        for address in self.addresses:
+            name = address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+            try:
+                results[name] = await self.request(address, message)
+            except OSError as e:
+                results[name] = {'ok': False, 'error': str(e)}
+        return results
+
+    async def health(self) -> Dict[str, Any]:
+        """
+        Ping every worker.
+
+        Returns:
+            Mapping of address to worker reply (or error)
+        """
+        return await self._broadcast({'op': 'ping'})
+
+    async def stats(self) -> Dict[str, Any]:
+        """
+        Collect the window cache and scheduler statistics of every worker.
+
+        Returns:
+            Mapping of address to worker reply with "cache" and "scheduler" (or error)
+        """
+        return await self._broadcast({'op': 'stats'})
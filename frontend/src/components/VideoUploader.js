@@ -1,4 +1,4 @@
-import React, { useState, useRef } from 'react';
+import React, { useState, useRef, useEffect } from 'react';
 import { uploadVideo } from '../services/api';
 import Loading from './layout/Loading';
 import '../styles/components/VideoUploader.css';
@@ -7,6 +7,16 @@ function VideoUploader({ onUploadStart, onUploadSuccess, onUploadError, isLoadin
   const [file, setFile] = useState(null);
   const [isDragging, setIsDragging] = useState(false);
   const fileInputRef = useRef(null);
+  const uploadControllerRef = useRef(null);
+  
+  // Leaving the page aborts an in-flight upload, which cancels its analysis
+  useEffect(() => {
+    return () => {
+      if (uploadControllerRef.current) {
+        uploadControllerRef.current.abort();
+      }
+    };
+  }, []);
   
   const handleFileChange = (e) => {
     if (e.target.files.length > 0) {
@@ -41,10 +51,14 @@ function VideoUploader({ onUploadStart, onUploadSuccess, onUploadError, isLoadin
       const formData = new FormData();
       formData.append('file', file);
       
-      const data = await uploadVideo(formData);
+      uploadControllerRef.current = new AbortController();
+      const data = await uploadVideo(formData, uploadControllerRef.current.signal);
       onUploadSuccess(data);
     } catch (error) {
+      if (error.name === 'AbortError') return;
       onUploadError(error.message || 'Upload failed');
+    } finally {
+      uploadControllerRef.current = null;
     }
   };
   
@@ -6,15 +6,46 @@
 // API base URL - set to the Flask backend URL
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
+// Display points requested for the timeline charts (the server downsamples
+// wps_data and merges emotion runs; omit ?points for full resolution)
+const TIMELINE_POINTS = 800;
+
 /**
  * Upload a video file for analysis
  * 
  * @param {FormData} formData - Form data containing the video file
+ * @param {AbortSignal} [signal] - Aborting closes the request, which cancels the analysis
  * @returns {Promise<Object>} - Analysis results
  */
-export const uploadVideo = async (formData) => {
+export const uploadVideo = async (formData, signal) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/upload?points=${TIMELINE_POINTS}`, {
+      method: 'POST',
+      body: formData,
+      signal
+    });
+    
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.error || 'Failed to upload video');
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('Error uploading video:', error);
+    throw error;
+  }
+};
+
+/**
+ * Upload a video for progressive analysis
+ * 
+ * @param {FormData} formData - Form data containing the video file
+ * @returns {Promise<Object>} - Job descriptor with job_id and status_url
+ */
+export const uploadVideoProgressive = async (formData) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/upload`, {
+    const response = await fetch(`${API_BASE_URL}/upload?mode=progressive`, {
       method: 'POST',
       body: formData
     });
@@ -31,6 +62,52 @@ export const uploadVideo = async (formData) => {
   }
 };
 
+/**
+ * Get the status, progress and latest result of an analysis job
+ * 
+ * @param {string} jobId - Job identifier returned by uploadVideoProgressive
+ * @returns {Promise<Object>} - Job status with progress, phase and result
+ */
+export const getJobStatus = async (jobId) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}?points=${TIMELINE_POINTS}`);
+    
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.error || 'Failed to get job status');
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('Error getting job status:', error);
+    throw error;
+  }
+};
+
+/**
+ * Cancel a queued or running analysis job
+ * 
+ * @param {string} jobId - Job identifier returned by uploadVideoProgressive
+ * @returns {Promise<Object>} - Cancellation status
+ */
+export const cancelJob = async (jobId) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`, {
+      method: 'DELETE'
+    });
+    
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.error || 'Failed to cancel job');
+    }
+    
+    return await response.json();
+  } catch (error) {
+    console.error('Error cancelling job:', error);
+    throw error;
+  }
+};
+
 /**
  * Send a chat message to the AI coach
  * 
@@ -72,4 +149,33 @@ export const checkApiHealth = async () => {
     console.error('API health check failed:', error);
     return false;
   }
-};
\ No newline at end of file
+};
+
+/**
+ * Open a live practice session over WebSocket
+ * 
+ * Stream 16 kHz mono 16-bit PCM chunks with socket.send(arrayBuffer) and
+ * send JSON.stringify({ type: 'stop' }) when finished.
+ * 
+ * @param {Function} onEvent - Called with each parsed analysis event
+ * @returns {WebSocket} - The open socket
+ */
+export const openLiveSession = (onEvent) => {
+  const socketUrl = `${API_BASE_URL.replace(/^http/, 'ws')}/live`;
+  const socket = new WebSocket(socketUrl);
+  socket.binaryType = 'arraybuffer';
+  
+  socket.onmessage = (message) => {
+    try {
+      onEvent(JSON.parse(message.data));
+    } catch (error) {
+      console.error('Error parsing live event:', error);
+    }
+  };
+  
+  socket.onerror = (error) => {
+    console.error('Live session error:', error);
+  };
+  
+  return socket;
+};
@@ -0,0 +1,15 @@
+"""
+Library entry point for Speechably.
+
+    import speechably
+    result = speechably.analyze("rehearsal.mp4")
+
+Uses the same services as the Flask API, in a worker process that keeps
+the backend packages off the caller's sys.path; see backend/batch.py.
+"""
+from backend.batch import analyze, analyze_many
+
+__all__ = [
+    'analyze',
+    'analyze_many'
+]